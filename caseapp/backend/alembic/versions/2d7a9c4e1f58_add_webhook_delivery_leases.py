@@ -0,0 +1,28 @@
+"""Add replica leases to the webhook delivery queue
+
+Revision ID: 2d7a9c4e1f58
+Revises: 6f2b8d4e9a17
+Create Date: 2026-10-19 09:14:36.512804
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '2d7a9c4e1f58'
+down_revision = '6f2b8d4e9a17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Replica lease columns on webhook_delivery_queue; existing rows start unowned
+    op.add_column('webhook_delivery_queue', sa.Column('owner_id', sa.String(length=100), nullable=True))
+    op.add_column('webhook_delivery_queue', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_webhook_delivery_queue_owner_id'), 'webhook_delivery_queue', ['owner_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_webhook_delivery_queue_owner_id'), table_name='webhook_delivery_queue')
+    op.drop_column('webhook_delivery_queue', 'lease_expires_at')
+    op.drop_column('webhook_delivery_queue', 'owner_id')
@@ -0,0 +1,48 @@
+"""Add forensic source aggregates
+
+Revision ID: 3b7d2e9c41a8
+Revises: 0f087aba17ae
+Create Date: 2026-10-18 09:12:41.318502
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3b7d2e9c41a8'
+down_revision = '0f087aba17ae'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create forensic_source_aggregates table
+    op.create_table(
+        'forensic_source_aggregates',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('source_id', sa.Integer(), nullable=False),
+        sa.Column('total_items', sa.Integer(), nullable=False),
+        sa.Column('deleted_count', sa.Integer(), nullable=False),
+        sa.Column('first_item_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_item_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('counts_by_type', sa.JSON(), nullable=True),
+        sa.Column('counts_by_hour', sa.JSON(), nullable=True),
+        sa.Column('counts_by_weekday', sa.JSON(), nullable=True),
+        sa.Column('counts_by_day', sa.JSON(), nullable=True),
+        sa.Column('sentiment_positive', sa.Integer(), nullable=False),
+        sa.Column('sentiment_neutral', sa.Integer(), nullable=False),
+        sa.Column('sentiment_negative', sa.Integer(), nullable=False),
+        sa.Column('participant_stats', sa.JSON(), nullable=True),
+        sa.Column('edge_weights', sa.JSON(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['source_id'], ['forensic_sources.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_forensic_source_aggregates_id'), 'forensic_source_aggregates', ['id'], unique=False)
+    op.create_index(op.f('ix_forensic_source_aggregates_source_id'), 'forensic_source_aggregates', ['source_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_forensic_source_aggregates_source_id'), table_name='forensic_source_aggregates')
+    op.drop_index(op.f('ix_forensic_source_aggregates_id'), table_name='forensic_source_aggregates')
+    op.drop_table('forensic_source_aggregates')
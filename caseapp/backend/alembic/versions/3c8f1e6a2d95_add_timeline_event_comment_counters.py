@@ -0,0 +1,37 @@
+"""Add comment counters to timeline events
+
+Revision ID: 3c8f1e6a2d95
+Revises: 9b3e6f1a4c27
+Create Date: 2026-10-18 20:31:05.218764
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3c8f1e6a2d95'
+down_revision = '9b3e6f1a4c27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('timeline_events', sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('timeline_events', sa.Column('comment_participant_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute("""
+        UPDATE timeline_events AS event
+        SET comment_count = counts.comments,
+            comment_participant_count = counts.participants
+        FROM (
+            SELECT timeline_event_id, count(*) AS comments, count(DISTINCT created_by) AS participants
+            FROM timeline_comments
+            GROUP BY timeline_event_id
+        ) AS counts
+        WHERE counts.timeline_event_id = event.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('timeline_events', 'comment_participant_count')
+    op.drop_column('timeline_events', 'comment_count')
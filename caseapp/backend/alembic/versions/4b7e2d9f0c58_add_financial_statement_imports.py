@@ -0,0 +1,73 @@
+"""Add bulk financial statement imports
+
+Revision ID: 4b7e2d9f0c58
+Revises: e3a8c5d91b27
+Create Date: 2026-10-18 17:24:09.561237
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '4b7e2d9f0c58'
+down_revision = 'e3a8c5d91b27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create financial_statement_imports table
+    op.create_table(
+        'financial_statement_imports',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('case_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('account_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=True),
+        sa.Column('file_format', sa.String(length=10), nullable=False),
+        sa.Column('profile', sa.String(length=50), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('rows_parsed', sa.Integer(), nullable=False),
+        sa.Column('rows_inserted', sa.Integer(), nullable=False),
+        sa.Column('rows_duplicate', sa.Integer(), nullable=False),
+        sa.Column('rows_rejected', sa.Integer(), nullable=False),
+        sa.Column('errors', sa.JSON(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_by', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.ForeignKeyConstraint(['account_id'], ['financial_accounts.id'], ),
+        sa.ForeignKeyConstraint(['case_id'], ['cases.id'], ),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_financial_statement_imports_id'), 'financial_statement_imports', ['id'], unique=False)
+    op.create_index(op.f('ix_financial_statement_imports_case_id'), 'financial_statement_imports', ['case_id'], unique=False)
+    op.create_index(op.f('ix_financial_statement_imports_account_id'), 'financial_statement_imports', ['account_id'], unique=False)
+    op.create_index(op.f('ix_financial_statement_imports_status'), 'financial_statement_imports', ['status'], unique=False)
+
+    # Import provenance and natural-key dedupe on transactions
+    op.add_column('financial_transactions', sa.Column('import_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.add_column('financial_transactions', sa.Column('natural_key_hash', sa.String(length=64), nullable=True))
+    op.create_foreign_key(
+        'fk_financial_transactions_import_id', 'financial_transactions', 'financial_statement_imports',
+        ['import_id'], ['id']
+    )
+    op.create_index(op.f('ix_financial_transactions_import_id'), 'financial_transactions', ['import_id'], unique=False)
+    op.create_unique_constraint(
+        'uq_financial_transactions_natural_key', 'financial_transactions', ['account_id', 'natural_key_hash']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_financial_transactions_natural_key', 'financial_transactions', type_='unique')
+    op.drop_index(op.f('ix_financial_transactions_import_id'), table_name='financial_transactions')
+    op.drop_constraint('fk_financial_transactions_import_id', 'financial_transactions', type_='foreignkey')
+    op.drop_column('financial_transactions', 'natural_key_hash')
+    op.drop_column('financial_transactions', 'import_id')
+
+    op.drop_index(op.f('ix_financial_statement_imports_status'), table_name='financial_statement_imports')
+    op.drop_index(op.f('ix_financial_statement_imports_account_id'), table_name='financial_statement_imports')
+    op.drop_index(op.f('ix_financial_statement_imports_case_id'), table_name='financial_statement_imports')
+    op.drop_index(op.f('ix_financial_statement_imports_id'), table_name='financial_statement_imports')
+    op.drop_table('financial_statement_imports')
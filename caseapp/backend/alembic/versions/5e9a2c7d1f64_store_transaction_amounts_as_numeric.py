@@ -0,0 +1,36 @@
+"""Store transaction amounts as NUMERIC(18, 3)
+
+Revision ID: 5e9a2c7d1f64
+Revises: 7d1c3a5e9b42
+Create Date: 2026-10-18 19:02:45.318276
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5e9a2c7d1f64'
+down_revision = '7d1c3a5e9b42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Rounds existing float values to the nearest thousandth (below every currency's minor unit)
+    op.alter_column(
+        'financial_transactions', 'amount',
+        existing_type=sa.Float(),
+        type_=sa.Numeric(18, 3),
+        existing_nullable=False,
+        postgresql_using='round(amount::numeric, 3)'
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'financial_transactions', 'amount',
+        existing_type=sa.Numeric(18, 3),
+        type_=sa.Float(),
+        existing_nullable=False,
+        postgresql_using='amount::double precision'
+    )
@@ -0,0 +1,35 @@
+"""Add media processing job leases and claim index
+
+Revision ID: 5e9a3c7b1f64
+Revises: 8c4f1e7a2d95
+Create Date: 2026-10-18 13:27:05.918264
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5e9a3c7b1f64'
+down_revision = '8c4f1e7a2d95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Worker lease columns on media_processing_jobs
+    op.add_column('media_processing_jobs', sa.Column('worker_id', sa.String(length=100), nullable=True))
+    op.add_column('media_processing_jobs', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Composite index matching the worker claim query
+    op.create_index(
+        'ix_media_processing_jobs_claim',
+        'media_processing_jobs',
+        ['status', sa.text('priority DESC'), 'created_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_media_processing_jobs_claim', table_name='media_processing_jobs')
+    op.drop_column('media_processing_jobs', 'lease_expires_at')
+    op.drop_column('media_processing_jobs', 'worker_id')
@@ -0,0 +1,44 @@
+"""Index timeline events for date-window viewports
+
+Revision ID: 6f2b8d4e9a17
+Revises: 8a4d2f7c1e63
+Create Date: 2026-10-18 21:58:23.904512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '6f2b8d4e9a17'
+down_revision = '8a4d2f7c1e63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keyset pages compare (event_date, sort_rank, id), so every event needs a rank
+    op.execute("UPDATE timeline_events SET sort_rank = 'i' WHERE sort_rank IS NULL")
+    op.alter_column(
+        'timeline_events',
+        'sort_rank',
+        existing_type=sa.String(length=255),
+        nullable=False,
+        server_default='i'
+    )
+
+    op.create_index(
+        'ix_timeline_events_timeline_date',
+        'timeline_events',
+        ['timeline_id', 'event_date', 'sort_rank', 'id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_timeline_events_timeline_date', table_name='timeline_events')
+    op.alter_column(
+        'timeline_events',
+        'sort_rank',
+        existing_type=sa.String(length=255),
+        nullable=True,
+        server_default=None
+    )
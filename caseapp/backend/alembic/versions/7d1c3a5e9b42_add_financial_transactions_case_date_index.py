@@ -0,0 +1,25 @@
+"""Add case/date index for paginated transaction listings
+
+Revision ID: 7d1c3a5e9b42
+Revises: 4b7e2d9f0c58
+Create Date: 2026-10-18 18:11:37.904162
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '7d1c3a5e9b42'
+down_revision = '4b7e2d9f0c58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_financial_transactions_case_date', 'financial_transactions',
+        ['case_id', 'transaction_date', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_financial_transactions_case_date', table_name='financial_transactions')
@@ -0,0 +1,47 @@
+"""Add lexicographic sort ranks to timeline events
+
+Revision ID: 8a4d2f7c1e63
+Revises: 3c8f1e6a2d95
+Create Date: 2026-10-18 21:12:40.537219
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '8a4d2f7c1e63'
+down_revision = '3c8f1e6a2d95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('timeline_events', sa.Column('sort_rank', sa.String(length=255), nullable=True))
+
+    # Rank events that share a timestamp in their existing display order. Fixed-width hex keys
+    # are valid base-36 ranks, and trimming trailing zeros keeps their order.
+    op.execute("""
+        UPDATE timeline_events AS event
+        SET sort_rank = rtrim(lpad(to_hex(ranked.position), 8, '0'), '0')
+        FROM (
+            SELECT
+                id,
+                row_number() OVER (
+                    PARTITION BY case_id, event_date
+                    ORDER BY display_order NULLS LAST, created_at, id
+                ) AS position
+            FROM timeline_events
+        ) AS ranked
+        WHERE ranked.id = event.id
+    """)
+
+    op.create_index(
+        'ix_timeline_events_case_date_rank',
+        'timeline_events',
+        ['case_id', 'event_date', 'sort_rank']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_timeline_events_case_date_rank', table_name='timeline_events')
+    op.drop_column('timeline_events', 'sort_rank')
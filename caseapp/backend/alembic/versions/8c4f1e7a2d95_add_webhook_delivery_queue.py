@@ -0,0 +1,70 @@
+"""Add webhook subscriptions and delivery queue
+
+Revision ID: 8c4f1e7a2d95
+Revises: 3b7d2e9c41a8
+Create Date: 2026-10-18 11:02:17.604913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '8c4f1e7a2d95'
+down_revision = '3b7d2e9c41a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create webhook_subscriptions table
+    op.create_table(
+        'webhook_subscriptions',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('url', sa.String(length=2048), nullable=False),
+        sa.Column('events', sa.JSON(), nullable=False),
+        sa.Column('secret', sa.String(length=255), nullable=True),
+        sa.Column('headers', sa.JSON(), nullable=True),
+        sa.Column('active', sa.Boolean(), nullable=False),
+        sa.Column('max_retries', sa.Integer(), nullable=False),
+        sa.Column('retry_delay_seconds', sa.Integer(), nullable=False),
+        sa.Column('timeout_seconds', sa.Integer(), nullable=False),
+        sa.Column('batch_size', sa.Integer(), nullable=False),
+        sa.Column('max_concurrency', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_webhook_subscriptions_id'), 'webhook_subscriptions', ['id'], unique=False)
+
+    # Create webhook_delivery_queue table
+    op.create_table(
+        'webhook_delivery_queue',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('endpoint_id', sa.String(length=36), nullable=False),
+        sa.Column('event_type', sa.String(length=50), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('batch_id', sa.String(length=36), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('response_code', sa.Integer(), nullable=True),
+        sa.Column('response_body', sa.Text(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('delivered_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('retry_count', sa.Integer(), nullable=False),
+        sa.Column('next_retry_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['endpoint_id'], ['webhook_subscriptions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_webhook_delivery_queue_id'), 'webhook_delivery_queue', ['id'], unique=False)
+    op.create_index(op.f('ix_webhook_delivery_queue_endpoint_id'), 'webhook_delivery_queue', ['endpoint_id'], unique=False)
+    op.create_index(op.f('ix_webhook_delivery_queue_status'), 'webhook_delivery_queue', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_webhook_delivery_queue_status'), table_name='webhook_delivery_queue')
+    op.drop_index(op.f('ix_webhook_delivery_queue_endpoint_id'), table_name='webhook_delivery_queue')
+    op.drop_index(op.f('ix_webhook_delivery_queue_id'), table_name='webhook_delivery_queue')
+    op.drop_table('webhook_delivery_queue')
+    op.drop_index(op.f('ix_webhook_subscriptions_id'), table_name='webhook_subscriptions')
+    op.drop_table('webhook_subscriptions')
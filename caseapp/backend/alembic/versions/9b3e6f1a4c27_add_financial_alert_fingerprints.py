@@ -0,0 +1,53 @@
+"""Add fingerprints to financial alerts
+
+Revision ID: 9b3e6f1a4c27
+Revises: 5e9a2c7d1f64
+Create Date: 2026-10-18 19:47:12.604913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '9b3e6f1a4c27'
+down_revision = '5e9a2c7d1f64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('financial_alerts', sa.Column('fingerprint', sa.String(length=64), nullable=True))
+
+    # Fingerprint existing high-value and concentration alerts the way the detectors do, so
+    # re-running analysis recognises them. Only the oldest of any duplicates is fingerprinted.
+    op.execute("""
+        UPDATE financial_alerts AS alert
+        SET fingerprint = encode(sha256(convert_to(keyed.identity, 'UTF8')), 'hex')
+        FROM (
+            SELECT
+                id,
+                alert_type || '|' || case_id::text || '|' || identity AS identity,
+                row_number() OVER (PARTITION BY case_id, alert_type, identity ORDER BY created_at, id) AS copy
+            FROM (
+                SELECT
+                    id, case_id, alert_type, created_at,
+                    CASE alert_type
+                        WHEN 'high_value' THEN transaction_id::text
+                        ELSE trigger_criteria ->> 'counterparty'
+                    END AS identity
+                FROM financial_alerts
+                WHERE alert_type IN ('high_value', 'concentration')
+            ) AS candidates
+            WHERE identity IS NOT NULL
+        ) AS keyed
+        WHERE alert.id = keyed.id AND keyed.copy = 1
+    """)
+
+    op.create_unique_constraint(
+        'uq_financial_alerts_fingerprint', 'financial_alerts', ['case_id', 'fingerprint']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_financial_alerts_fingerprint', 'financial_alerts', type_='unique')
+    op.drop_column('financial_alerts', 'fingerprint')
@@ -0,0 +1,23 @@
+"""Add media evidence rendition manifest
+
+Revision ID: a41d6f2c8e37
+Revises: 5e9a3c7b1f64
+Create Date: 2026-10-18 14:05:43.207916
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a41d6f2c8e37'
+down_revision = '5e9a3c7b1f64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('media_evidence', sa.Column('renditions', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('media_evidence', 'renditions')
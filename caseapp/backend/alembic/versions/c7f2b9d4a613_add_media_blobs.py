@@ -0,0 +1,51 @@
+"""Add content-addressed media blobs
+
+Revision ID: c7f2b9d4a613
+Revises: a41d6f2c8e37
+Create Date: 2026-10-18 14:48:19.530127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c7f2b9d4a613'
+down_revision = 'a41d6f2c8e37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create media_blobs table
+    op.create_table(
+        'media_blobs',
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('file_path', sa.String(length=500), nullable=False),
+        sa.Column('file_size', sa.BigInteger(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('sha256')
+    )
+
+    # Register existing files as blobs, one reference per media record
+    op.execute(
+        """
+        INSERT INTO media_blobs (sha256, file_path, file_size, ref_count)
+        SELECT file_hash, MIN(file_path), MAX(file_size), COUNT(*)
+        FROM media_evidence
+        GROUP BY file_hash
+        """
+    )
+
+    # file_hash is now unique per case rather than globally
+    op.drop_index('ix_media_evidence_file_hash', table_name='media_evidence')
+    op.create_index(op.f('ix_media_evidence_file_hash'), 'media_evidence', ['file_hash'], unique=False)
+    op.create_unique_constraint('uq_media_evidence_case_file_hash', 'media_evidence', ['case_id', 'file_hash'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_media_evidence_case_file_hash', 'media_evidence', type_='unique')
+    op.drop_index(op.f('ix_media_evidence_file_hash'), table_name='media_evidence')
+    op.create_index('ix_media_evidence_file_hash', 'media_evidence', ['file_hash'], unique=True)
+    op.drop_table('media_blobs')
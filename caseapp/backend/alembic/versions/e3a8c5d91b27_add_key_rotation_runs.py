@@ -0,0 +1,43 @@
+"""Add checkpointed key rotation runs
+
+Revision ID: e3a8c5d91b27
+Revises: c7f2b9d4a613
+Create Date: 2026-10-18 16:02:41.284915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'e3a8c5d91b27'
+down_revision = 'c7f2b9d4a613'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create key_rotation_runs table
+    op.create_table(
+        'key_rotation_runs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('mode', sa.String(length=20), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('target_key_id', sa.String(length=255), nullable=True),
+        sa.Column('document_ids', sa.JSON(), nullable=False),
+        sa.Column('next_index', sa.Integer(), nullable=False),
+        sa.Column('rotated_count', sa.Integer(), nullable=False),
+        sa.Column('failed_count', sa.Integer(), nullable=False),
+        sa.Column('failed_documents', sa.JSON(), nullable=False),
+        sa.Column('error_message', sa.String(length=1000), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_key_rotation_runs_status'), 'key_rotation_runs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_key_rotation_runs_status'), table_name='key_rotation_runs')
+    op.drop_table('key_rotation_runs')
@@ -9,7 +9,7 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime
 
 from services.background_job_service import BackgroundJobService, JobPriority
-from services.webhook_service import WebhookService, WebhookEvent
+from services.webhook_service import webhook_service, WebhookEvent
 from schemas.background_jobs import (
     JobSubmissionRequest, JobSubmissionResponse,
     JobStatusResponse, JobStatisticsResponse,
@@ -24,7 +24,6 @@ router = APIRouter()
 
 # Global service instances (in production, these would be dependency injected)
 background_job_service = BackgroundJobService()
-webhook_service = WebhookService(background_job_service)
 
 @router.post("/submit", response_model=JobSubmissionResponse)
 async def submit_background_job(
@@ -259,7 +258,9 @@ async def create_webhook_endpoint(
             max_retries=request.max_retries,
             retry_delay_seconds=request.retry_delay_seconds,
             timeout_seconds=request.timeout_seconds,
-            headers=request.headers
+            headers=request.headers,
+            batch_size=request.batch_size,
+            max_concurrency=request.max_concurrency
         )
         
         return WebhookEndpointResponse(
@@ -272,6 +273,8 @@ async def create_webhook_endpoint(
             retry_delay_seconds=endpoint.retry_delay_seconds,
             timeout_seconds=endpoint.timeout_seconds,
             headers=endpoint.headers,
+            batch_size=endpoint.batch_size,
+            max_concurrency=endpoint.max_concurrency,
             created_at=endpoint.created_at,
             updated_at=endpoint.updated_at
         )
@@ -307,6 +310,8 @@ async def list_webhook_endpoints(
             retry_delay_seconds=ep.retry_delay_seconds,
             timeout_seconds=ep.timeout_seconds,
             headers=ep.headers,
+            batch_size=ep.batch_size,
+            max_concurrency=ep.max_concurrency,
             created_at=ep.created_at,
             updated_at=ep.updated_at
         )
@@ -343,6 +348,8 @@ async def get_webhook_endpoint(
         retry_delay_seconds=endpoint.retry_delay_seconds,
         timeout_seconds=endpoint.timeout_seconds,
         headers=endpoint.headers,
+        batch_size=endpoint.batch_size,
+        max_concurrency=endpoint.max_concurrency,
         created_at=endpoint.created_at,
         updated_at=endpoint.updated_at
     )
@@ -374,7 +381,9 @@ async def update_webhook_endpoint(
         max_retries=request.max_retries,
         retry_delay_seconds=request.retry_delay_seconds,
         timeout_seconds=request.timeout_seconds,
-        headers=request.headers
+        headers=request.headers,
+        batch_size=request.batch_size,
+        max_concurrency=request.max_concurrency
     )
     
     if not endpoint:
@@ -390,6 +399,8 @@ async def update_webhook_endpoint(
         retry_delay_seconds=endpoint.retry_delay_seconds,
         timeout_seconds=endpoint.timeout_seconds,
         headers=endpoint.headers,
+        batch_size=endpoint.batch_size,
+        max_concurrency=endpoint.max_concurrency,
         created_at=endpoint.created_at,
         updated_at=endpoint.updated_at
     )
@@ -545,5 +556,6 @@ async def get_webhook_statistics(
         endpoint_breakdown=stats["endpoint_breakdown"],
         average_retries=stats["average_retries"],
         total_endpoints=stats["total_endpoints"],
-        active_endpoints=stats["active_endpoints"]
+        active_endpoints=stats["active_endpoints"],
+        delivery_queue=stats["delivery_queue"]
     )
\ No newline at end of file
@@ -2,32 +2,34 @@
 Collaboration API endpoints for real-time timeline sharing and presence
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, func, desc
 from typing import List, Optional, Dict, Any
 import structlog
 from datetime import datetime
 
+from core.config import settings
 from core.database import get_db
 from models.timeline import CaseTimeline, TimelineCollaboration, CollaborationSession, TimelineComment
 from models.user import User
 from services.timeline_collaboration_service import TimelineCollaborationService
-from services.presence_service import PresenceService
+from services.presence_service import presence_service
 from services.notification_service import NotificationService
 from services.external_sharing_service import ExternalSharingService
 from schemas.collaboration import (
     CollaborationShareRequest, CollaborationResponse, PresenceResponse,
     SessionStartRequest, SessionUpdateRequest, CommentCreateRequest, CommentResponse,
-    ExternalShareRequest, ExternalShareResponse
+    CommentThreadResponse, EventCommentThreadsResponse, ExternalShareRequest, ExternalShareResponse
 )
-from core.auth import get_current_user
+from core.auth import get_current_user, authenticate_token
 
 logger = structlog.get_logger()
 router = APIRouter()
 
 collaboration_service = TimelineCollaborationService()
-presence_service = PresenceService()
 notification_service = NotificationService()
 external_sharing_service = ExternalSharingService()
 
@@ -317,6 +319,13 @@ async def get_timeline_presence(
         logger.error("Failed to get timeline presence", error=str(e))
         raise HTTPException(status_code=500, detail="Failed to get presence data")
 
+def _require_own_session(session_id: str, user_id: str) -> Dict[str, Any]:
+    """The caller's active session; other users' sessions are reported as missing"""
+    session_data = presence_service.active_sessions.get(session_id)
+    if session_data is None or session_data['user_id'] != user_id:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session_data
+
 @router.get("/sessions/{session_id}/updates")
 async def get_session_updates(
     session_id: str,
@@ -325,6 +334,8 @@ async def get_session_updates(
 ):
     """Get pending updates for a collaboration session"""
     
+    _require_own_session(session_id, str(current_user.id))
+    
     try:
         updates = await presence_service.get_session_updates(session_id)
         return {"updates": updates}
@@ -333,6 +344,98 @@ async def get_session_updates(
         logger.error("Failed to get session updates", error=str(e))
         raise HTTPException(status_code=500, detail="Failed to get updates")
 
+@router.get("/sessions/{session_id}/events")
+async def stream_session_events(
+    session_id: str,
+    request: Request,
+    current_user = Depends(get_current_user)
+):
+    """Stream presence updates for a session as server-sent events (Requirements 6.2)"""
+    
+    _require_own_session(session_id, str(current_user.id))
+    subscription = presence_service.subscribe(session_id)
+    if subscription is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    async def event_stream():
+        while not await request.is_disconnected():
+            message = await subscription.get(timeout=settings.PRESENCE_HEARTBEAT_SECONDS)
+            yield f"data: {message}\n\n" if message is not None else ": keepalive\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/sessions/{session_id}/ws")
+async def presence_websocket(
+    websocket: WebSocket,
+    session_id: str,
+    token: str = Query(..., description="Access token (browsers cannot set headers on WebSocket requests)")
+):
+    """Bidirectional presence channel: pushes updates and accepts activity messages (Requirements 6.2)"""
+    
+    try:
+        payload = await authenticate_token(token)
+    except HTTPException:
+        await websocket.close(code=4401)
+        return
+    
+    user_id = str(payload["id"])
+    session_data = presence_service.active_sessions.get(session_id)
+    subscription = presence_service.subscribe(session_id)
+    if subscription is None or session_data is None or session_data['user_id'] != user_id:
+        await websocket.close(code=4404)
+        return
+    
+    await websocket.accept()
+    
+    async def send_updates():
+        while True:
+            message = await subscription.get(timeout=settings.PRESENCE_HEARTBEAT_SECONDS)
+            await websocket.send_text(message if message is not None else '{"type":"heartbeat"}')
+    
+    async def receive_activity():
+        while True:
+            activity = await websocket.receive_json()
+            if activity.get('type') != 'activity':
+                continue
+            activity_data = {
+                key: activity[key]
+                for key in presence_service.PERSISTED_FIELDS
+                if key in activity
+            }
+            if not await presence_service.update_session_activity(session_id, activity_data):
+                return
+            if activity_data.get('cursor_position') or activity_data.get('editing_event_id'):
+                await presence_service.broadcast_presence_update(
+                    timeline_id=session_data['timeline_id'],
+                    update_data={
+                        'type': 'presence_update',
+                        'user_id': user_id,
+                        'session_id': session_id,
+                        'cursor_position': activity_data.get('cursor_position'),
+                        'editing_event_id': activity_data.get('editing_event_id')
+                    },
+                    exclude_session_id=session_id
+                )
+    
+    tasks = [asyncio.create_task(send_updates()), asyncio.create_task(receive_activity())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if not task.cancelled() and task.exception() and not isinstance(task.exception(), WebSocketDisconnect):
+                logger.warning("Presence WebSocket error", session_id=session_id, error=str(task.exception()))
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+
 @router.post("/timelines/{timeline_id}/events/{event_id}/comments", response_model=CommentResponse)
 async def create_timeline_comment(
     timeline_id: str,
@@ -420,6 +523,49 @@ async def get_timeline_comments(
         logger.error("Failed to get timeline comments", error=str(e))
         raise HTTPException(status_code=500, detail="Failed to get comments")
 
+@router.get("/timelines/{timeline_id}/comments", response_model=List[EventCommentThreadsResponse])
+async def get_timeline_comment_threads(
+    timeline_id: str,
+    event_ids: List[str] = Query(..., description="Timeline event IDs to fetch discussions for"),
+    include_internal: bool = Query(True, description="Include internal comments"),
+    current_user = Depends(get_current_user)
+):
+    """
+    Get comment threads and discussion counts for many timeline events at once
+    
+    Lets a timeline view render every event's discussion with a constant number of queries
+    instead of one comments request per event. Events outside the timeline are omitted.
+    """
+    
+    if len(event_ids) > settings.TIMELINE_COMMENT_BATCH_MAX_EVENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.TIMELINE_COMMENT_BATCH_MAX_EVENTS} events per request"
+        )
+    
+    try:
+        threads = await collaboration_service.get_comment_threads(
+            timeline_id=timeline_id,
+            event_ids=event_ids,
+            include_internal=include_internal
+        )
+        
+        return [
+            EventCommentThreadsResponse(
+                event_id=event_id,
+                comment_count=discussion['comment_count'],
+                participant_count=discussion['participant_count'],
+                comments=[CommentThreadResponse(**comment) for comment in discussion['comments']]
+            )
+            for event_id, discussion in threads.items()
+        ]
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Failed to get timeline comment threads", error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to get comments")
+
 @router.post("/timelines/{timeline_id}/external-share", response_model=ExternalShareResponse)
 async def create_external_share_link(
     timeline_id: str,
@@ -8,7 +8,7 @@ from typing import Dict, Any
 from uuid import UUID
 import structlog
 
-from core.database import get_db
+from core.database import get_reporting_db
 from core.auth import get_current_user
 from models.user import User
 from schemas.timeline import TimelineExportRequest, TimelineExportResponse
@@ -25,7 +25,7 @@ async def export_case_timeline(
     case_id: UUID,
     export_request: TimelineExportRequest,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_reporting_db)
 ):
     """
     Export case timeline in various formats
@@ -2,19 +2,26 @@
 Financial Analysis API endpoints
 """
 
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, UploadFile, File, Form, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import List, Literal, Optional
+from datetime import datetime
 from uuid import UUID
+import json
 
-from core.database import get_db
+from core.database import get_db, get_reporting_db
 from schemas.financial_analysis import (
     FinancialAccountCreate, FinancialAccountResponse,
     FinancialTransactionCreate, FinancialTransactionResponse,
-    FinancialTransactionUpdate, FinancialAlertResponse, FinancialSummary
+    FinancialTransactionUpdate, FinancialAlertResponse, FinancialSummary,
+    FinancialTransactionListItem, FinancialTransactionPage, StatementImportResponse,
+    FlowTraceResponse, FlowCycleListResponse, FlowFanPatternResponse
 )
-from services.financial_analysis_service import FinancialAnalysisService
-from models.financial_analysis import FinancialAccount, FinancialTransaction, FinancialAlert
+from services.financial_analysis_service import FinancialAnalysisService, TransactionFilters
+from services.money_flow_service import MoneyFlowService
+from services.statement_import_service import StatementImportService
+from models.financial_analysis import FinancialAccount, FinancialTransaction, FinancialAlert, TransactionType
 
 router = APIRouter()
 
@@ -37,6 +44,43 @@ async def trigger_financial_analysis(
     await service.run_analysis(case_id)
     return {"message": "Analysis triggered successfully"}
 
+@router.get("/case/{case_id}/flow/trace", response_model=FlowTraceResponse)
+async def trace_money_flow(
+    case_id: UUID,
+    account_id: Optional[UUID] = Query(None, description="Case account to trace from"),
+    node: Optional[str] = Query(None, description="Flow node key to trace from (e.g. external:12345678)"),
+    max_hops: Optional[int] = Query(None, ge=1, le=8),
+    window_hours: Optional[int] = Query(None, ge=1, le=24 * 365),
+    since: Optional[datetime] = Query(None, description="Only follow funds that left the source from this time"),
+    db: AsyncSession = Depends(get_reporting_db)
+):
+    """Follow funds out of an account or counterparty across accounts, hop by hop in time order"""
+    service = MoneyFlowService(db)
+    return await service.trace(case_id, node_key=node, account_id=account_id, max_hops=max_hops,
+                               window_hours=window_hours, since=since)
+
+@router.get("/case/{case_id}/flow/cycles", response_model=FlowCycleListResponse)
+async def list_money_flow_cycles(
+    case_id: UUID,
+    max_hops: Optional[int] = Query(None, ge=2, le=8),
+    window_hours: Optional[int] = Query(None, ge=1, le=24 * 365),
+    db: AsyncSession = Depends(get_reporting_db)
+):
+    """Find round trips: funds that return to where they started within a time window"""
+    service = MoneyFlowService(db)
+    return await service.find_cycles(case_id, max_hops=max_hops, window_hours=window_hours)
+
+@router.get("/case/{case_id}/flow/fan-patterns", response_model=List[FlowFanPatternResponse])
+async def list_money_flow_fan_patterns(
+    case_id: UUID,
+    min_counterparties: Optional[int] = Query(None, ge=2),
+    window_hours: Optional[int] = Query(None, ge=1, le=24 * 365),
+    db: AsyncSession = Depends(get_reporting_db)
+):
+    """Find fan-in and fan-out of funds through a single account or counterparty"""
+    service = MoneyFlowService(db)
+    return await service.find_fan_patterns(case_id, min_counterparties=min_counterparties, window_hours=window_hours)
+
 @router.get("/case/{case_id}/accounts", response_model=List[FinancialAccountResponse])
 async def list_accounts(
     case_id: UUID,
@@ -68,15 +112,93 @@ async def create_transaction(
     await db.commit()
     return tx
 
-@router.get("/case/{case_id}/transactions", response_model=List[FinancialTransactionResponse])
+@router.post("/accounts/{account_id}/statements", response_model=StatementImportResponse, status_code=status.HTTP_201_CREATED)
+async def import_statement(
+    account_id: UUID,
+    file: UploadFile = File(...),
+    file_format: Optional[str] = Form(None),
+    profile: Optional[str] = Form(None),
+    column_mapping: Optional[str] = Form(None),
+    db: AsyncSession = Depends(get_reporting_db)
+):
+    """
+    Bulk-import a bank statement (CSV, OFX/QFX or QIF) into an account
+    
+    - **file_format**: csv, ofx or qif (detected from the file when omitted)
+    - **profile**: CSV column-mapping profile (generic, debit_credit, european, credit_card)
+    - **column_mapping**: JSON object overriding profile settings, e.g. {"date_column": "Posted"}
+    
+    Rows already imported for the account are skipped; detectors run once after loading.
+    """
+    try:
+        mapping = json.loads(column_mapping) if column_mapping else None
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="column_mapping must be a JSON object")
+    if mapping is not None and not isinstance(mapping, dict):
+        raise HTTPException(status_code=400, detail="column_mapping must be a JSON object")
+    
+    service = StatementImportService(db)
+    return await service.import_statement(
+        account_id, file.file, filename=file.filename, file_format=file_format,
+        profile=profile, column_mapping=mapping
+    )
+
+@router.get("/imports/{import_id}", response_model=StatementImportResponse)
+async def get_statement_import(
+    import_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the status and row counts of a statement import"""
+    service = StatementImportService(db)
+    statement_import = await service.get_import(import_id)
+    if not statement_import:
+        raise HTTPException(status_code=404, detail="Statement import not found")
+    return statement_import
+
+@router.get("/case/{case_id}/transactions", response_model=FinancialTransactionPage)
 async def list_transactions(
     case_id: UUID,
     account_id: Optional[UUID] = None,
+    date_from: Optional[datetime] = Query(None, description="Earliest transaction date (inclusive)"),
+    date_to: Optional[datetime] = Query(None, description="Latest transaction date (inclusive)"),
+    min_amount: Optional[float] = Query(None, ge=0),
+    max_amount: Optional[float] = Query(None, ge=0),
+    counterparty: Optional[str] = Query(None, min_length=1, description="Counterparty name substring or exact account number"),
+    transaction_type: Optional[List[TransactionType]] = Query(None),
+    is_suspicious: Optional[bool] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    format: Literal["json", "ndjson"] = Query("json", description="ndjson streams every matching row"),
     db: AsyncSession = Depends(get_db)
 ):
-    """List financial transactions for a case"""
+    """
+    List financial transactions for a case, newest first
+    
+    Pages are keyset-paginated: pass the returned next_cursor to fetch the following page.
+    With format=ndjson every matching transaction is streamed as one JSON object per line and
+    limit/cursor are ignored.
+    """
     service = FinancialAnalysisService(db)
-    return await service.get_transactions(case_id, account_id)
+    filters = TransactionFilters(
+        account_id=account_id,
+        date_from=date_from,
+        date_to=date_to,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        counterparty=counterparty,
+        transaction_types=transaction_type,
+        is_suspicious=is_suspicious
+    )
+    
+    if format == "ndjson":
+        async def ndjson_lines():
+            # The request's session stays open until the response body has been sent
+            async for row in service.stream_transactions(case_id, filters):
+                yield FinancialTransactionListItem.model_validate(row).model_dump_json() + "\n"
+        
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+    
+    return await service.list_transactions(case_id, filters, limit=limit, cursor=cursor)
 
 @router.put("/transactions/{transaction_id}", response_model=FinancialTransactionResponse)
 async def update_transaction(
@@ -8,12 +8,14 @@ from typing import Dict, Any
 from datetime import datetime, UTC
 import structlog
 
-from services.health_service import HealthService, HealthStatus
+from services.health_service import HealthService
+from services.health_monitor import health_monitor
 from services.comprehensive_health_service import ComprehensiveHealthService
 from core.auth import get_current_user
 from models.user import User
 from sqlalchemy.ext.asyncio import AsyncSession
 from core.database import get_db
+from core.http_client import http_client_registry
 from services.audit_service import AuditService
 
 logger = structlog.get_logger()
@@ -122,20 +124,17 @@ async def readiness_check():
     Kubernetes/Docker readiness probe endpoint
     
     Returns:
-        Simple readiness status for container orchestration
+        Simple readiness status for container orchestration, from the health monitor snapshot
     """
     try:
-        health_service = HealthService()
-        
-        # Check critical dependencies only
-        db_result = await health_service._check_database()
-        redis_result = await health_service._check_redis()
+        await health_monitor.ensure_fresh()
+        ready, reasons = health_monitor.readiness()
         
-        if (db_result.status == HealthStatus.HEALTHY and 
-            redis_result.status == HealthStatus.HEALTHY):
+        if ready:
             return {
                 "status": "ready",
-                "message": "System is ready to accept requests"
+                "message": "System is ready to accept requests",
+                "snapshot_age_seconds": health_monitor.snapshot_age()
             }
         else:
             raise HTTPException(
@@ -264,6 +263,22 @@ async def get_performance_metrics(
         logger.error("Failed to get performance metrics", error=str(e))
         raise HTTPException(status_code=500, detail=f"Failed to get performance metrics: {str(e)}")
 
+@router.get("/metrics/http-clients", response_model=Dict[str, Any])
+async def get_http_client_metrics(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get outbound HTTP connection pool utilisation
+    
+    Returns:
+        Per-pool connection usage, request counters and queue wait times
+    """
+    return {
+        "status": "success",
+        "timestamp": datetime.now(UTC).isoformat(),
+        "http_client_pools": http_client_registry.get_metrics()
+    }
+
 @router.get("/alerts", response_model=Dict[str, Any])
 async def get_active_alerts(
     current_user: User = Depends(get_current_user)
@@ -342,14 +357,11 @@ async def get_health_recommendations(
         raise HTTPException(status_code=500, detail=f"Failed to get health recommendations: {str(e)}")
 
 @router.get("/readiness/public", response_model=Dict[str, Any])
-async def readiness_check_public(
-    db: AsyncSession = Depends(get_db)
-):
+async def readiness_check_public():
     """Public readiness check (returns 200/503)"""
     try:
-        audit_service = AuditService(db)
-        health_service = HealthService()
-        result = await health_service.check_all_services(db, audit_service)
+        await health_monitor.ensure_fresh()
+        result = health_monitor.snapshot()
         
         if result["overall_status"] == "healthy":
             return {"status": "ready", "timestamp": datetime.now(UTC).isoformat()}
@@ -3,6 +3,7 @@ Media evidence management API endpoints
 """
 
 from typing import List, Optional
+from urllib.parse import quote
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request, status
 from fastapi.responses import FileResponse
@@ -13,6 +14,8 @@ from core.auth import get_current_user
 from models.user import User
 from services.media_service import MediaService
 from services.audit_service import AuditService
+from services.media_rendition_service import select_rendition
+from services.media_streaming_service import media_streaming_service, media_file_available
 from schemas.media import (
     MediaUploadRequest, MediaUpdateRequest, MediaSearchRequest,
     MediaAnnotationCreateRequest, MediaAnnotationUpdateRequest,
@@ -47,6 +50,7 @@ async def upload_media(
     categories: Optional[str] = Form(None),  # Comma-separated categories
     is_privileged: bool = Form(False),
     privilege_reason: Optional[str] = Form(None),
+    sha256: Optional[str] = Form(None),  # Optional client-computed content hash
     current_user: User = Depends(get_current_user),
     media_service: MediaService = Depends(get_media_service)
 ):
@@ -64,6 +68,7 @@ async def upload_media(
     - **categories**: Comma-separated categories for organization
     - **is_privileged**: Whether media is privileged
     - **privilege_reason**: Reason for privilege if applicable
+    - **sha256**: Optional SHA-256 of the file; known duplicates are rejected before the body is processed
     """
     try:
         # Validate file
@@ -88,7 +93,8 @@ async def upload_media(
             tags=parsed_tags,
             categories=parsed_categories,
             is_privileged=is_privileged,
-            privilege_reason=privilege_reason
+            privilege_reason=privilege_reason,
+            sha256=sha256
         )
         
         # Upload media
@@ -141,38 +147,58 @@ async def get_media(
             detail="Failed to get media"
         )
 
+@router.delete("/{media_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_media(
+    media_id: UUID,
+    current_user: User = Depends(get_current_user),
+    media_service: MediaService = Depends(get_media_service)
+):
+    """
+    Delete media evidence; its stored file is removed once no other media record shares it
+
+    - **media_id**: Media evidence ID
+    """
+    try:
+        deleted = await media_service.delete_media(media_id, current_user.id)
+    except CaseManagementException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Media {media_id} not found"
+        )
+
 @router.get("/{media_id}/download")
 async def download_media(
     media_id: UUID,
+    request: Request,
     current_user: User = Depends(get_current_user),
     media_service: MediaService = Depends(get_media_service)
 ):
     """
-    Download media evidence file
+    Download media evidence file (resumable with HTTP range requests)
     
     - **media_id**: Media evidence ID
     """
     try:
-        media = await media_service.get_media(media_id, include_annotations=False)
-        if not media:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Media {media_id} not found"
+        ip_address = request.client.host if request.client else "unknown"
+        key = media_streaming_service.session_key(media_id, current_user.id, ip_address, "download")
+        session = media_streaming_service.get_session(key)
+        
+        if session is None:
+            media = await _load_streamable_media(media_service, media_id)
+            access_log_id = await media_service.log_media_access(
+                media_id=media_id,
+                user_id=current_user.id,
+                access_type="download",
+                ip_address=ip_address
             )
+            session = media_streaming_service.open_session(key, media, access_log_id)
         
-        # Check if file exists
-        import os
-        if not os.path.exists(media.file_path):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Media file not found on disk"
-            )
-        
-        return FileResponse(
-            path=media.file_path,
-            filename=media.original_filename,
-            media_type=media.mime_type
-        )
+        response = media_streaming_service.build_response(session, request.headers, request.method)
+        response.headers["Content-Disposition"] = _attachment_disposition(session.filename)
+        return response
         
     except HTTPException:
         raise
@@ -186,6 +212,8 @@ async def download_media(
 @router.get("/{media_id}/thumbnail")
 async def get_media_thumbnail(
     media_id: UUID,
+    size: str = Query("small", description="Rendition size name, e.g. small, medium, large"),
+    format: str = Query("jpeg", pattern="^(jpeg|webp)$", description="Image format"),
     current_user: User = Depends(get_current_user),
     media_service: MediaService = Depends(get_media_service)
 ):
@@ -193,6 +221,8 @@ async def get_media_thumbnail(
     Get media thumbnail
     
     - **media_id**: Media evidence ID
+    - **size**: Rendition size (small, medium, large)
+    - **format**: Image format (jpeg, webp)
     """
     try:
         media = await media_service.get_media(media_id, include_annotations=False)
@@ -202,7 +232,13 @@ async def get_media_thumbnail(
                 detail=f"Media {media_id} not found"
             )
         
-        if not media.thumbnail_path:
+        rendition = select_rendition(media.renditions, size, format)
+        if rendition:
+            path, media_type = rendition["path"], f"image/{format}"
+        else:
+            path, media_type = media.thumbnail_path, "image/jpeg"
+        
+        if not path:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Thumbnail not available"
@@ -210,15 +246,18 @@ async def get_media_thumbnail(
         
         # Check if thumbnail exists
         import os
-        if not os.path.exists(media.thumbnail_path):
+        if not os.path.exists(path):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Thumbnail file not found on disk"
             )
         
+        # Renditions are content-addressed, so a given path never changes
+        headers = {"Cache-Control": "private, max-age=31536000, immutable"} if rendition else None
         return FileResponse(
-            path=media.thumbnail_path,
-            media_type="image/jpeg"
+            path=path,
+            media_type=media_type,
+            headers=headers
         )
         
     except HTTPException:
@@ -342,47 +381,29 @@ async def stream_media(
     """
     Stream media evidence file with HTTP range request support
     
+    Seeks within a playback session reuse the session: no database lookup or access log write
+    per range request.
+    
     - **media_id**: Media evidence ID
     """
     try:
-        media = await media_service.get_media(media_id, include_annotations=False)
-        if not media:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Media {media_id} not found"
+        ip_address = request.client.host if request.client else "unknown"
+        key = media_streaming_service.session_key(media_id, current_user.id, ip_address, "stream")
+        session = media_streaming_service.get_session(key)
+        
+        if session is None:
+            media = await _load_streamable_media(media_service, media_id)
+            
+            # Log media access for audit (once per playback session)
+            access_log_id = await media_service.log_media_access(
+                media_id=media_id,
+                user_id=current_user.id,
+                access_type="stream",
+                ip_address=ip_address
             )
+            session = media_streaming_service.open_session(key, media, access_log_id)
         
-        # Check if file exists
-        import os
-        if not os.path.exists(media.file_path):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Media file not found on disk"
-            )
-        
-        # Log media access for audit
-        await media_service.log_media_access(
-            media_id=media_id,
-            user_id=current_user.id,
-            access_type="stream",
-            ip_address=request.client.host if request.client else "unknown"
-        )
-        
-        # Handle range requests for streaming
-        range_header = request.headers.get('range')
-        
-        if range_header:
-            return await _handle_range_request(media.file_path, range_header, media.mime_type)
-        else:
-            # Return full file
-            return FileResponse(
-                path=media.file_path,
-                media_type=media.mime_type,
-                headers={
-                    "Accept-Ranges": "bytes",
-                    "Content-Length": str(media.file_size)
-                }
-            )
+        return media_streaming_service.build_response(session, request.headers, request.method)
         
     except HTTPException:
         raise
@@ -450,46 +471,46 @@ async def access_shared_media(
     """
     Access media through secure sharing link
     
+    A playback session counts as one view of the link, however many range requests it makes;
+    every request still checks that the link has not been revoked or expired.
+    
     - **share_token**: Secure sharing token
     """
     try:
-        # Validate and consume share link
-        media_info = await media_service.access_shared_media(
-            share_token=share_token,
-            ip_address=request.client.host if request.client else "unknown"
-        )
-        
-        if not media_info:
+        ip_address = request.client.host if request.client else "unknown"
+        key = media_streaming_service.session_key("shared", share_token, ip_address, "shared_view")
+        session = media_streaming_service.get_session(key)
+
+        if session is not None and not await media_service.is_share_link_active(share_token):
+            # Revoked or expired since the session opened
+            media_streaming_service.close_session(key)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Invalid or expired share link"
             )
-        
-        media = media_info["media"]
-        
-        # Check if file exists
-        import os
-        if not os.path.exists(media.file_path):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Media file not found on disk"
-            )
-        
-        # Handle range requests for streaming
-        range_header = request.headers.get('range')
-        
-        if range_header:
-            return await _handle_range_request(media.file_path, range_header, media.mime_type)
-        else:
-            # Return full file
-            return FileResponse(
-                path=media.file_path,
-                media_type=media.mime_type,
-                headers={
-                    "Accept-Ranges": "bytes",
-                    "Content-Length": str(media.file_size)
-                }
+
+        if session is None:
+            # Validate and consume share link
+            media_info = await media_service.access_shared_media(
+                share_token=share_token,
+                ip_address=ip_address
             )
+            
+            if not media_info:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Invalid or expired share link"
+                )
+            
+            media = media_info["media"]
+            if not media_file_available(media.file_path):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Media file not found on disk"
+                )
+            session = media_streaming_service.open_session(key, media, media_info.get("access_log_id"))
+        
+        return media_streaming_service.build_response(session, request.headers, request.method)
         
     except HTTPException:
         raise
@@ -500,51 +521,29 @@ async def access_shared_media(
             detail="Failed to access shared media"
         )
 
-async def _handle_range_request(file_path: str, range_header: str, mime_type: str):
-    """Handle HTTP range requests for media streaming"""
-    import os
-    from fastapi.responses import Response
-    
-    file_size = os.path.getsize(file_path)
-    
-    # Parse range header (e.g., "bytes=0-1023")
-    try:
-        range_match = range_header.replace('bytes=', '').split('-')
-        start = int(range_match[0]) if range_match[0] else 0
-        end = int(range_match[1]) if range_match[1] else file_size - 1
-        
-        # Validate range
-        if start >= file_size or end >= file_size or start > end:
-            return Response(
-                status_code=416,  # Range Not Satisfiable
-                headers={
-                    "Content-Range": f"bytes */{file_size}"
-                }
-            )
-        
-        # Read requested range
-        with open(file_path, 'rb') as f:
-            f.seek(start)
-            chunk_size = end - start + 1
-            data = f.read(chunk_size)
-        
-        return Response(
-            content=data,
-            status_code=206,  # Partial Content
-            media_type=mime_type,
-            headers={
-                "Accept-Ranges": "bytes",
-                "Content-Range": f"bytes {start}-{end}/{file_size}",
-                "Content-Length": str(chunk_size)
-            }
+async def _load_streamable_media(media_service: MediaService, media_id: UUID):
+    """Load media for a new playback session, raising 404 if it or its file is missing"""
+    media = await media_service.get_media(media_id, include_annotations=False)
+    if not media:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Media {media_id} not found"
         )
-        
-    except (ValueError, IndexError):
-        # Invalid range header
-        return Response(
-            status_code=400,
-            content="Invalid range header"
+    
+    if not media_file_available(media.file_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Media file not found on disk"
         )
+    return media
+
+def _attachment_disposition(filename: Optional[str]) -> str:
+    if not filename:
+        return "attachment"
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
 
 @router.get("/statistics", response_model=MediaStatisticsResponse)
 async def get_media_statistics(
@@ -13,15 +13,16 @@ from core.database import get_db
 from core.auth import get_current_user
 from models.user import User
 from schemas.timeline import (
-    TimelineEventCreateRequest, TimelineEventUpdateRequest,
+    TimelineEventCreateRequest, TimelineEventUpdateRequest, TimelineEventMoveRequest,
     EvidencePinCreateRequest, EvidencePinUpdateRequest,
     TimelineCommentCreateRequest, TimelineCommentUpdateRequest,
-    TimelineEventResponse, TimelineEventSummaryResponse, TimelineListResponse,
+    TimelineEventResponse, TimelineEventSummaryResponse, TimelineListResponse, TimelineViewportResponse,
     EvidencePinResponse, TimelineCommentResponse, EventTypeEnum,
     TimelineEventSuggestion, EventSuggestionRequest, 
     EventEnhancementRequest, EventEnhancementResponse
 )
 from services.timeline_service import TimelineService
+from services.timeline_viewport_service import TimelineViewportService, ZOOM_LEVELS
 from services.ai_timeline_service import AITimelineService
 from services.audit_service import AuditService
 from core.exceptions import CaseManagementException
@@ -69,7 +70,7 @@ async def get_timeline_event(
     
     - **event_id**: UUID of the timeline event to retrieve
     
-    Returns complete event information including evidence pins and comments.
+    Returns complete event information including evidence pins, with the evidence they point at, and comments.
     """
     try:
         event = await timeline_service.get_timeline_event(event_id)
@@ -79,7 +80,9 @@ async def get_timeline_event(
                 detail=f"Timeline event with ID {event_id} not found"
             )
         
-        return TimelineEventResponse.model_validate(event)
+        response = TimelineEventResponse.model_validate(event)
+        await timeline_service.resolve_pin_evidence(event.case_id, response.evidence_pins)
+        return response
         
     except HTTPException:
         raise
@@ -170,6 +173,10 @@ async def get_case_timeline(
         event_responses = [
             TimelineEventResponse.model_validate(event) for event in events
         ]
+        # Pinned evidence for the whole page, one query per evidence type at most
+        await timeline_service.resolve_pin_evidence(
+            case_id, [pin for event in event_responses for pin in event.evidence_pins]
+        )
         
         has_next = (offset + page_size) < total_count
         has_previous = page > 1
@@ -187,6 +194,46 @@ async def get_case_timeline(
         logger.error("Failed to get case timeline", case_id=str(case_id), error=str(e))
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
 
+@router.get("/timelines/{timeline_id}/viewport", response_model=TimelineViewportResponse)
+async def get_timeline_viewport(
+    timeline_id: UUID,
+    start_date: datetime = Query(..., description="Window start (inclusive)"),
+    end_date: datetime = Query(..., description="Window end (exclusive)"),
+    zoom: str = Query("auto", pattern=f"^({'|'.join(ZOOM_LEVELS)})$", description="events, a bucket width, or auto"),
+    event_types: Optional[List[EventTypeEnum]] = Query(None, description="Filter by event types"),
+    limit: int = Query(200, ge=1, le=1000, description="Raw events per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    top_events: int = Query(3, ge=1, le=20, description="Events listed per bucket"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get one date window of a timeline at a zoom level
+    
+    - **zoom=events**: Raw events in the window, keyset paginated with **cursor**
+    - **zoom=hour|day|week|month|quarter|year**: Server-side buckets with counts and top events
+    - **zoom=auto**: Raw events if the window holds at most **limit** of them, otherwise the finest buckets that fit
+    
+    Evidence pins and comments are not included; fetch them per event or with the batched comments endpoint.
+    """
+    try:
+        return await TimelineViewportService(db).get_viewport(
+            timeline_id,
+            start_date,
+            end_date,
+            zoom=zoom,
+            event_types=[et.value for et in event_types] if event_types else None,
+            limit=limit,
+            cursor=cursor,
+            top_events=top_events
+        )
+        
+    except CaseManagementException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error("Failed to get timeline viewport", timeline_id=str(timeline_id), error=str(e))
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+
 @router.post("/evidence-pins", response_model=EvidencePinResponse, status_code=status.HTTP_201_CREATED)
 async def pin_evidence_to_event(
     pin_request: EvidencePinCreateRequest,
@@ -275,6 +322,7 @@ async def reorder_timeline_events(
     
     Reorders timeline events while maintaining chronological constraints and proper validation.
     Each item in event_orders should have: {"event_id": "uuid", "new_date": "iso_date", "display_order": int}
+    The whole batch is applied in one statement; use the move endpoint for single drags.
     """
     try:
         updated_events = await timeline_service.reorder_timeline_events(
@@ -290,6 +338,43 @@ async def reorder_timeline_events(
         logger.error("Failed to reorder timeline events", case_id=str(case_id), error=str(e))
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
 
+@router.post("/cases/{case_id}/timeline/events/{event_id}/move", response_model=TimelineEventResponse)
+async def move_timeline_event(
+    case_id: UUID,
+    event_id: UUID,
+    move_request: TimelineEventMoveRequest,
+    current_user: User = Depends(get_current_user),
+    timeline_service: TimelineService = Depends(get_timeline_service)
+):
+    """
+    Move a timeline event between two neighbours
+    
+    - **case_id**: UUID of the case
+    - **event_id**: UUID of the event being moved
+    - **previous_event_id** / **next_event_id**: The event's new neighbours (either may be omitted at an end)
+    - **new_date**: Optional new date for the event
+    
+    Only the moved event is updated, however long the timeline.
+    """
+    try:
+        event = await timeline_service.move_timeline_event(
+            case_id,
+            event_id,
+            current_user.id,
+            previous_event_id=move_request.previous_event_id,
+            next_event_id=move_request.next_event_id,
+            new_date=move_request.new_date
+        )
+        
+        return TimelineEventResponse.model_validate(event)
+        
+    except CaseManagementException as e:
+        logger.error("Timeline event move failed", error=str(e), user_id=str(current_user.id))
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error("Failed to move timeline event", event_id=str(event_id), error=str(e))
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+
 @router.get("/events/types", response_model=List[dict])
 async def get_event_types():
     """
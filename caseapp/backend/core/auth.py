@@ -219,10 +219,18 @@ class AuthService:
                 return True
         return False
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
-    """Get current authenticated user from token"""
+async def authenticate_token(token: str) -> Dict[str, Any]:
+    """
+    Validate an access token and return the authenticated user's claims
+    
+    Shared by the bearer-token dependency and transports that carry the token elsewhere
+    (WebSocket query parameters), so every channel applies the same checks.
+    
+    Raises:
+        HTTPException: 401 if the token is invalid or MFA has not been completed
+    """
     try:
-        payload = await AuthService.verify_token(credentials.credentials)
+        payload = await AuthService.verify_token(token)
         user_id: str = payload.get("sub") or payload.get("username")
         if user_id is None:
             raise HTTPException(
@@ -259,6 +267,10 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
+    """Get current authenticated user from token"""
+    return await authenticate_token(credentials.credentials)
+
 class SecurityAuditService:
     """Service for security auditing and monitoring"""
     
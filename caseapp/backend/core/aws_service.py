@@ -2,6 +2,7 @@
 AWS Services Integration
 """
 
+import asyncio
 import boto3
 import structlog
 from typing import Optional, Dict, Any
@@ -23,8 +24,13 @@ class AWSService:
         self.kms_client: Optional[boto3.client] = None
         self._initialized = False
     
-    async def initialize(self) -> None:
-        """Initialize all AWS service clients"""
+    async def initialize(self, verify: bool = True) -> None:
+        """
+        Initialize all AWS service clients
+        
+        Args:
+            verify: Probe S3 and Textract connectivity; startup defers this to verify_connectivity
+        """
         try:
             # Configure AWS session
             session_kwargs = {
@@ -37,18 +43,12 @@ class AWSService:
                     'aws_secret_access_key': settings.AWS_SECRET_ACCESS_KEY
                 })
             
-            session = boto3.Session(**session_kwargs)
-            
-            # Initialize service clients
-            self.textract_client = session.client('textract')
-            self.comprehend_client = session.client('comprehend')
-            self.bedrock_client = session.client('bedrock-runtime')
-            self.transcribe_client = session.client('transcribe')
-            self.s3_client = session.client('s3')
-            self.kms_client = session.client('kms')
+            # Client creation loads botocore service models from disk, so keep it off the event loop
+            await asyncio.to_thread(self._create_clients, session_kwargs)
             
             # Test connectivity
-            await self._test_connectivity()
+            if verify:
+                await self.verify_connectivity()
             
             self._initialized = True
             logger.info("AWS services initialized successfully")
@@ -60,7 +60,22 @@ class AWSService:
             logger.error("Failed to initialize AWS services", error=str(e))
             raise
     
-    async def _test_connectivity(self) -> None:
+    def _create_clients(self, session_kwargs: Dict[str, Any]) -> None:
+        session = boto3.Session(**session_kwargs)
+        
+        # Initialize service clients
+        self.textract_client = session.client('textract')
+        self.comprehend_client = session.client('comprehend')
+        self.bedrock_client = session.client('bedrock-runtime')
+        self.transcribe_client = session.client('transcribe')
+        self.s3_client = session.client('s3')
+        self.kms_client = session.client('kms')
+    
+    async def verify_connectivity(self) -> None:
+        """Test connectivity to AWS services without blocking the event loop"""
+        await asyncio.to_thread(self._test_connectivity)
+    
+    def _test_connectivity(self) -> None:
         """Test connectivity to AWS services"""
         try:
             # Test S3 connectivity
@@ -26,6 +26,14 @@ class Settings(BaseSettings):
     DB_PASSWORD: str = "password"
     DB_NAME: str = "courtcase_db"
     
+    # Database sessions and pool
+    DB_SESSION_MODE: str = "pre_ping"  # pre_ping | optimistic (reconnect on disconnect error) | validate (SELECT 1 per session)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100  # Per connection; 0 when running behind pgbouncer
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # Connection default; 0 disables
+    DB_STATEMENT_TIMEOUTS_MS: Dict[str, int] = {"interactive": 5000, "default": 30000, "reporting": 300000}
+    
     # Constructed DATABASE_URL from individual components
     @property
     def DATABASE_URL(self) -> str:
@@ -81,6 +89,12 @@ class Settings(BaseSettings):
     KMS_KEY_ID: Optional[str] = None
     ENCRYPTION_ALGORITHM: str = "AES-256-GCM"
     KEY_ROTATION_DAYS: int = 90
+    ENCRYPTION_CHUNK_SIZE: int = 64 * 1024  # Plaintext bytes per authenticated chunk
+    ENCRYPTION_DATA_KEY_MAX_MESSAGES: int = 1000  # Envelopes encrypted under one cached data key
+    ENCRYPTION_DATA_KEY_MAX_AGE_SECONDS: int = 300
+    ENCRYPTION_DATA_KEY_CACHE_SIZE: int = 1000  # Unwrapped keys cached for decryption
+    ENCRYPTION_ROTATION_CONCURRENCY: int = 16  # Documents rotated in parallel
+    ENCRYPTION_ROTATION_BATCH_SIZE: int = 500  # Documents per progress checkpoint
     
     # Compliance Configuration
     AUDIT_LOG_RETENTION_DAYS: int = 2555  # 7 years for legal compliance
@@ -106,6 +120,79 @@ class Settings(BaseSettings):
     ENABLE_AI_FEATURES: bool = True
     CASE_CATEGORIZATION_MODEL: str = "amazon.titan-text-express-v1"
     
+    # Outbound HTTP client pools (webhooks, integrations)
+    HTTP_CLIENT_POOL_LIMIT: int = 100
+    HTTP_CLIENT_POOL_LIMIT_PER_HOST: int = 10
+    HTTP_CLIENT_TIMEOUT_SECONDS: int = 30
+    HTTP_CLIENT_KEEPALIVE_SECONDS: int = 30
+    HTTP_CLIENT_DNS_CACHE_SECONDS: int = 300
+    
+    # Webhook delivery engine
+    WEBHOOK_MAX_CONCURRENT_DELIVERIES: int = 20
+    WEBHOOK_RETRY_MAX_DELAY_SECONDS: int = 3600
+    WEBHOOK_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    WEBHOOK_CIRCUIT_RESET_SECONDS: int = 60
+    WEBHOOK_DELIVERY_RETENTION: int = 10000  # Settled deliveries kept in memory
+    WEBHOOK_DELIVERY_LEASE_SECONDS: int = 300  # Renewed while held; expired leases are claimed by another replica
+    WEBHOOK_DELIVERY_CLAIM_BATCH: int = 500  # Outstanding deliveries claimed per poll
+    
+    # Real-time collaboration presence
+    PRESENCE_FLUSH_INTERVAL_SECONDS: int = 30  # Coalesced session activity writes to the database
+    PRESENCE_SUBSCRIBER_QUEUE_SIZE: int = 50
+    PRESENCE_HEARTBEAT_SECONDS: int = 15
+    PRESENCE_SESSION_TTL_SECONDS: int = 3600
+    TIMELINE_COMMENT_BATCH_MAX_EVENTS: int = 500  # Events per batched comment-thread request
+    TIMELINE_RANK_MAX_LENGTH: int = 24  # Sort ranks longer than this trigger a background rebalance
+    TIMELINE_VIEWPORT_PAGE_SIZE: int = 200  # Raw events per viewport page
+    TIMELINE_VIEWPORT_MAX_BUCKETS: int = 120  # Automatic zoom picks the finest width within this many buckets
+    TIMELINE_VIEWPORT_TOP_EVENTS: int = 3  # Events listed per bucket
+    TIMELINE_EVIDENCE_CACHE_SECONDS: int = 900  # Upper bound; resolved pins are invalidated when their evidence changes
+    
+    # Media processing workers (per-pool concurrency per replica)
+    MEDIA_WORKER_THUMBNAIL_CONCURRENCY: int = 4
+    MEDIA_WORKER_METADATA_CONCURRENCY: int = 4
+    MEDIA_WORKER_TRANSCRIPTION_CONCURRENCY: int = 2
+    MEDIA_WORKER_OCR_CONCURRENCY: int = 2
+    MEDIA_WORKER_POLL_SECONDS: int = 5
+    MEDIA_JOB_LEASE_SECONDS: int = 300  # Extended by heartbeats; expired leases are requeued
+    
+    # Media renditions (thumbnails, previews, video posters and sprite sheets)
+    MEDIA_RENDITION_WORKERS: int = 2  # Processes in the rendition pool
+    MEDIA_RENDITION_SIZES: Dict[str, int] = {"small": 200, "medium": 400, "large": 800}  # Longest edge in pixels
+    MEDIA_RENDITION_FORMATS: List[str] = ["jpeg", "webp"]
+    MEDIA_SPRITE_FRAMES: int = 25
+    MEDIA_SPRITE_TILE_WIDTH: int = 160
+    FFMPEG_PATH: str = "ffmpeg"
+    FFPROBE_PATH: str = "ffprobe"
+    
+    # Media streaming
+    MEDIA_PLAYBACK_SESSION_IDLE_SECONDS: int = 300  # Requests within this gap share one access log entry
+    MEDIA_PLAYBACK_SESSION_MAX_SECONDS: int = 3600  # Sessions end this long after opening, however active
+    MEDIA_PRESIGNED_URL_SECONDS: int = 900
+    
+    # Financial analysis
+    FINANCIAL_IMPORT_BATCH_SIZE: int = 5000  # Rows per COPY into the staging table
+    FINANCIAL_IMPORT_MAX_ERRORS: int = 100  # Rejected rows kept on the import record
+    FINANCIAL_SUMMARY_CACHE_SECONDS: int = 900  # Upper bound; summaries are invalidated on every change
+    FINANCIAL_FLOW_MAX_HOPS: int = 4  # Longest path followed when tracing funds or finding round trips
+    FINANCIAL_FLOW_WINDOW_HOURS: int = 72  # A traced path or round trip must complete within this window
+    FINANCIAL_FLOW_FAN_COUNTERPARTIES: int = 5  # Distinct senders/receivers within the window for fan-in/out
+    FINANCIAL_FLOW_MAX_PATHS: int = 20000  # Search budget per trace or cycle scan
+    FINANCIAL_FLOW_CACHE_SIZE: int = 16  # Case graphs kept in memory per worker
+    
+    # Service start-up
+    SERVICE_INIT_TIMEOUT_SECONDS: int = 30  # Per service; slow steps fail instead of stalling start-up
+    SERVICE_MIGRATION_TIMEOUT_SECONDS: int = 300
+    
+    # Health monitoring (checks run in the background; probes read the cached snapshot)
+    HEALTH_CRITICAL_INTERVAL_SECONDS: int = 10  # Database, Redis and HTTP pools
+    HEALTH_MIGRATIONS_INTERVAL_SECONDS: int = 300
+    HEALTH_AWS_INTERVAL_SECONDS: int = 60
+    HEALTH_SERVICES_INTERVAL_SECONDS: int = 300
+    HEALTH_CHECK_TIMEOUT_SECONDS: int = 5
+    HEALTH_CHECK_JITTER: float = 0.2  # +/- fraction of the interval
+    HEALTH_STALE_FACTOR: int = 3  # Results older than this many intervals fail readiness
+    
     # Court Integration
     COURT_EFILING_API_URL: Optional[str] = None
     COURT_EFILING_API_KEY: Optional[str] = None
@@ -3,10 +3,12 @@ Database configuration and session management with connection pooling and retry
 """
 
 import asyncio
-from typing import AsyncGenerator, Optional
+import threading
+from typing import AsyncGenerator, Callable, Dict, Any, Optional
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.pool import QueuePool, NullPool
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from sqlalchemy import text, event
 from sqlalchemy.exc import DisconnectionError, OperationalError
 import structlog
@@ -16,6 +18,91 @@ from core.config import settings
 
 logger = structlog.get_logger()
 
+SESSION_MODES = ("pre_ping", "optimistic", "validate")
+
+class PoolMetrics:
+    """
+    Connection pool counters, updated from pool events instead of logged per checkout
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        self.connections_created = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.disconnects = 0
+        self.checkout_waits = 0
+        self.checkout_wait_seconds = 0.0
+        self.checkout_wait_max_seconds = 0.0
+        self.checkout_timeouts = 0
+    
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.checkout_waits += 1
+            self.checkout_wait_seconds += seconds
+            self.checkout_wait_max_seconds = max(self.checkout_wait_max_seconds, seconds)
+            if timed_out:
+                self.checkout_timeouts += 1
+    
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+    
+    def snapshot(self, pool=None) -> Dict[str, Any]:
+        """Counters plus current gauges (checked out, overflow) when the pool exposes them"""
+        with self._lock:
+            metrics = {
+                "connections_created": self.connections_created,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "disconnects": self.disconnects,
+                "checkout_timeouts": self.checkout_timeouts,
+                "checkout_wait_avg_ms": round(self.checkout_wait_seconds / self.checkout_waits * 1000, 3)
+                if self.checkout_waits else 0.0,
+                "checkout_wait_max_ms": round(self.checkout_wait_max_seconds * 1000, 3)
+            }
+        
+        for gauge in ("size", "checkedout", "overflow"):
+            if hasattr(pool, gauge):
+                metrics[gauge] = getattr(pool, gauge)()
+        return metrics
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection"""
+    
+    metrics: Optional[PoolMetrics] = None
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+class DatabaseSession(Session):
+    """
+    ORM session that applies a per-route-class statement timeout at the start of each transaction
+    
+    Sessions without ``info["statement_timeout_ms"]`` use the connection default set at connect
+    time and issue no extra statement.
+    """
+
+@event.listens_for(DatabaseSession, "after_begin")
+def _apply_statement_timeout(session, transaction, connection):
+    timeout_ms = session.info.get("statement_timeout_ms")
+    if timeout_ms is not None and connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
 class DatabaseConnectionManager:
     """Enhanced database connection manager with pooling and retry logic"""
     
@@ -25,6 +112,8 @@ class DatabaseConnectionManager:
         self._connection_validated = False
         self._last_validation_time = 0
         self._validation_interval = 300  # 5 minutes
+        self.session_mode = settings.DB_SESSION_MODE if settings.DB_SESSION_MODE in SESSION_MODES else "pre_ping"
+        self.metrics = PoolMetrics()
         
     def create_engine(self):
         """Create database engine with optimized connection pooling"""
@@ -48,8 +137,13 @@ class DatabaseConnectionManager:
                     "jit": "off"
                 },
                 "command_timeout": 60,
+                # Cached per connection by the asyncpg dialect; 0 disables it (e.g. behind pgbouncer)
+                "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
             }
         }
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            # Connection default; route classes with other limits override it per transaction
+            engine_args["connect_args"]["server_settings"]["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
         
         # Configure pooling based on environment
         if settings.TESTING:
@@ -58,33 +152,52 @@ class DatabaseConnectionManager:
         else:
             # Production pool configuration
             engine_args.update({
-                "pool_size": 10,
-                "max_overflow": 20,
-                "pool_pre_ping": True,
+                "poolclass": InstrumentedQueuePool,
+                "pool_size": settings.DB_POOL_SIZE,
+                "max_overflow": settings.DB_MAX_OVERFLOW,
+                # "optimistic" skips the liveness ping; a disconnect error invalidates the pool instead
+                "pool_pre_ping": self.session_mode == "pre_ping",
                 "pool_recycle": 3600,
                 "pool_timeout": 30,
             })
             
         # Create engine
         self.engine = create_async_engine(database_url, **engine_args)
+        if isinstance(self.engine.pool, InstrumentedQueuePool):
+            self.engine.pool.metrics = self.metrics
+        self._register_pool_listeners(self.engine)
         
-        # Add connection event listeners for monitoring
-        @event.listens_for(self.engine.sync_engine, "connect")
+        return self.engine
+    
+    def _register_pool_listeners(self, engine):
+        """Count pool activity; only new connections and disconnects are logged"""
+        metrics = self.metrics
+        
+        @event.listens_for(engine.sync_engine, "connect")
         def receive_connect(dbapi_connection, connection_record):
+            metrics.increment("connections_created")
             logger.info("Database connection established", 
                        connection_id=id(dbapi_connection))
         
-        @event.listens_for(self.engine.sync_engine, "checkout")
+        @event.listens_for(engine.sync_engine, "checkout")
         def receive_checkout(dbapi_connection, connection_record, connection_proxy):
-            logger.debug("Database connection checked out from pool",
-                        connection_id=id(dbapi_connection))
+            metrics.increment("checkouts")
         
-        @event.listens_for(self.engine.sync_engine, "checkin")
+        @event.listens_for(engine.sync_engine, "checkin")
         def receive_checkin(dbapi_connection, connection_record):
-            logger.debug("Database connection returned to pool",
-                        connection_id=id(dbapi_connection))
+            metrics.increment("checkins")
         
-        return self.engine
+        @event.listens_for(engine.sync_engine, "invalidate")
+        def receive_invalidate(dbapi_connection, connection_record, exception):
+            metrics.increment("invalidations")
+        
+        @event.listens_for(engine.sync_engine, "handle_error")
+        def receive_error(context):
+            if context.is_disconnect:
+                # SQLAlchemy invalidates the pool, so the next checkout reconnects
+                metrics.increment("disconnects")
+                logger.warning("Database disconnect detected; pool invalidated",
+                               error=str(context.original_exception))
     
     def create_session_factory(self):
         """Create session factory with proper configuration"""
@@ -97,6 +210,7 @@ class DatabaseConnectionManager:
         self.session_factory = async_sessionmaker(
             self.engine,
             class_=AsyncSession,
+            sync_session_class=DatabaseSession,
             expire_on_commit=False,
             autoflush=True,
             autocommit=False
@@ -212,43 +326,78 @@ AsyncSessionLocal = db_manager.create_session_factory()
 # Create declarative base
 Base = declarative_base()
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+async def _open_session(statement_timeout_ms: Optional[int] = None) -> AsyncSession:
     """
-    Enhanced database session dependency with retry logic and proper error handling
+    Session for a request according to DB_SESSION_MODE
     
-    Yields:
-        AsyncSession: Database session with automatic cleanup
+    "pre_ping" and "optimistic" return the session without touching the database; connectivity is
+    handled by the pool's pre-ping or by invalidation on the first disconnect error. "validate"
+    keeps the old behaviour of running SELECT 1 (with retries) on every session.
     """
-    session = None
-    try:
-        # Get session with retry logic
+    if db_manager.session_mode == "validate":
         session = await db_manager.get_session_with_retry()
-        
-        logger.debug("Database session started")
+    else:
+        session = AsyncSessionLocal()
+    
+    if statement_timeout_ms is not None and statement_timeout_ms != settings.DB_STATEMENT_TIMEOUT_MS:
+        session.sync_session.info["statement_timeout_ms"] = statement_timeout_ms
+    return session
+
+async def _session_scope(statement_timeout_ms: Optional[int] = None) -> AsyncGenerator[AsyncSession, None]:
+    session = await _open_session(statement_timeout_ms)
+    try:
         yield session
         
         # Commit any pending transactions
         await session.commit()
-        logger.debug("Database session committed successfully")
         
     except Exception as e:
         logger.error("Database session error", error=str(e), error_type=type(e).__name__)
         
-        if session:
-            try:
-                await session.rollback()
-                logger.info("Database session rolled back due to error")
-            except Exception as rollback_error:
-                logger.error("Failed to rollback database session", error=str(rollback_error))
+        try:
+            await session.rollback()
+        except Exception as rollback_error:
+            logger.error("Failed to rollback database session", error=str(rollback_error))
         
         raise
     finally:
-        if session:
-            try:
-                await session.close()
-                logger.debug("Database session closed")
-            except Exception as close_error:
-                logger.error("Failed to close database session", error=str(close_error))
+        try:
+            await session.close()
+        except Exception as close_error:
+            logger.error("Failed to close database session", error=str(close_error))
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Database session dependency with commit on success, rollback on error and automatic cleanup
+    
+    Yields:
+        AsyncSession: Database session
+    """
+    async for session in _session_scope():
+        yield session
+
+def get_db_for(route_class: str) -> Callable[[], AsyncGenerator[AsyncSession, None]]:
+    """
+    Session dependency with the statement timeout configured for a route class
+    
+    Args:
+        route_class: Key of DB_STATEMENT_TIMEOUTS_MS (e.g. "interactive", "reporting")
+        
+    Returns:
+        FastAPI dependency yielding an AsyncSession
+    """
+    if route_class not in settings.DB_STATEMENT_TIMEOUTS_MS:
+        raise ValueError(f"Unknown database route class: {route_class}")
+    
+    async def dependency() -> AsyncGenerator[AsyncSession, None]:
+        async for session in _session_scope(settings.DB_STATEMENT_TIMEOUTS_MS[route_class]):
+            yield session
+    
+    dependency.__name__ = f"get_db_{route_class}"
+    return dependency
+
+# Dependencies for long-running report and export queries
+get_reporting_db = get_db_for("reporting")
 
 async def validate_database_connection() -> bool:
     """
@@ -286,6 +435,7 @@ async def get_database_info() -> dict:
                 "pool_type": str(type(pool).__name__),
                 "status": "active"
             }
+        pool_info["session_mode"] = db_manager.session_mode
         
         # Test connection
         connection_valid = await db_manager.validate_connection()
@@ -294,6 +444,7 @@ async def get_database_info() -> dict:
             "status": "healthy" if connection_valid else "unhealthy",
             "connection_valid": connection_valid,
             "pool_info": pool_info,
+            "pool_metrics": get_pool_metrics(),
             "database_url": settings.DATABASE_URL.split('@')[0] + '@***',  # Hide credentials
             "last_validation": db_manager._last_validation_time
         }
@@ -303,4 +454,10 @@ async def get_database_info() -> dict:
             "status": "error",
             "error": str(e),
             "error_type": type(e).__name__
-        }
\ No newline at end of file
+        }
+
+def get_pool_metrics() -> Dict[str, Any]:
+    """
+    Connection pool counters (checkouts, wait time, disconnects) and gauges (checked out, overflow)
+    """
+    return db_manager.metrics.snapshot(engine.pool if engine is not None else None)
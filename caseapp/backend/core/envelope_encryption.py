@@ -0,0 +1,242 @@
+"""
+Streaming envelope encryption format (AES-256-GCM in authenticated chunks)
+
+Layout::
+
+    header  = MAGIC | version:u8 | chunk_size:u32 | nonce_prefix:8
+              | key_id_len:u16 | key_id | wrapped_key_len:u16 | wrapped_key | context_len:u16 | context
+    chunk i = AES-GCM(data_key, nonce_prefix | i:u32, plaintext[i], aad = digest | i:u32 | final:u8)
+    digest  = sha256(MAGIC | version | chunk_size | nonce_prefix | context)
+
+Every chunk but the last holds exactly ``chunk_size`` plaintext bytes, so chunk boundaries can be
+computed from offsets and any byte range can be decrypted without touching the rest of the file.
+Binding the header digest, the chunk index and a final-chunk flag into each tag rejects header
+tampering, reordered or dropped chunks and truncation. The key id and wrapped key are left out of
+the digest so a key rotation can re-wrap the data key without touching the chunks; a substituted
+wrapped key simply unwraps to a key that fails authentication.
+"""
+
+import hashlib
+import io
+import json
+import os
+import struct
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Optional
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+MAGIC = b"ISPE"
+VERSION = 1
+DEFAULT_CHUNK_SIZE = 64 * 1024
+TAG_SIZE = 16
+NONCE_PREFIX_SIZE = 8
+
+_FIXED = struct.Struct(">4sBI8s")
+
+class EnvelopeError(Exception):
+    """Malformed or tampered envelope"""
+
+@dataclass
+class EnvelopeHeader:
+    chunk_size: int
+    nonce_prefix: bytes
+    key_id: str
+    wrapped_key: bytes
+    context: Dict[str, str]
+    context_bytes: bytes
+    raw: bytes
+
+    @property
+    def length(self) -> int:
+        return len(self.raw)
+
+    @property
+    def digest(self) -> bytes:
+        return hashlib.sha256(self.raw[:_FIXED.size] + self.context_bytes).digest()
+
+    @property
+    def encrypted_chunk_size(self) -> int:
+        return self.chunk_size + TAG_SIZE
+
+def build_header(
+    wrapped_key: bytes,
+    key_id: str,
+    context: Optional[Dict[str, str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> EnvelopeHeader:
+    """New header with a random nonce prefix (unique per envelope, even when the data key is reused)"""
+    context = context or {}
+    context_bytes = json.dumps(context, sort_keys=True, separators=(",", ":")).encode()
+    return _pack_header(chunk_size, os.urandom(NONCE_PREFIX_SIZE), key_id, wrapped_key, context, context_bytes)
+
+def rewrap_header(header: EnvelopeHeader, wrapped_key: bytes, key_id: str) -> EnvelopeHeader:
+    """Same header with a re-wrapped data key; the digest, and so every chunk, stays valid"""
+    return _pack_header(
+        header.chunk_size, header.nonce_prefix, key_id, wrapped_key, header.context, header.context_bytes
+    )
+
+def _pack_header(
+    chunk_size: int,
+    nonce_prefix: bytes,
+    key_id: str,
+    wrapped_key: bytes,
+    context: Dict[str, str],
+    context_bytes: bytes
+) -> EnvelopeHeader:
+    key_id_bytes = key_id.encode()
+    raw = b"".join([
+        _FIXED.pack(MAGIC, VERSION, chunk_size, nonce_prefix),
+        struct.pack(">H", len(key_id_bytes)), key_id_bytes,
+        struct.pack(">H", len(wrapped_key)), wrapped_key,
+        struct.pack(">H", len(context_bytes)), context_bytes
+    ])
+    return EnvelopeHeader(chunk_size, nonce_prefix, key_id, wrapped_key, context, context_bytes, raw)
+
+def read_header(reader: BinaryIO) -> EnvelopeHeader:
+    """Parse the header at the reader's current position"""
+    fixed = reader.read(_FIXED.size)
+    if len(fixed) != _FIXED.size:
+        raise EnvelopeError("Truncated envelope header")
+    magic, version, chunk_size, nonce_prefix = _FIXED.unpack(fixed)
+    if magic != MAGIC:
+        raise EnvelopeError("Not an encrypted envelope")
+    if version != VERSION:
+        raise EnvelopeError(f"Unsupported envelope version {version}")
+
+    parts = [fixed]
+
+    def read_field() -> bytes:
+        length_bytes = reader.read(2)
+        if len(length_bytes) != 2:
+            raise EnvelopeError("Truncated envelope header")
+        (length,) = struct.unpack(">H", length_bytes)
+        value = reader.read(length)
+        if len(value) != length:
+            raise EnvelopeError("Truncated envelope header")
+        parts.extend([length_bytes, value])
+        return value
+
+    key_id = read_field().decode()
+    wrapped_key = read_field()
+    context_bytes = read_field()
+    context = json.loads(context_bytes or b"{}")
+    return EnvelopeHeader(chunk_size, nonce_prefix, key_id, wrapped_key, context, context_bytes, b"".join(parts))
+
+def _nonce(header: EnvelopeHeader, index: int) -> bytes:
+    return header.nonce_prefix + struct.pack(">I", index)
+
+def _aad(header_digest: bytes, index: int, final: bool) -> bytes:
+    return header_digest + struct.pack(">I?", index, final)
+
+def encrypt_stream(reader: BinaryIO, writer: BinaryIO, data_key: bytes, header: EnvelopeHeader) -> int:
+    """
+    Encrypt reader into writer in constant memory
+
+    Returns:
+        Number of plaintext bytes encrypted
+    """
+    cipher = AESGCM(data_key)
+    digest = header.digest
+    writer.write(header.raw)
+
+    total = 0
+    index = 0
+    chunk = reader.read(header.chunk_size)
+    while True:
+        # Read one chunk ahead so the last chunk can be flagged as final
+        following = reader.read(header.chunk_size) if len(chunk) == header.chunk_size else b""
+        final = not following
+        writer.write(cipher.encrypt(_nonce(header, index), chunk, _aad(digest, index, final)))
+        total += len(chunk)
+        if final:
+            return total
+        chunk = following
+        index += 1
+
+def decrypt_stream(reader: BinaryIO, writer: BinaryIO, data_key: bytes, header: EnvelopeHeader) -> int:
+    """
+    Decrypt the chunks following an already-read header into writer in constant memory
+
+    Returns:
+        Number of plaintext bytes written
+    """
+    cipher = AESGCM(data_key)
+    digest = header.digest
+    size = header.encrypted_chunk_size
+
+    total = 0
+    index = 0
+    chunk = reader.read(size)
+    while True:
+        following = reader.read(size) if len(chunk) == size else b""
+        final = not following
+        if len(chunk) < TAG_SIZE:
+            raise EnvelopeError("Truncated envelope")
+        try:
+            plaintext = cipher.decrypt(_nonce(header, index), chunk, _aad(digest, index, final))
+        except Exception:
+            raise EnvelopeError(f"Chunk {index} failed authentication")
+        writer.write(plaintext)
+        total += len(plaintext)
+        if final:
+            return total
+        chunk = following
+        index += 1
+
+def plaintext_size(header: EnvelopeHeader, envelope_size: int) -> int:
+    """Plaintext length of an envelope from its total size"""
+    body = envelope_size - header.length
+    chunks = max(1, -(-body // header.encrypted_chunk_size))
+    return body - chunks * TAG_SIZE
+
+def decrypt_range(
+    reader: BinaryIO,
+    data_key: bytes,
+    header: EnvelopeHeader,
+    envelope_size: int,
+    start: int,
+    end: int
+) -> bytes:
+    """
+    Decrypt plaintext bytes ``start``..``end`` (inclusive), reading only the chunks that cover them
+    """
+    size = plaintext_size(header, envelope_size)
+    end = min(end, size - 1)
+    if start > end:
+        return b""
+
+    cipher = AESGCM(data_key)
+    digest = header.digest
+    last_index = max(0, -(-size // header.chunk_size) - 1)
+    first_chunk, last_chunk = start // header.chunk_size, end // header.chunk_size
+
+    output = io.BytesIO()
+    for index in range(first_chunk, last_chunk + 1):
+        reader.seek(header.length + index * header.encrypted_chunk_size)
+        chunk = reader.read(header.encrypted_chunk_size)
+        try:
+            plaintext = cipher.decrypt(_nonce(header, index), chunk, _aad(digest, index, index == last_index))
+        except Exception:
+            raise EnvelopeError(f"Chunk {index} failed authentication")
+        output.write(plaintext)
+
+    offset = start - first_chunk * header.chunk_size
+    return output.getvalue()[offset:offset + end - start + 1]
+
+def encrypt_bytes(content: bytes, data_key: bytes, header: EnvelopeHeader) -> bytes:
+    writer = io.BytesIO()
+    encrypt_stream(io.BytesIO(content), writer, data_key, header)
+    return writer.getvalue()
+
+def decrypt_bytes(envelope: bytes, data_key: bytes) -> bytes:
+    reader = io.BytesIO(envelope)
+    header = read_header(reader)
+    writer = io.BytesIO()
+    decrypt_stream(reader, writer, data_key, header)
+    return writer.getvalue()
+
+def rewrap_bytes(envelope: bytes, wrapped_key: bytes, key_id: str) -> bytes:
+    """Envelope with its data key re-wrapped; chunk ciphertext is copied unchanged"""
+    header = read_header(io.BytesIO(envelope))
+    return rewrap_header(header, wrapped_key, key_id).raw + envelope[header.length:]
@@ -0,0 +1,142 @@
+"""
+Per-case Redis cache entries stamped with a generation that committed changes advance
+"""
+
+import json
+import weakref
+from typing import Any, Dict, Iterable, Optional, Tuple
+from uuid import UUID
+import structlog
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+
+from core.redis import redis_service
+
+logger = structlog.get_logger()
+
+# Caches whose source models the session hooks below watch
+_caches: "weakref.WeakSet[GenerationCache]" = weakref.WeakSet()
+
+class GenerationCache:
+    """
+    One Redis entry per case, served only while it carries the case's current generation
+
+    Every committed ORM change to an instance of one of the source models (each has a case_id)
+    increments its case's generation. Callers read the generation together with the entry and
+    store what they compute under that generation, so an entry built from data that changed
+    mid-computation is never served, even if it is written after the invalidation. Without
+    Redis, reads report no generation and callers compute directly.
+    """
+
+    def __init__(self, key_prefix: str, sources: Tuple[type, ...], ttl_seconds: int):
+        self.key_prefix = key_prefix
+        self.sources = sources
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._pending_key = f"{key_prefix}:stale_cases"
+        _caches.add(self)
+
+    @property
+    def redis_client(self):
+        """Shared Redis connection, or None when Redis is unavailable"""
+        return redis_service.redis_client if redis_service._initialized else None
+
+    def _keys(self, case_id: UUID):
+        return f"{self.key_prefix}:{case_id}", f"{self.key_prefix}:generation:{case_id}"
+
+    async def read(self, case_id: UUID) -> Tuple[Optional[Any], Optional[str]]:
+        """
+        The case's entry if it is current, and the generation to store a new one under
+
+        Returns:
+            (value or None, generation); the generation is None when Redis is unavailable
+        """
+        client = self.redis_client
+        if client is None:
+            return None, None
+
+        entry_key, generation_key = self._keys(case_id)
+        try:
+            cached, generation = await client.mget(entry_key, generation_key)
+        except Exception as e:
+            logger.warning("Generation cache unavailable", cache=self.key_prefix, case_id=str(case_id), error=str(e))
+            return None, None
+
+        generation = generation or "0"
+        if cached:
+            entry = json.loads(cached)
+            if entry.get("generation") == generation:
+                return entry.get("value"), generation
+        return None, generation
+
+    async def write(self, case_id: UUID, generation: str, value: Any):
+        """Store the case's entry under the generation read before computing it"""
+        await redis_service.set(
+            self._keys(case_id)[0], {"generation": generation, "value": value}, expire=self.ttl_seconds
+        )
+
+    async def generation(self, case_id: UUID) -> Optional[str]:
+        """The case's current data generation, or None when Redis is unavailable"""
+        client = self.redis_client
+        if client is None:
+            return None
+        try:
+            (generation,) = await client.mget(self._keys(case_id)[1])
+        except Exception as e:
+            logger.warning("Generation cache unavailable", cache=self.key_prefix, case_id=str(case_id), error=str(e))
+            return None
+        return generation or "0"
+
+    async def invalidate(self, case_ids: Iterable[UUID]):
+        """Start a new generation for each case, so cached entries are never served again"""
+        client = self.redis_client
+        case_ids = set(case_ids)
+        if client is None or not case_ids:
+            return
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for case_id in case_ids:
+                    entry_key, generation_key = self._keys(case_id)
+                    pipe.incr(generation_key)
+                    pipe.delete(entry_key)
+                await pipe.execute()
+        except Exception as e:
+            # Entries still expire after ttl_seconds
+            logger.warning(
+                "Generation cache invalidation failed",
+                cache=self.key_prefix, case_ids=[str(c) for c in case_ids], error=str(e)
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "ttl_seconds": self.ttl_seconds}
+
+@event.listens_for(Session, "after_flush")
+def _collect_stale_cases(session, flush_context):
+    """Remember which cases an ORM flush touched, for each cache watching the flushed models"""
+    caches = list(_caches)
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        for cache in caches:
+            if isinstance(instance, cache.sources) and instance.case_id is not None:
+                session.info.setdefault(cache._pending_key, set()).add(instance.case_id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_cases(session):
+    for cache in list(_caches):
+        stale = session.info.pop(cache._pending_key, None)
+        if not stale:
+            continue
+        invalidation = cache.invalidate(stale)
+        try:
+            # AsyncSession commits inside a greenlet, so the invalidation can be awaited here and is
+            # finished before the caller's commit() returns
+            await_only(invalidation)
+        except Exception as e:
+            invalidation.close()
+            logger.warning("Generation cache invalidation skipped", cache=cache.key_prefix, error=str(e))
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stale_cases(session):
+    for cache in list(_caches):
+        session.info.pop(cache._pending_key, None)
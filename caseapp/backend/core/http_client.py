@@ -0,0 +1,189 @@
+"""
+Shared HTTP client sessions for outbound webhook and integration traffic
+"""
+
+import time
+import aiohttp
+import structlog
+from typing import Optional, Dict, Any
+
+from core.config import settings
+
+logger = structlog.get_logger()
+
+class HTTPClientPool:
+    """A pooled aiohttp session with connection accounting"""
+
+    def __init__(self, name: str, limit: int, limit_per_host: int, timeout_seconds: int):
+        self.name = name
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout_seconds = timeout_seconds
+        self.session: Optional[aiohttp.ClientSession] = None
+
+        # Counters maintained by aiohttp trace hooks
+        self.requests_started = 0
+        self.requests_completed = 0
+        self.requests_failed = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.queued_waits = 0
+        self.queued_wait_seconds = 0.0
+
+    def open(self) -> aiohttp.ClientSession:
+        """Create the underlying session (must run inside the event loop)"""
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=settings.HTTP_CLIENT_KEEPALIVE_SECONDS,
+            ttl_dns_cache=settings.HTTP_CLIENT_DNS_CACHE_SECONDS,
+            use_dns_cache=True,
+            enable_cleanup_closed=True
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout_seconds),
+            trace_configs=[self._trace_config()]
+        )
+        return self.session
+
+    async def close(self) -> None:
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Pool utilisation and request counters"""
+        connector = self.session.connector if self.session and not self.session.closed else None
+        in_use = 0
+        in_use_per_host: Dict[str, int] = {}
+        idle = 0
+
+        if connector is not None:
+            # aiohttp does not expose pool occupancy publicly; read its bookkeeping defensively
+            in_use = len(getattr(connector, "_acquired", ()))
+            for key, protocols in getattr(connector, "_acquired_per_host", {}).items():
+                in_use_per_host[f"{key.host}:{key.port}"] = len(protocols)
+            idle = sum(len(conns) for conns in getattr(connector, "_conns", {}).values())
+
+        return {
+            "open": connector is not None,
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "connections_in_use": in_use,
+            "connections_idle": idle,
+            "utilisation_percent": round(in_use / self.limit * 100, 2) if self.limit else 0.0,
+            "connections_in_use_per_host": in_use_per_host,
+            "requests_started": self.requests_started,
+            "requests_completed": self.requests_completed,
+            "requests_failed": self.requests_failed,
+            "requests_in_flight": self.requests_started - self.requests_completed - self.requests_failed,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "queued_waits": self.queued_waits,
+            "average_queue_wait_ms": round(self.queued_wait_seconds / self.queued_waits * 1000, 2) if self.queued_waits else 0.0
+        }
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            self.requests_started += 1
+
+        async def on_request_end(session, context, params):
+            self.requests_completed += 1
+
+        async def on_request_exception(session, context, params):
+            self.requests_failed += 1
+
+        async def on_connection_create_end(session, context, params):
+            self.connections_created += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self.connections_reused += 1
+
+        async def on_connection_queued_start(session, context, params):
+            context.queued_at = time.monotonic()
+
+        async def on_connection_queued_end(session, context, params):
+            self.queued_waits += 1
+            self.queued_wait_seconds += time.monotonic() - getattr(context, "queued_at", time.monotonic())
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_connection_queued_start.append(on_connection_queued_start)
+        trace_config.on_connection_queued_end.append(on_connection_queued_end)
+        return trace_config
+
+class HTTPClientRegistry:
+    """Application-scoped registry of pooled HTTP client sessions"""
+
+    POOL_NAMES = ("webhooks", "integrations", "health")
+
+    def __init__(self):
+        self._pools: Dict[str, HTTPClientPool] = {}
+        self._initialized = False
+        self._closed = False
+
+    async def initialize(self) -> None:
+        """Open all named pools"""
+        self._closed = False
+        for name in self.POOL_NAMES:
+            self._open_pool(name)
+        self._initialized = True
+        logger.info("HTTP client registry initialized", pools=list(self._pools))
+
+    def get_session(self, name: str = "integrations") -> aiohttp.ClientSession:
+        """
+        Get the shared session for a named pool, opening it on first use
+
+        Raises:
+            RuntimeError: If the registry has been closed for shutdown
+        """
+        if self._closed:
+            # A pool opened after shutdown would never be closed
+            raise RuntimeError(f"HTTP client registry is closed; cannot open pool {name}")
+        pool = self._pools.get(name)
+        if pool is None or pool.session is None or pool.session.closed:
+            pool = self._open_pool(name)
+        return pool.session
+
+    async def close(self) -> None:
+        """Close all pooled sessions"""
+        for pool in self._pools.values():
+            await pool.close()
+        self._pools.clear()
+        self._initialized = False
+        self._closed = True
+        logger.info("HTTP client registry closed")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Per-pool utilisation metrics for health endpoints"""
+        return {
+            "initialized": self._initialized,
+            "pools": {name: pool.get_metrics() for name, pool in self._pools.items()}
+        }
+
+    def _open_pool(self, name: str) -> HTTPClientPool:
+        if name not in self.POOL_NAMES:
+            raise ValueError(f"Unknown HTTP client pool: {name}")
+
+        if name == "health":
+            # Local self-checks only need a handful of short-lived connections
+            pool = HTTPClientPool(name=name, limit=10, limit_per_host=5, timeout_seconds=5)
+        else:
+            pool = HTTPClientPool(
+                name=name,
+                limit=settings.HTTP_CLIENT_POOL_LIMIT,
+                limit_per_host=settings.HTTP_CLIENT_POOL_LIMIT_PER_HOST,
+                timeout_seconds=settings.HTTP_CLIENT_TIMEOUT_SECONDS
+            )
+        pool.open()
+        self._pools[name] = pool
+        return pool
+
+# Global HTTP client registry instance
+http_client_registry = HTTPClientRegistry()
@@ -0,0 +1,114 @@
+"""
+Deferred imports and once-loaded models for heavy optional libraries
+
+Export, forensic and NLP dependencies (reportlab, matplotlib, pandas, spaCy, ...) cost seconds of
+import time and hundreds of MB of memory. Services bind them through ``lazy_import`` so a replica
+only pays for the libraries it actually uses, and share loaded models through ``lazy_registry``.
+"""
+
+import importlib
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Any, Callable, Dict, Optional
+import structlog
+
+logger = structlog.get_logger()
+
+class LazyModule(ModuleType):
+    """Module proxy that imports the real module on first attribute access"""
+
+    def __init__(self, name: str, registry: "LazyImportRegistry"):
+        super().__init__(name)
+        self._lazy_registry = registry
+        self._lazy_module: Optional[ModuleType] = None
+
+    def _load(self) -> ModuleType:
+        if self._lazy_module is None:
+            self._lazy_module = self._lazy_registry.import_module(self.__name__)
+        return self._lazy_module
+
+    def __getattr__(self, attribute: str) -> Any:
+        # Only called for attributes the proxy does not define itself
+        return getattr(self._load(), attribute)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._lazy_module is not None else "deferred"
+        return f"<LazyModule {self.__name__} ({state})>"
+
+class LazyImportRegistry:
+    """Tracks deferred modules, shared models and startup milestones"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.milestones: Dict[str, float] = {}
+        self.modules: Dict[str, Dict[str, Any]] = {}
+        self.models: Dict[str, Any] = {}
+        self.model_load_seconds: Dict[str, float] = {}
+        self._lock = threading.RLock()
+
+    def lazy_import(self, name: str) -> LazyModule:
+        """Proxy for ``name``, imported on first attribute access"""
+        self.modules.setdefault(name, {"loaded": name in sys.modules, "import_seconds": None})
+        return LazyModule(name, self)
+
+    def import_module(self, name: str) -> ModuleType:
+        with self._lock:
+            module = sys.modules.get(name)
+            if module is not None and not isinstance(module, LazyModule):
+                self.modules.setdefault(name, {"import_seconds": None})["loaded"] = True
+                return module
+
+            started = time.perf_counter()
+            module = importlib.import_module(name)
+            elapsed = time.perf_counter() - started
+            self.modules[name] = {"loaded": True, "import_seconds": round(elapsed, 4)}
+            logger.info("Deferred module imported", module=name, import_seconds=round(elapsed, 3))
+            return module
+
+    def get_model(self, name: str, loader: Callable[[], Any]) -> Any:
+        """
+        Load a model once per process and share it between services
+
+        The loader's result is cached even when it is None, so a missing optional model is
+        reported once instead of being retried on every use.
+        """
+        if name in self.models:
+            return self.models[name]
+
+        with self._lock:
+            if name not in self.models:
+                started = time.perf_counter()
+                self.models[name] = loader()
+                self.model_load_seconds[name] = round(time.perf_counter() - started, 4)
+                logger.info("Shared model loaded", model=name, available=self.models[name] is not None,
+                            load_seconds=self.model_load_seconds[name])
+            return self.models[name]
+
+    def mark(self, milestone: str):
+        """Record seconds since start-up (this module's first import) for a milestone; first call wins"""
+        self.milestones.setdefault(milestone, round(time.perf_counter() - self.started_at, 4))
+
+    def get_report(self) -> Dict[str, Any]:
+        return {
+            "milestones": dict(self.milestones),
+            "deferred_modules": sorted(name for name, info in self.modules.items() if not info["loaded"]),
+            "loaded_modules": {
+                name: info["import_seconds"] for name, info in self.modules.items() if info["loaded"]
+            },
+            "models": {
+                name: {"available": model is not None, "load_seconds": self.model_load_seconds.get(name)}
+                for name, model in self.models.items()
+            }
+        }
+
+# Global lazy import registry instance
+lazy_registry = LazyImportRegistry()
+
+def lazy_import(name: str) -> LazyModule:
+    """Module proxy imported on first attribute access"""
+    return lazy_registry.lazy_import(name)
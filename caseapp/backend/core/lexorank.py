@@ -0,0 +1,78 @@
+"""
+Lexicographic rank keys - fractional ordering that lets an item move without renumbering its neighbours
+"""
+
+from typing import List, Optional
+
+# Lowercase base 36 sorts the same byte-wise and under the usual locale collations
+RANK_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+RANK_BASE = len(RANK_DIGITS)
+
+def rank_between(before: Optional[str] = None, after: Optional[str] = None) -> str:
+    """
+    A key that sorts strictly between two keys
+
+    Keys are read as base-36 fractions (0.<digits>), so there is always room for another one.
+    None stands for the open start or end of the sequence. Generated keys never end in "0",
+    which keeps room below every key.
+
+    Raises:
+        ValueError: If before does not sort before after
+    """
+    before = before or ""
+    if after is not None and not before < after:
+        raise ValueError(f"Rank {before!r} does not sort before {after!r}")
+
+    digits = []
+    position = 0
+    while True:
+        low = RANK_DIGITS.index(before[position]) if position < len(before) else 0
+        high = RANK_DIGITS.index(after[position]) if after is not None and position < len(after) else RANK_BASE
+        if high - low > 1:
+            digits.append(RANK_DIGITS[(low + high) // 2])
+            return "".join(digits)
+        digits.append(RANK_DIGITS[low])
+        if high - low == 1:
+            # The prefix is now below after's, so only before bounds the remaining digits
+            after = None
+        position += 1
+
+# Rank of the only item in an empty sequence
+FIRST_RANK = rank_between()
+
+def spread_ranks(count: int, before: Optional[str] = None, after: Optional[str] = None) -> List[str]:
+    """
+    count short keys spaced evenly between two keys (the whole key space by default), in order
+
+    The keys share a width chosen so roughly RANK_BASE slots stay free between neighbours.
+
+    Raises:
+        ValueError: If before does not sort before after
+    """
+    before = before or ""
+    if after is not None and not before < after:
+        raise ValueError(f"Rank {before!r} does not sort before {after!r}")
+
+    width = max(1, len(before), len(after or ""))
+    while True:
+        low = _value(before, width)
+        high = _value(after, width) if after is not None else RANK_BASE ** width
+        if high - low >= (count + 1) * RANK_BASE:
+            break
+        width += 1
+    step = (high - low) // (count + 1)
+    return [_digits(low + (index + 1) * step, width).rstrip("0") for index in range(count)]
+
+def _value(key: str, width: int) -> int:
+    """A key as an integer count of RANK_BASE ** -width steps"""
+    value = 0
+    for digit in key.ljust(width, "0"):
+        value = value * RANK_BASE + RANK_DIGITS.index(digit)
+    return value
+
+def _digits(value: int, width: int) -> str:
+    digits = []
+    for _ in range(width):
+        value, digit = divmod(value, RANK_BASE)
+        digits.append(RANK_DIGITS[digit])
+    return "".join(reversed(digits))
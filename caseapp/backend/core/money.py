@@ -0,0 +1,41 @@
+"""
+Exact money amounts - currency minor units, quantization and scaled-integer conversion
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional, Union
+
+# Stored as NUMERIC(18, 3): three places hold the minor unit of every ISO 4217 currency
+AMOUNT_PRECISION = 18
+AMOUNT_PLACES = 3
+# Scaled integers (for vectorised analysis) count thousandths of the currency unit
+AMOUNT_FACTOR = 10 ** AMOUNT_PLACES
+
+DEFAULT_MINOR_UNITS = 2
+# ISO 4217 currencies whose minor unit is not two decimal places
+MINOR_UNITS = {
+    "BIF": 0, "CLP": 0, "DJF": 0, "GNF": 0, "ISK": 0, "JPY": 0, "KMF": 0, "KRW": 0, "PYG": 0,
+    "RWF": 0, "UGX": 0, "UYI": 0, "VND": 0, "VUV": 0, "XAF": 0, "XOF": 0, "XPF": 0,
+    "BHD": 3, "IQD": 3, "JOD": 3, "KWD": 3, "LYD": 3, "OMR": 3, "TND": 3,
+}
+
+AmountLike = Union[Decimal, float, int, str]
+
+def minor_units(currency: Optional[str]) -> int:
+    """Decimal places of the currency's minor unit"""
+    return MINOR_UNITS.get((currency or "").upper(), DEFAULT_MINOR_UNITS)
+
+def to_decimal(value: AmountLike) -> Decimal:
+    # str() keeps a float's shortest repr (0.1 -> "0.1") instead of its binary expansion
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+def quantize_amount(value: AmountLike, currency: Optional[str] = None) -> Decimal:
+    """Amount rounded half-up to the currency's minor unit"""
+    return to_decimal(value).quantize(Decimal(1).scaleb(-minor_units(currency)), rounding=ROUND_HALF_UP)
+
+def to_scaled(value: AmountLike) -> int:
+    """Exact integer count of thousandths"""
+    return int(to_decimal(value).scaleb(AMOUNT_PLACES).to_integral_value(rounding=ROUND_HALF_UP))
+
+def from_scaled(value: int) -> Decimal:
+    return Decimal(int(value)).scaleb(-AMOUNT_PLACES)
@@ -4,17 +4,31 @@ Manages service initialization, dependencies, and graceful shutdown
 """
 
 import asyncio
-from typing import Dict, List, Any, Optional
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Tuple
 import structlog
 from contextlib import asynccontextmanager
 
+from core.config import settings
 from core.database import engine, Base
 from core.redis import redis_service
 from core.aws_service import aws_service
+from core.http_client import http_client_registry
 from services.health_service import HealthService
 
 logger = structlog.get_logger()
 
+@dataclass
+class ServiceInitStep:
+    """A node in the service initialization graph"""
+    name: str
+    initialize: Callable[[], Awaitable[Dict[str, Any]]]
+    depends_on: Tuple[str, ...] = ()
+    critical: bool = False  # Dependents are skipped when a critical step fails
+    deferred: bool = False  # Runs in the background warm-up after startup completes
+    timeout: Optional[float] = None
+
 class ServiceManager:
     """Manages service lifecycle and dependencies"""
     
@@ -22,65 +36,66 @@ class ServiceManager:
         self.logger = logger.bind(component="service_manager")
         self.initialized_services: Dict[str, bool] = {}
         self.service_errors: Dict[str, str] = {}
+        self.initialization_times: Dict[str, float] = {}
         self.health_service = HealthService()
+        self.init_steps = self._build_init_graph()
+        self.warmup_task: Optional[asyncio.Task] = None
+    
+    def _build_init_graph(self) -> List[ServiceInitStep]:
+        """
+        Startup dependency graph
+        
+        Independent steps run concurrently; only migrations -> database and the steps that need
+        database and Redis are ordered. Connectivity probes and import checks are deferred.
+        """
+        return [
+            ServiceInitStep("migrations", self._initialize_migrations, timeout=settings.SERVICE_MIGRATION_TIMEOUT_SECONDS),
+            ServiceInitStep("database", self._initialize_database, depends_on=("migrations",), critical=True),
+            ServiceInitStep("redis", self._initialize_redis, critical=True),
+            ServiceInitStep("http_clients", self._initialize_http_clients),
+            ServiceInitStep("aws_services", self._initialize_aws_services),
+            ServiceInitStep("health_monitor", self._initialize_health_monitor, depends_on=("database", "redis")),
+            ServiceInitStep(
+                "integration_services", self._initialize_integration_services,
+                depends_on=("database", "redis", "http_clients")
+            ),
+            ServiceInitStep("aws_connectivity", self._verify_aws_connectivity, depends_on=("aws_services",), deferred=True),
+            ServiceInitStep("core_services", self._initialize_core_services, deferred=True),
+            ServiceInitStep("ai_services", self._initialize_ai_services, deferred=True),
+            ServiceInitStep("security_services", self._initialize_security_services, deferred=True)
+        ]
     
     async def initialize_all_services(self) -> Dict[str, Any]:
         """
-        Initialize all services in proper dependency order
+        Initialize startup services concurrently in dependency order
+        
+        Returns once every non-deferred step has finished; deferred steps continue in a
+        background warm-up task.
         
         Returns:
             Dict containing initialization results
         """
         self.logger.info("Starting service initialization")
+        started = time.perf_counter()
         
-        initialization_steps = [
-            ("database", self._initialize_database),
-            ("redis", self._initialize_redis),
-            ("aws_services", self._initialize_aws_services),
-            ("core_services", self._initialize_core_services),
-            ("ai_services", self._initialize_ai_services),
-            ("security_services", self._initialize_security_services),
-            ("integration_services", self._initialize_integration_services)
-        ]
+        startup_steps = [step for step in self.init_steps if not step.deferred]
+        deferred_steps = [step for step in self.init_steps if step.deferred]
         
-        results = {}
+        results = await self._run_steps(startup_steps)
         
-        for service_name, init_func in initialization_steps:
-            try:
-                self.logger.info(f"Initializing {service_name}")
-                result = await init_func()
-                self.initialized_services[service_name] = True
-                results[service_name] = {
-                    "status": "success",
-                    "message": f"{service_name} initialized successfully",
-                    "details": result
-                }
-                self.logger.info(f"{service_name} initialized successfully")
-            
-            except Exception as e:
-                error_msg = f"Failed to initialize {service_name}: {str(e)}"
-                self.logger.error(error_msg, error=str(e))
-                self.initialized_services[service_name] = False
-                self.service_errors[service_name] = error_msg
-                results[service_name] = {
-                    "status": "error",
-                    "message": error_msg,
-                    "details": {}
-                }
-                
-                # For critical services, stop initialization
-                if service_name in ["database", "redis"]:
-                    self.logger.error(f"Critical service {service_name} failed, stopping initialization")
-                    break
+        if deferred_steps:
+            self.warmup_task = asyncio.create_task(self._run_warmup(deferred_steps, results))
         
         # Generate overall status
-        successful_services = sum(1 for success in self.initialized_services.values() if success)
-        total_services = len(initialization_steps)
+        successful_services = sum(1 for result in results.values() if result["status"] == "success")
+        total_services = len(startup_steps)
         
         overall_status = {
             "status": "success" if successful_services == total_services else "partial",
             "successful_services": successful_services,
             "total_services": total_services,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "deferred_services": [step.name for step in deferred_steps],
             "services": results
         }
         
@@ -88,11 +103,101 @@ class ServiceManager:
             "Service initialization completed",
             successful=successful_services,
             total=total_services,
-            status=overall_status["status"]
+            status=overall_status["status"],
+            duration_ms=overall_status["duration_ms"],
+            timings=self.initialization_times
         )
         
         return overall_status
     
+    async def _run_steps(
+        self,
+        steps: List[ServiceInitStep],
+        results: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Run each step as soon as its dependencies have finished"""
+        results = {} if results is None else results
+        done: Dict[str, asyncio.Event] = {step.name: asyncio.Event() for step in steps}
+        critical = {step.name for step in self.init_steps if step.critical}
+        
+        async def run(step: ServiceInitStep):
+            try:
+                for dependency in step.depends_on:
+                    if dependency in done:
+                        await done[dependency].wait()
+                
+                failed = [
+                    dependency for dependency in step.depends_on
+                    if dependency in critical and not self.initialized_services.get(dependency)
+                ]
+                if failed:
+                    message = f"Skipped {step.name}: critical dependency failed ({', '.join(failed)})"
+                    self.logger.error(message)
+                    self.initialized_services[step.name] = False
+                    self.service_errors[step.name] = message
+                    results[step.name] = {"status": "skipped", "message": message, "details": {}}
+                    return
+                
+                results[step.name] = await self._run_step(step)
+            finally:
+                done[step.name].set()
+        
+        await asyncio.gather(*(run(step) for step in steps))
+        return results
+    
+    async def _run_step(self, step: ServiceInitStep) -> Dict[str, Any]:
+        self.logger.info(f"Initializing {step.name}")
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(step.initialize(), timeout=step.timeout or settings.SERVICE_INIT_TIMEOUT_SECONDS)
+            self.initialized_services[step.name] = True
+            status = {
+                "status": "success",
+                "message": f"{step.name} initialized successfully",
+                "details": result
+            }
+            self.logger.info(f"{step.name} initialized successfully")
+        
+        except Exception as e:
+            reason = "timed out" if isinstance(e, asyncio.TimeoutError) else str(e)
+            error_msg = f"Failed to initialize {step.name}: {reason}"
+            self.logger.error(error_msg, error=reason, critical=step.critical)
+            self.initialized_services[step.name] = False
+            self.service_errors[step.name] = error_msg
+            status = {
+                "status": "error",
+                "message": error_msg,
+                "details": {}
+            }
+        
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.initialization_times[step.name] = duration_ms
+        status["duration_ms"] = duration_ms
+        return status
+    
+    async def _run_warmup(self, steps: List[ServiceInitStep], results: Dict[str, Dict[str, Any]]):
+        """Background warm-up for probes that readiness does not wait on"""
+        await self._run_steps(steps, results)
+        self.logger.info(
+            "Service warm-up completed",
+            services={step.name: results[step.name]["status"] for step in steps},
+            timings={step.name: self.initialization_times.get(step.name) for step in steps}
+        )
+    
+    async def _initialize_health_monitor(self) -> Dict[str, Any]:
+        """Start background health checks that readiness and health probes read from"""
+        from services.health_monitor import health_monitor
+        
+        return await health_monitor.start()
+    
+    async def _initialize_migrations(self) -> Dict[str, Any]:
+        """Apply pending database migrations"""
+        from core.database_migration import run_startup_migrations
+        
+        if not await run_startup_migrations():
+            raise Exception("Database migrations failed or were skipped")
+        return {"migrations_applied": True}
+    
     async def _initialize_database(self) -> Dict[str, Any]:
         """Initialize database connection and create tables"""
         async with engine.begin() as conn:
@@ -116,9 +221,21 @@ class ServiceManager:
         
         return {"connection_established": True, "connection_verified": True}
     
+    async def _initialize_http_clients(self) -> Dict[str, Any]:
+        """Open shared outbound HTTP connection pools"""
+        await http_client_registry.initialize()
+        
+        return {"pools": list(http_client_registry.get_metrics()["pools"])}
+    
     async def _initialize_aws_services(self) -> Dict[str, Any]:
-        """Initialize AWS service clients"""
-        await aws_service.initialize()
+        """Initialize AWS service clients (connectivity is probed during warm-up)"""
+        await aws_service.initialize(verify=False)
+        
+        return {"clients_created": True}
+    
+    async def _verify_aws_connectivity(self) -> Dict[str, Any]:
+        """Probe AWS connectivity and report per-service health"""
+        await aws_service.verify_connectivity()
         
         # Verify AWS services
         aws_results = await self.health_service._check_aws_services()
@@ -229,10 +346,21 @@ class ServiceManager:
                 DeploymentOrchestrationService
             ]
             
+            # Resume persisted webhook deliveries and start the delivery engine
+            from services.webhook_service import webhook_service, DatabaseWebhookDeliveryStore
+            store = DatabaseWebhookDeliveryStore() if self.initialized_services.get("database") else None
+            webhook_delivery = await webhook_service.start(store=store)
+            
+            # Real-time presence fan-out and coalesced session activity persistence
+            from services.presence_service import presence_service
+            presence = await presence_service.start()
+            
             return {
                 "integration_services_available": len(service_classes),
                 "background_processing_enabled": True,
                 "webhook_support_enabled": True,
+                "webhook_delivery": webhook_delivery,
+                "presence": presence,
                 "deployment_monitoring_enabled": True,
                 "comprehensive_health_monitoring_enabled": True,
                 "diagnostic_tools_enabled": True,
@@ -254,15 +382,21 @@ class ServiceManager:
         """
         self.logger.info("Starting graceful service shutdown")
         
+        if self.warmup_task and not self.warmup_task.done():
+            self.warmup_task.cancel()
+            await asyncio.gather(self.warmup_task, return_exceptions=True)
+        
         shutdown_results = {}
         
         # Shutdown services in reverse order
         shutdown_steps = [
+            ("health_monitor", self._shutdown_health_monitor),
             ("integration_services", self._shutdown_integration_services),
             ("security_services", self._shutdown_security_services),
             ("ai_services", self._shutdown_ai_services),
             ("core_services", self._shutdown_core_services),
             ("aws_services", self._shutdown_aws_services),
+            ("http_clients", self._shutdown_http_clients),
             ("redis", self._shutdown_redis),
             ("database", self._shutdown_database)
         ]
@@ -291,10 +425,27 @@ class ServiceManager:
         self.logger.info("Service shutdown completed")
         return shutdown_results
     
+    async def _shutdown_health_monitor(self) -> Dict[str, Any]:
+        """Stop background health checks"""
+        from services.health_monitor import health_monitor
+        
+        await health_monitor.stop()
+        return {"checks_stopped": True}
+    
     async def _shutdown_integration_services(self) -> Dict[str, Any]:
         """Shutdown integration services"""
-        # Integration services are stateless, no special shutdown needed
-        return {"shutdown_type": "stateless"}
+        # Stop webhook dispatch before the HTTP pools close; outstanding deliveries resume on restart
+        from services.webhook_service import webhook_service
+        from services.presence_service import presence_service
+        from services.media_streaming_service import media_streaming_service
+        await webhook_service.stop()
+        await presence_service.stop()
+        await media_streaming_service.stop()
+        return {
+            "webhook_delivery_stopped": True,
+            "presence_activity_flushed": True,
+            "playback_sessions_flushed": True
+        }
     
     async def _shutdown_security_services(self) -> Dict[str, Any]:
         """Shutdown security services"""
@@ -316,6 +467,11 @@ class ServiceManager:
         # AWS clients are managed by boto3, no special shutdown needed
         return {"shutdown_type": "managed_by_boto3"}
     
+    async def _shutdown_http_clients(self) -> Dict[str, Any]:
+        """Close shared outbound HTTP connection pools"""
+        await http_client_registry.close()
+        return {"sessions_closed": True}
+    
     async def _shutdown_redis(self) -> Dict[str, Any]:
         """Shutdown Redis connection"""
         try:
@@ -337,6 +493,8 @@ class ServiceManager:
         return {
             "initialized_services": self.initialized_services,
             "service_errors": self.service_errors,
+            "initialization_times_ms": self.initialization_times,
+            "warmup_complete": self.warmup_task is None or self.warmup_task.done(),
             "total_services": len(self.initialized_services),
             "healthy_services": sum(1 for status in self.initialized_services.values() if status)
         }
\ No newline at end of file
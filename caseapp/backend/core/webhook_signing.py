@@ -0,0 +1,27 @@
+"""
+Webhook payload encoding and signing shared by all outbound webhook senders
+"""
+
+import hashlib
+import hmac
+from typing import Any, Dict, Iterable
+
+import orjson
+
+# Non-string keys are stringified; datetimes, UUIDs and enums are handled natively
+ENCODE_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+def encode_payload(payload: Dict[str, Any]) -> bytes:
+    """Serialise a webhook payload once; the result is both signed and sent"""
+    return orjson.dumps(payload, option=ENCODE_OPTIONS)
+
+def encode_batch(envelope: Dict[str, Any], bodies: Iterable[bytes], key: str = "events") -> bytes:
+    """Wrap already-encoded bodies in an envelope without re-serialising them"""
+    head = encode_payload({**envelope, key: []})
+    # head ends with '[]}' for the trailing key; splice the encoded bodies into the empty list
+    return head[:-2] + b",".join(bodies) + b"]}"
+
+def sign_payload(secret: str, body: bytes) -> str:
+    """HMAC-SHA256 signature header value for the exact bytes being sent"""
+    digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
@@ -2,6 +2,7 @@
 Court Case Management System - Main FastAPI Application
 """
 
+from core.lazy_imports import lazy_registry  # First import: startup milestones are timed from here
 from datetime import datetime, UTC
 from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
@@ -50,28 +51,8 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Court Case Management System")
     
-    # Step 1: Validate database connection
-    from core.database import validate_database_connection
-    logger.info("Validating database connection...")
-    
-    db_valid = await validate_database_connection()
-    if not db_valid:
-        logger.error("Database connection validation failed during startup")
-        # Continue startup but log the issue
-    else:
-        logger.info("Database connection validated successfully")
-    
-    # Step 2: Run database migrations
-    from core.database_migration import run_startup_migrations
-    logger.info("Running database migrations...")
-    
-    migration_success = await run_startup_migrations()
-    if migration_success:
-        logger.info("Database migrations completed successfully")
-    else:
-        logger.warning("Database migrations failed or were skipped")
-    
-    # Step 3: Initialize service manager
+    # Initialize services concurrently; migrations, database and Redis form the critical path
+    # and connectivity probes continue in a background warm-up
     service_manager = ServiceManager()
     app.state.service_manager = service_manager
     
@@ -87,7 +68,12 @@ async def lifespan(app: FastAPI):
             total=initialization_result["total_services"]
         )
     
-    logger.info("Application startup complete")
+    lazy_registry.mark("services_ready")
+    logger.info(
+        "Application startup complete",
+        startup=lazy_registry.milestones,
+        timings=service_manager.initialization_times
+    )
     
     yield
     
@@ -269,35 +255,33 @@ async def health_check():
 @app.get("/health/ready")
 async def readiness_check():
     """
-    Comprehensive readiness check for ALB health checks
-    Includes database connectivity validation
+    Readiness check for ALB health checks
+    Answered from the health monitor snapshot; database connectivity gates readiness
     """
+    from services.health_monitor import health_monitor
+    
     try:
-        from core.database import validate_database_connection
-        from services.health_service import HealthService
-        
-        # Database connectivity check
-        db_valid = await validate_database_connection()
+        await health_monitor.ensure_fresh()
+        ready, reasons = health_monitor.readiness(required=("database",))
+        snapshot_age = health_monitor.snapshot_age()
         
-        if not db_valid:
+        if not ready:
             raise HTTPException(
                 status_code=503,
                 detail={
                     "status": "not_ready",
                     "timestamp": datetime.now(UTC).isoformat(),
                     "message": "Database connection validation failed",
-                    "database": "disconnected"
+                    "database": "disconnected",
+                    "reasons": reasons,
+                    "snapshot_age_seconds": snapshot_age
                 }
             )
         
-        # Quick Redis check
-        health_service = HealthService()
-        redis_result = await health_service._check_redis()
-        redis_status = "connected" if redis_result.status == "healthy" else "error"
-        
-        # Check migration status
-        from core.database_migration import get_migration_status
-        migration_status = await get_migration_status()
+        redis_result = health_monitor.get_result("redis")
+        redis_status = "connected" if redis_result and redis_result.status == "healthy" else "error"
+        migrations_result = health_monitor.get_result("migrations")
+        migration_status = migrations_result.details if migrations_result else {}
         
         return {
             "status": "ready",
@@ -310,6 +294,7 @@ async def readiness_check():
                 "pending_count": migration_status.get("pending_count", 0),
                 "schema_status": migration_status.get("schema_status", "unknown")
             },
+            "snapshot_age_seconds": snapshot_age,
             "version": "1.0.0"
         }
             
@@ -331,23 +316,22 @@ async def readiness_check():
 async def detailed_health_check():
     """
     Detailed health check endpoint for monitoring and debugging
-    Returns comprehensive status of all services and dependencies
+    Returns the health monitor snapshot of all services and dependencies
     """
-    from services.health_service import HealthService
+    from services.health_monitor import health_monitor
+    from core.http_client import http_client_registry
     
     try:
-        health_service = HealthService()
+        await health_monitor.ensure_fresh()
+        snapshot = health_monitor.snapshot()
         
-        # Comprehensive health check
-        db_result = await health_service._check_database()
-        redis_result = await health_service._check_redis()
+        db_result = health_monitor.get_result("database")
+        redis_result = health_monitor.get_result("redis")
+        database_status = "connected" if db_result and db_result.status == "healthy" else "error"
+        redis_status = "connected" if redis_result and redis_result.status == "healthy" else "error"
         
-        database_status = "connected" if db_result.status == "healthy" else "error"
-        redis_status = "connected" if redis_result.status == "healthy" else "error"
-        
-        # Check migration status
-        from core.database_migration import get_migration_status
-        migration_status = await get_migration_status()
+        migrations_result = health_monitor.get_result("migrations")
+        migration_status = migrations_result.details if migrations_result else {}
         
         # Determine overall health
         is_healthy = database_status == "connected" and redis_status == "connected"
@@ -364,6 +348,14 @@ async def detailed_health_check():
                 "pending_count": migration_status.get("pending_count", 0),
                 "schema_status": migration_status.get("schema_status", "unknown")
             },
+            "checks": snapshot["checks"],
+            "snapshot_age_seconds": snapshot["snapshot_age_seconds"],
+            "http_client_pools": http_client_registry.get_metrics(),
+            "startup": lazy_registry.get_report(),
+            "service_initialization": (
+                app.state.service_manager.get_service_status()
+                if hasattr(app.state, "service_manager") else None
+            ),
             "version": "1.0.0"
         }
         
@@ -396,6 +388,8 @@ async def detailed_health_check():
             }
         )
 
+lazy_registry.mark("app_imported")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
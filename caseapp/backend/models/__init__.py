@@ -8,8 +8,9 @@ from .client import Client
 from .case import Case, CaseStatus, CaseType, CasePriority, AuditLog
 from .document import Document, DocumentStatus, DocumentType, ExtractedEntity, DocumentVersion
 from .timeline import TimelineEvent, EvidencePin
-from .media import MediaEvidence, MediaAnnotation, MediaProcessingJob, MediaShareLink, MediaAccessLog, MediaType, MediaFormat, ProcessingStatus
-from .financial_analysis import FinancialAccount, FinancialTransaction, FinancialAlert
+from .media import MediaEvidence, MediaAnnotation, MediaProcessingJob, MediaBlob, MediaShareLink, MediaAccessLog, MediaType, MediaFormat, ProcessingStatus
+from .financial_analysis import FinancialAccount, FinancialTransaction, FinancialAlert, FinancialStatementImport, StatementImportStatus
+from .encryption import KeyRotationRun, KeyRotationMode, KeyRotationStatus
 
 # Import other models as they are created
 from .forensic_analysis import ForensicSource
@@ -22,7 +23,8 @@ __all__ = [
     "AuditLog",
     "Document", "DocumentStatus", "DocumentType", "ExtractedEntity", "DocumentVersion",
     "TimelineEvent", "EvidencePin",
-    "MediaEvidence", "MediaAnnotation", "MediaProcessingJob", "MediaShareLink", "MediaAccessLog", "MediaType", "MediaFormat", "ProcessingStatus",
-    "FinancialAccount", "FinancialTransaction", "FinancialAlert",
+    "MediaEvidence", "MediaAnnotation", "MediaProcessingJob", "MediaBlob", "MediaShareLink", "MediaAccessLog", "MediaType", "MediaFormat", "ProcessingStatus",
+    "FinancialAccount", "FinancialTransaction", "FinancialAlert", "FinancialStatementImport", "StatementImportStatus",
+    "KeyRotationRun", "KeyRotationMode", "KeyRotationStatus",
     "ForensicSource"
 ]
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""
+Encryption key management models
+"""
+
+from sqlalchemy import Column, String, Integer, DateTime, JSON
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from uuid import uuid4
+from enum import Enum
+
+from core.database import Base
+
+class KeyRotationMode(str, Enum):
+    """How a key rotation treats each document"""
+    REWRAP = "rewrap"  # Re-wrap data keys under the target KMS key (KMS ReEncrypt)
+    REENCRYPT = "reencrypt"  # Decrypt and encrypt the content under a fresh data key
+
+class KeyRotationStatus(str, Enum):
+    """Key rotation run status"""
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class KeyRotationRun(Base):
+    """Checkpointed bulk key rotation; resumes from next_index after a failure or restart"""
+    
+    __tablename__ = "key_rotation_runs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    mode = Column(String(20), default=KeyRotationMode.REWRAP.value, nullable=False)
+    status = Column(String(20), default=KeyRotationStatus.RUNNING.value, nullable=False, index=True)
+    target_key_id = Column(String(255), nullable=True)
+    
+    # Work list and checkpoint (every document before next_index has been attempted)
+    document_ids = Column(JSON, nullable=False)
+    next_index = Column(Integer, default=0, nullable=False)
+    
+    # Results
+    rotated_count = Column(Integer, default=0, nullable=False)
+    failed_count = Column(Integer, default=0, nullable=False)
+    failed_documents = Column(JSON, nullable=False, default=list)
+    error_message = Column(String(1000), nullable=True)
+    
+    started_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    
+    def __repr__(self):
+        return f"<KeyRotationRun(id={self.id}, status={self.status}, next_index={self.next_index})>"
@@ -231,4 +231,73 @@ class WebhookDelivery(Base):
     endpoint = relationship("WebhookEndpoint", back_populates="deliveries")
     
     def __repr__(self):
-        return f"<WebhookDelivery(id={self.id}, endpoint_id={self.endpoint_id}, status='{self.status}')>"
\ No newline at end of file
+        return f"<WebhookDelivery(id={self.id}, endpoint_id={self.endpoint_id}, status='{self.status}')>"
+
+class WebhookSubscription(Base):
+    """Webhook endpoint registered through the webhook delivery service"""
+    __tablename__ = "webhook_subscriptions"
+    
+    # Primary key matches the service-level endpoint identifier
+    id = Column(String(36), primary_key=True, index=True)
+    
+    # Endpoint configuration
+    name = Column(String(100), nullable=False)
+    url = Column(String(2048), nullable=False)
+    events = Column(JSON, nullable=False)  # List of subscribed event types
+    secret = Column(String(255))  # For webhook signature verification
+    headers = Column(JSON)  # Additional request headers
+    
+    # Delivery settings
+    active = Column(Boolean, default=True, nullable=False)
+    max_retries = Column(Integer, default=3, nullable=False)
+    retry_delay_seconds = Column(Integer, default=60, nullable=False)  # Base delay for exponential backoff
+    timeout_seconds = Column(Integer, default=30, nullable=False)
+    batch_size = Column(Integer, default=1, nullable=False)  # Events combined per POST (1 = no batching)
+    max_concurrency = Column(Integer, default=1, nullable=False)  # Requests in flight per endpoint
+    
+    # Audit fields
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Relationships
+    deliveries = relationship("WebhookQueuedDelivery", back_populates="subscription", cascade="all, delete-orphan", passive_deletes=True)
+    
+    def __repr__(self):
+        return f"<WebhookSubscription(id={self.id}, url='{self.url}', active={self.active})>"
+
+class WebhookQueuedDelivery(Base):
+    """Durable webhook delivery record driven by the delivery engine"""
+    __tablename__ = "webhook_delivery_queue"
+    
+    # Primary key matches the service-level delivery identifier
+    id = Column(String(36), primary_key=True, index=True)
+    
+    # Endpoint association
+    endpoint_id = Column(String(36), ForeignKey("webhook_subscriptions.id", ondelete="CASCADE"), nullable=False, index=True)
+    
+    # Delivery information
+    event_type = Column(String(50), nullable=False)
+    payload = Column(JSON, nullable=False)
+    batch_id = Column(String(36))  # Set when delivered as part of a batched POST
+    
+    # Delivery status
+    status = Column(String(20), nullable=False, index=True)  # pending, delivered, failed, retrying, cancelled
+    response_code = Column(Integer)
+    response_body = Column(Text)
+    error_message = Column(Text)
+    
+    # Timing
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    delivered_at = Column(DateTime(timezone=True))
+    retry_count = Column(Integer, default=0, nullable=False)
+    next_retry_at = Column(DateTime(timezone=True))
+    
+    # Replica lease (claimed with FOR UPDATE SKIP LOCKED, renewed while the replica holds it)
+    owner_id = Column(String(100), index=True)
+    lease_expires_at = Column(DateTime(timezone=True))
+    
+    # Relationships
+    subscription = relationship("WebhookSubscription", back_populates="deliveries")
+    
+    def __repr__(self):
+        return f"<WebhookQueuedDelivery(id={self.id}, endpoint_id={self.endpoint_id}, status='{self.status}')>"
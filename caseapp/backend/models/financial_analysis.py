@@ -2,7 +2,7 @@
 Financial analysis model definitions for detecting suspicious activity
 """
 
-from sqlalchemy import Column, String, Text, DateTime, Integer, Float, ForeignKey, JSON, Boolean, Enum
+from sqlalchemy import Column, String, Text, DateTime, Integer, Float, ForeignKey, JSON, Boolean, Enum, Index, Numeric, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -12,6 +12,7 @@ from typing import Optional, List, Dict, Any
 import uuid
 
 from core.database import Base
+from core.money import AMOUNT_PLACES, AMOUNT_PRECISION
 
 class TransactionType(PyEnum):
     """Financial transaction types"""
@@ -31,6 +32,12 @@ class AlertSeverity(PyEnum):
     HIGH = "high"
     CRITICAL = "critical"
 
+class StatementImportStatus(str, PyEnum):
+    """Bank statement import status"""
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
 class FinancialAccount(Base):
     """Financial account model (Bank, Wallet, etc.)"""
     __tablename__ = "financial_accounts"
@@ -63,6 +70,12 @@ class FinancialAccount(Base):
 class FinancialTransaction(Base):
     """Financial transaction model"""
     __tablename__ = "financial_transactions"
+    __table_args__ = (
+        # Re-importing a statement (or an overlapping one) skips rows already loaded for the account
+        UniqueConstraint("account_id", "natural_key_hash", name="uq_financial_transactions_natural_key"),
+        # Case listings: filtered by case, keyset-paginated on (transaction_date, id)
+        Index("ix_financial_transactions_case_date", "case_id", "transaction_date", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     account_id = Column(UUID(as_uuid=True), ForeignKey("financial_accounts.id"), nullable=False, index=True)
@@ -72,8 +85,12 @@ class FinancialTransaction(Base):
     document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id"))
     forensic_item_id = Column(UUID(as_uuid=True)) # Link to forensic items if applicable
     
+    # Bulk statement import (natural_key_hash is set only for imported rows)
+    import_id = Column(UUID(as_uuid=True), ForeignKey("financial_statement_imports.id"), index=True)
+    natural_key_hash = Column(String(64))
+    
     transaction_date = Column(DateTime(timezone=True), nullable=False)
-    amount = Column(Float, nullable=False)
+    amount = Column(Numeric(AMOUNT_PRECISION, AMOUNT_PLACES), nullable=False)  # Unsigned; exact to the currency's minor unit
     currency = Column(String(10), default="USD")
     transaction_type = Column(Enum(TransactionType), default=TransactionType.OTHER)
     
@@ -104,12 +121,17 @@ class FinancialTransaction(Base):
 class FinancialAlert(Base):
     """Financial analysis alert model"""
     __tablename__ = "financial_alerts"
+    __table_args__ = (
+        # Detectors upsert on this, so re-running (or racing) analyses never duplicates an alert
+        UniqueConstraint("case_id", "fingerprint", name="uq_financial_alerts_fingerprint"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     case_id = Column(UUID(as_uuid=True), ForeignKey("cases.id"), nullable=False, index=True)
     transaction_id = Column(UUID(as_uuid=True), ForeignKey("financial_transactions.id"))
     
     alert_type = Column(String(50), nullable=False)  # structuring, rapid_succession, unusual_volume, etc.
+    fingerprint = Column(String(64))  # SHA-256 of type, case and the alerted transactions (or situation)
     severity = Column(Enum(AlertSeverity), default=AlertSeverity.MEDIUM)
     title = Column(String(200), nullable=False)
     description = Column(Text)
@@ -131,3 +153,35 @@ class FinancialAlert(Base):
     
     def __repr__(self):
         return f"<FinancialAlert(id={self.id}, type='{self.alert_type}', severity='{self.severity}')>"
+
+class FinancialStatementImport(Base):
+    """Bulk bank statement import (CSV, OFX or QIF) into an account"""
+    __tablename__ = "financial_statement_imports"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    case_id = Column(UUID(as_uuid=True), ForeignKey("cases.id"), nullable=False, index=True)
+    account_id = Column(UUID(as_uuid=True), ForeignKey("financial_accounts.id"), nullable=False, index=True)
+    
+    filename = Column(String(255))
+    file_format = Column(String(10), nullable=False)  # csv, ofx, qif
+    profile = Column(String(50))  # Column-mapping profile used for CSV files
+    status = Column(String(20), default=StatementImportStatus.PROCESSING.value, nullable=False, index=True)
+    
+    # Row counts
+    rows_parsed = Column(Integer, default=0, nullable=False)
+    rows_inserted = Column(Integer, default=0, nullable=False)
+    rows_duplicate = Column(Integer, default=0, nullable=False)
+    rows_rejected = Column(Integer, default=0, nullable=False)
+    errors = Column(JSON)  # First FINANCIAL_IMPORT_MAX_ERRORS rejected rows with reasons
+    error_message = Column(Text)
+    
+    # Audit fields
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    completed_at = Column(DateTime(timezone=True))
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    
+    # Relationships
+    account = relationship("FinancialAccount")
+    
+    def __repr__(self):
+        return f"<FinancialStatementImport(id={self.id}, format='{self.file_format}', status='{self.status}')>"
@@ -67,6 +67,7 @@ class ForensicSource(Base):
     uploaded_by = relationship("User")
     forensic_items = relationship("ForensicItem", back_populates="source", cascade="all, delete-orphan")
     analysis_reports = relationship("ForensicAnalysisReport", back_populates="source", cascade="all, delete-orphan")
+    aggregate = relationship("ForensicSourceAggregate", back_populates="source", uselist=False, cascade="all, delete-orphan")
 
 class ForensicItem(Base):
     """Individual forensic data item (email, text message, etc.)"""
@@ -268,4 +269,37 @@ class CommunicationNetwork(Base):
     parameters = Column(JSON)  # Analysis parameters used
     
     # Relationships
-    source = relationship("ForensicSource")
\ No newline at end of file
+    source = relationship("ForensicSource")
+
+class ForensicSourceAggregate(Base):
+    """Precomputed per-source statistics maintained during ingestion"""
+    __tablename__ = "forensic_source_aggregates"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    source_id = Column(Integer, ForeignKey("forensic_sources.id"), nullable=False, unique=True, index=True)
+    
+    # Volume
+    total_items = Column(Integer, default=0, nullable=False)
+    deleted_count = Column(Integer, default=0, nullable=False)
+    first_item_at = Column(DateTime(timezone=True))
+    last_item_at = Column(DateTime(timezone=True))
+    
+    # Distributions
+    counts_by_type = Column(JSON)  # {item_type: count}
+    counts_by_hour = Column(JSON)  # 24 buckets, hour of day
+    counts_by_weekday = Column(JSON)  # 7 buckets, Monday first
+    counts_by_day = Column(JSON)  # {YYYY-MM-DD: count}
+    
+    # Sentiment buckets
+    sentiment_positive = Column(Integer, default=0, nullable=False)
+    sentiment_neutral = Column(Integer, default=0, nullable=False)
+    sentiment_negative = Column(Integer, default=0, nullable=False)
+    
+    # Communication network
+    participant_stats = Column(JSON)  # {participant: {sent, received, degree}}
+    edge_weights = Column(JSON)  # [[participant_a, participant_b, weight], ...]
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    source = relationship("ForensicSource", back_populates="aggregate")
@@ -2,7 +2,7 @@
 Media evidence models for court case management system
 """
 
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, Text, ForeignKey, Enum as SQLEnum, JSON, BigInteger
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, Text, ForeignKey, Enum as SQLEnum, JSON, BigInteger, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -74,6 +74,11 @@ class MediaEvidence(Base):
     
     __tablename__ = "media_evidence"
     
+    # The same file may be evidence in several cases, but only once per case
+    __table_args__ = (
+        UniqueConstraint("case_id", "file_hash", name="uq_media_evidence_case_file_hash"),
+    )
+    
     # Primary identification
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     case_id = Column(UUID(as_uuid=True), ForeignKey("cases.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -83,7 +88,7 @@ class MediaEvidence(Base):
     original_filename = Column(String(255), nullable=False)
     file_path = Column(String(500), nullable=False)
     file_size = Column(BigInteger, nullable=False)  # Size in bytes
-    file_hash = Column(String(64), nullable=False, unique=True, index=True)  # SHA-256 hash
+    file_hash = Column(String(64), nullable=False, index=True)  # SHA-256 hash, shared blob key (see MediaBlob)
     mime_type = Column(String(100), nullable=False)
     
     # Media classification
@@ -122,6 +127,7 @@ class MediaEvidence(Base):
     # Thumbnails and previews
     thumbnail_path = Column(String(500), nullable=True)  # Thumbnail image path
     preview_path = Column(String(500), nullable=True)  # Preview/compressed version path
+    renditions = Column(JSON, nullable=True)  # Rendition manifest: sizes/formats, poster and sprite sheet
     
     # Legal and administrative
     is_privileged = Column(Boolean, default=False, nullable=False)
@@ -265,6 +271,10 @@ class MediaProcessingJob(Base):
     retry_count = Column(Integer, default=0, nullable=False)
     max_retries = Column(Integer, default=3, nullable=False)
     
+    # Worker lease (claimed with FOR UPDATE SKIP LOCKED, extended by heartbeats)
+    worker_id = Column(String(100), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    
     # Results
     result_data = Column(JSON, nullable=True)
     output_files = Column(ARRAY(String), nullable=True, default=list)  # Generated file paths
@@ -303,6 +313,30 @@ class MediaProcessingJob(Base):
             return int((self.completed_at - self.started_at).total_seconds())
         return None
 
+# Claim order for media workers: pending jobs by priority (highest first), oldest first
+Index(
+    "ix_media_processing_jobs_claim",
+    MediaProcessingJob.status,
+    MediaProcessingJob.priority.desc(),
+    MediaProcessingJob.created_at
+)
+
+class MediaBlob(Base):
+    """Content-addressed stored file shared by every media record with the same SHA-256"""
+    
+    __tablename__ = "media_blobs"
+    
+    sha256 = Column(String(64), primary_key=True)
+    file_path = Column(String(500), nullable=False)
+    file_size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, default=1, nullable=False)  # Media evidence records using this blob
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<MediaBlob(sha256={self.sha256}, ref_count={self.ref_count})>"
+
 class MediaShareLink(Base):
     """Secure sharing links for media evidence"""
     
@@ -2,10 +2,11 @@
 Timeline and event model definitions for case timeline management
 """
 
-from sqlalchemy import Column, String, Text, DateTime, Integer, ForeignKey, JSON, Boolean, Float
+from sqlalchemy import Column, String, Text, DateTime, Integer, ForeignKey, JSON, Boolean, Float, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from core.lexorank import FIRST_RANK
 from datetime import datetime
 from enum import Enum as PyEnum
 from typing import Optional, List, Dict, Any
@@ -70,6 +71,12 @@ class CaseTimeline(Base):
 class TimelineEvent(Base):
     """Timeline event model for chronological case events"""
     __tablename__ = "timeline_events"
+    __table_args__ = (
+        # Serves the case timeline's (event_date, sort_rank) ordering and rank lookups
+        Index("ix_timeline_events_case_date_rank", "case_id", "event_date", "sort_rank"),
+        # Serves viewport date windows, buckets and keyset pages over a timeline
+        Index("ix_timeline_events_timeline_date", "timeline_id", "event_date", "sort_rank", "id"),
+    )
     
     # Primary key as UUID
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
@@ -98,9 +105,14 @@ class TimelineEvent(Base):
     is_milestone = Column(Boolean, default=False)  # Mark significant events
     
     # Display and ordering
-    display_order = Column(Integer)  # Manual ordering within same date
+    display_order = Column(Integer)  # Legacy manual ordering, superseded by sort_rank
+    sort_rank = Column(String(255), nullable=False, server_default=FIRST_RANK)  # Orders events sharing a timestamp (core.lexorank)
     color = Column(String(7))  # Hex color code for visualization
     
+    # Discussion counters, maintained by the collaboration service as comments are added
+    comment_count = Column(Integer, default=0, server_default="0", nullable=False)
+    comment_participant_count = Column(Integer, default=0, server_default="0", nullable=False)
+    
     # Audit fields
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
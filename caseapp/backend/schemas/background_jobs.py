@@ -84,6 +84,8 @@ class WebhookEndpointRequest(BaseModel):
     retry_delay_seconds: int = Field(default=60, ge=1, le=3600, description="Delay between retries")
     timeout_seconds: int = Field(default=30, ge=5, le=300, description="Request timeout")
     headers: Dict[str, str] = Field(default={}, description="Additional headers to send")
+    batch_size: int = Field(default=1, ge=1, le=100, description="Events combined into one POST (1 disables batching)")
+    max_concurrency: int = Field(default=1, ge=1, le=20, description="Maximum requests in flight to this endpoint")
     
     @field_validator('url')
     def validate_url(cls, v):
@@ -108,6 +110,8 @@ class WebhookEndpointResponse(BaseModel):
     retry_delay_seconds: int = Field(..., description="Delay between retries")
     timeout_seconds: int = Field(..., description="Request timeout")
     headers: Dict[str, str] = Field(..., description="Additional headers")
+    batch_size: int = Field(..., description="Events combined into one POST")
+    max_concurrency: int = Field(..., description="Maximum requests in flight to this endpoint")
     created_at: datetime = Field(..., description="Creation timestamp")
     updated_at: datetime = Field(..., description="Last update timestamp")
 
@@ -143,6 +147,7 @@ class WebhookStatisticsResponse(BaseModel):
     average_retries: float = Field(..., description="Average number of retries")
     total_endpoints: int = Field(..., description="Total number of endpoints")
     active_endpoints: int = Field(..., description="Number of active endpoints")
+    delivery_queue: Optional[Dict[str, Any]] = Field(None, description="Delivery engine queue and circuit breaker status")
 
 class WebhookPayload(BaseModel):
     """Base webhook payload structure"""
@@ -83,6 +83,17 @@ class CommentResponse(BaseModel):
     resolved_by_id: Optional[str] = None
     resolved_at: Optional[datetime] = None
 
+class CommentThreadResponse(CommentResponse):
+    """Timeline comment with its replies"""
+    replies: List["CommentThreadResponse"] = Field(default_factory=list)
+
+class EventCommentThreadsResponse(BaseModel):
+    """Discussion of one timeline event: counters and comment threads"""
+    event_id: str
+    comment_count: int = 0
+    participant_count: int = 0
+    comments: List[CommentThreadResponse] = Field(default_factory=list)
+
 class ExternalShareRequest(BaseModel):
     """Request to create external share link"""
     expires_in_hours: int = Field(24, ge=1, le=168, description="Expiration in hours (1-168)")
@@ -71,6 +71,30 @@ class FinancialTransactionResponse(FinancialTransactionBase):
     class Config:
         from_attributes = True
 
+class FinancialTransactionListItem(BaseModel):
+    """Transaction row as returned by listings (without metadata_json)"""
+    id: UUID
+    account_id: UUID
+    case_id: UUID
+    document_id: Optional[UUID] = None
+    transaction_date: datetime
+    amount: float
+    currency: str
+    transaction_type: TransactionType
+    description: Optional[str] = None
+    counterparty_name: Optional[str] = None
+    counterparty_account: Optional[str] = None
+    is_suspicious: bool
+    risk_score: float
+    tags: Optional[List[str]] = None
+    created_at: datetime
+
+class FinancialTransactionPage(BaseModel):
+    """One keyset-paginated page of transactions"""
+    items: List[FinancialTransactionListItem]
+    next_cursor: Optional[str] = None
+    limit: int
+
 class FinancialAlertResponse(BaseModel):
     id: UUID
     case_id: UUID
@@ -98,3 +122,82 @@ class FinancialSummary(BaseModel):
     high_risk_transactions: int
     top_counterparties: List[Dict[str, Any]]
     timeline_data: List[Dict[str, Any]]
+
+class FlowNodeResponse(BaseModel):
+    """Party in a money-flow graph (case account, external account or named counterparty)"""
+    key: str
+    kind: str
+    label: str
+    account_id: Optional[UUID] = None
+
+class FlowEdgeResponse(BaseModel):
+    transaction_id: UUID
+    source: str
+    target: str
+    amount: float
+    at: datetime
+
+class FlowReachResponse(BaseModel):
+    """Node reached from a traced source, aggregated over all paths"""
+    node: FlowNodeResponse
+    hops: int
+    paths: int
+    traced_amount: float
+
+class FlowPathResponse(BaseModel):
+    amount: float
+    edges: List[FlowEdgeResponse]
+
+class FlowTraceResponse(BaseModel):
+    """Time-respecting multi-hop trace of funds out of a node"""
+    source: FlowNodeResponse
+    reached: List[FlowReachResponse]
+    paths: List[FlowPathResponse]
+    truncated: bool
+
+class FlowCycleResponse(BaseModel):
+    nodes: List[FlowNodeResponse]
+    edges: List[FlowEdgeResponse]
+    amount_out: float
+    amount_returned: float
+    started_at: datetime
+    completed_at: datetime
+
+class FlowCycleListResponse(BaseModel):
+    """Round trips found in a case's money-flow graph"""
+    cycles: List[FlowCycleResponse]
+    truncated: bool
+
+class FlowFanPatternResponse(BaseModel):
+    """Fan-in or fan-out of funds through one node within a time window"""
+    kind: str
+    node: FlowNodeResponse
+    counterparties: int
+    transactions: int
+    amount: float
+    related_amount: float
+    pass_through: bool
+    started_at: datetime
+    ended_at: datetime
+    transaction_ids: List[UUID]
+
+class StatementImportResponse(BaseModel):
+    """Result of a bulk bank statement import"""
+    id: UUID
+    case_id: UUID
+    account_id: UUID
+    filename: Optional[str] = None
+    file_format: str
+    profile: Optional[str] = None
+    status: str
+    rows_parsed: int
+    rows_inserted: int
+    rows_duplicate: int
+    rows_rejected: int
+    errors: Optional[List[Dict[str, Any]]] = None
+    error_message: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
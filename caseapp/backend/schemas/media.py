@@ -79,6 +79,7 @@ class MediaUploadRequest(BaseModel):
     categories: Optional[List[str]] = Field(default_factory=list, description="Categories for organization")
     is_privileged: bool = Field(False, description="Whether media is privileged")
     privilege_reason: Optional[str] = Field(None, description="Reason for privilege if applicable")
+    sha256: Optional[str] = Field(None, description="Client-computed SHA-256 of the file, checked against the upload")
     
     @field_validator('tags', 'categories')
     def validate_lists(cls, v):
@@ -86,6 +87,15 @@ class MediaUploadRequest(BaseModel):
             return []
         return [item.strip() for item in v if item.strip()]
     
+    @field_validator('sha256')
+    def validate_sha256(cls, v):
+        if v is None:
+            return v
+        v = v.strip().lower()
+        if len(v) != 64 or any(c not in '0123456789abcdef' for c in v):
+            raise ValueError('sha256 must be a 64-character hex digest')
+        return v
+    
     @field_validator('privilege_reason')
     def validate_privilege_reason(cls, v, values):
         if values.get('is_privileged') and not v:
@@ -302,6 +312,7 @@ class MediaEvidenceResponse(BaseModel):
     # Thumbnails and previews
     thumbnail_path: Optional[str]
     preview_path: Optional[str]
+    renditions: Optional[Dict[str, Any]] = None
     
     # Audit fields
     created_at: datetime
@@ -71,6 +71,12 @@ class TimelineEventUpdateRequest(BaseModel):
     color: Optional[str] = Field(None, pattern=r'^#[0-9A-Fa-f]{6}$', description="Hex color code")
     event_metadata: Optional[Dict[str, Any]] = Field(None, description="Additional event metadata")
 
+class TimelineEventMoveRequest(BaseModel):
+    """Schema for moving one event between its new neighbours"""
+    previous_event_id: Optional[UUID] = Field(None, description="Event that should come immediately before")
+    next_event_id: Optional[UUID] = Field(None, description="Event that should come immediately after")
+    new_date: Optional[datetime] = Field(None, description="New event date, if the move changes it")
+
 class EvidencePinCreateRequest(BaseModel):
     """Schema for pinning evidence to timeline events"""
     timeline_event_id: UUID = Field(..., description="ID of the timeline event")
@@ -133,6 +139,16 @@ class EventEnhancementResponse(BaseModel):
     improvements_made: List[str] = Field(default_factory=list, description="List of improvements made")
 
 # Response schemas
+class EvidenceSummary(BaseModel):
+    """Schema for the evidence an evidence pin points at"""
+    evidence_type: str
+    evidence_id: UUID
+    title: Optional[str] = None
+    thumbnail_path: Optional[str] = None
+    file_hash: Optional[str] = None
+    kind: Optional[str] = None
+    mime_type: Optional[str] = None
+
 class EvidencePinResponse(BaseModel):
     """Schema for evidence pin responses"""
     id: UUID
@@ -146,6 +162,7 @@ class EvidencePinResponse(BaseModel):
     is_primary: bool
     created_at: datetime
     created_by: UUID
+    evidence: Optional[EvidenceSummary] = Field(None, description="The pinned evidence; None if it no longer exists")
 
     class Config:
         from_attributes = True
@@ -180,12 +197,15 @@ class TimelineEventResponse(BaseModel):
     importance_level: int
     is_milestone: bool
     display_order: Optional[int]
+    sort_rank: Optional[str] = None
     color: Optional[str]
     event_metadata: Optional[Dict[str, Any]]
     created_at: datetime
     updated_at: Optional[datetime]
     created_by: UUID
     updated_by: Optional[UUID]
+    comment_count: int = 0
+    comment_participant_count: int = 0
     
     # Related data
     evidence_pins: List[EvidencePinResponse] = Field(default_factory=list)
@@ -206,12 +226,31 @@ class TimelineEventSummaryResponse(BaseModel):
     location: Optional[str]
     importance_level: int
     is_milestone: bool
+    sort_rank: Optional[str] = None
     evidence_count: int = 0
     comment_count: int = 0
 
     class Config:
         from_attributes = True
 
+class TimelineViewportBucket(BaseModel):
+    """One date_trunc bucket of a zoomed-out timeline"""
+    start: datetime
+    count: int
+    top_events: List[TimelineEventSummaryResponse] = Field(default_factory=list)
+
+class TimelineViewportResponse(BaseModel):
+    """Schema for a timeline date window: raw events or buckets, depending on zoom"""
+    timeline_id: UUID
+    start_date: datetime
+    end_date: datetime
+    mode: str
+    zoom: str
+    total_count: int
+    events: List[TimelineEventSummaryResponse] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
+    buckets: List[TimelineViewportBucket] = Field(default_factory=list)
+
 class TimelineListResponse(BaseModel):
     """Schema for paginated timeline list responses"""
     events: List[TimelineEventResponse]
@@ -17,6 +17,7 @@ from botocore.exceptions import ClientError
 from core.database import get_db, validate_database_connection, get_database_info
 from core.redis import redis_service
 from core.config import settings
+from core.http_client import http_client_registry
 from services.health_service import HealthService, HealthStatus, HealthCheckResult
 from services.audit_service import AuditService
 
@@ -215,8 +216,6 @@ class ComprehensiveHealthService(HealthService):
     async def _measure_response_times(self) -> Dict[str, Any]:
         """Measure application endpoint response times"""
         try:
-            import aiohttp
-            
             endpoints = [
                 "/health/ready",
                 "/api/v1/health/status",
@@ -225,22 +224,22 @@ class ComprehensiveHealthService(HealthService):
             
             response_times = {}
             
-            async with aiohttp.ClientSession() as session:
-                for endpoint in endpoints:
-                    try:
-                        start_time = time.time()
-                        async with session.get(f"http://localhost:8000{endpoint}") as response:
-                            response_time = time.time() - start_time
-                            response_times[endpoint] = {
-                                "response_time": response_time,
-                                "status_code": response.status,
-                                "status": "healthy" if response_time < 1.0 else "degraded"
-                            }
-                    except Exception as e:
+            session = http_client_registry.get_session("health")
+            for endpoint in endpoints:
+                try:
+                    start_time = time.time()
+                    async with session.get(f"http://localhost:8000{endpoint}") as response:
+                        response_time = time.time() - start_time
                         response_times[endpoint] = {
-                            "error": str(e),
-                            "status": "unhealthy"
+                            "response_time": response_time,
+                            "status_code": response.status,
+                            "status": "healthy" if response_time < 1.0 else "degraded"
                         }
+                except Exception as e:
+                    response_times[endpoint] = {
+                        "error": str(e),
+                        "status": "unhealthy"
+                    }
             
             return response_times
             
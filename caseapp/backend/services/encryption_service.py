@@ -3,9 +3,14 @@ Encryption service for end-to-end encryption of sensitive documents and communic
 Provides AES-256 encryption with AWS KMS key management
 """
 
+import asyncio
 import base64
 import json
 import hashlib
+import io
+import os
+import time
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Tuple
 from datetime import datetime, UTC
 from cryptography.fernet import Fernet
@@ -17,9 +22,86 @@ import structlog
 
 from core.config import settings
 from core.exceptions import CaseManagementException
+from core.envelope_encryption import (
+    build_header, read_header, encrypt_stream, decrypt_stream, decrypt_range,
+    encrypt_bytes, decrypt_bytes
+)
 
 logger = structlog.get_logger()
 
+ENVELOPE_FORMAT = "aes-256-gcm-envelope-v1"
+
+# KMS encryption context bound to every data key; per-document context lives in the envelope header
+DATA_KEY_CONTEXT = {'purpose': 'document_encryption'}
+
+LOCAL_KEY_IDS = ('local-dev-key', 'local-fallback-key')  # Unwrapped keys, valid only without KMS
+
+class DataKeyCache:
+    """
+    Bounded, time-limited cache of plaintext data keys
+    
+    Encryption reuses the current data key for at most ``max_messages`` envelopes and
+    ``max_age_seconds``; decryption keeps up to ``max_entries`` unwrapped keys for the same age.
+    """
+    
+    def __init__(self, max_messages: int, max_age_seconds: float, max_entries: int):
+        self.max_messages = max_messages
+        self.max_age_seconds = max_age_seconds
+        self.max_entries = max_entries
+        self._current: Optional[Dict[str, Any]] = None
+        self._unwrapped: "OrderedDict[Tuple[bytes, str], Tuple[bytes, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def take_encryption_key(self, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """The current data key if it is still within its message and age limits"""
+        now = time.monotonic() if now is None else now
+        current = self._current
+        if current and current['messages'] < self.max_messages and now - current['created'] < self.max_age_seconds:
+            current['messages'] += 1
+            self.hits += 1
+            return current
+        self._current = None
+        self.misses += 1
+        return None
+    
+    def store_encryption_key(self, data_key: Dict[str, Any], context: Dict[str, str], now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        self._current = {**data_key, 'created': now, 'messages': 1}
+        self.put_unwrapped(data_key['encrypted_key'], context, data_key['plaintext_key'], now)
+    
+    def get_unwrapped(self, wrapped_key: bytes, context: Dict[str, str], now: Optional[float] = None) -> Optional[bytes]:
+        now = time.monotonic() if now is None else now
+        cache_key = (wrapped_key, json.dumps(context, sort_keys=True))
+        entry = self._unwrapped.get(cache_key)
+        if entry is None or now - entry[1] >= self.max_age_seconds:
+            self._unwrapped.pop(cache_key, None)
+            self.misses += 1
+            return None
+        self._unwrapped.move_to_end(cache_key)
+        self.hits += 1
+        return entry[0]
+    
+    def put_unwrapped(self, wrapped_key: bytes, context: Dict[str, str], plaintext_key: bytes, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        cache_key = (wrapped_key, json.dumps(context, sort_keys=True))
+        self._unwrapped[cache_key] = (plaintext_key, now)
+        self._unwrapped.move_to_end(cache_key)
+        while len(self._unwrapped) > self.max_entries:
+            self._unwrapped.popitem(last=False)
+    
+    def clear(self):
+        self._current = None
+        self._unwrapped.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'cached_keys': len(self._unwrapped),
+            'current_key_messages': self._current['messages'] if self._current else 0
+        }
+
 class EncryptionService:
     """Service for encrypting and decrypting sensitive data"""
     
@@ -31,6 +113,12 @@ class EncryptionService:
             aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
         )
         self.kms_key_id = getattr(settings, 'KMS_KEY_ID', None)
+        self.key_cache = DataKeyCache(
+            max_messages=settings.ENCRYPTION_DATA_KEY_MAX_MESSAGES,
+            max_age_seconds=settings.ENCRYPTION_DATA_KEY_MAX_AGE_SECONDS,
+            max_entries=settings.ENCRYPTION_DATA_KEY_CACHE_SIZE
+        )
+        self._key_lock = asyncio.Lock()
     
     async def encrypt_document(
         self, 
@@ -39,7 +127,7 @@ class EncryptionService:
         metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
-        Encrypt document content using AES-256 with KMS-managed keys
+        Encrypt document content using AES-256-GCM envelopes with KMS-managed keys
         
         Args:
             content: Document content as bytes
@@ -50,14 +138,11 @@ class EncryptionService:
             Dictionary containing encrypted data and metadata
         """
         try:
-            # Generate data encryption key using KMS
-            data_key = await self._generate_data_key()
-            
-            # Create Fernet cipher with the data key
-            fernet = Fernet(base64.urlsafe_b64encode(data_key['plaintext_key'][:32]))
-            
-            # Encrypt the content
-            encrypted_content = fernet.encrypt(content)
+            data_key = await self._get_encryption_key()
+            encryption_context = {
+                'document_id': document_id,
+                'purpose': 'document_encryption'
+            }
             
             # Create encryption metadata
             encryption_metadata = {
@@ -69,19 +154,22 @@ class EncryptionService:
                 'metadata': metadata or {}
             }
             
-            # Encrypt the metadata
-            metadata_json = json.dumps(encryption_metadata).encode()
-            encrypted_metadata = fernet.encrypt(metadata_json)
+            def encrypt(plaintext: bytes) -> bytes:
+                header = build_header(
+                    data_key['encrypted_key'], data_key['key_id'], encryption_context, settings.ENCRYPTION_CHUNK_SIZE
+                )
+                return encrypt_bytes(plaintext, data_key['plaintext_key'], header)
+            
+            encrypted_content = await asyncio.to_thread(encrypt, content)
+            encrypted_metadata = encrypt(json.dumps(encryption_metadata).encode())
             
             result = {
+                'format': ENVELOPE_FORMAT,
                 'encrypted_content': base64.b64encode(encrypted_content).decode(),
                 'encrypted_metadata': base64.b64encode(encrypted_metadata).decode(),
                 'encrypted_data_key': base64.b64encode(data_key['encrypted_key']).decode(),
                 'key_id': data_key['key_id'],
-                'encryption_context': {
-                    'document_id': document_id,
-                    'purpose': 'document_encryption'
-                }
+                'encryption_context': encryption_context
             }
             
             logger.info("Document encrypted successfully", 
@@ -110,27 +198,19 @@ class EncryptionService:
             Tuple of (decrypted_content, metadata)
         """
         try:
-            # Decrypt the data key using KMS
-            encrypted_key = base64.b64decode(encrypted_data['encrypted_data_key'])
-            
-            decrypted_key_response = self.kms_client.decrypt(
-                CiphertextBlob=encrypted_key,
-                EncryptionContext=encrypted_data['encryption_context']
-            )
-            
-            plaintext_key = decrypted_key_response['Plaintext']
-            
-            # Create Fernet cipher with the decrypted key
-            fernet = Fernet(base64.urlsafe_b64encode(plaintext_key[:32]))
-            
-            # Decrypt the content
-            encrypted_content = base64.b64decode(encrypted_data['encrypted_content'])
-            decrypted_content = fernet.decrypt(encrypted_content)
-            
-            # Decrypt the metadata
-            encrypted_metadata = base64.b64decode(encrypted_data['encrypted_metadata'])
-            decrypted_metadata_json = fernet.decrypt(encrypted_metadata)
-            metadata = json.loads(decrypted_metadata_json.decode())
+            if encrypted_data.get('format') != ENVELOPE_FORMAT:
+                decrypted_content, metadata = await self._decrypt_legacy_document(encrypted_data)
+            else:
+                encrypted_content = base64.b64decode(encrypted_data['encrypted_content'])
+                header = read_header(io.BytesIO(encrypted_content))
+                plaintext_key = await self._unwrap_key(header.wrapped_key, header.key_id)
+                
+                decrypted_content = await asyncio.to_thread(decrypt_bytes, encrypted_content, plaintext_key)
+                metadata = json.loads(decrypt_bytes(
+                    base64.b64decode(encrypted_data['encrypted_metadata']), plaintext_key
+                ))
+                if header.context.get('document_id') != metadata['document_id']:
+                    raise CaseManagementException("Envelope does not belong to this document")
             
             # Verify content integrity
             content_hash = hashlib.sha256(decrypted_content).hexdigest()
@@ -150,6 +230,128 @@ class EncryptionService:
             logger.error("Document decryption failed", error=str(e))
             raise CaseManagementException(f"Document decryption failed: {str(e)}")
     
+    async def encrypt_file(
+        self,
+        source_path: str,
+        destination_path: str,
+        context: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Encrypt a file into an envelope in constant memory
+        
+        Args:
+            source_path: Plaintext file
+            destination_path: Envelope file to write
+            context: Authenticated context stored in the envelope header (e.g. media_id)
+            
+        Returns:
+            Key ID and sizes of the written envelope
+        """
+        data_key = await self._get_encryption_key()
+        header = build_header(data_key['encrypted_key'], data_key['key_id'], context, settings.ENCRYPTION_CHUNK_SIZE)
+        
+        def encrypt() -> int:
+            with open(source_path, 'rb') as reader, open(destination_path, 'wb') as writer:
+                return encrypt_stream(reader, writer, data_key['plaintext_key'], header)
+        
+        plaintext_size = await asyncio.to_thread(encrypt)
+        return {
+            'format': ENVELOPE_FORMAT,
+            'key_id': data_key['key_id'],
+            'plaintext_size': plaintext_size,
+            'envelope_size': os.path.getsize(destination_path)
+        }
+    
+    async def decrypt_file(self, source_path: str, destination_path: str) -> int:
+        """Decrypt an envelope file in constant memory, returning the plaintext size"""
+        with open(source_path, 'rb') as reader:
+            header = read_header(reader)
+        plaintext_key = await self._unwrap_key(header.wrapped_key, header.key_id)
+        
+        def decrypt() -> int:
+            with open(source_path, 'rb') as reader, open(destination_path, 'wb') as writer:
+                reader.seek(header.length)
+                return decrypt_stream(reader, writer, plaintext_key, header)
+        
+        return await asyncio.to_thread(decrypt)
+    
+    async def decrypt_file_range(self, source_path: str, start: int, end: int) -> bytes:
+        """Decrypt plaintext bytes start..end (inclusive) of an envelope file, e.g. for media seeking"""
+        with open(source_path, 'rb') as reader:
+            header = read_header(reader)
+        plaintext_key = await self._unwrap_key(header.wrapped_key, header.key_id)
+        
+        def decrypt() -> bytes:
+            with open(source_path, 'rb') as reader:
+                return decrypt_range(reader, plaintext_key, header, os.path.getsize(source_path), start, end)
+        
+        return await asyncio.to_thread(decrypt)
+    
+    def get_key_cache_stats(self) -> Dict[str, Any]:
+        return self.key_cache.get_stats()
+    
+    async def _get_encryption_key(self) -> Dict[str, Any]:
+        """Current cached data key, generating a new one when it is exhausted or expired"""
+        async with self._key_lock:
+            data_key = self.key_cache.take_encryption_key()
+            if data_key is None:
+                data_key = await self._generate_data_key()
+                self.key_cache.store_encryption_key(data_key, DATA_KEY_CONTEXT)
+            return data_key
+    
+    async def _unwrap_key(self, wrapped_key: bytes, key_id: str, context: Optional[Dict[str, str]] = None) -> bytes:
+        """Plaintext data key for a wrapped key, from the cache or KMS"""
+        if self._is_local_key(key_id):
+            # Development keys are stored unwrapped
+            return wrapped_key
+        
+        context = context or DATA_KEY_CONTEXT
+        plaintext_key = self.key_cache.get_unwrapped(wrapped_key, context)
+        if plaintext_key is None:
+            response = await asyncio.to_thread(
+                self.kms_client.decrypt,
+                CiphertextBlob=wrapped_key,
+                EncryptionContext=context
+            )
+            plaintext_key = response['Plaintext']
+            self.key_cache.put_unwrapped(wrapped_key, context, plaintext_key)
+        return plaintext_key
+    
+    def _is_local_key(self, key_id: Optional[str]) -> bool:
+        """
+        Whether a key id names an unwrapped development key
+
+        Such keys are only honoured when no KMS key is configured; otherwise a forged header
+        could supply its own key and skip KMS entirely.
+        """
+        if key_id not in LOCAL_KEY_IDS:
+            return False
+        if self.kms_key_id:
+            raise CaseManagementException(f"Local key {key_id} is not accepted while a KMS key is configured")
+        return True
+    
+    async def _decrypt_legacy_document(self, encrypted_data: Dict[str, Any]) -> Tuple[bytes, Dict[str, Any]]:
+        """Decrypt documents written before envelopes (Fernet token, base64-encoded again)"""
+        encrypted_key = base64.b64decode(encrypted_data['encrypted_data_key'])
+        if self._is_local_key(encrypted_data.get('key_id')):
+            plaintext_key = base64.urlsafe_b64decode(encrypted_key)
+        else:
+            plaintext_key = await self._unwrap_key(
+                encrypted_key, encrypted_data.get('key_id'), encrypted_data['encryption_context']
+            )
+        
+        # Create Fernet cipher with the decrypted key
+        fernet = Fernet(base64.urlsafe_b64encode(plaintext_key[:32]))
+        
+        # Decrypt the content
+        encrypted_content = base64.b64decode(encrypted_data['encrypted_content'])
+        decrypted_content = fernet.decrypt(encrypted_content)
+        
+        # Decrypt the metadata
+        encrypted_metadata = base64.b64decode(encrypted_data['encrypted_metadata'])
+        decrypted_metadata_json = fernet.decrypt(encrypted_metadata)
+        return decrypted_content, json.loads(decrypted_metadata_json.decode())
+    
     async def encrypt_communication(
         self, 
         message: str, 
@@ -325,16 +527,18 @@ class EncryptionService:
         try:
             if not self.kms_key_id:
                 # For development/testing, generate a local key
-                key = Fernet.generate_key()
+                key = os.urandom(32)
                 return {
-                    'plaintext_key': base64.urlsafe_b64decode(key),
+                    'plaintext_key': key,
                     'encrypted_key': key,  # In real implementation, this would be KMS encrypted
                     'key_id': 'local-dev-key'
                 }
             
-            response = self.kms_client.generate_data_key(
+            response = await asyncio.to_thread(
+                self.kms_client.generate_data_key,
                 KeyId=self.kms_key_id,
-                KeySpec='AES_256'
+                KeySpec='AES_256',
+                EncryptionContext=DATA_KEY_CONTEXT
             )
             
             return {
@@ -344,61 +548,31 @@ class EncryptionService:
             }
             
         except ClientError as e:
+            # No local fallback: data under a local key could not be read back while KMS is configured
             logger.error("KMS data key generation failed", error=str(e))
-            # Fallback to local key generation for development
-            key = Fernet.generate_key()
-            return {
-                'plaintext_key': base64.urlsafe_b64decode(key),
-                'encrypted_key': key,
-                'key_id': 'local-fallback-key'
-            }
+            raise CaseManagementException(f"Data key generation failed: {str(e)}")
     
-    async def rotate_encryption_keys(self, document_ids: list) -> Dict[str, Any]:
+    async def rotate_encryption_keys(
+        self,
+        document_ids: list,
+        store,
+        mode: str = "rewrap",
+        target_key_id: Optional[str] = None,
+        run_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Rotate encryption keys for specified documents
         
         Args:
             document_ids: List of document IDs to rotate keys for
+            store: EncryptedDocumentStore holding the encrypted payloads
+            mode: "rewrap" to re-wrap data keys under the target KMS key, "reencrypt" to re-encrypt content
+            target_key_id: KMS key to rotate to (defaults to the configured key)
+            run_id: Earlier rotation run to resume from its last checkpoint
             
         Returns:
             Dictionary with rotation results
         """
-        try:
-            rotation_results = {
-                'rotated_count': 0,
-                'failed_count': 0,
-                'rotation_timestamp': datetime.now(UTC).isoformat(),
-                'failed_documents': []
-            }
-            
-            for document_id in document_ids:
-                try:
-                    # In a real implementation, this would:
-                    # 1. Decrypt document with old key
-                    # 2. Re-encrypt with new key
-                    # 3. Update database with new encrypted data
-                    
-                    logger.info("Key rotation completed for document", 
-                               document_id=document_id)
-                    rotation_results['rotated_count'] += 1
-                    
-                except Exception as e:
-                    logger.error("Key rotation failed for document", 
-                                document_id=document_id, 
-                                error=str(e))
-                    rotation_results['failed_count'] += 1
-                    rotation_results['failed_documents'].append({
-                        'document_id': document_id,
-                        'error': str(e)
-                    })
-            
-            logger.info("Key rotation batch completed", 
-                       total_documents=len(document_ids),
-                       rotated=rotation_results['rotated_count'],
-                       failed=rotation_results['failed_count'])
-            
-            return rotation_results
-            
-        except Exception as e:
-            logger.error("Key rotation batch failed", error=str(e))
-            raise CaseManagementException(f"Key rotation failed: {str(e)}")
\ No newline at end of file
+        from services.key_rotation_service import KeyRotationService
+        
+        return await KeyRotationService(self).rotate(document_ids, store, mode, target_key_id, run_id)
\ No newline at end of file
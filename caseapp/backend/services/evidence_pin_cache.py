@@ -0,0 +1,51 @@
+"""
+Per-case cache of resolved evidence pin metadata with generation-based invalidation
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+
+from core.config import settings
+from core.generation_cache import GenerationCache
+from models.document import Document
+from models.media import MediaEvidence
+
+class EvidencePinCache(GenerationCache):
+    """
+    Caches the metadata of a case's pinned evidence in Redis, stamped with the case's generation
+
+    The entry maps evidence keys ("type:id") to their metadata and fills in lazily: keys not yet
+    in it are loaded together and merged back, so pinning new evidence costs one load of just that
+    evidence. Every committed change to a case's documents or media starts a new generation.
+    Forensic items are imported once and never edited, so their entries only age out with the TTL.
+    """
+
+    def __init__(self, ttl_seconds: Optional[int] = None):
+        super().__init__(
+            "timeline:evidence",
+            (Document, MediaEvidence),
+            ttl_seconds or settings.TIMELINE_EVIDENCE_CACHE_SECONDS
+        )
+
+    async def get_many(
+        self,
+        case_id: UUID,
+        keys: List[str],
+        load: Callable[[List[str]], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Cached metadata for each key, loading the missing keys in one call"""
+        evidence, generation = await self.read(case_id)
+        if generation is None:
+            return await load(keys)
+
+        evidence = evidence or {}
+        missing = [key for key in keys if key not in evidence]
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            evidence.update(await load(missing))
+            await self.write(case_id, generation, evidence)
+        return {key: evidence[key] for key in keys}
+
+# Global evidence pin cache instance
+evidence_pin_cache = EvidencePinCache()
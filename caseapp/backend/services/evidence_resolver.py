@@ -0,0 +1,188 @@
+"""
+Evidence resolver - batched, type-aware lookups of the evidence behind timeline pins
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+import structlog
+from sqlalchemy import func, null, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.exceptions import CaseManagementException
+from models.document import Document
+from models.forensic_analysis import ForensicItem, ForensicSource
+from models.media import MediaEvidence
+from services.evidence_pin_cache import evidence_pin_cache
+
+logger = structlog.get_logger()
+
+# (evidence_type, evidence_id), as stored on an evidence pin
+EvidenceRef = Tuple[str, UUID]
+
+# Keeps IN lists well under the bind parameter limits of both drivers
+RESOLVE_CHUNK_SIZE = 5000
+
+# Forensic items have integer keys; pins store them as the UUID with the same integer value
+FORENSIC_ID_LIMIT = 2 ** 31
+
+def forensic_evidence_id(item_id: int) -> UUID:
+    """The evidence_id a pin uses for a forensic item"""
+    return UUID(int=item_id)
+
+def forensic_item_id(evidence_id: UUID) -> Optional[int]:
+    """The forensic item an evidence_id refers to, or None if it cannot be one"""
+    value = evidence_id.int
+    return value if 0 < value < FORENSIC_ID_LIMIT else None
+
+def _document_query(ids: List[UUID]):
+    return select(
+        Document.id.label("id"),
+        Document.case_id.label("case_id"),
+        Document.original_filename.label("title"),
+        null().label("thumbnail_path"),
+        Document.file_hash.label("file_hash"),
+        Document.document_type.label("kind"),
+        Document.mime_type.label("mime_type"),
+    ).where(Document.id.in_(ids))
+
+def _media_query(ids: List[UUID]):
+    return select(
+        MediaEvidence.id.label("id"),
+        MediaEvidence.case_id.label("case_id"),
+        MediaEvidence.original_filename.label("title"),
+        MediaEvidence.thumbnail_path.label("thumbnail_path"),
+        MediaEvidence.file_hash.label("file_hash"),
+        MediaEvidence.media_type.label("kind"),
+        MediaEvidence.mime_type.label("mime_type"),
+    ).where(MediaEvidence.id.in_(ids))
+
+def _forensic_query(ids: List[UUID]):
+    item_ids = [item_id for item_id in map(forensic_item_id, ids) if item_id is not None]
+    return select(
+        ForensicItem.id.label("id"),
+        ForensicSource.case_id.label("case_id"),
+        func.coalesce(ForensicItem.subject, ForensicItem.sender, ForensicItem.external_id).label("title"),
+        null().label("thumbnail_path"),
+        ForensicSource.file_hash.label("file_hash"),
+        ForensicItem.item_type.label("kind"),
+        ForensicItem.content_type.label("mime_type"),
+    ).join(ForensicSource, ForensicItem.source_id == ForensicSource.id).where(ForensicItem.id.in_(item_ids))
+
+# One projected query per evidence type; each selects the same labelled columns
+EVIDENCE_QUERIES: Dict[str, Callable[[List[UUID]], Any]] = {
+    "document": _document_query,
+    "media": _media_query,
+    "forensic": _forensic_query,
+}
+
+def evidence_key(evidence_type: str, evidence_id: UUID) -> str:
+    return f"{evidence_type}:{evidence_id}"
+
+class EvidenceResolver:
+    """
+    Resolves evidence pins to the documents, media and forensic items they point at
+
+    Pins are grouped by evidence type and each group is loaded with one projected query, so
+    resolving a timeline costs at most one query per evidence type however many pins it has.
+    Resolved metadata is cached per case in evidence_pin_cache.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def resolve(self, refs: Iterable[EvidenceRef]) -> Dict[str, Dict[str, Any]]:
+        """
+        Metadata of the evidence behind each reference
+
+        Returns:
+            Dictionary keyed by evidence_key(type, id) with id, evidence_type, case_id, title,
+            thumbnail_path, file_hash, kind and mime_type. Missing evidence has no entry.
+        """
+        by_type: Dict[str, set] = {}
+        for evidence_type, evidence_id in refs:
+            by_type.setdefault(_type_value(evidence_type), set()).add(UUID(str(evidence_id)))
+
+        resolved: Dict[str, Dict[str, Any]] = {}
+        for evidence_type, ids in by_type.items():
+            query = EVIDENCE_QUERIES.get(evidence_type)
+            if query is None:
+                continue
+            ids = list(ids)
+            for start in range(0, len(ids), RESOLVE_CHUNK_SIZE):
+                result = await self.db.execute(query(ids[start:start + RESOLVE_CHUNK_SIZE]))
+                for row in result.mappings():
+                    summary = _summary(evidence_type, row)
+                    resolved[evidence_key(evidence_type, summary["evidence_id"])] = summary
+        return resolved
+
+    async def validate(self, refs: Iterable[EvidenceRef], case_id: Optional[UUID] = None):
+        """
+        Check that every referenced item exists, and belongs to case_id when given
+
+        Raises:
+            CaseManagementException: INVALID_EVIDENCE_TYPE or EVIDENCE_NOT_FOUND
+        """
+        refs = [(_type_value(evidence_type), UUID(str(evidence_id))) for evidence_type, evidence_id in refs]
+        for evidence_type, _ in refs:
+            if evidence_type not in EVIDENCE_QUERIES:
+                raise CaseManagementException(
+                    f"Unknown evidence type: {evidence_type}",
+                    error_code="INVALID_EVIDENCE_TYPE"
+                )
+
+        resolved = await self.resolve(refs)
+        for evidence_type, evidence_id in refs:
+            summary = resolved.get(evidence_key(evidence_type, evidence_id))
+            # Evidence from another case is reported as missing rather than revealed
+            if summary is None or (case_id is not None and summary["case_id"] != case_id):
+                raise CaseManagementException(
+                    f"{evidence_type.capitalize()} evidence with ID {evidence_id} not found",
+                    error_code="EVIDENCE_NOT_FOUND"
+                )
+
+    async def resolve_case_pins(self, case_id: UUID, pins: Iterable[Any]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Cached metadata for a case's pins, keyed by evidence_key
+
+        Only evidence missing from the case's cache entry is loaded; missing evidence maps to None.
+        """
+        refs = {
+            evidence_key(pin.evidence_type, pin.evidence_id): (pin.evidence_type, pin.evidence_id)
+            for pin in pins
+        }
+        if not refs:
+            return {}
+
+        async def load(keys: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+            resolved = await self.resolve(refs[key] for key in keys)
+            return {key: _cacheable(resolved.get(key)) for key in keys}
+
+        return await evidence_pin_cache.get_many(case_id, list(refs), load)
+
+def _type_value(evidence_type: Any) -> str:
+    return getattr(evidence_type, "value", evidence_type)
+
+def _summary(evidence_type: str, row: Any) -> Dict[str, Any]:
+    evidence_id = row["id"]
+    if evidence_type == "forensic":
+        evidence_id = forensic_evidence_id(evidence_id)
+    return {
+        "evidence_type": evidence_type,
+        "evidence_id": evidence_id,
+        "case_id": row["case_id"],
+        "title": row["title"],
+        "thumbnail_path": row["thumbnail_path"],
+        "file_hash": row["file_hash"],
+        "kind": _type_value(row["kind"]),
+        "mime_type": row["mime_type"],
+    }
+
+def _cacheable(summary: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """The summary with its UUIDs as strings, as it round-trips through the cache"""
+    if summary is None:
+        return None
+    return {
+        **summary,
+        "evidence_id": str(summary["evidence_id"]),
+        "case_id": str(summary["case_id"]),
+    }
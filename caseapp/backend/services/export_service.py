@@ -15,27 +15,26 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func
 from sqlalchemy.orm import selectinload
 
-# PDF generation
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib.colors import HexColor, black, white, grey
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.platypus.flowables import Image as ReportLabImage
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
+from core.lazy_imports import lazy_import
 
-# PNG visualization
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib.patches import Rectangle
-import numpy as np
+# PDF generation and PNG visualization libraries are imported on first export
+pagesizes = lazy_import("reportlab.lib.pagesizes")
+reportlab_styles = lazy_import("reportlab.lib.styles")
+units = lazy_import("reportlab.lib.units")
+reportlab_colors = lazy_import("reportlab.lib.colors")
+platypus = lazy_import("reportlab.platypus")
+enums = lazy_import("reportlab.lib.enums")
+plt = lazy_import("matplotlib.pyplot")
+mdates = lazy_import("matplotlib.dates")
+np = lazy_import("numpy")
 
 from core.database import AsyncSessionLocal
 from models.case import Case
 from models.timeline import CaseTimeline, TimelineEvent
 from models.document import Document
 from models.media import MediaEvidence
-from models.forensic_analysis import ForensicSource, ForensicItem
+from models.forensic_analysis import ForensicSource, ForensicItem, AnalysisStatus
+from services.forensic_aggregate_service import ForensicAggregateService, ForensicAggregateAccumulator
 from core.exceptions import CaseManagementException
 from core.config import settings
 
@@ -44,6 +43,9 @@ logger = structlog.get_logger()
 class ExportService:
     """Service for exporting case data in multiple formats"""
     
+    # Sources whose ingestion has finished and may be safely backfilled
+    SETTLED_ANALYSIS_STATUSES = (AnalysisStatus.COMPLETED, AnalysisStatus.PARTIAL, AnalysisStatus.FAILED)
+    
     def __init__(self):
         self.temp_dir = Path("/tmp/case_exports")
         self.temp_dir.mkdir(exist_ok=True)
@@ -82,9 +84,9 @@ class ExportService:
                 
                 # Generate PDF
                 pdf_buffer = io.BytesIO()
-                doc = SimpleDocTemplate(
+                doc = platypus.SimpleDocTemplate(
                     pdf_buffer,
-                    pagesize=A4,
+                    pagesize=pagesizes.A4,
                     rightMargin=72,
                     leftMargin=72,
                     topMargin=72,
@@ -93,43 +95,43 @@ class ExportService:
                 
                 # Build PDF content
                 story = []
-                styles = getSampleStyleSheet()
+                styles = reportlab_styles.getSampleStyleSheet()
                 
                 # Add custom styles
-                title_style = ParagraphStyle(
+                title_style = reportlab_styles.ParagraphStyle(
                     'CustomTitle',
                     parent=styles['Heading1'],
                     fontSize=18,
                     spaceAfter=30,
-                    alignment=TA_CENTER
+                    alignment=enums.TA_CENTER
                 )
                 
                 # Title page
-                story.append(Paragraph(f"Case Timeline Report", title_style))
-                story.append(Spacer(1, 12))
-                story.append(Paragraph(f"Case: {case_data['case']['title']}", styles['Heading2']))
-                story.append(Paragraph(f"Case Number: {case_data['case']['case_number']}", styles['Normal']))
-                story.append(Paragraph(f"Generated: {datetime.now(UTC).strftime('%Y-%m-%d %H:%M UTC')}", styles['Normal']))
-                story.append(Spacer(1, 20))
+                story.append(platypus.Paragraph(f"Case Timeline Report", title_style))
+                story.append(platypus.Spacer(1, 12))
+                story.append(platypus.Paragraph(f"Case: {case_data['case']['title']}", styles['Heading2']))
+                story.append(platypus.Paragraph(f"Case Number: {case_data['case']['case_number']}", styles['Normal']))
+                story.append(platypus.Paragraph(f"Generated: {datetime.now(UTC).strftime('%Y-%m-%d %H:%M UTC')}", styles['Normal']))
+                story.append(platypus.Spacer(1, 20))
                 
                 # Case summary
                 if case_data['case']['description']:
-                    story.append(Paragraph("Case Description", styles['Heading3']))
-                    story.append(Paragraph(case_data['case']['description'], styles['Normal']))
-                    story.append(Spacer(1, 12))
+                    story.append(platypus.Paragraph("Case Description", styles['Heading3']))
+                    story.append(platypus.Paragraph(case_data['case']['description'], styles['Normal']))
+                    story.append(platypus.Spacer(1, 12))
                 
                 # Timeline events
-                story.append(Paragraph("Timeline Events", styles['Heading2']))
-                story.append(Spacer(1, 12))
+                story.append(platypus.Paragraph("Timeline Events", styles['Heading2']))
+                story.append(platypus.Spacer(1, 12))
                 
                 for event in case_data['events']:
                     # Event header
                     event_date = event['event_date'].strftime('%Y-%m-%d %H:%M') if event['event_date'] else 'No date'
-                    story.append(Paragraph(f"{event['title']} ({event_date})", styles['Heading3']))
+                    story.append(platypus.Paragraph(f"{event['title']} ({event_date})", styles['Heading3']))
                     
                     # Event details
                     if event['description']:
-                        story.append(Paragraph(event['description'], styles['Normal']))
+                        story.append(platypus.Paragraph(event['description'], styles['Normal']))
                     
                     if include_metadata:
                         # Event metadata table
@@ -139,31 +141,31 @@ class ExportService:
                             ['Participants', ', '.join(event['participants']) if event['participants'] else 'None']
                         ]
                         
-                        metadata_table = Table(metadata_data, colWidths=[2*inch, 4*inch])
-                        metadata_table.setStyle(TableStyle([
-                            ('BACKGROUND', (0, 0), (0, -1), HexColor('#f0f0f0')),
-                            ('TEXTCOLOR', (0, 0), (-1, -1), black),
+                        metadata_table = platypus.Table(metadata_data, colWidths=[2*units.inch, 4*units.inch])
+                        metadata_table.setStyle(platypus.TableStyle([
+                            ('BACKGROUND', (0, 0), (0, -1), reportlab_colors.HexColor('#f0f0f0')),
+                            ('TEXTCOLOR', (0, 0), (-1, -1), reportlab_colors.black),
                             ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
                             ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
                             ('FONTSIZE', (0, 0), (-1, -1), 9),
-                            ('GRID', (0, 0), (-1, -1), 1, black)
+                            ('GRID', (0, 0), (-1, -1), 1, reportlab_colors.black)
                         ]))
                         story.append(metadata_table)
                     
                     # Evidence attachments
                     if include_evidence and event.get('evidence_pins'):
-                        story.append(Paragraph("Attached Evidence:", styles['Heading4']))
+                        story.append(platypus.Paragraph("Attached Evidence:", styles['Heading4']))
                         for evidence in event['evidence_pins']:
                             evidence_text = f"• {evidence['title']} ({evidence['type']})"
                             if evidence.get('relevance_score'):
                                 evidence_text += f" - Relevance: {evidence['relevance_score']:.2f}"
-                            story.append(Paragraph(evidence_text, styles['Normal']))
+                            story.append(platypus.Paragraph(evidence_text, styles['Normal']))
                     
-                    story.append(Spacer(1, 20))
+                    story.append(platypus.Spacer(1, 20))
                 
                 # Export metadata
-                story.append(PageBreak())
-                story.append(Paragraph("Export Information", styles['Heading2']))
+                story.append(platypus.PageBreak())
+                story.append(platypus.Paragraph("Export Information", styles['Heading2']))
                 export_info = [
                     ['Export Date', datetime.now(UTC).strftime('%Y-%m-%d %H:%M:%S UTC')],
                     ['Total Events', str(len(case_data['events']))],
@@ -172,14 +174,14 @@ class ExportService:
                     ['Include Metadata', 'Yes' if include_metadata else 'No']
                 ]
                 
-                export_table = Table(export_info, colWidths=[2*inch, 4*inch])
-                export_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (0, -1), HexColor('#f0f0f0')),
-                    ('TEXTCOLOR', (0, 0), (-1, -1), black),
+                export_table = platypus.Table(export_info, colWidths=[2*units.inch, 4*units.inch])
+                export_table.setStyle(platypus.TableStyle([
+                    ('BACKGROUND', (0, 0), (0, -1), reportlab_colors.HexColor('#f0f0f0')),
+                    ('TEXTCOLOR', (0, 0), (-1, -1), reportlab_colors.black),
                     ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
                     ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
                     ('FONTSIZE', (0, 0), (-1, -1), 10),
-                    ('GRID', (0, 0), (-1, -1), 1, black)
+                    ('GRID', (0, 0), (-1, -1), 1, reportlab_colors.black)
                 ]))
                 story.append(export_table)
                 
@@ -348,9 +350,9 @@ class ExportService:
                 
                 # Generate PDF
                 pdf_buffer = io.BytesIO()
-                doc = SimpleDocTemplate(
+                doc = platypus.SimpleDocTemplate(
                     pdf_buffer,
-                    pagesize=A4,
+                    pagesize=pagesizes.A4,
                     rightMargin=72,
                     leftMargin=72,
                     topMargin=72,
@@ -358,25 +360,25 @@ class ExportService:
                 )
                 
                 story = []
-                styles = getSampleStyleSheet()
+                styles = reportlab_styles.getSampleStyleSheet()
                 
                 # Title
-                title_style = ParagraphStyle(
+                title_style = reportlab_styles.ParagraphStyle(
                     'CustomTitle',
                     parent=styles['Heading1'],
                     fontSize=18,
                     spaceAfter=30,
-                    alignment=TA_CENTER
+                    alignment=enums.TA_CENTER
                 )
                 
-                story.append(Paragraph("Forensic Analysis Report", title_style))
-                story.append(Spacer(1, 12))
-                story.append(Paragraph(f"Case: {forensic_data['case']['title']}", styles['Heading2']))
-                story.append(Paragraph(f"Generated: {datetime.now(UTC).strftime('%Y-%m-%d %H:%M UTC')}", styles['Normal']))
-                story.append(Spacer(1, 20))
+                story.append(platypus.Paragraph("Forensic Analysis Report", title_style))
+                story.append(platypus.Spacer(1, 12))
+                story.append(platypus.Paragraph(f"Case: {forensic_data['case']['title']}", styles['Heading2']))
+                story.append(platypus.Paragraph(f"Generated: {datetime.now(UTC).strftime('%Y-%m-%d %H:%M UTC')}", styles['Normal']))
+                story.append(platypus.Spacer(1, 20))
                 
                 # Executive summary
-                story.append(Paragraph("Executive Summary", styles['Heading2']))
+                story.append(platypus.Paragraph("Executive Summary", styles['Heading2']))
                 summary_data = [
                     ['Total Sources', str(len(forensic_data['sources']))],
                     ['Total Messages', str(forensic_data['statistics']['total_messages'])],
@@ -385,21 +387,21 @@ class ExportService:
                     ['Analysis Status', 'Complete']
                 ]
                 
-                summary_table = Table(summary_data, colWidths=[2*inch, 4*inch])
-                summary_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (0, -1), HexColor('#f0f0f0')),
-                    ('TEXTCOLOR', (0, 0), (-1, -1), black),
+                summary_table = platypus.Table(summary_data, colWidths=[2*units.inch, 4*units.inch])
+                summary_table.setStyle(platypus.TableStyle([
+                    ('BACKGROUND', (0, 0), (0, -1), reportlab_colors.HexColor('#f0f0f0')),
+                    ('TEXTCOLOR', (0, 0), (-1, -1), reportlab_colors.black),
                     ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
                     ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
                     ('FONTSIZE', (0, 0), (-1, -1), 10),
-                    ('GRID', (0, 0), (-1, -1), 1, black)
+                    ('GRID', (0, 0), (-1, -1), 1, reportlab_colors.black)
                 ]))
                 story.append(summary_table)
-                story.append(Spacer(1, 20))
+                story.append(platypus.Spacer(1, 20))
                 
                 # Communication statistics
                 if include_statistics:
-                    story.append(Paragraph("Communication Statistics", styles['Heading2']))
+                    story.append(platypus.Paragraph("Communication Statistics", styles['Heading2']))
                     
                     stats = forensic_data['statistics']
                     stats_data = [
@@ -415,42 +417,42 @@ class ExportService:
                         ['Negative Messages', str(stats.get('negative_sentiment', 0))],
                         ['', ''],
                         ['Temporal Patterns', ''],
-                        ['Peak Activity Hour', str(stats.get('peak_hour', 'N/A'))],
+                        ['Peak Activity Hour', str(stats['peak_hour']) if stats.get('peak_hour') is not None else 'N/A'],
                         ['Weekend Messages', str(stats.get('weekend_messages', 0))],
                         ['Deleted Messages', str(stats.get('deleted_messages', 0))]
                     ]
                     
-                    stats_table = Table(stats_data, colWidths=[2*inch, 2*inch])
-                    stats_table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (0, -1), HexColor('#f0f0f0')),
-                        ('TEXTCOLOR', (0, 0), (-1, -1), black),
+                    stats_table = platypus.Table(stats_data, colWidths=[2*units.inch, 2*units.inch])
+                    stats_table.setStyle(platypus.TableStyle([
+                        ('BACKGROUND', (0, 0), (0, -1), reportlab_colors.HexColor('#f0f0f0')),
+                        ('TEXTCOLOR', (0, 0), (-1, -1), reportlab_colors.black),
                         ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
                         ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
                         ('FONTSIZE', (0, 0), (-1, -1), 9),
-                        ('GRID', (0, 0), (-1, -1), 1, black)
+                        ('GRID', (0, 0), (-1, -1), 1, reportlab_colors.black)
                     ]))
                     story.append(stats_table)
-                    story.append(Spacer(1, 20))
+                    story.append(platypus.Spacer(1, 20))
                 
                 # Network analysis
                 if include_network_analysis:
-                    story.append(Paragraph("Communication Network Analysis", styles['Heading2']))
-                    story.append(Paragraph("Key Participants and Relationships:", styles['Heading3']))
+                    story.append(platypus.Paragraph("Communication Network Analysis", styles['Heading2']))
+                    story.append(platypus.Paragraph("Key Participants and Relationships:", styles['Heading3']))
                     
                     for participant in forensic_data['network_analysis']['key_participants'][:10]:
                         participant_text = f"• {participant['name']} - {participant['message_count']} messages"
                         if participant.get('centrality_score'):
                             participant_text += f" (Centrality: {participant['centrality_score']:.2f})"
-                        story.append(Paragraph(participant_text, styles['Normal']))
+                        story.append(platypus.Paragraph(participant_text, styles['Normal']))
                     
-                    story.append(Spacer(1, 12))
+                    story.append(platypus.Spacer(1, 12))
                 
                 # Source details
-                story.append(PageBreak())
-                story.append(Paragraph("Forensic Sources", styles['Heading2']))
+                story.append(platypus.PageBreak())
+                story.append(platypus.Paragraph("Forensic Sources", styles['Heading2']))
                 
                 for source in forensic_data['sources']:
-                    story.append(Paragraph(f"Source: {source['source_name']}", styles['Heading3']))
+                    story.append(platypus.Paragraph(f"Source: {source['source_name']}", styles['Heading3']))
                     
                     source_details = [
                         ['Source Type', source['source_type']],
@@ -460,17 +462,17 @@ class ExportService:
                         ['Analysis Status', source['analysis_status']]
                     ]
                     
-                    source_table = Table(source_details, colWidths=[2*inch, 4*inch])
-                    source_table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (0, -1), HexColor('#f0f0f0')),
-                        ('TEXTCOLOR', (0, 0), (-1, -1), black),
+                    source_table = platypus.Table(source_details, colWidths=[2*units.inch, 4*units.inch])
+                    source_table.setStyle(platypus.TableStyle([
+                        ('BACKGROUND', (0, 0), (0, -1), reportlab_colors.HexColor('#f0f0f0')),
+                        ('TEXTCOLOR', (0, 0), (-1, -1), reportlab_colors.black),
                         ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
                         ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
                         ('FONTSIZE', (0, 0), (-1, -1), 9),
-                        ('GRID', (0, 0), (-1, -1), 1, black)
+                        ('GRID', (0, 0), (-1, -1), 1, reportlab_colors.black)
                     ]))
                     story.append(source_table)
-                    story.append(Spacer(1, 12))
+                    story.append(platypus.Spacer(1, 12))
                 
                 # Build PDF
                 doc.build(story)
@@ -608,7 +610,9 @@ class ExportService:
                 
                 # Temporal analysis
                 stats_report['temporal_analysis'] = {
-                    'peak_activity_hour': forensic_data['statistics'].get('peak_hour', 'N/A'),
+                    'peak_activity_hour': forensic_data['statistics'].get('peak_hour') if forensic_data['statistics'].get('peak_hour') is not None else 'N/A',
+                    'messages_by_hour': forensic_data['statistics'].get('messages_by_hour', []),
+                    'messages_by_weekday': forensic_data['statistics'].get('messages_by_weekday', []),
                     'weekend_messages': forensic_data['statistics'].get('weekend_messages', 0),
                     'weekday_messages': forensic_data['statistics']['total_messages'] - forensic_data['statistics'].get('weekend_messages', 0),
                     'deleted_messages': forensic_data['statistics'].get('deleted_messages', 0),
@@ -853,13 +857,23 @@ class ExportService:
         if source_ids:
             sources = [s for s in sources if str(s.id) in source_ids]
         
-        # Calculate statistics
-        total_messages = 0
-        participants = set()
-        date_range = {'start': None, 'end': None}
+        # Load precomputed aggregates in one query instead of scanning items
+        aggregate_service = ForensicAggregateService(db)
+        aggregates = await aggregate_service.get_aggregates([source.id for source in sources])
+        
+        # Sources ingested before aggregates existed are backfilled once
+        backfilled = False
+        for source in sources:
+            if source.id not in aggregates and source.analysis_status in self.SETTLED_ANALYSIS_STATUSES:
+                aggregates[source.id] = await aggregate_service.rebuild_source(source.id)
+                backfilled = True
+        if backfilled:
+            await db.commit()
         
+        combined = ForensicAggregateAccumulator()
         sources_data = []
         for source in sources:
+            aggregate = aggregates.get(source.id)
             source_dict = {
                 'id': str(source.id),
                 'source_name': source.source_name,
@@ -867,61 +881,21 @@ class ExportService:
                 'device_info': source.device_info,
                 'account_info': source.account_info,
                 'analysis_status': source.analysis_status.value if source.analysis_status else 'unknown',
-                'message_count': 0
+                'message_count': aggregate.total_items if aggregate else 0
             }
-            
-            # Count messages and participants (simplified)
-            if hasattr(source, 'forensic_items'):
-                source_dict['message_count'] = len(source.forensic_items)
-                total_messages += source_dict['message_count']
-                
-                for item in source.forensic_items:
-                    if item.sender:
-                        participants.add(item.sender)
-                    if item.recipients:
-                        participants.update(item.recipients)
-                    
-                    if item.timestamp:
-                        if not date_range['start'] or item.timestamp < date_range['start']:
-                            date_range['start'] = item.timestamp
-                        if not date_range['end'] or item.timestamp > date_range['end']:
-                            date_range['end'] = item.timestamp
+            if aggregate:
+                combined.merge(ForensicAggregateAccumulator.from_aggregate(aggregate))
             
             sources_data.append(source_dict)
         
-        # Format date range
-        if date_range['start']:
-            date_range['start'] = date_range['start'].strftime('%Y-%m-%d')
-        if date_range['end']:
-            date_range['end'] = date_range['end'].strftime('%Y-%m-%d')
-        
-        # Mock additional statistics (would be calculated from actual data)
-        statistics = {
-            'total_messages': total_messages,
-            'unique_participants': len(participants),
-            'date_range': date_range,
-            'email_count': int(total_messages * 0.4),
-            'sms_count': int(total_messages * 0.3),
-            'whatsapp_count': int(total_messages * 0.2),
-            'other_count': int(total_messages * 0.1),
-            'positive_sentiment': int(total_messages * 0.3),
-            'neutral_sentiment': int(total_messages * 0.5),
-            'negative_sentiment': int(total_messages * 0.2),
-            'peak_hour': 14,
-            'weekend_messages': int(total_messages * 0.15),
-            'deleted_messages': int(total_messages * 0.05)
-        }
-        
-        # Mock network analysis
+        participants = combined.participant_summaries()
+        participant_count = len(participants)
+        edges = combined.edge_list()
         network_analysis = {
-            'key_participants': [
-                {
-                    'name': participant,
-                    'message_count': int(total_messages * 0.1),
-                    'centrality_score': 0.75
-                }
-                for participant in list(participants)[:10]
-            ]
+            'key_participants': participants[:10],
+            'participants': participants,
+            'edges': edges,
+            'density': len(edges) / (participant_count * (participant_count - 1) / 2) if participant_count > 1 else 0
         }
         
         return {
@@ -931,7 +905,7 @@ class ExportService:
                 'case_number': case.case_number
             },
             'sources': sources_data,
-            'statistics': statistics,
+            'statistics': combined.statistics(),
             'network_analysis': network_analysis
         }
     
@@ -978,35 +952,35 @@ class ExportService:
         """Generate PDF from filtered data"""
         # Use existing PDF generation logic with filtered data
         pdf_buffer = io.BytesIO()
-        doc = SimpleDocTemplate(pdf_buffer, pagesize=A4)
+        doc = platypus.SimpleDocTemplate(pdf_buffer, pagesize=pagesizes.A4)
         
         story = []
-        styles = getSampleStyleSheet()
+        styles = reportlab_styles.getSampleStyleSheet()
         
         # Title
-        story.append(Paragraph("Filtered Case Export", styles['Title']))
-        story.append(Spacer(1, 12))
+        story.append(platypus.Paragraph("Filtered Case Export", styles['Title']))
+        story.append(platypus.Spacer(1, 12))
         
         # Filter information
-        story.append(Paragraph("Applied Filters:", styles['Heading2']))
+        story.append(platypus.Paragraph("Applied Filters:", styles['Heading2']))
         for filter_name, filter_value in filters.items():
-            story.append(Paragraph(f"{filter_name}: {filter_value}", styles['Normal']))
-        story.append(Spacer(1, 20))
+            story.append(platypus.Paragraph(f"{filter_name}: {filter_value}", styles['Normal']))
+        story.append(platypus.Spacer(1, 20))
         
         # Case information
         case = filtered_data['case']
-        story.append(Paragraph(f"Case: {case['title']}", styles['Heading2']))
-        story.append(Paragraph(f"Case Number: {case['case_number']}", styles['Normal']))
-        story.append(Spacer(1, 12))
+        story.append(platypus.Paragraph(f"Case: {case['title']}", styles['Heading2']))
+        story.append(platypus.Paragraph(f"Case Number: {case['case_number']}", styles['Normal']))
+        story.append(platypus.Spacer(1, 12))
         
         # Events
-        story.append(Paragraph(f"Events ({len(filtered_data['events'])})", styles['Heading2']))
+        story.append(platypus.Paragraph(f"Events ({len(filtered_data['events'])})", styles['Heading2']))
         for event in filtered_data['events']:
             event_date = event['event_date'].strftime('%Y-%m-%d %H:%M') if event['event_date'] else 'No date'
-            story.append(Paragraph(f"{event['title']} ({event_date})", styles['Heading3']))
+            story.append(platypus.Paragraph(f"{event['title']} ({event_date})", styles['Heading3']))
             if event['description']:
-                story.append(Paragraph(event['description'], styles['Normal']))
-            story.append(Spacer(1, 12))
+                story.append(platypus.Paragraph(event['description'], styles['Normal']))
+            story.append(platypus.Spacer(1, 12))
         
         doc.build(story)
         pdf_content = pdf_buffer.getvalue()
@@ -1059,19 +1033,11 @@ class ExportService:
                 'node_type': 'participant'
             })
         
-        # Create edges (simplified - would be calculated from actual message data)
-        edges = []
-        for i, participant1 in enumerate(participants):
-            for participant2 in participants[i+1:]:
-                # Mock edge weight calculation
-                edge_weight = min(participant1['message_count'], participant2['message_count']) * 0.1
-                if edge_weight > 1:
-                    edges.append({
-                        'source': participant1['name'],
-                        'target': participant2['name'],
-                        'weight': edge_weight,
-                        'edge_type': 'communication'
-                    })
+        # Edges between the displayed participants, weighted by messages exchanged
+        edges = [
+            dict(edge, edge_type='communication')
+            for edge in self._edges_between(forensic_data, [p['name'] for p in participants])
+        ]
         
         return {
             'nodes': nodes,
@@ -1186,12 +1152,23 @@ class ExportService:
     async def _calculate_message_frequency(self, forensic_data: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate message frequency patterns"""
         total_messages = forensic_data['statistics']['total_messages']
+        messages_by_day = forensic_data['statistics'].get('messages_by_day', {})
+        
+        date_range = forensic_data['statistics']['date_range']
+        period_days = 1
+        if date_range['start'] and date_range['end']:
+            period_days = (
+                datetime.fromisoformat(date_range['end']) - datetime.fromisoformat(date_range['start'])
+            ).days + 1
+        
+        average_per_day = total_messages / period_days
+        peak_day_messages = max(messages_by_day.values()) if messages_by_day else 0
         
-        # Mock frequency calculation (would use actual timestamp data)
         return {
-            'messages_per_day_average': round(total_messages / 30, 1),  # Assuming 30-day period
-            'peak_day_messages': round(total_messages * 0.1),  # 10% on peak day
-            'frequency_pattern': 'irregular',  # Would be calculated from actual data
+            'messages_per_day_average': round(average_per_day, 1),
+            'peak_day_messages': peak_day_messages,
+            'active_days': len(messages_by_day),
+            'frequency_pattern': 'irregular' if peak_day_messages > average_per_day * 3 else 'regular',
             'communication_intensity': 'high' if total_messages > 1000 else 'moderate' if total_messages > 100 else 'low'
         }
     
@@ -1242,19 +1219,21 @@ class ExportService:
     
     async def _calculate_relationship_strength(self, forensic_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Calculate relationship strength between participants"""
-        participants = forensic_data['network_analysis']['key_participants']
-        relationships = []
+        participants = forensic_data['network_analysis']['key_participants'][:5]  # Limit to top 5
+        edges = self._edges_between(forensic_data, [p['name'] for p in participants])
+        strongest = max((edge['weight'] for edge in edges), default=0)
         
-        for i, participant1 in enumerate(participants[:5]):  # Limit to top 5
-            for participant2 in participants[i+1:5]:
-                strength = min(participant1['message_count'], participant2['message_count']) / max(participant1['message_count'], participant2['message_count'])
-                relationships.append({
-                    'participant_1': participant1['name'],
-                    'participant_2': participant2['name'],
-                    'strength_score': round(strength, 2),
-                    'relationship_type': 'strong' if strength > 0.7 else 'moderate' if strength > 0.3 else 'weak',
-                    'interaction_frequency': 'high' if strength > 0.5 else 'moderate'
-                })
+        relationships = []
+        for edge in edges:
+            strength = edge['weight'] / strongest
+            relationships.append({
+                'participant_1': edge['source'],
+                'participant_2': edge['target'],
+                'message_exchange_count': edge['weight'],
+                'strength_score': round(strength, 2),
+                'relationship_type': 'strong' if strength > 0.7 else 'moderate' if strength > 0.3 else 'weak',
+                'interaction_frequency': 'high' if strength > 0.5 else 'moderate'
+            })
         
         return relationships
     
@@ -1307,7 +1286,8 @@ class ExportService:
         include_metadata: bool
     ) -> Dict[str, Any]:
         """Generate detailed network data for export"""
-        participants = forensic_data['network_analysis']['key_participants']
+        network_analysis = forensic_data['network_analysis']
+        participants = network_analysis.get('participants', network_analysis['key_participants'])
         
         # Enhanced nodes with metadata
         nodes = []
@@ -1322,60 +1302,59 @@ class ExportService:
             if include_metadata:
                 node.update({
                     'node_index': i,
-                    'participant_type': 'individual',  # Would be determined from data
+                    'participant_type': 'individual',
                     'activity_level': 'high' if participant['message_count'] > 100 else 'moderate' if participant['message_count'] > 20 else 'low',
-                    'first_communication': None,  # Would be calculated from actual data
-                    'last_communication': None,
-                    'communication_frequency': participant['message_count'] / 30  # Messages per day estimate
+                    'sent_count': participant.get('sent_count', 0),
+                    'received_count': participant.get('received_count', 0),
+                    'degree': participant.get('degree', 0)
                 })
             
             nodes.append(node)
         
-        # Enhanced edges with metadata
+        # Edges carry the real number of messages exchanged between each pair
         edges = []
-        edge_id = 0
-        for i, participant1 in enumerate(participants):
-            for j, participant2 in enumerate(participants[i+1:], i+1):
-                edge_weight = min(participant1['message_count'], participant2['message_count']) * 0.1
-                if edge_weight > 1:
-                    edge = {
-                        'id': edge_id,
-                        'source': participant1['name'],
-                        'target': participant2['name'],
-                        'weight': round(edge_weight, 2)
-                    }
-                    
-                    if include_metadata:
-                        edge.update({
-                            'edge_type': 'bidirectional',
-                            'communication_strength': 'strong' if edge_weight > 10 else 'moderate' if edge_weight > 5 else 'weak',
-                            'message_exchange_count': int(edge_weight * 10),  # Estimate
-                            'relationship_duration': None,  # Would be calculated
-                            'sentiment_balance': 'neutral'  # Would be calculated
-                        })
-                    
-                    edges.append(edge)
-                    edge_id += 1
+        for edge_id, exchange in enumerate(self._edges_between(forensic_data, [p['name'] for p in participants])):
+            edge = {
+                'id': edge_id,
+                'source': exchange['source'],
+                'target': exchange['target'],
+                'weight': exchange['weight']
+            }
+            
+            if include_metadata:
+                edge.update({
+                    'edge_type': 'bidirectional',
+                    'communication_strength': 'strong' if exchange['weight'] > 100 else 'moderate' if exchange['weight'] > 10 else 'weak',
+                    'message_exchange_count': exchange['weight']
+                })
+            
+            edges.append(edge)
         
         network_data = {
             'nodes': nodes,
-            'edges': edges
+            'edges': edges,
+            'density': len(edges) / (len(nodes) * (len(nodes) - 1) / 2) if len(nodes) > 1 else 0
         }
         
         if include_metadata:
             network_data['metadata'] = {
                 'network_type': 'communication_network',
-                'analysis_method': 'message_frequency',
+                'analysis_method': 'message_exchange_count',
                 'node_count': len(nodes),
                 'edge_count': len(edges),
-                'density': len(edges) / (len(nodes) * (len(nodes) - 1) / 2) if len(nodes) > 1 else 0,
-                'clustering': 0.5,  # Would be calculated
-                'diameter': 3,  # Would be calculated
-                'average_path_length': 2.1  # Would be calculated
+                'density': network_data['density']
             }
         
         return network_data
     
+    def _edges_between(self, forensic_data: Dict[str, Any], participant_names: List[str]) -> List[Dict[str, Any]]:
+        """Precomputed communication edges restricted to the given participants"""
+        allowed = set(participant_names)
+        return [
+            edge for edge in forensic_data['network_analysis'].get('edges', [])
+            if edge['source'] in allowed and edge['target'] in allowed
+        ]
+    
     async def _export_network_as_csv(self, network_data: Dict[str, Any]) -> bytes:
         """Export network data as CSV format"""
         import csv
@@ -0,0 +1,94 @@
+"""
+Idempotent bulk writes of financial alerts, keyed by a deterministic fingerprint
+"""
+
+import hashlib
+import uuid
+from typing import Any, Dict, Iterable, Optional
+from uuid import UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.financial_analysis import AlertSeverity, FinancialAlert
+
+# Rows per INSERT, well under PostgreSQL's bind parameter limit
+ALERT_INSERT_CHUNK = 1000
+# Columns a refreshed alert takes from the latest analysis; acknowledgement is kept
+REFRESHED_COLUMNS = ("transaction_id", "severity", "title", "description", "trigger_criteria", "detected_patterns")
+
+def alert_fingerprint(
+    alert_type: str,
+    case_id: UUID,
+    transaction_ids: Iterable[UUID] = (),
+    key: Optional[str] = None
+) -> str:
+    """SHA-256 of the alert type, case and either an explicit key or the sorted transaction set"""
+    identity = key if key is not None else ",".join(sorted(str(tx_id) for tx_id in transaction_ids))
+    return hashlib.sha256(f"{alert_type}|{case_id}|{identity}".encode()).hexdigest()
+
+class FinancialAlertBatch:
+    """
+    One detector's alerts, written with a single INSERT ... ON CONFLICT on (case_id, fingerprint)
+
+    Alerts identified by a fixed set of transactions are inserted once and left alone afterwards
+    (DO NOTHING). With refresh=True, alerts about an evolving situation - a counterparty's share of
+    outflows, a growing structuring sequence - are keyed by that situation and updated in place
+    (DO UPDATE). Either way re-running analysis, or two analyses racing, never duplicates an alert.
+    """
+
+    def __init__(self, case_id: UUID, refresh: bool = False):
+        self.case_id = case_id
+        self.refresh = refresh
+        self.rows: Dict[str, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def add(
+        self,
+        alert_type: str,
+        severity: AlertSeverity,
+        title: str,
+        description: str,
+        transaction_ids: Iterable[UUID] = (),
+        key: Optional[str] = None,
+        transaction_id: Optional[UUID] = None,
+        trigger_criteria: Optional[Dict[str, Any]] = None,
+        detected_patterns: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Queue an alert; returns its fingerprint"""
+        transaction_ids = list(transaction_ids)
+        fingerprint = alert_fingerprint(alert_type, self.case_id, transaction_ids, key)
+        self.rows[fingerprint] = {
+            "id": uuid.uuid4(),
+            "case_id": self.case_id,
+            "fingerprint": fingerprint,
+            "transaction_id": transaction_id or (transaction_ids[0] if transaction_ids else None),
+            "alert_type": alert_type,
+            "severity": severity,
+            "title": title,
+            "description": description,
+            "trigger_criteria": trigger_criteria,
+            "detected_patterns": detected_patterns,
+            "is_acknowledged": False
+        }
+        return fingerprint
+
+    async def write(self, db: AsyncSession) -> int:
+        """Insert (or refresh) the queued alerts; returns the number of rows written"""
+        rows = list(self.rows.values())
+        written = 0
+        for start in range(0, len(rows), ALERT_INSERT_CHUNK):
+            statement = pg_insert(FinancialAlert).values(rows[start:start + ALERT_INSERT_CHUNK])
+            conflict = [FinancialAlert.case_id, FinancialAlert.fingerprint]
+            if self.refresh:
+                statement = statement.on_conflict_do_update(
+                    index_elements=conflict,
+                    set_={column: statement.excluded[column] for column in REFRESHED_COLUMNS}
+                )
+            else:
+                statement = statement.on_conflict_do_nothing(index_elements=conflict)
+            result = await db.execute(statement)
+            written += max(result.rowcount, 0)
+        self.rows.clear()
+        return written
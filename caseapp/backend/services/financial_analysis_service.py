@@ -3,18 +3,174 @@ Financial analysis service for detecting suspicious financial activity
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc
-from typing import Optional, List, Dict, Any
+from sqlalchemy import select, update, or_, case, desc, text, tuple_, Select
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any, AsyncIterator, Sequence, Tuple
 from uuid import UUID
 from datetime import datetime, timedelta, UTC
+from decimal import Decimal
+import base64
+import json
 import structlog
 import re
 
 from models.financial_analysis import FinancialAccount, FinancialTransaction, FinancialAlert, TransactionType, AlertSeverity
-from core.exceptions import CaseManagementException
+from core.exceptions import CaseManagementException, ValidationError
+from core.lazy_imports import lazy_import
+from core.money import from_scaled, quantize_amount, to_scaled
+from services.financial_alert_writer import FinancialAlertBatch
+from services.financial_summary_cache import financial_summary_cache
+from services.money_flow_service import MoneyFlowService
+from services.transaction_frame import TransactionFrame
 
 logger = structlog.get_logger()
 
+np = lazy_import("numpy")
+
+SUMMARY_TIMELINE_DAYS = 30
+SUMMARY_TOP_COUNTERPARTIES = 5
+HIGH_RISK_SCORE = 0.7
+
+HIGH_VALUE_THRESHOLD = 10000
+STRUCTURING_THRESHOLD = 10000
+STRUCTURING_MIN_ITEMS = 3
+STRUCTURING_WINDOW_SECONDS = 48 * 3600
+FLAG_UPDATE_CHUNK = 1000
+
+# Grouping set ids from GROUPING(counterparty_name, recent_day): a bit is set for each column
+# the row is NOT grouped by
+_GROUPING_TOTAL = 3
+_GROUPING_COUNTERPARTY = 1
+_GROUPING_DAY = 2
+
+# One pass over the case's transactions: FILTER aggregates give credit/debit/high-risk totals and
+# grouping sets produce the grand total, per-counterparty and per-day rows together
+CASE_SUMMARY_SQL = text("""
+WITH grouped AS (
+    SELECT
+        GROUPING(counterparty_name, recent_day) AS grouping_set,
+        counterparty_name,
+        recent_day,
+        count(*) AS transaction_count,
+        coalesce(sum(amount) FILTER (WHERE transaction_type = 'CREDIT'), 0) AS total_credit,
+        coalesce(sum(amount) FILTER (WHERE transaction_type = 'DEBIT'), 0) AS total_debit,
+        count(*) FILTER (WHERE risk_score >= :high_risk) AS high_risk_count,
+        coalesce(sum(amount), 0) AS total_amount
+    FROM (
+        SELECT
+            counterparty_name, amount, transaction_type, risk_score,
+            CASE WHEN transaction_date >= :since THEN date(transaction_date) END AS recent_day
+        FROM financial_transactions
+        WHERE case_id = :case_id
+    ) AS case_transactions
+    GROUP BY GROUPING SETS ((), (counterparty_name), (recent_day))
+),
+ranked AS (
+    SELECT
+        grouped.*,
+        row_number() OVER (PARTITION BY grouping_set ORDER BY total_amount DESC) AS amount_rank
+    FROM grouped
+)
+SELECT case_counts.total_accounts, case_counts.total_alerts, ranked.*
+FROM (
+    SELECT
+        (SELECT count(*) FROM financial_accounts WHERE case_id = :case_id) AS total_accounts,
+        (SELECT count(*) FROM financial_alerts WHERE case_id = :case_id) AS total_alerts
+) AS case_counts
+LEFT JOIN ranked ON (
+    ranked.grouping_set = 3
+    OR (ranked.grouping_set = 1 AND ranked.amount_rank <= :top_counterparties)
+    OR (ranked.grouping_set = 2 AND ranked.recent_day IS NOT NULL)
+)
+ORDER BY ranked.grouping_set, ranked.amount_rank, ranked.recent_day
+""")
+
+# Columns returned by transaction listings (metadata_json is left out; it can be large)
+TRANSACTION_LIST_COLUMNS = (
+    FinancialTransaction.id,
+    FinancialTransaction.account_id,
+    FinancialTransaction.case_id,
+    FinancialTransaction.document_id,
+    FinancialTransaction.transaction_date,
+    FinancialTransaction.amount,
+    FinancialTransaction.currency,
+    FinancialTransaction.transaction_type,
+    FinancialTransaction.description,
+    FinancialTransaction.counterparty_name,
+    FinancialTransaction.counterparty_account,
+    FinancialTransaction.is_suspicious,
+    FinancialTransaction.risk_score,
+    FinancialTransaction.tags,
+    FinancialTransaction.created_at,
+)
+
+@dataclass
+class TransactionFilters:
+    """Server-side filters for transaction listings"""
+    account_id: Optional[UUID] = None
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    counterparty: Optional[str] = None  # Substring of the name, or exact account number
+    transaction_types: Optional[Sequence[TransactionType]] = None
+    is_suspicious: Optional[bool] = None
+
+def encode_cursor(transaction_date: datetime, transaction_id: UUID) -> str:
+    """Opaque keyset cursor for the position after a transaction"""
+    payload = json.dumps([transaction_date.isoformat(), str(transaction_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        transaction_date, transaction_id = json.loads(payload)
+        return datetime.fromisoformat(transaction_date), UUID(transaction_id)
+    except (ValueError, TypeError):
+        raise ValidationError("Invalid pagination cursor")
+
+def summary_from_rows(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Dashboard summary from the CASE_SUMMARY_SQL rows"""
+    first = rows[0] if rows else {}
+    total = next((row for row in rows if row["grouping_set"] == _GROUPING_TOTAL), None) or {}
+    total_credit = float(total.get("total_credit") or 0.0)
+    total_debit = float(total.get("total_debit") or 0.0)
+
+    counterparties = sorted(
+        (row for row in rows if row["grouping_set"] == _GROUPING_COUNTERPARTY),
+        key=lambda row: row["amount_rank"]
+    )
+    days = sorted(
+        (row for row in rows if row["grouping_set"] == _GROUPING_DAY),
+        key=lambda row: row["recent_day"]
+    )
+
+    return {
+        "total_accounts": first.get("total_accounts") or 0,
+        "total_transactions": total.get("transaction_count") or 0,
+        "total_alerts": first.get("total_alerts") or 0,
+        "total_credit": total_credit,
+        "total_debit": total_debit,
+        "net_flow": total_credit - total_debit,
+        "unaccounted_flows": 0.0, # Placeholder
+        "high_risk_transactions": total.get("high_risk_count") or 0,
+        "top_counterparties": [
+            {"name": row["counterparty_name"] or "Unknown", "amount": float(row["total_amount"])}
+            for row in counterparties
+        ],
+        "timeline_data": [
+            {"date": str(row["recent_day"]), "amount": float(row["total_amount"])}
+            for row in days
+        ],
+        "generated_at": datetime.now(UTC).isoformat()
+    }
+
+def _quantized(amount: Optional[Any], currency: Optional[str]) -> Optional[Decimal]:
+    return quantize_amount(amount, currency) if amount is not None else None
+
+def _flag(flags: Dict[UUID, float], tx_id: UUID, risk_score: float):
+    flags[tx_id] = max(flags.get(tx_id, 0.0), risk_score)
+
 class FinancialAnalysisService:
     """Service for analyzing financial transactions and detecting patterns"""
     
@@ -22,213 +178,188 @@ class FinancialAnalysisService:
         self.db = db
     
     async def get_case_summary(self, case_id: UUID) -> Dict[str, Any]:
-        """Get aggregated financial summary for a case"""
+        """Get aggregated financial summary for a case (cached until the case's data changes)"""
         try:
-            # Get basic counts
-            account_count_res = await self.db.execute(
-                select(func.count(FinancialAccount.id)).where(FinancialAccount.case_id == case_id)
-            )
-            total_accounts = account_count_res.scalar()
-            
-            transaction_count_res = await self.db.execute(
-                select(func.count(FinancialTransaction.id)).where(FinancialTransaction.case_id == case_id)
-            )
-            total_transactions = transaction_count_res.scalar()
-            
-            alert_count_res = await self.db.execute(
-                select(func.count(FinancialAlert.id)).where(FinancialAlert.case_id == case_id)
-            )
-            total_alerts = alert_count_res.scalar()
-            
-            # Sum amounts
-            credit_res = await self.db.execute(
-                select(func.sum(FinancialTransaction.amount))
-                .where(and_(FinancialTransaction.case_id == case_id, FinancialTransaction.transaction_type == TransactionType.CREDIT))
-            )
-            total_credit = credit_res.scalar() or 0.0
-            
-            debit_res = await self.db.execute(
-                select(func.sum(FinancialTransaction.amount))
-                .where(and_(FinancialTransaction.case_id == case_id, FinancialTransaction.transaction_type == TransactionType.DEBIT))
-            )
-            total_debit = debit_res.scalar() or 0.0
-            
-            # Top counterparties
-            counterparty_res = await self.db.execute(
-                select(FinancialTransaction.counterparty_name, func.sum(FinancialTransaction.amount).label("total_amount"))
-                .where(FinancialTransaction.case_id == case_id)
-                .group_by(FinancialTransaction.counterparty_name)
-                .order_by(desc("total_amount"))
-                .limit(5)
-            )
-            top_counterparties = [
-                {"name": name or "Unknown", "amount": amount} 
-                for name, amount in counterparty_res.all()
-            ]
-            
-            # Timeline data (last 30 days)
-            thirty_days_ago = datetime.now(UTC) - timedelta(days=30)
-            timeline_res = await self.db.execute(
-                select(func.date(FinancialTransaction.transaction_date).label("date"), func.sum(FinancialTransaction.amount).label("total"))
-                .where(and_(FinancialTransaction.case_id == case_id, FinancialTransaction.transaction_date >= thirty_days_ago))
-                .group_by(func.date(FinancialTransaction.transaction_date))
-                .order_by("date")
-            )
-            # High risk transactions
-            high_risk_res = await self.db.execute(
-                select(func.count(FinancialTransaction.id))
-                .where(and_(FinancialTransaction.case_id == case_id, FinancialTransaction.risk_score >= 0.7))
-            )
-            high_risk_count = high_risk_res.scalar() or 0
-            
-            timeline_data = [
-                {"date": str(row.date), "amount": row.total}
-                for row in timeline_res.all()
-            ]
-            
-            return {
-                "total_accounts": total_accounts,
-                "total_transactions": total_transactions,
-                "total_alerts": total_alerts,
-                "total_credit": total_credit,
-                "total_debit": total_debit,
-                "net_flow": total_credit - total_debit,
-                "unaccounted_flows": 0.0, # Placeholder
-                "high_risk_transactions": high_risk_count,
-                "top_counterparties": top_counterparties,
-                "timeline_data": timeline_data,
-                "generated_at": datetime.now(UTC).isoformat()
-            }
+            return await financial_summary_cache.get_or_compute(case_id, lambda: self._compute_case_summary(case_id))
         except Exception as e:
             logger.error("Failed to get financial summary", case_id=str(case_id), error=str(e))
             raise CaseManagementException(f"Failed to get financial summary: {str(e)}")
 
+    async def _compute_case_summary(self, case_id: UUID) -> Dict[str, Any]:
+        """Summary from a single statement: one scan of the case's transactions plus two counts"""
+        result = await self.db.execute(CASE_SUMMARY_SQL, {
+            "case_id": case_id,
+            "since": datetime.now(UTC) - timedelta(days=SUMMARY_TIMELINE_DAYS),
+            "high_risk": HIGH_RISK_SCORE,
+            "top_counterparties": SUMMARY_TOP_COUNTERPARTIES
+        })
+        return summary_from_rows(result.mappings().all())
+
     async def run_analysis(self, case_id: UUID):
         """Run automated analysis on all transactions for a case"""
         try:
-            # Get all transactions for the case
-            result = await self.db.execute(
-                select(FinancialTransaction).where(FinancialTransaction.case_id == case_id).order_by(FinancialTransaction.transaction_date)
-            )
-            transactions = list(result.scalars().all())
+            # Columnar snapshot of the case: exact scaled amounts, time-ordered
+            frame = await TransactionFrame.load(self.db, case_id)
             
-            if not transactions:
+            if not len(frame):
                 return
             
+            # Transaction id -> risk score to raise it to (flagged suspicious)
+            flags: Dict[UUID, float] = {}
+            
             # 1. Detect High-Value Transactions
-            await self._detect_high_value_transactions(case_id, transactions)
+            await self._detect_high_value_transactions(case_id, frame, flags)
             
             # 2. Detect Structuring / Rapid Succession
-            await self._detect_structuring(case_id, transactions)
+            await self._detect_structuring(case_id, frame, flags)
             
             # 3. Detect Unusual Concentration (Top Recipients)
-            await self._detect_unusual_concentration(case_id, transactions)
+            await self._detect_unusual_concentration(case_id, frame, flags)
+            
+            # 4. Detect Round-Tripping and Fan-In/Fan-Out across accounts
+            await self._detect_money_flow_patterns(case_id, flags)
             
+            await self._apply_flags(flags)
             await self.db.commit()
-            logger.info("Financial analysis completed", case_id=str(case_id), transaction_count=len(transactions))
+            # Alerts and flags are bulk statements, which bypass the ORM hooks that invalidate the summary
+            await financial_summary_cache.invalidate([case_id])
+            logger.info("Financial analysis completed", case_id=str(case_id), transaction_count=len(frame), flagged=len(flags))
             
         except Exception as e:
             logger.error("Financial analysis failed", case_id=str(case_id), error=str(e))
             await self.db.rollback()
             raise CaseManagementException(f"Financial analysis failed: {str(e)}")
 
-    async def _detect_high_value_transactions(self, case_id: UUID, transactions: List[FinancialTransaction]):
+    async def _detect_high_value_transactions(self, case_id: UUID, frame: TransactionFrame, flags: Dict[UUID, float]):
         """Flag transactions above a certain threshold (e.g., $10,000)"""
-        THRESHOLD = 10000.0
-        for tx in transactions:
-            if tx.amount >= THRESHOLD:
-                tx.is_suspicious = True
-                tx.risk_score = max(tx.risk_score, 0.6)
-                
-                # Check if alert already exists
-                alert_exists = await self.db.execute(
-                    select(FinancialAlert).where(and_(FinancialAlert.transaction_id == tx.id, FinancialAlert.alert_type == "high_value"))
-                )
-                if not alert_exists.scalar_one_or_none():
-                    alert = FinancialAlert(
-                        case_id=case_id,
-                        transaction_id=tx.id,
-                        alert_type="high_value",
-                        severity=AlertSeverity.MEDIUM,
-                        title="High-Value Transaction",
-                        description=f"Transaction of {tx.amount} {tx.currency} exceeds reporting threshold.",
-                        trigger_criteria={"threshold": THRESHOLD}
-                    )
-                    self.db.add(alert)
+        alerts = FinancialAlertBatch(case_id)
+        for i in np.flatnonzero(frame.amounts >= to_scaled(HIGH_VALUE_THRESHOLD)):
+            tx_id = frame.ids[i]
+            _flag(flags, tx_id, 0.6)
+            alerts.add(
+                alert_type="high_value",
+                severity=AlertSeverity.MEDIUM,
+                title="High-Value Transaction",
+                description=f"Transaction of {from_scaled(frame.amounts[i])} {frame.currency(i)} exceeds reporting threshold.",
+                transaction_ids=[tx_id],
+                trigger_criteria={"threshold": HIGH_VALUE_THRESHOLD}
+            )
+        # Already-alerted transactions conflict on their fingerprint and are skipped
+        await alerts.write(self.db)
 
-    async def _detect_structuring(self, case_id: UUID, transactions: List[FinancialTransaction]):
+    async def _detect_structuring(self, case_id: UUID, frame: TransactionFrame, flags: Dict[UUID, float]):
         """Detect rapid succession of smaller transactions just below threshold (e.g. $9,000-$9,999)"""
-        # Simple implementation: 3+ transactions to same counterparty within 48h totalling > $10k
-        for i in range(len(transactions)):
-            tx_a = transactions[i]
-            if tx_a.transaction_type != TransactionType.DEBIT and tx_a.transaction_type != TransactionType.CREDIT:
-                continue
-                
-            sequence = [tx_a]
-            for j in range(i + 1, len(transactions)):
-                tx_b = transactions[j]
-                if tx_b.counterparty_account == tx_a.counterparty_account and \
-                   (tx_b.transaction_date - tx_a.transaction_date).total_seconds() <= 172800: # 48h
-                    sequence.append(tx_b)
-            
-            if len(sequence) >= 3:
-                total_amount = sum(s.amount for s in sequence)
-                if total_amount >= 10000.0:
-                    for s in sequence:
-                        s.is_suspicious = True
-                        s.risk_score = max(s.risk_score, 0.8)
-                    
-                    alert = FinancialAlert(
-                        case_id=case_id,
-                        alert_type="structuring",
-                        severity=AlertSeverity.HIGH,
-                        title="Potential Structuring Detected",
-                        description=f"Sequence of {len(sequence)} transactions totalling {total_amount} detected within 48h to same counterparty.",
-                        trigger_criteria={"item_count": len(sequence), "total_amount": total_amount}
-                    )
-                    self.db.add(alert)
-                    # Skip processed sequence items to avoid double alerts
-                    i += len(sequence) - 1
+        # 3+ transactions to the same counterparty within 48h of a debit or credit, totalling > $10k
+        order = np.lexsort((frame.times, frame.counterparties))
+        order = order[frame.counterparties[order] >= 0]
+        if order.size < STRUCTURING_MIN_ITEMS:
+            return
+        
+        # Sorted (counterparty, time) keys: each transaction's 48h window is one searchsorted away
+        times = frame.times[order] - frame.times.min()
+        keys = frame.counterparties[order].astype(np.int64) * (int(times.max()) + STRUCTURING_WINDOW_SECONDS + 1) + times
+        ends = np.searchsorted(keys, keys + STRUCTURING_WINDOW_SECONDS, side="right")
+        starts = np.arange(order.size)
+        running = np.concatenate(([0], np.cumsum(frame.amounts[order])))
+        totals = running[ends] - running[starts]
+        qualifying = np.flatnonzero(
+            frame.type_mask(TransactionType.DEBIT, TransactionType.CREDIT)[order]
+            & (ends - starts >= STRUCTURING_MIN_ITEMS)
+            & (totals >= to_scaled(STRUCTURING_THRESHOLD))
+        )
+        
+        # Overlapping windows of one counterparty form a single sequence (and a single alert)
+        sequences = []
+        for i in qualifying:
+            if sequences and i < sequences[-1][1]:
+                sequences[-1][1] = max(sequences[-1][1], ends[i])
+            else:
+                sequences.append([i, ends[i]])
+        
+        # Keyed by counterparty and first transaction, so a sequence that grows updates its alert
+        alerts = FinancialAlertBatch(case_id, refresh=True)
+        for start, end in sequences:
+            sequence = order[start:end]
+            for i in sequence:
+                _flag(flags, frame.ids[i], 0.8)
+            total_amount = float(from_scaled(running[end] - running[start]))
+            first = sequence[0]
+            alerts.add(
+                alert_type="structuring",
+                severity=AlertSeverity.HIGH,
+                title="Potential Structuring Detected",
+                description=f"Sequence of {len(sequence)} transactions totalling {total_amount} detected within 48h to same counterparty.",
+                key=f"{frame.counterparty(first)}|{frame.ids[first]}",
+                transaction_id=frame.ids[first],
+                trigger_criteria={"item_count": int(len(sequence)), "total_amount": total_amount}
+            )
+        await alerts.write(self.db)
 
-    async def _detect_unusual_concentration(self, case_id: UUID, transactions: List[FinancialTransaction]):
+    async def _detect_unusual_concentration(self, case_id: UUID, frame: TransactionFrame, flags: Dict[UUID, float]):
         """Detect if a single counterparty receives more than 50% of total outflows"""
         try:
-            debits = [tx for tx in transactions if tx.transaction_type == TransactionType.DEBIT]
-            if not debits:
-                return
-                
-            total_outflow = sum(tx.amount for tx in debits)
+            debits = frame.type_mask(TransactionType.DEBIT)
+            total_outflow = int(frame.amounts[debits].sum())
             if total_outflow == 0:
                 return
-                
-            concentration: Dict[str, float] = {}
-            for tx in debits:
-                if tx.counterparty_account:
-                    concentration[tx.counterparty_account] = concentration.get(tx.counterparty_account, 0) + tx.amount
             
-            for counterparty, amount in concentration.items():
-                percentage = (amount / total_outflow) * 100
-                if percentage >= 50.0:
-                    # Flag transactions for this counterparty
-                    for tx in debits:
-                        if tx.counterparty_account == counterparty:
-                            tx.is_suspicious = True
-                            tx.risk_score = max(tx.risk_score, 0.7)
-                    
-                    # Create alert
-                    alert = FinancialAlert(
-                        case_id=case_id,
-                        alert_type="concentration",
-                        severity=AlertSeverity.MEDIUM,
-                        title="Unusual Concentration of Funds",
-                        description=f"Counterparty {counterparty} received {percentage:.1f}% of total outflows (${amount:,.2f} of ${total_outflow:,.2f}).",
-                        trigger_criteria={"counterparty": counterparty, "percentage": percentage, "amount": amount}
-                    )
-                    self.db.add(alert)
+            with_counterparty = debits & (frame.counterparties >= 0)
+            concentration = np.zeros(len(frame.counterparty_labels), dtype=np.int64)
+            np.add.at(concentration, frame.counterparties[with_counterparty], frame.amounts[with_counterparty])
+            
+            # One alert per counterparty, refreshed as its share changes
+            alerts = FinancialAlertBatch(case_id, refresh=True)
+            for code in np.flatnonzero(concentration * 2 >= total_outflow):
+                counterparty = frame.counterparty_labels[code]
+                amount = from_scaled(concentration[code])
+                percentage = float(concentration[code] * 100 / total_outflow)
+                # Flag transactions for this counterparty
+                for i in np.flatnonzero(with_counterparty & (frame.counterparties == code)):
+                    _flag(flags, frame.ids[i], 0.7)
+                
+                alerts.add(
+                    alert_type="concentration",
+                    severity=AlertSeverity.MEDIUM,
+                    title="Unusual Concentration of Funds",
+                    description=f"Counterparty {counterparty} received {percentage:.1f}% of total outflows (${amount:,.2f} of ${from_scaled(total_outflow):,.2f}).",
+                    key=counterparty,
+                    trigger_criteria={"counterparty": counterparty, "percentage": percentage, "amount": float(amount)}
+                )
+            await alerts.write(self.db)
                     
         except Exception as e:
             logger.error("Concentration detection failed", case_id=str(case_id), error=str(e))
 
+    async def _detect_money_flow_patterns(self, case_id: UUID, flags: Dict[UUID, float]):
+        """Trace funds across accounts and counterparties for cycles and mule-like fan patterns"""
+        try:
+            created = await MoneyFlowService(self.db).detect_patterns(case_id, flags)
+            if created:
+                logger.info("Money-flow alerts raised", case_id=str(case_id), alerts=created)
+        except Exception as e:
+            logger.error("Money-flow detection failed", case_id=str(case_id), error=str(e))
+
+    async def _apply_flags(self, flags: Dict[UUID, float]):
+        """Mark flagged transactions suspicious and raise their risk scores, one UPDATE per score and chunk"""
+        by_score: Dict[float, List[UUID]] = {}
+        for tx_id, score in flags.items():
+            by_score.setdefault(score, []).append(tx_id)
+        
+        for score, tx_ids in by_score.items():
+            for chunk_start in range(0, len(tx_ids), FLAG_UPDATE_CHUNK):
+                await self.db.execute(
+                    update(FinancialTransaction)
+                    .where(FinancialTransaction.id.in_(tx_ids[chunk_start:chunk_start + FLAG_UPDATE_CHUNK]))
+                    .values(
+                        is_suspicious=True,
+                        risk_score=case(
+                            (or_(FinancialTransaction.risk_score.is_(None), FinancialTransaction.risk_score < score), score),
+                            else_=FinancialTransaction.risk_score
+                        )
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+
     async def ingest_from_text(self, case_id: UUID, text: str, document_id: Optional[UUID] = None):
         """Extract transactions from raw text patterns (OCR/Forensic)"""
         # Common bank statement patterns
@@ -265,7 +396,8 @@ class FinancialAnalysisService:
                     else:
                         continue # Skip if date format unknown
                     
-                    amount = float(amount_str.replace(',', ''))
+                    # Stored unsigned; the sign is carried by the transaction type
+                    amount = quantize_amount(amount_str.replace(',', '')).copy_abs()
                     
                     # Create transaction
                     transaction = FinancialTransaction(
@@ -320,7 +452,7 @@ class FinancialAnalysisService:
             case_id=case_id,
             account_id=tx_data.get("account_id"),
             transaction_date=tx_data.get("transaction_date", datetime.now(UTC)),
-            amount=tx_data.get("amount"),
+            amount=_quantized(tx_data.get("amount"), tx_data.get("currency", "USD")),
             currency=tx_data.get("currency", "USD"),
             transaction_type=tx_data.get("transaction_type"),
             description=tx_data.get("description"),
@@ -342,6 +474,82 @@ class FinancialAnalysisService:
         result = await self.db.execute(query.order_by(desc(FinancialTransaction.transaction_date)))
         return list(result.scalars().all())
 
+    async def list_transactions(
+        self,
+        case_id: UUID,
+        filters: Optional[TransactionFilters] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        One page of a case's transactions, newest first, using keyset pagination
+        
+        Args:
+            case_id: Case ID
+            filters: Optional server-side filters
+            limit: Page size
+            cursor: next_cursor from the previous page
+            
+        Returns:
+            Dictionary with items (projected rows) and next_cursor (None on the last page)
+        """
+        query = self._transactions_query(case_id, filters)
+        if cursor:
+            cursor_date, cursor_id = decode_cursor(cursor)
+            query = query.where(
+                tuple_(FinancialTransaction.transaction_date, FinancialTransaction.id) < tuple_(cursor_date, cursor_id)
+            )
+        
+        # One extra row tells whether another page exists
+        result = await self.db.execute(query.limit(limit + 1))
+        rows = [dict(row) for row in result.mappings().all()]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["transaction_date"], rows[-1]["id"])
+        return {"items": rows, "next_cursor": next_cursor, "limit": limit}
+
+    async def stream_transactions(
+        self,
+        case_id: UUID,
+        filters: Optional[TransactionFilters] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Every matching transaction, newest first, read through a server-side cursor"""
+        result = await self.db.stream(
+            self._transactions_query(case_id, filters).execution_options(yield_per=batch_size)
+        )
+        async for partition in result.mappings().partitions():
+            for row in partition:
+                yield dict(row)
+
+    def _transactions_query(self, case_id: UUID, filters: Optional[TransactionFilters]) -> Select:
+        """Projected, filtered listing ordered by (transaction_date, id) to match ix_financial_transactions_case_date"""
+        query = select(*TRANSACTION_LIST_COLUMNS).where(FinancialTransaction.case_id == case_id)
+        filters = filters or TransactionFilters()
+        
+        if filters.account_id:
+            query = query.where(FinancialTransaction.account_id == filters.account_id)
+        if filters.date_from:
+            query = query.where(FinancialTransaction.transaction_date >= filters.date_from)
+        if filters.date_to:
+            query = query.where(FinancialTransaction.transaction_date <= filters.date_to)
+        if filters.min_amount is not None:
+            query = query.where(FinancialTransaction.amount >= filters.min_amount)
+        if filters.max_amount is not None:
+            query = query.where(FinancialTransaction.amount <= filters.max_amount)
+        if filters.counterparty:
+            query = query.where(or_(
+                FinancialTransaction.counterparty_name.icontains(filters.counterparty, autoescape=True),
+                FinancialTransaction.counterparty_account == filters.counterparty
+            ))
+        if filters.transaction_types:
+            query = query.where(FinancialTransaction.transaction_type.in_(filters.transaction_types))
+        if filters.is_suspicious is not None:
+            query = query.where(FinancialTransaction.is_suspicious == filters.is_suspicious)
+        
+        return query.order_by(desc(FinancialTransaction.transaction_date), desc(FinancialTransaction.id))
+
     async def update_transaction(self, transaction_id: UUID, update_data: Dict[str, Any]) -> Optional[FinancialTransaction]:
         """Update a financial transaction"""
         result = await self.db.execute(
@@ -354,6 +562,7 @@ class FinancialAnalysisService:
         for key, value in update_data.items():
             if hasattr(transaction, key) and value is not None:
                 setattr(transaction, key, value)
+        transaction.amount = _quantized(transaction.amount, transaction.currency)
         
         await self.db.flush()
         return transaction
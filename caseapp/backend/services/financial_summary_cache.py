@@ -0,0 +1,42 @@
+"""
+Per-case financial summary cache with generation-based invalidation
+"""
+
+from typing import Any, Callable, Awaitable, Dict, Optional
+from uuid import UUID
+
+from core.config import settings
+from core.generation_cache import GenerationCache
+from models.financial_analysis import FinancialAccount, FinancialAlert, FinancialTransaction
+
+class FinancialSummaryCache(GenerationCache):
+    """
+    Caches case summaries in Redis, keyed by case and stamped with the case's generation
+
+    Every committed change to a case's transactions, alerts or accounts increments the case
+    generation, and a summary is served only if it was computed under the current one.
+    """
+
+    def __init__(self, ttl_seconds: Optional[int] = None):
+        super().__init__(
+            "financial:summary",
+            (FinancialTransaction, FinancialAlert, FinancialAccount),
+            ttl_seconds or settings.FINANCIAL_SUMMARY_CACHE_SECONDS
+        )
+
+    async def get_or_compute(self, case_id: UUID, compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Cached summary for the case, computing and storing it on a miss"""
+        summary, generation = await self.read(case_id)
+        if generation is None:
+            return await compute()
+        if summary is not None:
+            self.hits += 1
+            return summary
+
+        self.misses += 1
+        summary = await compute()
+        await self.write(case_id, generation, summary)
+        return summary
+
+# Global financial summary cache instance
+financial_summary_cache = FinancialSummaryCache()
@@ -0,0 +1,286 @@
+"""
+Forensic aggregate service - precomputed per-source statistics for exports and dashboards
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+from datetime import datetime, UTC
+import structlog
+
+from models.forensic_analysis import ForensicSourceAggregate, ForensicItem, ForensicDataType
+
+logger = structlog.get_logger()
+
+# Sentiment scores range from -1 (negative) to 1 (positive)
+POSITIVE_SENTIMENT_THRESHOLD = 0.1
+NEGATIVE_SENTIMENT_THRESHOLD = -0.1
+
+# Item types reported under the "sms" bucket of export breakdowns
+SMS_TYPES = (ForensicDataType.SMS.value, ForensicDataType.IMESSAGE.value)
+
+class ForensicAggregateAccumulator:
+    """Running totals for forensic items, foldable into a ForensicSourceAggregate row"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all accumulated totals"""
+        self.total_items = 0
+        self.deleted_count = 0
+        self.first_item_at: Optional[datetime] = None
+        self.last_item_at: Optional[datetime] = None
+        self.counts_by_type: Dict[str, int] = {}
+        self.counts_by_hour: List[int] = [0] * 24
+        self.counts_by_weekday: List[int] = [0] * 7
+        self.counts_by_day: Dict[str, int] = {}
+        self.sentiment = {'positive': 0, 'neutral': 0, 'negative': 0}
+        self.participants: Dict[str, Dict[str, int]] = {}
+        self.edges: Dict[Tuple[str, str], int] = {}
+
+    @property
+    def is_empty(self) -> bool:
+        return self.total_items == 0
+
+    def add_item(self, item: ForensicItem) -> None:
+        """Account for a single forensic item"""
+        self.total_items += 1
+        if item.is_deleted:
+            self.deleted_count += 1
+
+        item_type = item.item_type.value if hasattr(item.item_type, 'value') else str(item.item_type)
+        self.counts_by_type[item_type] = self.counts_by_type.get(item_type, 0) + 1
+
+        if item.timestamp:
+            timestamp = item.timestamp if item.timestamp.tzinfo else item.timestamp.replace(tzinfo=UTC)
+            self.counts_by_hour[timestamp.hour] += 1
+            self.counts_by_weekday[timestamp.weekday()] += 1
+            day_key = timestamp.strftime('%Y-%m-%d')
+            self.counts_by_day[day_key] = self.counts_by_day.get(day_key, 0) + 1
+            self._extend_range(timestamp, timestamp)
+
+        if item.sentiment_score is not None:
+            if item.sentiment_score > POSITIVE_SENTIMENT_THRESHOLD:
+                self.sentiment['positive'] += 1
+            elif item.sentiment_score < NEGATIVE_SENTIMENT_THRESHOLD:
+                self.sentiment['negative'] += 1
+            else:
+                self.sentiment['neutral'] += 1
+
+        sender = item.sender or None
+        recipients = [r for r in (item.recipients or []) if r]
+        if sender:
+            self._participant(sender)['sent'] += 1
+        for recipient in recipients:
+            self._participant(recipient)['received'] += 1
+            if sender and recipient != sender:
+                edge = (sender, recipient) if sender < recipient else (recipient, sender)
+                self.edges[edge] = self.edges.get(edge, 0) + 1
+
+    def add_items(self, items: Iterable[ForensicItem]) -> None:
+        for item in items:
+            self.add_item(item)
+
+    def merge(self, other: "ForensicAggregateAccumulator") -> None:
+        """Fold another accumulator's totals into this one"""
+        self.total_items += other.total_items
+        self.deleted_count += other.deleted_count
+        if other.first_item_at:
+            self._extend_range(other.first_item_at, other.last_item_at)
+        for key, count in other.counts_by_type.items():
+            self.counts_by_type[key] = self.counts_by_type.get(key, 0) + count
+        for hour, count in enumerate(other.counts_by_hour):
+            self.counts_by_hour[hour] += count
+        for weekday, count in enumerate(other.counts_by_weekday):
+            self.counts_by_weekday[weekday] += count
+        for day, count in other.counts_by_day.items():
+            self.counts_by_day[day] = self.counts_by_day.get(day, 0) + count
+        for bucket, count in other.sentiment.items():
+            self.sentiment[bucket] += count
+        for name, counts in other.participants.items():
+            participant = self._participant(name)
+            participant['sent'] += counts['sent']
+            participant['received'] += counts['received']
+        for edge, weight in other.edges.items():
+            self.edges[edge] = self.edges.get(edge, 0) + weight
+
+    @classmethod
+    def from_aggregate(cls, aggregate: ForensicSourceAggregate) -> "ForensicAggregateAccumulator":
+        """Load totals from a stored aggregate row"""
+        accumulator = cls()
+        accumulator.total_items = aggregate.total_items or 0
+        accumulator.deleted_count = aggregate.deleted_count or 0
+        accumulator.first_item_at = aggregate.first_item_at
+        accumulator.last_item_at = aggregate.last_item_at
+        accumulator.counts_by_type = dict(aggregate.counts_by_type or {})
+        accumulator.counts_by_hour = list(aggregate.counts_by_hour or [0] * 24)
+        accumulator.counts_by_weekday = list(aggregate.counts_by_weekday or [0] * 7)
+        accumulator.counts_by_day = dict(aggregate.counts_by_day or {})
+        accumulator.sentiment = {
+            'positive': aggregate.sentiment_positive or 0,
+            'neutral': aggregate.sentiment_neutral or 0,
+            'negative': aggregate.sentiment_negative or 0
+        }
+        accumulator.participants = {
+            name: {'sent': stats.get('sent', 0), 'received': stats.get('received', 0)}
+            for name, stats in (aggregate.participant_stats or {}).items()
+        }
+        accumulator.edges = {
+            (source, target): weight for source, target, weight in (aggregate.edge_weights or [])
+        }
+        return accumulator
+
+    def write_to(self, aggregate: ForensicSourceAggregate) -> None:
+        """Overwrite an aggregate row with these totals"""
+        degrees = self.degrees()
+        aggregate.total_items = self.total_items
+        aggregate.deleted_count = self.deleted_count
+        aggregate.first_item_at = self.first_item_at
+        aggregate.last_item_at = self.last_item_at
+        aggregate.counts_by_type = dict(self.counts_by_type)
+        aggregate.counts_by_hour = list(self.counts_by_hour)
+        aggregate.counts_by_weekday = list(self.counts_by_weekday)
+        aggregate.counts_by_day = dict(self.counts_by_day)
+        aggregate.sentiment_positive = self.sentiment['positive']
+        aggregate.sentiment_neutral = self.sentiment['neutral']
+        aggregate.sentiment_negative = self.sentiment['negative']
+        aggregate.participant_stats = {
+            name: {'sent': counts['sent'], 'received': counts['received'], 'degree': degrees.get(name, 0)}
+            for name, counts in self.participants.items()
+        }
+        aggregate.edge_weights = [[source, target, weight] for (source, target), weight in self.edges.items()]
+
+    def degrees(self) -> Dict[str, int]:
+        """Number of distinct counterparts per participant"""
+        degrees: Dict[str, int] = {}
+        for source, target in self.edges:
+            degrees[source] = degrees.get(source, 0) + 1
+            degrees[target] = degrees.get(target, 0) + 1
+        return degrees
+
+    def statistics(self) -> Dict[str, Any]:
+        """Communication statistics in the export report format"""
+        email_count = self.counts_by_type.get(ForensicDataType.EMAIL.value, 0)
+        sms_count = sum(self.counts_by_type.get(item_type, 0) for item_type in SMS_TYPES)
+        whatsapp_count = self.counts_by_type.get(ForensicDataType.WHATSAPP.value, 0)
+
+        return {
+            'total_messages': self.total_items,
+            'unique_participants': len(self.participants),
+            'date_range': {
+                'start': self.first_item_at.strftime('%Y-%m-%d') if self.first_item_at else None,
+                'end': self.last_item_at.strftime('%Y-%m-%d') if self.last_item_at else None
+            },
+            'email_count': email_count,
+            'sms_count': sms_count,
+            'whatsapp_count': whatsapp_count,
+            'other_count': self.total_items - email_count - sms_count - whatsapp_count,
+            'messages_by_type': dict(self.counts_by_type),
+            'positive_sentiment': self.sentiment['positive'],
+            'neutral_sentiment': self.sentiment['neutral'],
+            'negative_sentiment': self.sentiment['negative'],
+            'peak_hour': self.counts_by_hour.index(max(self.counts_by_hour)) if any(self.counts_by_hour) else None,
+            'messages_by_hour': list(self.counts_by_hour),
+            'messages_by_weekday': list(self.counts_by_weekday),
+            'messages_by_day': dict(sorted(self.counts_by_day.items())),
+            'weekend_messages': self.counts_by_weekday[5] + self.counts_by_weekday[6],
+            'deleted_messages': self.deleted_count
+        }
+
+    def participant_summaries(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Participants ordered by message volume, with degree centrality"""
+        degrees = self.degrees()
+        normaliser = max(len(self.participants) - 1, 1)
+
+        summaries = [
+            {
+                'name': name,
+                'message_count': counts['sent'] + counts['received'],
+                'sent_count': counts['sent'],
+                'received_count': counts['received'],
+                'degree': degrees.get(name, 0),
+                'centrality_score': round(degrees.get(name, 0) / normaliser, 4)
+            }
+            for name, counts in self.participants.items()
+        ]
+        summaries.sort(key=lambda p: (-p['message_count'], p['name']))
+        return summaries[:limit] if limit is not None else summaries
+
+    def edge_list(self, participants: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Weighted edges, optionally restricted to a set of participants"""
+        allowed = set(participants) if participants is not None else None
+        edges = [
+            {'source': source, 'target': target, 'weight': weight}
+            for (source, target), weight in self.edges.items()
+            if allowed is None or (source in allowed and target in allowed)
+        ]
+        edges.sort(key=lambda e: (-e['weight'], e['source'], e['target']))
+        return edges
+
+    def _participant(self, name: str) -> Dict[str, int]:
+        participant = self.participants.get(name)
+        if participant is None:
+            participant = self.participants[name] = {'sent': 0, 'received': 0}
+        return participant
+
+    def _extend_range(self, start: datetime, end: datetime) -> None:
+        if self.first_item_at is None or start < self.first_item_at:
+            self.first_item_at = start
+        if self.last_item_at is None or end > self.last_item_at:
+            self.last_item_at = end
+
+class ForensicAggregateService:
+    """Maintains and serves precomputed forensic source aggregates"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def flush(self, source_id: int, accumulator: ForensicAggregateAccumulator) -> None:
+        """Fold pending totals into the source aggregate and reset the accumulator (caller commits)"""
+        if accumulator.is_empty:
+            return
+
+        aggregate = await self._get_or_create(source_id)
+        combined = ForensicAggregateAccumulator.from_aggregate(aggregate)
+        combined.merge(accumulator)
+        combined.write_to(aggregate)
+        accumulator.reset()
+
+    async def rebuild_source(self, source_id: int) -> ForensicSourceAggregate:
+        """Recompute a source aggregate from its stored items (caller commits)"""
+        accumulator = ForensicAggregateAccumulator()
+        items = await self.db.stream_scalars(
+            select(ForensicItem)
+            .where(ForensicItem.source_id == source_id)
+            .execution_options(yield_per=1000)
+        )
+        async for item in items:
+            accumulator.add_item(item)
+
+        aggregate = await self._get_or_create(source_id)
+        accumulator.write_to(aggregate)
+
+        logger.info("Forensic source aggregate rebuilt", source_id=source_id, total_items=accumulator.total_items)
+        return aggregate
+
+    async def get_aggregates(self, source_ids: List[int]) -> Dict[int, ForensicSourceAggregate]:
+        """Load stored aggregates for several sources in one query"""
+        if not source_ids:
+            return {}
+
+        result = await self.db.execute(
+            select(ForensicSourceAggregate).where(ForensicSourceAggregate.source_id.in_(source_ids))
+        )
+        return {aggregate.source_id: aggregate for aggregate in result.scalars().all()}
+
+    async def _get_or_create(self, source_id: int) -> ForensicSourceAggregate:
+        result = await self.db.execute(
+            select(ForensicSourceAggregate).where(ForensicSourceAggregate.source_id == source_id)
+        )
+        aggregate = result.scalar_one_or_none()
+        if aggregate is None:
+            aggregate = ForensicSourceAggregate(source_id=source_id)
+            ForensicAggregateAccumulator().write_to(aggregate)
+            self.db.add(aggregate)
+        return aggregate
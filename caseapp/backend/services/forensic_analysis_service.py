@@ -14,21 +14,10 @@ from uuid import UUID
 import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, func, desc
-import pandas as pd
-import numpy as np
 from email import message_from_string
 from email.header import decode_header
 import mailbox
 import plistlib
-import biplist
-
-# NLP and analysis libraries
-import spacy
-from textblob import TextBlob
-import networkx as nx
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
-from sklearn.decomposition import LatentDirichletAllocation
 
 from core.database import AsyncSessionLocal
 from models.forensic_analysis import (
@@ -37,21 +26,35 @@ from models.forensic_analysis import (
 )
 from models.case import Case
 from services.audit_service import AuditService
+from services.forensic_aggregate_service import ForensicAggregateService, ForensicAggregateAccumulator
+from core.lazy_imports import lazy_import, lazy_registry
+
+# NLP and analysis libraries are imported on first use
+pd = lazy_import("pandas")
+spacy = lazy_import("spacy")
+textblob = lazy_import("textblob")
+nx = lazy_import("networkx")
 
 logger = structlog.get_logger()
 
+def _load_spacy_model():
+    try:
+        return spacy.load("en_core_web_sm")
+    except OSError:
+        logger.warning("spaCy model not found, some NLP features will be limited")
+        return None
+
 class ForensicAnalysisService:
     """Service for forensic analysis of digital communications"""
     
     def __init__(self, audit_service: Optional[AuditService] = None):
         """Initialize forensic analysis service"""
         self.audit_service = audit_service
-        # Load NLP model
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            logger.warning("spaCy model not found, some NLP features will be limited")
-            self.nlp = None
+    
+    @property
+    def nlp(self):
+        """spaCy pipeline shared by every service instance, loaded on first use"""
+        return lazy_registry.get_model("spacy:en_core_web_sm", _load_spacy_model)
     
     async def process_forensic_source(
         self,
@@ -265,6 +268,7 @@ class ForensicAnalysisService:
             
             cursor = conn.execute(query)
             items_processed = 0
+            aggregates = ForensicAggregateAccumulator()
             
             for row in cursor:
                 # Convert Apple timestamp to datetime
@@ -313,14 +317,17 @@ class ForensicAnalysisService:
                 )
                 
                 db.add(forensic_item)
+                aggregates.add_item(forensic_item)
                 items_processed += 1
                 
                 # Commit in batches
                 if items_processed % 100 == 0:
+                    await ForensicAggregateService(db).flush(source.id, aggregates)
                     await db.commit()
                     source.analysis_progress = min(50.0, (items_processed / 1000) * 50)
                     await db.commit()
             
+            await ForensicAggregateService(db).flush(source.id, aggregates)
             await db.commit()
             return items_processed
             
@@ -332,6 +339,7 @@ class ForensicAnalysisService:
         
         file_path = source.file_path
         items_processed = 0
+        aggregates = ForensicAggregateAccumulator()
         
         try:
             # Handle different email formats
@@ -342,9 +350,11 @@ class ForensicAnalysisService:
                     forensic_item = await self._process_email_message(source, message, db)
                     if forensic_item:
                         db.add(forensic_item)
+                        aggregates.add_item(forensic_item)
                         items_processed += 1
                         
                         if items_processed % 50 == 0:
+                            await ForensicAggregateService(db).flush(source.id, aggregates)
                             await db.commit()
                             source.analysis_progress = min(80.0, (items_processed / 1000) * 80)
                             await db.commit()
@@ -356,8 +366,10 @@ class ForensicAnalysisService:
                     forensic_item = await self._process_email_message(source, message, db)
                     if forensic_item:
                         db.add(forensic_item)
+                        aggregates.add_item(forensic_item)
                         items_processed = 1
             
+            await ForensicAggregateService(db).flush(source.id, aggregates)
             await db.commit()
             logger.info("Email archive analysis completed", items_processed=items_processed)
             
@@ -460,7 +472,7 @@ class ForensicAnalysisService:
         
         try:
             # Sentiment analysis
-            blob = TextBlob(content)
+            blob = textblob.TextBlob(content)
             results['sentiment'] = blob.sentiment.polarity
             
             # Language detection
@@ -0,0 +1,265 @@
+"""
+Health monitor - dependency checks on a background schedule, probes answered from a snapshot
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Sequence, Tuple, Union
+import structlog
+
+from core.config import settings
+from services.health_service import HealthService, HealthCheckResult, HealthStatus
+
+logger = structlog.get_logger()
+
+CheckFunction = Callable[[], Awaitable[Union[HealthCheckResult, List[HealthCheckResult]]]]
+
+@dataclass
+class ScheduledHealthCheck:
+    """A health check with its refresh interval and latest results"""
+    name: str
+    check: CheckFunction
+    interval: float
+    critical: bool = False  # Readiness requires this check to be healthy and fresh
+    timeout: Optional[float] = None
+    results: List[HealthCheckResult] = field(default_factory=list)
+    checked_at: Optional[float] = None  # time.monotonic() of the last completed run
+    duration_ms: Optional[float] = None
+    consecutive_failures: int = 0
+    runs: int = 0
+
+    def age(self, now: float) -> Optional[float]:
+        return None if self.checked_at is None else now - self.checked_at
+
+    def is_stale(self, now: float) -> bool:
+        age = self.age(now)
+        return age is None or age > self.interval * settings.HEALTH_STALE_FACTOR
+
+    def is_healthy(self) -> bool:
+        return bool(self.results) and all(result.status == HealthStatus.HEALTHY for result in self.results)
+
+class HealthMonitor:
+    """
+    Runs each registered check on its own jittered schedule and keeps the latest results in memory
+
+    Readiness and detailed health endpoints read the snapshot instead of probing dependencies, so
+    load-balancer and monitoring traffic no longer turns into database, Redis and AWS calls.
+    """
+
+    def __init__(self, jitter: Optional[float] = None):
+        self.jitter = settings.HEALTH_CHECK_JITTER if jitter is None else jitter
+        self.health_service = HealthService()
+        self.checks: Dict[str, ScheduledHealthCheck] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def register(
+        self,
+        name: str,
+        check: CheckFunction,
+        interval: float,
+        critical: bool = False,
+        timeout: Optional[float] = None
+    ):
+        self.checks[name] = ScheduledHealthCheck(name, check, interval, critical, timeout)
+
+    def register_default_checks(self):
+        """Database, Redis, migrations, HTTP pools, AWS clients and service wiring"""
+        health_service = self.health_service
+
+        self.register("database", health_service._check_database, settings.HEALTH_CRITICAL_INTERVAL_SECONDS, critical=True)
+        self.register("redis", health_service._check_redis, settings.HEALTH_CRITICAL_INTERVAL_SECONDS, critical=True)
+        self.register("http_clients", health_service._check_http_clients, settings.HEALTH_CRITICAL_INTERVAL_SECONDS)
+        self.register(
+            "migrations", self._check_migrations, settings.HEALTH_MIGRATIONS_INTERVAL_SECONDS,
+            timeout=settings.SERVICE_MIGRATION_TIMEOUT_SECONDS
+        )
+        self.register("aws_services", health_service._check_aws_services, settings.HEALTH_AWS_INTERVAL_SECONDS)
+        self.register("services", self._service_checks(health_service), settings.HEALTH_SERVICES_INTERVAL_SECONDS)
+
+    async def start(self) -> Dict[str, Any]:
+        """Start one refresh loop per check; the first run of each happens immediately"""
+        if self.running:
+            return {"checks": list(self.checks)}
+        if not self.checks:
+            self.register_default_checks()
+
+        self._tasks = [
+            asyncio.create_task(self._refresh_loop(check), name=f"health-check-{check.name}")
+            for check in self.checks.values()
+        ]
+        logger.info("Health monitor started", checks={name: check.interval for name, check in self.checks.items()})
+        return {"checks": list(self.checks)}
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def refresh(self, names: Optional[List[str]] = None):
+        """Run checks now (all of them by default)"""
+        await asyncio.gather(*(self._run(self.checks[name]) for name in (names or list(self.checks))))
+
+    async def ensure_fresh(self):
+        """
+        Refresh stale checks when the background loops are not running (e.g. before start-up
+        completes); a no-op while the monitor is running
+        """
+        if self.running:
+            return
+        if not self.checks:
+            self.register_default_checks()
+        now = time.monotonic()
+        stale = [name for name, check in self.checks.items() if check.age(now) is None or check.age(now) > check.interval]
+        if stale:
+            await self.refresh(stale)
+
+    def readiness(self, required: Optional[Sequence[str]] = None) -> Tuple[bool, Dict[str, Any]]:
+        """Ready when every required (by default, critical) check is healthy and not stale"""
+        now = time.monotonic()
+        reasons = {}
+        for check in self.checks.values():
+            if (check.name not in required) if required is not None else not check.critical:
+                continue
+            if check.checked_at is None:
+                reasons[check.name] = "not checked yet"
+            elif check.is_stale(now):
+                reasons[check.name] = f"stale ({check.age(now):.1f}s old)"
+            elif not check.is_healthy():
+                reasons[check.name] = check.results[0].message if check.results else "unhealthy"
+        return not reasons, reasons
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Latest results in HealthService.check_all_services format, plus per-check age and timing
+        """
+        now = time.monotonic()
+        wall_now = datetime.now(UTC)
+        results = [result for check in self.checks.values() for result in check.results]
+        ready, reasons = self.readiness()
+
+        return {
+            "overall_status": self.health_service._calculate_overall_status(results),
+            "timestamp": wall_now.isoformat(),
+            "snapshot_age_seconds": self.snapshot_age(now),
+            "ready": ready,
+            "not_ready_reasons": reasons,
+            "checks": {
+                name: {
+                    "status": self._check_status(check, now),
+                    "critical": check.critical,
+                    "interval_seconds": check.interval,
+                    "age_seconds": None if check.checked_at is None else round(check.age(now), 3),
+                    "duration_ms": check.duration_ms,
+                    "consecutive_failures": check.consecutive_failures,
+                    "runs": check.runs
+                }
+                for name, check in self.checks.items()
+            },
+            "services": {
+                result.name: {
+                    "status": result.status,
+                    "message": result.message,
+                    "details": result.details,
+                    "timestamp": result.timestamp.isoformat()
+                }
+                for result in results
+            }
+        }
+
+    def snapshot_age(self, now: Optional[float] = None) -> Optional[float]:
+        """Seconds since the oldest result in the snapshot was taken"""
+        now = time.monotonic() if now is None else now
+        ages = [check.age(now) for check in self.checks.values() if check.checked_at is not None]
+        return round(max(ages), 3) if ages else None
+
+    def get_result(self, name: str) -> Optional[HealthCheckResult]:
+        """Latest result for a single component (e.g. "database", "migrations")"""
+        for check in self.checks.values():
+            for result in check.results:
+                if result.name == name:
+                    return result
+        return None
+
+    def _check_status(self, check: ScheduledHealthCheck, now: float) -> str:
+        if check.checked_at is None:
+            return "pending"
+        if check.is_stale(now):
+            return "stale"
+        return self.health_service._calculate_overall_status(check.results)
+
+    async def _refresh_loop(self, check: ScheduledHealthCheck):
+        while True:
+            await self._run(check)
+            # Jitter keeps replicas (and checks sharing an interval) from probing in lockstep
+            await asyncio.sleep(check.interval * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    async def _run(self, check: ScheduledHealthCheck):
+        started = time.monotonic()
+        try:
+            outcome = await asyncio.wait_for(check.check(), timeout=check.timeout or settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+            results = outcome if isinstance(outcome, list) else [outcome]
+        except Exception as e:
+            reason = "timed out" if isinstance(e, asyncio.TimeoutError) else str(e)
+            results = [HealthCheckResult(
+                name=check.name,
+                status=HealthStatus.UNHEALTHY,
+                message=f"Health check failed: {reason}"
+            )]
+
+        check.results = results
+        check.checked_at = time.monotonic()
+        check.duration_ms = round((check.checked_at - started) * 1000, 1)
+        check.runs += 1
+        if all(result.status == HealthStatus.HEALTHY for result in results):
+            check.consecutive_failures = 0
+        else:
+            check.consecutive_failures += 1
+            if check.consecutive_failures == 1:
+                logger.warning("Health check failing", check=check.name,
+                               results={result.name: result.message for result in results})
+
+    async def _check_migrations(self) -> HealthCheckResult:
+        from core.database_migration import get_migration_status
+
+        migration_status = await get_migration_status()
+        if migration_status.get("status") == "error":
+            return HealthCheckResult(
+                name="migrations",
+                status=HealthStatus.UNHEALTHY,
+                message=f"Migration status unavailable: {migration_status.get('error')}"
+            )
+
+        pending = migration_status.get("pending_count", 0)
+        return HealthCheckResult(
+            name="migrations",
+            status=HealthStatus.HEALTHY if not pending else HealthStatus.DEGRADED,
+            message="Schema up to date" if not pending else f"{pending} pending migrations",
+            details={
+                "current_version": migration_status.get("current_version"),
+                "pending_count": pending,
+                "schema_status": migration_status.get("schema_status", "unknown")
+            }
+        )
+
+    @staticmethod
+    def _service_checks(health_service: HealthService) -> CheckFunction:
+        async def check() -> List[HealthCheckResult]:
+            groups = await asyncio.gather(
+                health_service._check_core_services(),
+                health_service._check_ai_services(),
+                health_service._check_security_services(),
+                health_service._check_integration_services()
+            )
+            return [result for group in groups for result in group]
+        return check
+
+# Global health monitor instance
+health_monitor = HealthMonitor()
@@ -14,6 +14,7 @@ from sqlalchemy import text
 from core.database import get_db
 from core.redis import redis_service
 from core.aws_service import aws_service
+from core.http_client import http_client_registry
 from services.case_service import CaseService
 from services.document_service import DocumentService
 from services.timeline_service import TimelineService
@@ -56,7 +57,8 @@ class HealthService:
     async def check_all_services(
         self, 
         db: Optional[AsyncSession] = None, 
-        audit_service: Optional[AuditService] = None
+        audit_service: Optional[AuditService] = None,
+        use_snapshot: bool = True
     ) -> Dict[str, Any]:
         """
         Perform comprehensive health check of all services
@@ -64,16 +66,23 @@ class HealthService:
         Args:
             db: Optional database session
             audit_service: Optional audit service
+            use_snapshot: Answer from the background health monitor when it is running
             
         Returns:
             Dict containing overall status and individual service results
         """
+        from services.health_monitor import health_monitor
+        
+        if use_snapshot and health_monitor.running:
+            return health_monitor.snapshot()
+        
         self.logger.info("Starting comprehensive health check")
         
         # Run all health checks concurrently
         checks = await asyncio.gather(
             self._check_database(),
             self._check_redis(),
+            self._check_http_clients(),
             self._check_aws_services(),
             self._check_core_services(db, audit_service),
             self._check_ai_services(db, audit_service),
@@ -190,6 +199,38 @@ class HealthService:
                 message=f"Redis connection failed: {str(e)}"
             )
     
+    async def _check_http_clients(self) -> HealthCheckResult:
+        """Check shared outbound HTTP connection pools"""
+        metrics = http_client_registry.get_metrics()
+        
+        if not metrics["initialized"]:
+            return HealthCheckResult(
+                name="http_clients",
+                status=HealthStatus.DEGRADED,
+                message="HTTP client registry not initialized",
+                details=metrics
+            )
+        
+        saturated = [
+            name for name, pool in metrics["pools"].items()
+            if pool["utilisation_percent"] >= 90
+        ]
+        
+        if saturated:
+            return HealthCheckResult(
+                name="http_clients",
+                status=HealthStatus.DEGRADED,
+                message=f"HTTP connection pools near capacity: {', '.join(saturated)}",
+                details=metrics
+            )
+        
+        return HealthCheckResult(
+            name="http_clients",
+            status=HealthStatus.HEALTHY,
+            message="HTTP connection pools available",
+            details=metrics
+        )
+    
     async def _check_aws_services(self) -> List[HealthCheckResult]:
         """Check AWS service connectivity"""
         results = []
@@ -4,7 +4,6 @@ Provides comprehensive API integration capabilities
 """
 
 import uuid
-import json
 import asyncio
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta, UTC
@@ -12,14 +11,14 @@ from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import and_, or_, desc, func
 import structlog
-import httpx
-import hashlib
+import aiohttp
 
 from services.audit_service import AuditService
-import hmac
 
 from core.config import settings
 from core.exceptions import CaseManagementException
+from core.http_client import http_client_registry
+from core.webhook_signing import encode_payload, sign_payload
 from models.case import Case
 from models.document import Document
 from models.timeline import TimelineEvent
@@ -761,6 +760,7 @@ class IntegrationService:
             payload: Event payload data
         """
         try:
+            body = None
             for webhook_id, config in self.webhook_configs.items():
                 if not config.get("active", True):
                     continue
@@ -768,28 +768,29 @@ class IntegrationService:
                 if event_type not in config.get("events", []):
                     continue
                 
-                # Prepare webhook payload
-                webhook_payload = {
-                    "event": event_type,
-                    "timestamp": datetime.now(UTC).isoformat(),
-                    "data": payload
-                }
+                # Encode the webhook payload once and share it across subscribed endpoints
+                if body is None:
+                    body = encode_payload({
+                        "event": event_type,
+                        "timestamp": datetime.now(UTC).isoformat(),
+                        "data": payload
+                    })
                 
                 # Send webhook asynchronously
-                asyncio.create_task(self._send_webhook(config, webhook_payload))
+                asyncio.create_task(self._send_webhook(config, body))
                 
         except Exception as e:
             logger.error("Webhook trigger failed", 
                         event_type=event_type, 
                         error=str(e))
     
-    async def _send_webhook(self, config: Dict[str, Any], payload: Dict[str, Any]):
+    async def _send_webhook(self, config: Dict[str, Any], body: bytes):
         """
         Send webhook HTTP request
         
         Args:
             config: Webhook configuration
-            payload: Payload to send
+            body: Encoded payload, signed and sent as-is
         """
         try:
             headers = config.get("headers", {}).copy()
@@ -797,65 +798,59 @@ class IntegrationService:
             
             # Add signature if secret is configured
             if config.get("secret"):
-                signature = self._generate_webhook_signature(
-                    config["secret"], 
-                    json.dumps(payload)
-                )
+                signature = self._generate_webhook_signature(config["secret"], body)
                 headers["X-Webhook-Signature"] = signature
             
             timeout = config.get("timeout_seconds", 30)
             retry_count = config.get("retry_count", 3)
             
-            async with httpx.AsyncClient() as client:
-                for attempt in range(retry_count + 1):
-                    try:
-                        response = await client.post(
-                            config["url"],
-                            json=payload,
-                            headers=headers,
-                            timeout=timeout
-                        )
-                        
-                        if response.status_code < 400:
-                            logger.info("Webhook sent successfully", 
-                                       webhook_id=config["id"],
-                                       status_code=response.status_code)
-                            break
-                        else:
-                            logger.warning("Webhook failed", 
-                                          webhook_id=config["id"],
-                                          status_code=response.status_code,
-                                          attempt=attempt + 1)
-                            
-                    except Exception as e:
-                        logger.error("Webhook request failed", 
-                                    webhook_id=config["id"],
-                                    attempt=attempt + 1,
-                                    error=str(e))
-                        
-                        if attempt < retry_count:
-                            await asyncio.sleep(2 ** attempt)  # Exponential backoff
+            session = http_client_registry.get_session("integrations")
+            for attempt in range(retry_count + 1):
+                try:
+                    async with session.post(
+                        config["url"],
+                        data=body,
+                        headers=headers,
+                        timeout=aiohttp.ClientTimeout(total=timeout)
+                    ) as response:
+                        status_code = response.status
+                        # Drain the body so the connection returns to the pool
+                        await response.read()
+                    
+                    if status_code < 400:
+                        logger.info("Webhook sent successfully", 
+                                   webhook_id=config["id"],
+                                   status_code=status_code)
+                        break
+                    else:
+                        logger.warning("Webhook failed", 
+                                      webhook_id=config["id"],
+                                      status_code=status_code,
+                                      attempt=attempt + 1)
                         
+                except Exception as e:
+                    logger.error("Webhook request failed", 
+                                webhook_id=config["id"],
+                                attempt=attempt + 1,
+                                error=str(e))
+                    
+                    if attempt < retry_count:
+                        await asyncio.sleep(2 ** attempt)  # Exponential backoff
+                    
         except Exception as e:
             logger.error("Webhook sending failed", 
                         webhook_id=config.get("id"),
                         error=str(e))
     
-    def _generate_webhook_signature(self, secret: str, payload: str) -> str:
+    def _generate_webhook_signature(self, secret: str, body: bytes) -> str:
         """
         Generate webhook signature for payload verification
         
         Args:
             secret: Webhook secret
-            payload: JSON payload string
+            body: Encoded payload bytes
             
         Returns:
             HMAC signature
         """
-        signature = hmac.new(
-            secret.encode('utf-8'),
-            payload.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
-        
-        return f"sha256={signature}"
\ No newline at end of file
+        return sign_payload(secret, body)
\ No newline at end of file
@@ -0,0 +1,266 @@
+"""
+Key rotation service - parallel, checkpointed rotation of document encryption keys
+"""
+
+import asyncio
+import base64
+import json
+from abc import ABC, abstractmethod
+from datetime import datetime, UTC
+from typing import Dict, Any, List, Optional, Tuple
+from uuid import UUID
+import structlog
+from sqlalchemy import select, update
+
+from core.config import settings
+from core.database import AsyncSessionLocal
+from core.envelope_encryption import rewrap_bytes
+from core.exceptions import CaseManagementException
+from models.encryption import KeyRotationRun, KeyRotationMode, KeyRotationStatus
+from services.encryption_service import ENVELOPE_FORMAT, DATA_KEY_CONTEXT, LOCAL_KEY_IDS
+
+logger = structlog.get_logger()
+
+class EncryptedDocumentStore(ABC):
+    """
+    Storage for the encrypted payloads produced by EncryptionService.encrypt_document
+    
+    The service does not own where payloads live, so callers subclass this over their own
+    storage (a table column, an object store) and pass an instance to rotate(). save() must
+    replace the payload atomically, so a failed save leaves the document readable under its
+    old key; the run reports it in failed_documents.
+    """
+    
+    @abstractmethod
+    async def load(self, document_id: str) -> Dict[str, Any]:
+        """The document's current encrypted payload"""
+    
+    @abstractmethod
+    async def save(self, document_id: str, encrypted_data: Dict[str, Any]) -> None:
+        """Replace the document's payload with its rotated form"""
+
+class KeyRotationService:
+    """
+    Rotates document keys with bounded parallelism, checkpointing progress after every batch
+    
+    The default mode re-wraps each document's data key under the target KMS key with ReEncrypt,
+    leaving the ciphertext untouched; documents sharing a data key cost one KMS call per run.
+    Re-encrypt mode decrypts and encrypts the content under a fresh data key.
+    """
+    
+    def __init__(self, encryption_service, concurrency: Optional[int] = None, batch_size: Optional[int] = None):
+        self.encryption_service = encryption_service
+        self.concurrency = concurrency or settings.ENCRYPTION_ROTATION_CONCURRENCY
+        self.batch_size = batch_size or settings.ENCRYPTION_ROTATION_BATCH_SIZE
+        self._tasks: Dict[str, asyncio.Task] = {}
+    
+    async def rotate(
+        self,
+        document_ids: List[str],
+        store: EncryptedDocumentStore,
+        mode: KeyRotationMode = KeyRotationMode.REWRAP,
+        target_key_id: Optional[str] = None,
+        run_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Rotate keys for the given documents, or resume an earlier run when run_id is given
+        
+        Returns:
+            Dictionary with rotation results
+        """
+        if run_id:
+            run = await self._load_run(run_id)
+            if run is None:
+                raise CaseManagementException(f"Key rotation run {run_id} not found")
+            mode = KeyRotationMode(run['mode'])
+            target_key_id = run['target_key_id']
+        else:
+            mode = KeyRotationMode(mode)
+            target_key_id = target_key_id or self.encryption_service.kms_key_id
+            run = {
+                'mode': mode.value,
+                'status': KeyRotationStatus.RUNNING.value,
+                'target_key_id': target_key_id,
+                'document_ids': [str(document_id) for document_id in document_ids],
+                'next_index': 0,
+                'rotated_count': 0,
+                'failed_count': 0,
+                'failed_documents': []
+            }
+            run_id = await self._create_run(run)
+        
+        if mode == KeyRotationMode.REENCRYPT:
+            # Content must land under a data key generated after the rotation started
+            self.encryption_service.key_cache.clear()
+        
+        document_ids = run['document_ids']
+        index = run['next_index']
+        semaphore = asyncio.Semaphore(self.concurrency)
+        rewrapped: Dict[Tuple[bytes, str], asyncio.Future] = {}
+        
+        async def rotate_one(document_id: str) -> Optional[str]:
+            async with semaphore:
+                try:
+                    encrypted_data = await store.load(document_id)
+                    if mode == KeyRotationMode.REWRAP:
+                        encrypted_data = await self._rewrap_document(encrypted_data, target_key_id, rewrapped)
+                    else:
+                        encrypted_data = await self._reencrypt_document(encrypted_data)
+                    await store.save(document_id, encrypted_data)
+                    return None
+                except Exception as e:
+                    logger.error("Key rotation failed for document", document_id=document_id, error=str(e))
+                    return str(e)[:500]
+        
+        logger.info("Key rotation started", run_id=run_id, mode=mode.value,
+                    total_documents=len(document_ids), resume_index=index)
+        
+        try:
+            while index < len(document_ids):
+                batch = document_ids[index:index + self.batch_size]
+                errors = await asyncio.gather(*(rotate_one(document_id) for document_id in batch))
+                
+                for document_id, error in zip(batch, errors):
+                    if error is None:
+                        run['rotated_count'] += 1
+                    else:
+                        run['failed_count'] += 1
+                        run['failed_documents'].append({'document_id': document_id, 'error': error})
+                
+                index += len(batch)
+                await self._update_run(run_id, {
+                    'next_index': index,
+                    'rotated_count': run['rotated_count'],
+                    'failed_count': run['failed_count'],
+                    'failed_documents': run['failed_documents']
+                })
+        except Exception as e:
+            await self._update_run(run_id, {'status': KeyRotationStatus.FAILED.value, 'error_message': str(e)[:1000]})
+            logger.error("Key rotation run failed", run_id=run_id, next_index=index, error=str(e))
+            raise CaseManagementException(f"Key rotation failed: {str(e)}")
+        
+        completed_at = datetime.now(UTC)
+        await self._update_run(run_id, {'status': KeyRotationStatus.COMPLETED.value, 'completed_at': completed_at})
+        
+        logger.info("Key rotation completed", run_id=run_id, total_documents=len(document_ids),
+                    rotated=run['rotated_count'], failed=run['failed_count'],
+                    kms_rewraps=len(rewrapped))
+        
+        return {
+            'run_id': run_id,
+            'mode': mode.value,
+            'rotated_count': run['rotated_count'],
+            'failed_count': run['failed_count'],
+            'rotation_timestamp': completed_at.isoformat(),
+            'failed_documents': run['failed_documents']
+        }
+    
+    def start(
+        self,
+        document_ids: List[str],
+        store: EncryptedDocumentStore,
+        mode: KeyRotationMode = KeyRotationMode.REWRAP,
+        target_key_id: Optional[str] = None,
+        run_id: Optional[str] = None
+    ) -> asyncio.Task:
+        """Run a rotation in the background; progress is visible through get_run"""
+        task = asyncio.create_task(self.rotate(document_ids, store, mode, target_key_id, run_id))
+        self._tasks[id(task)] = task
+        task.add_done_callback(lambda done: self._tasks.pop(id(done), None))
+        return task
+    
+    async def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        return await self._load_run(run_id)
+    
+    async def _rewrap_document(
+        self,
+        encrypted_data: Dict[str, Any],
+        target_key_id: Optional[str],
+        rewrapped: Dict[Tuple[bytes, str], asyncio.Future]
+    ) -> Dict[str, Any]:
+        if not target_key_id or encrypted_data['key_id'] in LOCAL_KEY_IDS:
+            # Development keys were never wrapped by KMS, so there is nothing to re-wrap
+            return await self._reencrypt_document(encrypted_data)
+        
+        is_envelope = encrypted_data.get('format') == ENVELOPE_FORMAT
+        context = DATA_KEY_CONTEXT if is_envelope else encrypted_data['encryption_context']
+        wrapped_key = base64.b64decode(encrypted_data['encrypted_data_key'])
+        
+        # Concurrent documents sharing a data key wait on the same ReEncrypt call
+        cache_key = (wrapped_key, json.dumps(context, sort_keys=True))
+        future = rewrapped.get(cache_key)
+        if future is None:
+            future = rewrapped[cache_key] = asyncio.ensure_future(
+                self._reencrypt_data_key(wrapped_key, context, target_key_id)
+            )
+        try:
+            new_wrapped_key, new_key_id = await asyncio.shield(future)
+        except Exception:
+            rewrapped.pop(cache_key, None)
+            raise
+        
+        result = {
+            **encrypted_data,
+            'encrypted_data_key': base64.b64encode(new_wrapped_key).decode(),
+            'key_id': new_key_id
+        }
+        if is_envelope:
+            for field in ('encrypted_content', 'encrypted_metadata'):
+                envelope = rewrap_bytes(base64.b64decode(encrypted_data[field]), new_wrapped_key, new_key_id)
+                result[field] = base64.b64encode(envelope).decode()
+        return result
+    
+    async def _reencrypt_data_key(
+        self,
+        wrapped_key: bytes,
+        context: Dict[str, str],
+        target_key_id: str
+    ) -> Tuple[bytes, str]:
+        response = await asyncio.to_thread(
+            self.encryption_service.kms_client.re_encrypt,
+            CiphertextBlob=wrapped_key,
+            SourceEncryptionContext=context,
+            DestinationKeyId=target_key_id,
+            DestinationEncryptionContext=context
+        )
+        return response['CiphertextBlob'], response['KeyId']
+    
+    async def _reencrypt_document(self, encrypted_data: Dict[str, Any]) -> Dict[str, Any]:
+        content, metadata = await self.encryption_service.decrypt_document(encrypted_data)
+        return await self.encryption_service.encrypt_document(
+            content, metadata['document_id'], metadata.get('metadata')
+        )
+    
+    async def _create_run(self, run: Dict[str, Any]) -> str:
+        async with AsyncSessionLocal() as db:
+            row = KeyRotationRun(**run)
+            db.add(row)
+            await db.commit()
+            return str(row.id)
+    
+    async def _load_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        async with AsyncSessionLocal() as db:
+            row = await db.scalar(select(KeyRotationRun).where(KeyRotationRun.id == UUID(str(run_id))))
+            if row is None:
+                return None
+            return {
+                'id': str(row.id),
+                'mode': row.mode,
+                'status': row.status,
+                'target_key_id': row.target_key_id,
+                'document_ids': row.document_ids,
+                'next_index': row.next_index,
+                'rotated_count': row.rotated_count,
+                'failed_count': row.failed_count,
+                'failed_documents': list(row.failed_documents or []),
+                'error_message': row.error_message,
+                'started_at': row.started_at,
+                'completed_at': row.completed_at
+            }
+    
+    async def _update_run(self, run_id: str, values: Dict[str, Any]):
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(KeyRotationRun).where(KeyRotationRun.id == UUID(str(run_id))).values(**values)
+            )
+            await db.commit()
@@ -3,34 +3,39 @@ Media processing service for background analysis tasks
 """
 
 import os
+import socket
 import asyncio
-from typing import List, Optional, Dict, Any
-from uuid import UUID
-from pathlib import Path
+from datetime import datetime, timedelta, UTC
+from typing import List, Optional, Dict, Any, Sequence, Set, Tuple
+from uuid import UUID, uuid4
 import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-from PIL import Image, ImageOps
-import hashlib
-
+from sqlalchemy import select, update, and_, or_
 from models.media import MediaEvidence, MediaProcessingJob, ProcessingStatus, MediaType
-from core.database import get_db
+from core.config import settings
+from core.database import get_db, AsyncSessionLocal
 from core.exceptions import CaseManagementException
-from sqlalchemy import select
+from services.media_rendition_service import media_rendition_service, select_rendition
 
 logger = structlog.get_logger()
 
+# Worker pools and the job types each one claims; every pool has its own concurrency limit
+MEDIA_JOB_POOLS: Dict[str, Tuple[str, ...]] = {
+    "thumbnail": ("thumbnail", "preview"),
+    "metadata": ("object_detection", "face_detection"),
+    "transcription": ("transcription",),
+    "ocr": ("ocr",),
+}
+
 class MediaProcessingService:
     """Service for processing media evidence in background"""
     
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.thumbnail_size = (200, 200)
-        self.preview_size = (800, 600)
     
     async def process_pending_jobs(self, limit: int = 10) -> int:
         """
-        Process pending media processing jobs
+        Claim and process pending media processing jobs sequentially
         
         Args:
             limit: Maximum number of jobs to process
@@ -39,15 +44,7 @@ class MediaProcessingService:
             Number of jobs processed
         """
         try:
-            # Get pending jobs ordered by priority and creation time
-            result = await self.db.execute(
-                select(MediaProcessingJob)
-                .where(MediaProcessingJob.status == ProcessingStatus.PENDING)
-                .order_by(MediaProcessingJob.priority.desc(), MediaProcessingJob.created_at.asc())
-                .limit(limit)
-            )
-            
-            jobs = result.scalars().all()
+            jobs = await self.claim_jobs(default_worker_id(), limit=limit)
             processed_count = 0
             
             for job in jobs:
@@ -55,13 +52,13 @@ class MediaProcessingService:
                     await self._process_job(job)
                     processed_count += 1
                 except Exception as e:
+                    # _process_job has already recorded the failure
                     logger.error(
                         "Job processing failed",
                         job_id=str(job.id),
                         job_type=job.job_type,
                         error=str(e)
                     )
-                    await self._mark_job_failed(job, str(e))
             
             logger.info(f"Processed {processed_count} media processing jobs")
             return processed_count
@@ -70,13 +67,107 @@ class MediaProcessingService:
             logger.error("Failed to process media jobs", error=str(e))
             return 0
     
-    async def _process_job(self, job: MediaProcessingJob):
-        """Process a single media processing job"""
+    @staticmethod
+    def claim_query(job_types: Optional[Sequence[str]], limit: int):
+        """Pending jobs in priority order, skipping rows another worker has locked"""
+        query = select(MediaProcessingJob).where(MediaProcessingJob.status == ProcessingStatus.PENDING)
+        if job_types:
+            query = query.where(MediaProcessingJob.job_type.in_(job_types))
+        return (
+            query
+            .order_by(MediaProcessingJob.priority.desc(), MediaProcessingJob.created_at.asc())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+    
+    async def claim_jobs(
+        self,
+        worker_id: str,
+        job_types: Optional[Sequence[str]] = None,
+        limit: int = 10
+    ) -> List[MediaProcessingJob]:
+        """
+        Lease up to ``limit`` pending jobs to a worker
+        
+        The rows are locked with FOR UPDATE SKIP LOCKED and marked as processing in the same
+        transaction, so concurrent workers always receive disjoint jobs.
+        """
+        if limit <= 0:
+            return []
+        
+        result = await self.db.execute(self.claim_query(job_types, limit))
+        jobs = list(result.scalars().all())
+        
+        now = datetime.now(UTC)
+        for job in jobs:
+            job.status = ProcessingStatus.PROCESSING
+            job.started_at = now
+            job.completed_at = None
+            job.worker_id = worker_id
+            job.lease_expires_at = now + timedelta(seconds=settings.MEDIA_JOB_LEASE_SECONDS)
         
-        # Mark job as processing
-        job.status = ProcessingStatus.PROCESSING
-        job.started_at = asyncio.get_event_loop().time()
         await self.db.commit()
+        return jobs
+    
+    async def extend_lease(self, job_id: UUID, worker_id: str) -> bool:
+        """Extend a running job's lease; False if the worker no longer holds it"""
+        result = await self.db.execute(
+            update(MediaProcessingJob)
+            .where(
+                and_(
+                    MediaProcessingJob.id == job_id,
+                    MediaProcessingJob.worker_id == worker_id,
+                    MediaProcessingJob.status == ProcessingStatus.PROCESSING
+                )
+            )
+            .values(lease_expires_at=datetime.now(UTC) + timedelta(seconds=settings.MEDIA_JOB_LEASE_SECONDS))
+        )
+        await self.db.commit()
+        return result.rowcount == 1
+    
+    async def recover_stale_jobs(self) -> int:
+        """
+        Requeue jobs whose worker stopped heartbeating
+        
+        Returns:
+            Number of jobs requeued or failed
+        """
+        now = datetime.now(UTC)
+        stale = and_(
+            MediaProcessingJob.status == ProcessingStatus.PROCESSING,
+            or_(MediaProcessingJob.lease_expires_at.is_(None), MediaProcessingJob.lease_expires_at < now)
+        )
+        released = dict(worker_id=None, lease_expires_at=None, retry_count=MediaProcessingJob.retry_count + 1)
+        
+        requeued = await self.db.execute(
+            update(MediaProcessingJob)
+            .where(and_(stale, MediaProcessingJob.retry_count + 1 < MediaProcessingJob.max_retries))
+            .values(status=ProcessingStatus.PENDING, started_at=None, error_message="Worker lease expired", **released)
+        )
+        exhausted = await self.db.execute(
+            update(MediaProcessingJob)
+            .where(stale)
+            .values(status=ProcessingStatus.FAILED, completed_at=now, error_message="Worker lease expired", **released)
+        )
+        await self.db.commit()
+        
+        recovered = requeued.rowcount + exhausted.rowcount
+        if recovered:
+            logger.warning(
+                "Recovered stale media processing jobs",
+                requeued=requeued.rowcount,
+                failed=exhausted.rowcount
+            )
+        return recovered
+    
+    async def _process_job(self, job: MediaProcessingJob):
+        """Process a single claimed media processing job"""
+        
+        worker_id = job.worker_id
+        if job.status != ProcessingStatus.PROCESSING:
+            job.status = ProcessingStatus.PROCESSING
+            job.started_at = datetime.now(UTC)
+            await self.db.commit()
         
         try:
             # Get associated media
@@ -104,9 +195,24 @@ class MediaProcessingService:
             else:
                 raise CaseManagementException(f"Unknown job type: {job.job_type}")
             
-            # Mark job as completed
-            job.status = ProcessingStatus.COMPLETED
-            job.completed_at = asyncio.get_event_loop().time()
+            # Mark job as completed (handlers may already have marked it skipped), but only while this
+            # worker still holds it: a job whose lease lapsed has been requeued and may run elsewhere
+            completed = await self.db.execute(
+                update(MediaProcessingJob)
+                .where(and_(MediaProcessingJob.id == job.id, MediaProcessingJob.worker_id == worker_id))
+                .values(
+                    status=ProcessingStatus.COMPLETED if job.status == ProcessingStatus.PROCESSING else job.status,
+                    result_data=job.result_data,
+                    output_files=job.output_files,
+                    completed_at=datetime.now(UTC),
+                    lease_expires_at=None
+                )
+            )
+            if completed.rowcount != 1:
+                job_id = job.id
+                await self.db.rollback()
+                logger.warning("Media job lease lost before completion", job_id=str(job_id), worker_id=worker_id)
+                return
             await self.db.commit()
             
             logger.info(
@@ -121,7 +227,7 @@ class MediaProcessingService:
             raise
     
     async def _generate_thumbnail(self, media: MediaEvidence, job: MediaProcessingJob):
-        """Generate thumbnail for image/video media"""
+        """Generate thumbnail renditions for image/video media"""
         
         if media.media_type not in [MediaType.IMAGE, MediaType.VIDEO, MediaType.DOCUMENT_SCAN]:
             job.status = ProcessingStatus.SKIPPED
@@ -129,63 +235,26 @@ class MediaProcessingService:
             return
         
         try:
-            # For images and PDFs, use PIL
-            if media.media_type in [MediaType.IMAGE, MediaType.DOCUMENT_SCAN]:
-                await self._generate_image_thumbnail(media, job)
-            elif media.media_type == MediaType.VIDEO:
-                # For videos, we'd use ffmpeg or similar - for now, skip
-                job.status = ProcessingStatus.SKIPPED
-                job.result_data = {"reason": "Video thumbnail generation not implemented"}
-                
+            manifest = await self._render(media)
         except Exception as e:
             raise CaseManagementException(f"Thumbnail generation failed: {str(e)}")
-    
-    async def _generate_image_thumbnail(self, media: MediaEvidence, job: MediaProcessingJob):
-        """Generate thumbnail for image files"""
         
-        if not os.path.exists(media.file_path):
-            raise CaseManagementException("Source file not found")
+        thumbnail = select_rendition(manifest, "small")
+        media.thumbnail_path = thumbnail["path"]
         
-        try:
-            # Open image
-            with Image.open(media.file_path) as img:
-                # Convert to RGB if necessary
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    img = img.convert('RGB')
-                
-                # Generate thumbnail
-                img.thumbnail(self.thumbnail_size, Image.Resampling.LANCZOS)
-                
-                # Create thumbnail path
-                thumbnail_dir = Path(media.file_path).parent / "thumbnails"
-                thumbnail_dir.mkdir(exist_ok=True)
-                
-                thumbnail_filename = f"thumb_{Path(media.filename).stem}.jpg"
-                thumbnail_path = thumbnail_dir / thumbnail_filename
-                
-                # Save thumbnail
-                img.save(thumbnail_path, "JPEG", quality=85, optimize=True)
-                
-                # Update media record
-                media.thumbnail_path = str(thumbnail_path)
-                
-                # Store job results
-                job.result_data = {
-                    "thumbnail_path": str(thumbnail_path),
-                    "thumbnail_size": img.size,
-                    "original_size": Image.open(media.file_path).size
-                }
-                job.output_files = [str(thumbnail_path)]
-                
-                logger.info(
-                    "Thumbnail generated",
-                    media_id=str(media.id),
-                    thumbnail_path=str(thumbnail_path),
-                    size=img.size
-                )
-                
-        except Exception as e:
-            raise CaseManagementException(f"Image thumbnail generation failed: {str(e)}")
+        job.result_data = {
+            "thumbnail_path": thumbnail["path"],
+            "thumbnail_size": [thumbnail["width"], thumbnail["height"]],
+            "original_size": [manifest["original_width"], manifest["original_height"]]
+        }
+        job.output_files = self._output_files(manifest)
+        
+        logger.info(
+            "Thumbnail generated",
+            media_id=str(media.id),
+            thumbnail_path=thumbnail["path"],
+            renditions=len(manifest["renditions"])
+        )
     
     async def _generate_preview(self, media: MediaEvidence, job: MediaProcessingJob):
         """Generate preview/compressed version for large media"""
@@ -195,47 +264,48 @@ class MediaProcessingService:
             job.result_data = {"reason": "Preview generation only supported for images"}
             return
         
-        if not os.path.exists(media.file_path):
-            raise CaseManagementException("Source file not found")
-        
         try:
-            with Image.open(media.file_path) as img:
-                # Only generate preview if image is large enough
-                if img.size[0] <= self.preview_size[0] and img.size[1] <= self.preview_size[1]:
-                    job.status = ProcessingStatus.SKIPPED
-                    job.result_data = {"reason": "Image too small for preview generation"}
-                    return
-                
-                # Convert to RGB if necessary
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    img = img.convert('RGB')
-                
-                # Resize for preview
-                img.thumbnail(self.preview_size, Image.Resampling.LANCZOS)
-                
-                # Create preview path
-                preview_dir = Path(media.file_path).parent / "previews"
-                preview_dir.mkdir(exist_ok=True)
-                
-                preview_filename = f"preview_{Path(media.filename).stem}.jpg"
-                preview_path = preview_dir / preview_filename
-                
-                # Save preview
-                img.save(preview_path, "JPEG", quality=80, optimize=True)
-                
-                # Update media record
-                media.preview_path = str(preview_path)
-                
-                # Store job results
-                job.result_data = {
-                    "preview_path": str(preview_path),
-                    "preview_size": img.size,
-                    "compression_ratio": os.path.getsize(preview_path) / media.file_size
-                }
-                job.output_files = [str(preview_path)]
-                
+            # The thumbnail job normally rendered every size already
+            manifest = media.renditions or await self._render(media)
         except Exception as e:
             raise CaseManagementException(f"Preview generation failed: {str(e)}")
+        
+        preview = select_rendition(manifest, "large")
+        if preview is None or (
+            manifest["original_width"] <= preview["width"] and manifest["original_height"] <= preview["height"]
+        ):
+            job.status = ProcessingStatus.SKIPPED
+            job.result_data = {"reason": "Image too small for preview generation"}
+            return
+        
+        media.preview_path = preview["path"]
+        
+        job.result_data = {
+            "preview_path": preview["path"],
+            "preview_size": [preview["width"], preview["height"]],
+            "compression_ratio": os.path.getsize(preview["path"]) / media.file_size
+        }
+        job.output_files = [preview["path"]]
+    
+    async def _render(self, media: MediaEvidence) -> Dict[str, Any]:
+        """Render every size and format in the process pool and record the manifest on the media"""
+        if media.media_type == MediaType.VIDEO:
+            manifest = await media_rendition_service.render_video(media.file_path)
+        else:
+            manifest = await media_rendition_service.render_image(media.file_path)
+        
+        media.renditions = manifest
+        if media.width is None:
+            media.width = manifest["original_width"]
+            media.height = manifest["original_height"]
+        return manifest
+    
+    @staticmethod
+    def _output_files(manifest: Dict[str, Any]) -> List[str]:
+        files = [rendition["path"] for rendition in manifest["renditions"]]
+        if "sprite" in manifest:
+            files.append(manifest["sprite"]["path"])
+        return files
     
     async def _extract_text_ocr(self, media: MediaEvidence, job: MediaProcessingJob):
         """Extract text from images using OCR (placeholder implementation)"""
@@ -320,10 +390,15 @@ class MediaProcessingService:
     async def _mark_job_failed(self, job: MediaProcessingJob, error_message: str):
         """Mark job as failed and handle retry logic"""
         
+        # Discard whatever the failed handler left pending (e.g. a broken transaction)
+        await self.db.rollback()
+        await self.db.refresh(job)
+        
         job.status = ProcessingStatus.FAILED
         job.error_message = error_message
         job.retry_count += 1
-        job.completed_at = asyncio.get_event_loop().time()
+        job.completed_at = datetime.now(UTC)
+        job.lease_expires_at = None
         
         await self.db.commit()
         
@@ -369,6 +444,7 @@ class MediaProcessingService:
                 job.error_message = None
                 job.started_at = None
                 job.completed_at = None
+                job.worker_id = None
                 retry_count += 1
             
             await self.db.commit()
@@ -380,8 +456,173 @@ class MediaProcessingService:
             logger.error("Failed to retry jobs", error=str(e))
             return 0
 
+def default_worker_id() -> str:
+    """Identifier recorded on leased jobs: host, process and a per-instance suffix"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+class MediaWorkerPool:
+    """
+    Horizontally scalable media worker
+    
+    Each pool claims only its own job types, up to its own concurrency limit, so a backlog of
+    slow transcriptions never holds up thumbnails. Any number of replicas can run side by side:
+    claims use FOR UPDATE SKIP LOCKED, running jobs extend their lease with heartbeats, and jobs
+    whose lease lapses (a crashed or killed worker) are requeued by whichever replica notices.
+    """
+    
+    def __init__(
+        self,
+        pools: Optional[Dict[str, Tuple[Sequence[str], int]]] = None,
+        session_factory=AsyncSessionLocal,
+        worker_id: Optional[str] = None,
+        poll_interval_seconds: Optional[float] = None
+    ):
+        if pools is None:
+            pools = {
+                "thumbnail": (MEDIA_JOB_POOLS["thumbnail"], settings.MEDIA_WORKER_THUMBNAIL_CONCURRENCY),
+                "metadata": (MEDIA_JOB_POOLS["metadata"], settings.MEDIA_WORKER_METADATA_CONCURRENCY),
+                "transcription": (MEDIA_JOB_POOLS["transcription"], settings.MEDIA_WORKER_TRANSCRIPTION_CONCURRENCY),
+                "ocr": (MEDIA_JOB_POOLS["ocr"], settings.MEDIA_WORKER_OCR_CONCURRENCY),
+            }
+        self.pools = pools
+        self.session_factory = session_factory
+        self.worker_id = worker_id or default_worker_id()
+        self.poll_interval_seconds = poll_interval_seconds or settings.MEDIA_WORKER_POLL_SECONDS
+        self.lease_seconds = settings.MEDIA_JOB_LEASE_SECONDS
+        
+        self.in_flight: Dict[str, Set[asyncio.Task]] = {name: set() for name in pools}
+        self.processed: Dict[str, int] = {name: 0 for name in pools}
+        self.failed: Dict[str, int] = {name: 0 for name in pools}
+        self._tasks: List[asyncio.Task] = []
+    
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+    
+    async def start(self):
+        """Start one claim loop per pool plus the stale-lease sweeper"""
+        if self.running:
+            return
+        self._tasks = [asyncio.create_task(self._poll(name)) for name in self.pools]
+        self._tasks.append(asyncio.create_task(self._maintain()))
+        logger.info(
+            "Media worker pool started",
+            worker_id=self.worker_id,
+            pools={name: concurrency for name, (_, concurrency) in self.pools.items()}
+        )
+    
+    async def stop(self, drain: bool = True):
+        """Stop claiming; let running jobs finish (or cancel them, leaving their leases to expire)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        
+        running = [task for tasks in self.in_flight.values() for task in tasks]
+        if not drain:
+            for task in running:
+                task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        logger.info("Media worker pool stopped", worker_id=self.worker_id)
+    
+    async def run(self):
+        """Run until cancelled"""
+        await self.start()
+        try:
+            await asyncio.gather(*self._tasks)
+        finally:
+            await self.stop()
+    
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "running": self.running,
+            "pools": {
+                name: {
+                    "job_types": list(job_types),
+                    "concurrency": concurrency,
+                    "in_flight": len(self.in_flight[name]),
+                    "processed": self.processed[name],
+                    "failed": self.failed[name]
+                }
+                for name, (job_types, concurrency) in self.pools.items()
+            }
+        }
+    
+    async def _poll(self, name: str):
+        job_types, concurrency = self.pools[name]
+        in_flight = self.in_flight[name]
+        
+        while True:
+            free = concurrency - len(in_flight)
+            if free <= 0:
+                # Wait for a slot rather than polling the database
+                await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                continue
+            
+            job_ids = await self._claim(job_types, free)
+            for job_id in job_ids:
+                task = asyncio.create_task(self._run_job(name, job_id))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            
+            if len(job_ids) < free:
+                # Queue is drained for this pool; back off until the next poll
+                await asyncio.sleep(self.poll_interval_seconds)
+    
+    async def _claim(self, job_types: Sequence[str], limit: int) -> List[UUID]:
+        try:
+            async with self.session_factory() as db:
+                jobs = await MediaProcessingService(db).claim_jobs(self.worker_id, job_types, limit)
+                return [job.id for job in jobs]
+        except Exception as e:
+            logger.error("Failed to claim media jobs", job_types=list(job_types), error=str(e))
+            return []
+    
+    async def _run_job(self, name: str, job_id: UUID):
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            await self._execute(job_id)
+            self.processed[name] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failed[name] += 1
+            logger.error("Media job failed", pool=name, job_id=str(job_id), error=str(e))
+        finally:
+            heartbeat.cancel()
+    
+    async def _execute(self, job_id: UUID):
+        async with self.session_factory() as db:
+            job = await db.get(MediaProcessingJob, job_id)
+            if job is None:
+                return
+            await MediaProcessingService(db)._process_job(job)
+    
+    async def _heartbeat(self, job_id: UUID):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with self.session_factory() as db:
+                    if not await MediaProcessingService(db).extend_lease(job_id, self.worker_id):
+                        logger.warning("Media job lease lost", job_id=str(job_id), worker_id=self.worker_id)
+                        return
+            except Exception as e:
+                logger.warning("Media job heartbeat failed", job_id=str(job_id), error=str(e))
+    
+    async def _maintain(self):
+        while True:
+            try:
+                async with self.session_factory() as db:
+                    processor = MediaProcessingService(db)
+                    await processor.recover_stale_jobs()
+                    await processor.retry_failed_jobs(limit=sum(c for _, c in self.pools.values()))
+            except Exception as e:
+                logger.error("Media worker maintenance failed", error=str(e))
+            await asyncio.sleep(self.lease_seconds / 2)
+
 async def run_media_processor():
-    """Background task to process media jobs with retry logic"""
+    """Background worker process: waits for the database, then runs the media worker pool"""
     
     logger.info("Media processor starting...")
     
@@ -397,6 +638,7 @@ async def run_media_processor():
                 await db.close()
                 logger.info("Database connection successful")
                 break
+            break
         except Exception as e:
             if attempt < max_retries - 1:
                 logger.warning(f"Database not ready (attempt {attempt + 1}/{max_retries}), retrying in {retry_delay}s: {str(e)}")
@@ -405,35 +647,11 @@ async def run_media_processor():
                 logger.error(f"Failed to connect to database after {max_retries} attempts")
                 raise
     
-    # Main processing loop
-    while True:
-        try:
-            async for db in get_db():
-                try:
-                    processor = MediaProcessingService(db)
-                    
-                    # Process pending jobs
-                    processed = await processor.process_pending_jobs(limit=10)
-                    
-                    # Retry failed jobs occasionally
-                    if processed == 0:  # Only retry when no pending jobs
-                        await processor.retry_failed_jobs(limit=3)
-                        
-                except Exception as e:
-                    logger.error("Media processor error", error=str(e))
-                finally:
-                    await db.close()
-                
-                # Wait before next processing cycle
-                await asyncio.sleep(30)  # Process every 30 seconds
-                break  # Exit the async for loop after one iteration
-            
-            # Small delay between cycles
-            await asyncio.sleep(1)
-            
-        except Exception as e:
-            logger.error("Fatal media processor error", error=str(e))
-            await asyncio.sleep(5)  # Wait before retrying
+    workers = MediaWorkerPool()
+    try:
+        await workers.run()
+    finally:
+        media_rendition_service.shutdown()
 
 if __name__ == "__main__":
     """Entry point when run as a module"""
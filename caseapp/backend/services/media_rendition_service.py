@@ -0,0 +1,229 @@
+"""
+Media rendition service - thumbnails, previews and video posters rendered in a process pool
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Sequence
+import structlog
+from PIL import Image, ImageOps
+
+from core.config import settings
+from core.exceptions import ProcessingError
+
+logger = structlog.get_logger()
+
+RENDITION_DIR = "renditions"
+
+# Pillow save() arguments per output format
+ENCODERS: Dict[str, Dict[str, Any]] = {
+    "jpeg": {"format": "JPEG", "quality": 85, "optimize": True, "progressive": True},
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+}
+
+def _store(output_dir: Path, data: bytes, extension: str) -> str:
+    """Write bytes under their SHA-256 name; identical renditions are stored once"""
+    path = output_dir / f"{hashlib.sha256(data).hexdigest()}.{extension}"
+    if not path.exists():
+        temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+    return str(path)
+
+def _render_sizes(
+    image: Image.Image,
+    output_dir: Path,
+    sizes: Dict[str, int],
+    formats: Sequence[str]
+) -> List[Dict[str, Any]]:
+    """Encode every size/format from one decoded image, scaling down from the largest size"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    renditions = []
+    current = image
+
+    for name, edge in sorted(sizes.items(), key=lambda item: item[1], reverse=True):
+        if current.width > edge or current.height > edge:
+            current = current.copy()
+            current.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+
+        for image_format in formats:
+            buffer = io.BytesIO()
+            current.save(buffer, **ENCODERS[image_format])
+            renditions.append({
+                "name": name,
+                "format": image_format,
+                "width": current.width,
+                "height": current.height,
+                "path": _store(output_dir, buffer.getvalue(), "jpg" if image_format == "jpeg" else image_format)
+            })
+
+    return renditions
+
+def render_image(
+    source_path: str,
+    sizes: Dict[str, int],
+    formats: Sequence[str]
+) -> Dict[str, Any]:
+    """
+    Render all image renditions from a single decode (runs in a worker process)
+
+    For JPEG sources Image.draft lets the decoder downscale by a power of two while decoding,
+    so a large photo is never fully decompressed just to produce small renditions.
+    """
+    output_dir = Path(source_path).parent / RENDITION_DIR
+
+    with Image.open(source_path) as image:
+        original_size = image.size
+        image.draft("RGB", (max(sizes.values()),) * 2)
+        image = ImageOps.exif_transpose(image)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        renditions = _render_sizes(image, output_dir, sizes, formats)
+
+    return {
+        "source": "image",
+        "original_width": original_size[0],
+        "original_height": original_size[1],
+        "renditions": renditions
+    }
+
+def _probe_duration(source_path: str) -> Optional[float]:
+    result = subprocess.run(
+        [
+            settings.FFPROBE_PATH, "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1",
+            source_path
+        ],
+        capture_output=True, text=True, timeout=60
+    )
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
+def _run_ffmpeg(arguments: List[str]) -> bytes:
+    result = subprocess.run(
+        [settings.FFMPEG_PATH, "-v", "error", "-nostdin", *arguments],
+        capture_output=True, timeout=300
+    )
+    if result.returncode != 0 or not result.stdout:
+        raise ProcessingError(f"ffmpeg failed: {result.stderr.decode(errors='replace').strip()[:500]}")
+    return result.stdout
+
+def render_video(
+    source_path: str,
+    sizes: Dict[str, int],
+    formats: Sequence[str],
+    sprite_frames: int,
+    sprite_tile_width: int
+) -> Dict[str, Any]:
+    """
+    Render a poster (in every size/format) and a scrub sprite sheet (runs in a worker process)
+
+    Both passes decode keyframes only: the poster seeks before opening the input so ffmpeg jumps
+    to the nearest keyframe, and the sprite sheet skips non-key frames entirely.
+    """
+    output_dir = Path(source_path).parent / RENDITION_DIR
+    duration = _probe_duration(source_path)
+    poster_at = min(duration * 0.1, 10.0) if duration else 0.0
+
+    poster = _run_ffmpeg([
+        "-ss", f"{poster_at:.3f}", "-i", source_path,
+        "-frames:v", "1", "-f", "image2pipe", "-vcodec", "png", "-"
+    ])
+    with Image.open(io.BytesIO(poster)) as image:
+        original_size = image.size
+        renditions = _render_sizes(image.convert("RGB"), output_dir, sizes, formats)
+
+    manifest: Dict[str, Any] = {
+        "source": "video",
+        "original_width": original_size[0],
+        "original_height": original_size[1],
+        "duration": duration,
+        "poster_at": poster_at,
+        "renditions": renditions
+    }
+
+    if duration and sprite_frames > 0:
+        columns = max(1, int(sprite_frames ** 0.5))
+        rows = -(-sprite_frames // columns)
+        interval = max(duration / sprite_frames, 1.0)
+        sprite = _run_ffmpeg([
+            "-skip_frame", "nokey", "-i", source_path,
+            "-vf", f"fps=1/{interval:.3f},scale={sprite_tile_width}:-2,tile={columns}x{rows}",
+            "-frames:v", "1", "-vsync", "vfr", "-q:v", "5",
+            "-f", "image2pipe", "-vcodec", "mjpeg", "-"
+        ])
+        manifest["sprite"] = {
+            "path": _store(output_dir, sprite, "jpg"),
+            "columns": columns,
+            "rows": rows,
+            "interval": interval,
+            "tile_width": sprite_tile_width
+        }
+
+    return manifest
+
+class MediaRenditionService:
+    """Runs rendition jobs in a process pool so decoding never blocks the event loop"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or settings.MEDIA_RENDITION_WORKERS
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def render_image(self, source_path: str) -> Dict[str, Any]:
+        return await self._submit(
+            render_image, source_path,
+            dict(settings.MEDIA_RENDITION_SIZES), list(settings.MEDIA_RENDITION_FORMATS)
+        )
+
+    async def render_video(self, source_path: str) -> Dict[str, Any]:
+        return await self._submit(
+            render_video, source_path,
+            dict(settings.MEDIA_RENDITION_SIZES), list(settings.MEDIA_RENDITION_FORMATS),
+            settings.MEDIA_SPRITE_FRAMES, settings.MEDIA_SPRITE_TILE_WIDTH
+        )
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def _submit(self, function, source_path: str, *arguments) -> Dict[str, Any]:
+        if not os.path.exists(source_path):
+            raise ProcessingError("Source file not found")
+        loop = asyncio.get_running_loop()
+        manifest = await loop.run_in_executor(self.executor, function, source_path, *arguments)
+        logger.info(
+            "Media renditions generated",
+            source_path=source_path,
+            renditions=len(manifest["renditions"]),
+            sprite="sprite" in manifest
+        )
+        return manifest
+
+def select_rendition(
+    renditions: Optional[Dict[str, Any]],
+    name: str,
+    image_format: str = "jpeg"
+) -> Optional[Dict[str, Any]]:
+    """Pick a rendition from a media manifest by size name and format"""
+    for rendition in (renditions or {}).get("renditions", []):
+        if rendition["name"] == name and rendition["format"] == image_format:
+            return rendition
+    return None
+
+# Global media rendition service instance
+media_rendition_service = MediaRenditionService()
@@ -6,6 +6,7 @@ import os
 import hashlib
 import mimetypes
 import asyncio
+import tempfile
 from functools import partial
 from typing import List, Optional, Dict, Any, Tuple
 
@@ -14,11 +15,12 @@ from datetime import datetime
 from pathlib import Path
 import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc, asc
+from sqlalchemy import select, update, delete, func, and_, or_, desc, asc
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import selectinload
 from fastapi import UploadFile
 
-from models.media import MediaEvidence, MediaAnnotation, MediaProcessingJob, MediaType, MediaFormat, ProcessingStatus
+from models.media import MediaEvidence, MediaAnnotation, MediaProcessingJob, MediaBlob, MediaType, MediaFormat, ProcessingStatus
 from models.case import Case
 from schemas.media import (
     MediaUploadRequest, MediaUpdateRequest, MediaSearchRequest,
@@ -31,6 +33,24 @@ from core.exceptions import CaseManagementException
 
 logger = structlog.get_logger()
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+def _stream_to_temp_file(source, staging_path: Path) -> Tuple[Path, str, int]:
+    """Copy an upload into a staging file, hashing each chunk as it is written (runs in a worker thread)"""
+    hasher = hashlib.sha256()
+    size = 0
+    fd, temp_name = tempfile.mkstemp(dir=staging_path, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as staged:
+            while chunk := source.read(UPLOAD_CHUNK_SIZE):
+                hasher.update(chunk)
+                staged.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+    return Path(temp_name), hasher.hexdigest(), size
+
 class MediaService:
     """Service for managing media evidence"""
     
@@ -39,6 +59,9 @@ class MediaService:
         self.audit_service = audit_service
         self.upload_path = Path(getattr(settings, 'MEDIA_UPLOAD_PATH', './uploads/media'))
         self.upload_path.mkdir(parents=True, exist_ok=True)
+        self.blob_path = self.upload_path / "blobs"
+        self.staging_path = self.upload_path / "staging"
+        self.staging_path.mkdir(exist_ok=True)
     
     async def upload_media(
         self,
@@ -66,33 +89,36 @@ class MediaService:
             if not case:
                 raise CaseManagementException(f"Case {upload_request.case_id} not found")
             
-            # Read file content and calculate hash
-            file_content = await file.read()
-            file_hash = hashlib.sha256(file_content).hexdigest()
+            # A client-supplied hash lets known duplicates be rejected before the body is read
+            if upload_request.sha256:
+                await self._reject_duplicate(upload_request.case_id, upload_request.sha256)
             
-            # Check for duplicate files
-            existing_result = await self.db.execute(
-                select(MediaEvidence).where(MediaEvidence.file_hash == file_hash)
+            # Copy to a staging file while hashing, off the event loop
+            await file.seek(0)
+            temp_path, file_hash, file_size = await asyncio.to_thread(
+                _stream_to_temp_file, file.file, self.staging_path
             )
-            existing_media = existing_result.scalar_one_or_none()
-            if existing_media:
-                raise CaseManagementException(f"File already exists with ID {existing_media.id}")
+            
+            try:
+                if upload_request.sha256 and file_hash != upload_request.sha256:
+                    raise CaseManagementException("Uploaded content does not match the supplied SHA-256")
+                if not upload_request.sha256:
+                    await self._reject_duplicate(upload_request.case_id, file_hash)
+                
+                # Reference the blob first: its row lock keeps the sweeper from removing the file
+                # while it is moved into the content-addressed store
+                file_path = self._blob_file_path(file_hash)
+                await self._acquire_blob(file_hash, file_path, file_size)
+                await asyncio.to_thread(self._commit_blob, temp_path, file_hash)
+            finally:
+                temp_path.unlink(missing_ok=True)
             
             # Determine media type and format
             mime_type = file.content_type or mimetypes.guess_type(file.filename)[0] or "application/octet-stream"
             media_type, media_format = self._determine_media_type_and_format(mime_type, file.filename)
             
-            # Generate unique filename
             file_extension = Path(file.filename).suffix.lower()
             unique_filename = f"{file_hash}{file_extension}"
-            file_path = self.upload_path / str(upload_request.case_id) / unique_filename
-            
-            # Create directory if it doesn't exist
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Save file to disk
-            with open(file_path, "wb") as f:
-                f.write(file_content)
             
             # Extract basic metadata
             metadata = await self._extract_basic_metadata(file_path, media_type)
@@ -103,7 +129,7 @@ class MediaService:
                 filename=unique_filename,
                 original_filename=file.filename,
                 file_path=str(file_path),
-                file_size=len(file_content),
+                file_size=file_size,
                 file_hash=file_hash,
                 mime_type=mime_type,
                 media_type=media_type,
@@ -154,6 +180,141 @@ class MediaService:
             logger.error("Media upload failed", filename=file.filename, error=str(e))
             raise CaseManagementException(f"Failed to upload media: {str(e)}")
     
+    async def _reject_duplicate(self, case_id: UUID, file_hash: str):
+        """Raise if the case already holds a file with this hash"""
+        existing_result = await self.db.execute(
+            select(MediaEvidence.id).where(
+                and_(MediaEvidence.case_id == case_id, MediaEvidence.file_hash == file_hash)
+            )
+        )
+        existing_id = existing_result.scalar_one_or_none()
+        if existing_id:
+            raise CaseManagementException(f"File already exists with ID {existing_id}")
+    
+    def _blob_file_path(self, file_hash: str) -> Path:
+        return self.blob_path / file_hash[:2] / file_hash[2:4] / file_hash
+    
+    def _commit_blob(self, temp_path: Path, file_hash: str) -> Path:
+        """Atomically rename a staged upload into the blob store (runs in a worker thread)"""
+        blob_file = self._blob_file_path(file_hash)
+        if not blob_file.exists():
+            blob_file.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(temp_path, blob_file)
+        return blob_file
+    
+    async def _acquire_blob(self, file_hash: str, file_path: Path, file_size: int):
+        """Register the blob or add a reference to it (committed with the media record)"""
+        await self.db.execute(
+            pg_insert(MediaBlob)
+            .values(sha256=file_hash, file_path=str(file_path), file_size=file_size, ref_count=1)
+            .on_conflict_do_update(
+                index_elements=[MediaBlob.sha256],
+                set_={"ref_count": MediaBlob.ref_count + 1, "updated_at": func.now()}
+            )
+        )
+    
+    async def release_blob(self, file_hash: str) -> bool:
+        """
+        Drop one reference to a blob
+        
+        Call within the transaction that removes the media record. The stored file is left in
+        place: sweep_released_blobs() deletes it once that transaction has committed.
+        
+        Returns:
+            True if that was the last reference
+        """
+        result = await self.db.execute(
+            update(MediaBlob)
+            .where(MediaBlob.sha256 == file_hash)
+            .values(ref_count=MediaBlob.ref_count - 1)
+            .returning(MediaBlob.ref_count)
+        )
+        ref_count = result.scalar_one_or_none()
+        return ref_count is not None and ref_count <= 0
+    
+    async def sweep_released_blobs(self, limit: int = 100) -> int:
+        """
+        Delete the files and rows of blobs that no media record references any more
+        
+        Each blob row stays locked until its file is gone, so an upload of the same content
+        waits and then stores the file again. Blobs left behind by an interrupted sweep are
+        picked up by the next one. Rows registered from pre-blob uploads keep their original
+        path, and a later upload of the same content adds a copy in the blob store, so both
+        locations are removed.
+        
+        Returns:
+            Number of blobs deleted
+        """
+        result = await self.db.execute(
+            select(MediaBlob.sha256, MediaBlob.file_path)
+            .where(MediaBlob.ref_count <= 0)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        released = result.all()
+        if not released:
+            return 0
+        
+        try:
+            for row in released:
+                for path in {Path(row.file_path), self._blob_file_path(row.sha256)}:
+                    await asyncio.to_thread(path.unlink, missing_ok=True)
+            await self.db.execute(
+                delete(MediaBlob).where(MediaBlob.sha256.in_([row.sha256 for row in released]))
+            )
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        
+        logger.info("Media blobs deleted", count=len(released))
+        return len(released)
+    
+    async def delete_media(self, media_id: UUID, user_id: UUID) -> bool:
+        """
+        Delete a media record and release its stored file
+        
+        Args:
+            media_id: Media evidence ID
+            user_id: User deleting the media
+            
+        Returns:
+            True if deleted, False if not found
+        """
+        try:
+            media = await self.get_media(media_id, include_annotations=False)
+            if not media:
+                return False
+            
+            case_id, filename, file_hash = media.case_id, media.original_filename, media.file_hash
+            await self.db.delete(media)
+            await self.release_blob(file_hash)
+            await self.db.commit()
+            
+        except Exception as e:
+            await self.db.rollback()
+            logger.error("Failed to delete media", media_id=str(media_id), error=str(e))
+            raise CaseManagementException(f"Failed to delete media: {str(e)}")
+        
+        await self.audit_service.log_action(
+            entity_type="media_evidence",
+            entity_id=media_id,
+            action="delete",
+            user_id=user_id,
+            case_id=case_id,
+            entity_name=filename,
+            old_value=f"Deleted media: {filename}"
+        )
+        
+        try:
+            await self.sweep_released_blobs()
+        except Exception as e:
+            # The released blob stays on disk until a later sweep
+            logger.warning("Media blob sweep failed", file_hash=file_hash, error=str(e))
+        
+        logger.info("Media evidence deleted", media_id=str(media_id), user_id=str(user_id))
+        return True
+    
     async def get_media(self, media_id: UUID, include_annotations: bool = True) -> Optional[MediaEvidence]:
         """
         Get media evidence by ID
@@ -539,7 +700,7 @@ class MediaService:
             share_link.last_accessed_ip = ip_address
             
             # Log access
-            await self.log_media_access(
+            access_log_id = await self.log_media_access(
                 media_id=share_link.media_id,
                 user_id=None,  # Anonymous access via share link
                 access_type="shared_view",
@@ -560,13 +721,39 @@ class MediaService:
             return {
                 "media": share_link.media,
                 "share_link": share_link,
-                "views_remaining": share_link.views_remaining
+                "views_remaining": share_link.views_remaining,
+                "access_log_id": access_log_id
             }
             
         except Exception as e:
             logger.error("Failed to access shared media", share_token=share_token[:8] + "...", error=str(e))
             return None
-    
+
+    async def is_share_link_active(self, share_token: str) -> bool:
+        """
+        Check a share link for a request within an open playback session, without counting a view
+
+        The session's own view has already been counted, so only a revoked link, an expired link
+        or a view limit lowered below the views already served ends it.
+
+        Args:
+            share_token: Secure sharing token
+
+        Returns:
+            True if the link still grants access
+        """
+        from models.media import MediaShareLink
+
+        result = await self.db.execute(
+            select(MediaShareLink).where(MediaShareLink.share_token == share_token)
+        )
+        share_link = result.scalar_one_or_none()
+        if not share_link:
+            return False
+
+        over_limit = share_link.view_limit is not None and share_link.view_count > share_link.view_limit
+        return share_link.is_active and not share_link.is_expired and not over_limit
+
     async def log_media_access(
         self,
         media_id: UUID,
@@ -579,7 +766,7 @@ class MediaService:
         duration_ms: Optional[int] = None
     ):
         """
-        Log media access for audit purposes
+        Log media access for audit purposes, returning the access log entry ID
         
         Args:
             media_id: Media evidence ID
@@ -615,7 +802,9 @@ class MediaService:
                 user_id=str(user_id) if user_id else None,
                 ip_address=ip_address
             )
+            return access_log.id
             
         except Exception as e:
             logger.error("Failed to log media access", media_id=str(media_id), error=str(e))
-            # Don't raise exception for logging failures
\ No newline at end of file
+            # Don't raise exception for logging failures
+            return None
\ No newline at end of file
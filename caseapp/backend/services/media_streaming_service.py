@@ -0,0 +1,409 @@
+"""
+Media streaming engine - zero-copy range responses, conditional requests and playback sessions
+"""
+
+import asyncio
+import mmap
+import os
+import time
+from dataclasses import dataclass, field
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Dict, Any, List, Set, Tuple
+from uuid import UUID, uuid4
+import structlog
+from sqlalchemy import update
+from starlette.datastructures import Headers
+from starlette.responses import Response, RedirectResponse
+from starlette.types import Scope, Receive, Send
+
+from core.aws_service import aws_service
+from core.config import settings
+from core.database import AsyncSessionLocal
+from models.media import MediaEvidence, MediaAccessLog
+
+logger = structlog.get_logger()
+
+ByteRange = Tuple[int, int]  # Inclusive start and end offsets
+
+S3_PREFIX = "s3://"
+MAX_RANGES = 16  # More ranges than this are answered with the full entity
+
+def media_file_available(file_path: str) -> bool:
+    """Remote objects are assumed present; local files must exist"""
+    return file_path.startswith(S3_PREFIX) or os.path.exists(file_path)
+
+def parse_range_header(range_header: str, file_size: int) -> List[ByteRange]:
+    """
+    Parse a bytes Range header into sorted, merged inclusive ranges
+
+    Returns an empty list when no range is satisfiable; raises ValueError if the header is malformed.
+    """
+    unit, _, specs = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs.strip():
+        raise ValueError(f"Unsupported range header: {range_header}")
+
+    ranges = []
+    for spec in specs.split(","):
+        first, separator, last = spec.strip().partition("-")
+        if not separator:
+            raise ValueError(f"Invalid range: {spec}")
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length > 0 and file_size > 0:
+                ranges.append((max(file_size - length, 0), file_size - 1))
+            continue
+        start = int(first)
+        end = int(last) if last else None
+        if end is not None and start > end:
+            raise ValueError(f"Invalid range: {spec}")
+        if start < file_size:
+            ranges.append((start, file_size - 1 if end is None else min(end, file_size - 1)))
+
+    ranges.sort()
+    merged: List[ByteRange] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def _etag_matches(header: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+def _not_modified_since(header: Optional[str], modified_at: float) -> bool:
+    if not header:
+        return False
+    try:
+        return int(modified_at) <= parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+class MediaFileResponse(Response):
+    """
+    Sends byte ranges of a local file
+
+    Uses the ASGI zero-copy send extension (sendfile) when the server offers it and otherwise
+    streams slices of a memory-mapped file; several ranges become a multipart/byteranges body.
+    """
+
+    chunk_size = 1024 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        file_size: int,
+        media_type: str,
+        ranges: Optional[List[ByteRange]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        send_header_only: bool = False
+    ):
+        self.path = path
+        self.file_size = file_size
+        self.ranges = ranges or ([(0, file_size - 1)] if file_size else [])
+        self.status_code = 206 if ranges else 200
+        self.send_header_only = send_header_only
+        self.background = None
+        self.parts: List[Tuple[bytes, ByteRange]] = []
+        self.closing = b""
+
+        headers = dict(headers or {})
+        if ranges and len(ranges) > 1:
+            boundary = uuid4().hex
+            self.media_type = f"multipart/byteranges; boundary={boundary}"
+            for start, end in ranges:
+                part_header = (
+                    f"\r\n--{boundary}\r\n"
+                    f"Content-Type: {media_type}\r\n"
+                    f"Content-Range: bytes {start}-{end}/{file_size}\r\n\r\n"
+                ).encode()
+                self.parts.append((part_header, (start, end)))
+            self.closing = f"\r\n--{boundary}--\r\n".encode()
+            content_length = sum(len(part) + end - start + 1 for part, (start, end) in self.parts) + len(self.closing)
+        else:
+            self.media_type = media_type
+            self.parts = [(b"", byte_range) for byte_range in self.ranges]
+            if ranges:
+                start, end = ranges[0]
+                headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+            content_length = sum(end - start + 1 for start, end in self.ranges)
+
+        headers["Content-Length"] = str(content_length)
+        self.content_length = content_length
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.send_header_only or not self.content_length:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        zero_copy = "http.response.zerocopysend" in scope.get("extensions", {})
+        with open(self.path, "rb") as file:
+            if zero_copy:
+                await self._send_zero_copy(file, send)
+            else:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    await self._send_mapped(mapped, send)
+
+    async def _send_zero_copy(self, file, send: Send) -> None:
+        for part_header, (start, end) in self.parts:
+            if part_header:
+                await send({"type": "http.response.body", "body": part_header, "more_body": True})
+            await send({
+                "type": "http.response.zerocopysend",
+                "file": file,
+                "offset": start,
+                "count": end - start + 1,
+                "more_body": True
+            })
+        await send({"type": "http.response.body", "body": self.closing, "more_body": False})
+
+    async def _send_mapped(self, mapped: mmap.mmap, send: Send) -> None:
+        for part_header, (start, end) in self.parts:
+            if part_header:
+                await send({"type": "http.response.body", "body": part_header, "more_body": True})
+            for offset in range(start, end + 1, self.chunk_size):
+                chunk = mapped[offset:min(offset + self.chunk_size, end + 1)]
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": self.closing, "more_body": False})
+
+@dataclass
+class PlaybackSession:
+    """One viewer's playback of one media file; seeks reuse it instead of hitting the database"""
+    key: Tuple[str, ...]
+    media_id: UUID
+    file_path: str
+    file_size: int
+    mime_type: str
+    etag: str
+    modified_at: float
+    filename: Optional[str] = None
+    access_log_id: Optional[UUID] = None
+    started_at: float = field(default_factory=time.monotonic)
+    last_seen: float = field(default_factory=time.monotonic)
+    requests: int = 0
+    bytes_served: int = 0
+    last_status: Optional[int] = None
+    presigned_url: Optional[str] = None
+    presigned_at: float = 0.0
+
+    @property
+    def is_remote(self) -> bool:
+        return self.file_path.startswith(S3_PREFIX)
+
+class MediaStreamingService:
+    """
+    Builds streaming responses and coalesces their audit logging
+
+    The first request of a playback session loads the media, writes its access log entry and
+    opens the session. Range requests and seeks within the idle window reuse the session, and
+    the entry's bytes served, status and duration are written once when the session expires.
+    A session also expires max_seconds after it opened, however active it stays.
+    """
+
+    def __init__(self, idle_seconds: Optional[int] = None, max_seconds: Optional[int] = None):
+        self.idle_seconds = idle_seconds or settings.MEDIA_PLAYBACK_SESSION_IDLE_SECONDS
+        self.max_seconds = max_seconds or settings.MEDIA_PLAYBACK_SESSION_MAX_SECONDS
+        self.sessions: Dict[Tuple[str, ...], PlaybackSession] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._pending_writes: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def session_key(media_id: Any, viewer: Any, ip_address: str, access_type: str) -> Tuple[str, ...]:
+        return (str(media_id), str(viewer), ip_address, access_type)
+
+    def get_session(self, key: Tuple[str, ...]) -> Optional[PlaybackSession]:
+        """The viewer's open playback session, if it has not gone idle or outlived max_seconds"""
+        session = self.sessions.get(key)
+        if session is None or self._is_expired(session, time.monotonic()):
+            return None
+        return session
+
+    def close_session(self, key: Tuple[str, ...]):
+        """End a playback session early, writing its totals in the background"""
+        session = self.sessions.pop(key, None)
+        if session is not None:
+            task = asyncio.create_task(self._write_sessions([session]))
+            self._pending_writes.add(task)
+            task.add_done_callback(self._pending_writes.discard)
+
+    def open_session(
+        self,
+        key: Tuple[str, ...],
+        media: MediaEvidence,
+        access_log_id: Optional[UUID] = None
+    ) -> PlaybackSession:
+        """Start a playback session for media that has been loaded and access-logged"""
+        self.close_session(key)
+
+        modified_at = 0.0
+        if not media.file_path.startswith(S3_PREFIX):
+            modified_at = os.stat(media.file_path).st_mtime
+
+        session = PlaybackSession(
+            key=key,
+            media_id=media.id,
+            file_path=media.file_path,
+            file_size=media.file_size,
+            mime_type=media.mime_type,
+            etag=f'"{media.file_hash}"',
+            modified_at=modified_at,
+            filename=media.original_filename,
+            access_log_id=access_log_id
+        )
+        self.sessions[key] = session
+        self._ensure_flush_loop()
+        return session
+
+    def build_response(self, session: PlaybackSession, request_headers: Headers, method: str = "GET") -> Response:
+        """Response for one request within a playback session, honouring conditionals and ranges"""
+        if session.is_remote:
+            response = RedirectResponse(self._presigned_url(session), status_code=307)
+            response.headers["Cache-Control"] = "private, no-store"
+            return self._record(session, response, 0)
+
+        validators = {
+            "ETag": session.etag,
+            "Last-Modified": formatdate(session.modified_at, usegmt=True),
+            "Accept-Ranges": "bytes",
+            "Cache-Control": "private, max-age=0, must-revalidate"
+        }
+
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, session.etag)
+        else:
+            not_modified = _not_modified_since(request_headers.get("if-modified-since"), session.modified_at)
+        if not_modified:
+            return self._record(session, Response(status_code=304, headers=validators), 0)
+
+        ranges = None
+        range_header = request_headers.get("range")
+        if range_header and self._if_range_matches(request_headers.get("if-range"), session):
+            try:
+                ranges = parse_range_header(range_header, session.file_size)
+            except ValueError:
+                ranges = None  # A malformed Range header is ignored
+            else:
+                if not ranges:
+                    response = Response(
+                        status_code=416,
+                        headers={**validators, "Content-Range": f"bytes */{session.file_size}"}
+                    )
+                    return self._record(session, response, 0)
+                if len(ranges) > MAX_RANGES:
+                    ranges = None
+
+        response = MediaFileResponse(
+            session.file_path,
+            session.file_size,
+            session.mime_type,
+            ranges=ranges,
+            headers=validators,
+            send_header_only=method.upper() == "HEAD"
+        )
+        return self._record(session, response, 0 if response.send_header_only else response.content_length)
+
+    async def flush_expired(self, force: bool = False) -> int:
+        """Write the access log totals of sessions that have expired (or all, when forced)"""
+        now = time.monotonic()
+        expired = [
+            session for session in self.sessions.values()
+            if force or self._is_expired(session, now)
+        ]
+        for session in expired:
+            self.sessions.pop(session.key, None)
+        await self._write_sessions(expired)
+        return len(expired)
+
+    async def stop(self):
+        if self._flush_task:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await asyncio.gather(*self._pending_writes, return_exceptions=True)
+        await self.flush_expired(force=True)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "active_sessions": len(self.sessions),
+            "requests": sum(session.requests for session in self.sessions.values()),
+            "bytes_served": sum(session.bytes_served for session in self.sessions.values())
+        }
+
+    def _is_expired(self, session: PlaybackSession, now: float) -> bool:
+        return now - session.last_seen > self.idle_seconds or now - session.started_at > self.max_seconds
+
+    @staticmethod
+    def _if_range_matches(if_range: Optional[str], session: PlaybackSession) -> bool:
+        if not if_range:
+            return True
+        if if_range.startswith('"') or if_range.startswith("W/"):
+            # Only a strong validator can satisfy If-Range
+            return if_range == session.etag
+        try:
+            return int(session.modified_at) == int(parsedate_to_datetime(if_range).timestamp())
+        except (TypeError, ValueError):
+            return False
+
+    def _presigned_url(self, session: PlaybackSession) -> str:
+        lifetime = settings.MEDIA_PRESIGNED_URL_SECONDS
+        if session.presigned_url is None or time.monotonic() - session.presigned_at > lifetime / 2:
+            bucket, _, key = session.file_path[len(S3_PREFIX):].partition("/")
+            session.presigned_url = aws_service.get_s3_client().generate_presigned_url(
+                "get_object",
+                Params={"Bucket": bucket, "Key": key, "ResponseContentType": session.mime_type},
+                ExpiresIn=lifetime
+            )
+            session.presigned_at = time.monotonic()
+        return session.presigned_url
+
+    @staticmethod
+    def _record(session: PlaybackSession, response: Response, bytes_served: int) -> Response:
+        session.requests += 1
+        session.bytes_served += bytes_served
+        session.last_status = response.status_code
+        session.last_seen = time.monotonic()
+        return response
+
+    def _ensure_flush_loop(self):
+        if self._flush_task is None or self._flush_task.done():
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+            except RuntimeError:
+                self._flush_task = None
+
+    async def _flush_loop(self):
+        while self.sessions:
+            await asyncio.sleep(self.idle_seconds / 2)
+            try:
+                await self.flush_expired()
+            except Exception as e:
+                logger.error("Failed to flush playback sessions", error=str(e))
+
+    async def _write_sessions(self, sessions: List[PlaybackSession]):
+        rows = [
+            {
+                "id": session.access_log_id,
+                "bytes_served": session.bytes_served,
+                "response_status": session.last_status,
+                "duration_ms": int((session.last_seen - session.started_at) * 1000)
+            }
+            for session in sessions if session.access_log_id is not None
+        ]
+        if not rows:
+            return
+
+        try:
+            async with AsyncSessionLocal() as db:
+                # ORM bulk UPDATE by primary key: one executemany for every expired session
+                await db.execute(update(MediaAccessLog), rows)
+                await db.commit()
+        except Exception as e:
+            logger.error("Failed to write playback session totals", sessions=len(rows), error=str(e))
+
+# Global media streaming service instance
+media_streaming_service = MediaStreamingService()
@@ -0,0 +1,454 @@
+"""
+Money-flow graph engine - compact CSR adjacency over a case's transactions
+"""
+
+from __future__ import annotations
+
+import calendar
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, UTC
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from core.lazy_imports import lazy_import
+from models.financial_analysis import TransactionType
+
+np = lazy_import("numpy")
+
+# Recorded from the account holder's side: money leaving / entering the account
+OUTFLOW_TYPES = {TransactionType.DEBIT, TransactionType.CASH_WITHDRAWAL}
+INFLOW_TYPES = {TransactionType.CREDIT, TransactionType.CASH_DEPOSIT}
+# Transfers between two case accounts appear on both statements; records this close are one movement
+MIRROR_TOLERANCE_SECONDS = 3 * 86400
+
+_ACCOUNT_NOISE = re.compile(r"[\s\-./]")
+_WHITESPACE = re.compile(r"\s+")
+
+@dataclass(frozen=True)
+class FlowNode:
+    """A party money moves between: a case account, an external account number or a named counterparty"""
+    key: str
+    kind: str  # account, external, name
+    label: str
+    account_id: Optional[UUID] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"key": self.key, "kind": self.kind, "label": self.label, "account_id": self.account_id}
+
+def normalize_account_number(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    return _ACCOUNT_NOISE.sub("", value).upper() or None
+
+def normalize_name(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    return _WHITESPACE.sub(" ", value).strip().casefold() or None
+
+def epoch_seconds(moment: datetime) -> int:
+    """UTC epoch seconds; naive datetimes are taken as UTC"""
+    return calendar.timegm(moment.utctimetuple())
+
+def _is_outflow(transaction_type: Optional[TransactionType], signed_amount: Optional[str]) -> bool:
+    if transaction_type in OUTFLOW_TYPES:
+        return True
+    if transaction_type in INFLOW_TYPES:
+        return False
+    # Transfers and other types: imported rows keep the statement's signed amount
+    if signed_amount:
+        try:
+            return Decimal(signed_amount) < 0
+        except InvalidOperation:
+            pass
+    return True
+
+class MoneyFlowGraph:
+    """
+    Directed, time-stamped multigraph of money flows in CSR form
+
+    Edges are grouped by source node and sorted by time within each node, so the edges a path can
+    continue with after time t are one contiguous slice found by binary search. A second permutation
+    orders the same edges by destination for fan-in scans. Node and edge attributes live in flat
+    numpy arrays; only the node descriptors and transaction ids stay Python objects.
+    """
+
+    def __init__(
+        self,
+        nodes: Sequence[FlowNode],
+        src: np.ndarray,
+        dst: np.ndarray,
+        amounts: np.ndarray,
+        times: np.ndarray,
+        transaction_ids: Sequence[UUID]
+    ):
+        self.nodes = list(nodes)
+        self.node_index = {node.key: i for i, node in enumerate(self.nodes)}
+        node_count = len(self.nodes)
+
+        order = np.lexsort((times, src))
+        self.src = src[order]
+        self.dst = dst[order]
+        self.amounts = amounts[order]
+        self.times = times[order]
+        self.transaction_ids = [transaction_ids[i] for i in order]
+        self.indptr = self._indptr(self.src, node_count)
+
+        self.in_order = np.lexsort((self.times, self.dst))
+        self.in_indptr = self._indptr(self.dst[self.in_order], node_count)
+
+    @staticmethod
+    def _indptr(sorted_nodes: np.ndarray, node_count: int) -> np.ndarray:
+        indptr = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sorted_nodes, minlength=node_count), out=indptr[1:])
+        return indptr
+
+    @property
+    def node_count(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.src)
+
+    def _out_slice(self, node: int, after: int, until: int) -> Tuple[int, int]:
+        """Edges leaving node with after <= time <= until"""
+        lo, hi = int(self.indptr[node]), int(self.indptr[node + 1])
+        times = self.times[lo:hi]
+        return lo + int(np.searchsorted(times, after, "left")), lo + int(np.searchsorted(times, until, "right"))
+
+    def describe_edge(self, edge: int) -> Dict[str, Any]:
+        return {
+            "transaction_id": self.transaction_ids[edge],
+            "source": self.nodes[self.src[edge]].key,
+            "target": self.nodes[self.dst[edge]].key,
+            "amount": float(self.amounts[edge]),
+            "at": datetime.fromtimestamp(int(self.times[edge]), UTC)
+        }
+
+    def trace(
+        self,
+        source: int,
+        max_hops: int,
+        window_seconds: int,
+        since: Optional[int] = None,
+        max_paths: int = 20000,
+        path_limit: int = 50
+    ) -> Dict[str, Any]:
+        """
+        Time-respecting paths out of a node
+
+        Each hop must happen no earlier than the previous one and within window_seconds of the
+        path's first hop. Every node reached is aggregated with its fewest hops, the number of
+        paths reaching it and the largest amount that could have travelled along one path (the
+        path's smallest hop).
+        """
+        reached: Dict[int, Dict[str, Any]] = {}
+        paths: List[Tuple[float, Tuple[int, ...]]] = []
+        lo, hi = self._out_slice(source, since if since is not None else np.iinfo(np.int64).min, np.iinfo(np.int64).max)
+        stack = [(edge, (edge,), float(self.amounts[edge]), int(self.times[edge]) + window_seconds) for edge in range(lo, hi)]
+        explored = 0
+
+        while stack and explored < max_paths:
+            edge, path, bottleneck, deadline = stack.pop()
+            explored += 1
+            node = int(self.dst[edge])
+            entry = reached.setdefault(node, {"hops": len(path), "paths": 0, "traced_amount": 0.0})
+            entry["hops"] = min(entry["hops"], len(path))
+            entry["paths"] += 1
+            entry["traced_amount"] = max(entry["traced_amount"], bottleneck)
+            paths.append((bottleneck, path))
+
+            if len(path) >= max_hops or node == source:
+                continue
+            visited = {source, *(int(self.dst[step]) for step in path)}
+            lo, hi = self._out_slice(node, int(self.times[edge]), deadline)
+            for following in range(lo, hi):
+                if int(self.dst[following]) not in visited:
+                    stack.append((following, path + (following,), min(bottleneck, float(self.amounts[following])), deadline))
+
+        paths.sort(key=lambda item: item[0], reverse=True)
+        return {
+            "source": self.nodes[source].to_dict(),
+            "reached": sorted(
+                ({"node": self.nodes[node].to_dict(), **entry} for node, entry in reached.items()),
+                key=lambda item: (-item["traced_amount"], item["hops"])
+            ),
+            "paths": [
+                {"amount": amount, "edges": [self.describe_edge(edge) for edge in path]}
+                for amount, path in paths[:path_limit]
+            ],
+            "truncated": bool(stack)
+        }
+
+    def _cycle_candidates(self) -> np.ndarray:
+        """Nodes that can lie on a cycle: repeatedly drop nodes without both live in- and out-edges"""
+        alive = np.ones(self.node_count, dtype=bool)
+        while True:
+            live = alive[self.src] & alive[self.dst] & (self.src != self.dst)
+            has_out = np.zeros(self.node_count, dtype=bool)
+            has_in = np.zeros(self.node_count, dtype=bool)
+            has_out[self.src[live]] = True
+            has_in[self.dst[live]] = True
+            pruned = alive & has_out & has_in
+            if np.array_equal(pruned, alive):
+                return alive
+            alive = pruned
+
+    def find_cycles(
+        self,
+        max_hops: int,
+        window_seconds: int,
+        min_return_ratio: float = 0.5,
+        max_paths: int = 20000
+    ) -> Dict[str, Any]:
+        """
+        Round trips: time-respecting cycles that bring at least min_return_ratio of the amount that
+        left a node back to it within window_seconds
+        """
+        candidates = self._cycle_candidates()
+        cycles: Dict[frozenset, Dict[str, Any]] = {}
+        explored = 0
+
+        for start in np.flatnonzero(candidates):
+            start = int(start)
+            for first in range(int(self.indptr[start]), int(self.indptr[start + 1])):
+                if not candidates[self.dst[first]] or self.dst[first] == start:
+                    continue
+                stack = [(first, (first,), int(self.times[first]) + window_seconds)]
+                while stack:
+                    if explored >= max_paths:
+                        return self._cycle_result(cycles, truncated=True)
+                    edge, path, deadline = stack.pop()
+                    explored += 1
+                    node = int(self.dst[edge])
+                    if node == start:
+                        if self.amounts[edge] >= min_return_ratio * self.amounts[first]:
+                            cycles.setdefault(frozenset(path), self._describe_cycle(path))
+                        continue
+                    if len(path) >= max_hops:
+                        continue
+                    visited = {int(self.dst[step]) for step in path}
+                    lo, hi = self._out_slice(node, int(self.times[edge]), deadline)
+                    for following in range(lo, hi):
+                        target = int(self.dst[following])
+                        if candidates[target] and (target == start or target not in visited):
+                            stack.append((following, path + (following,), deadline))
+
+        return self._cycle_result(cycles, truncated=False)
+
+    def _describe_cycle(self, path: Tuple[int, ...]) -> Dict[str, Any]:
+        first, last = path[0], path[-1]
+        return {
+            "nodes": [self.nodes[self.src[edge]].to_dict() for edge in path],
+            "edges": [self.describe_edge(edge) for edge in path],
+            "amount_out": float(self.amounts[first]),
+            "amount_returned": float(self.amounts[last]),
+            "started_at": datetime.fromtimestamp(int(self.times[first]), UTC),
+            "completed_at": datetime.fromtimestamp(int(self.times[last]), UTC)
+        }
+
+    @staticmethod
+    def _cycle_result(cycles: Dict[frozenset, Dict[str, Any]], truncated: bool) -> Dict[str, Any]:
+        return {
+            "cycles": sorted(cycles.values(), key=lambda cycle: cycle["amount_out"], reverse=True),
+            "truncated": truncated
+        }
+
+    def find_fan_patterns(
+        self,
+        min_counterparties: int,
+        window_seconds: int,
+        pass_through_ratio: float = 0.8
+    ) -> List[Dict[str, Any]]:
+        """
+        Fan-in (many senders to one node) and fan-out (one node to many receivers) within a window
+
+        Each pattern also reports the amount moved on the other side of the node around the window
+        (forwarded after a fan-in, funded before a fan-out); when that is at least
+        pass_through_ratio of the pattern's amount the node behaves like a pass-through (mule).
+        """
+        node_count = self.node_count
+        pairs = np.unique(self.src.astype(np.int64) * node_count + self.dst)
+        distinct_senders = np.bincount(pairs % node_count, minlength=node_count)
+        distinct_receivers = np.bincount(pairs // node_count, minlength=node_count)
+        patterns = []
+
+        for node in np.flatnonzero(distinct_senders >= min_counterparties):
+            node = int(node)
+            edges = self.in_order[self.in_indptr[node]:self.in_indptr[node + 1]]
+            window = self._densest_window(edges, self.src[edges], min_counterparties, window_seconds)
+            if window is not None:
+                start, end = window
+                lo, hi = self._out_slice(node, start, end + window_seconds)
+                patterns.append(self._describe_fan("fan_in", node, edges, window, float(self.amounts[lo:hi].sum()), pass_through_ratio))
+
+        for node in np.flatnonzero(distinct_receivers >= min_counterparties):
+            node = int(node)
+            edges = np.arange(self.indptr[node], self.indptr[node + 1])
+            window = self._densest_window(edges, self.dst[edges], min_counterparties, window_seconds)
+            if window is not None:
+                start, end = window
+                incoming = self.in_order[self.in_indptr[node]:self.in_indptr[node + 1]]
+                in_times = self.times[incoming]
+                funded = incoming[(in_times >= start - window_seconds) & (in_times <= end)]
+                patterns.append(self._describe_fan("fan_out", node, edges, window, float(self.amounts[funded].sum()), pass_through_ratio))
+
+        return sorted(patterns, key=lambda pattern: pattern["amount"], reverse=True)
+
+    def _densest_window(
+        self,
+        edges: np.ndarray,
+        counterparties: np.ndarray,
+        min_counterparties: int,
+        window_seconds: int
+    ) -> Optional[Tuple[int, int]]:
+        """(start, end) times of the window with the most distinct counterparties, if it reaches the minimum"""
+        times = self.times[edges]
+        seen: Counter = Counter()
+        best, best_window, left = 0, None, 0
+        for right in range(len(edges)):
+            seen[int(counterparties[right])] += 1
+            while times[right] - times[left] > window_seconds:
+                party = int(counterparties[left])
+                seen[party] -= 1
+                if not seen[party]:
+                    del seen[party]
+                left += 1
+            if len(seen) > best:
+                best, best_window = len(seen), (int(times[left]), int(times[right]))
+        return best_window if best >= min_counterparties else None
+
+    def _describe_fan(
+        self,
+        kind: str,
+        node: int,
+        edges: np.ndarray,
+        window: Tuple[int, int],
+        related_amount: float,
+        pass_through_ratio: float
+    ) -> Dict[str, Any]:
+        start, end = window
+        in_window = edges[(self.times[edges] >= start) & (self.times[edges] <= end)]
+        counterparties = self.src[in_window] if kind == "fan_in" else self.dst[in_window]
+        amount = float(self.amounts[in_window].sum())
+        return {
+            "kind": kind,
+            "node": self.nodes[node].to_dict(),
+            "counterparties": len(np.unique(counterparties)),
+            "transactions": len(in_window),
+            "amount": amount,
+            "related_amount": related_amount,
+            "pass_through": amount > 0 and related_amount >= pass_through_ratio * amount,
+            "started_at": datetime.fromtimestamp(start, UTC),
+            "ended_at": datetime.fromtimestamp(end, UTC),
+            "transaction_ids": [self.transaction_ids[edge] for edge in in_window]
+        }
+
+class MoneyFlowGraphBuilder:
+    """
+    Resolves transactions to flow edges between nodes
+
+    A counterparty account number that matches one of the case's accounts becomes an edge between
+    the two case accounts; other counterparties are keyed by account number, or by name when no
+    number was recorded. A transfer between two case accounts recorded on both statements is kept
+    once (the sender's record).
+    """
+
+    def __init__(self, accounts: Iterable[Tuple[UUID, Optional[str], Optional[str]]]):
+        self.nodes: List[FlowNode] = []
+        self.node_index: Dict[str, int] = {}
+        self.account_nodes: Dict[UUID, int] = {}
+        self.accounts_by_number: Dict[str, int] = {}
+        for account_id, account_number, account_name in accounts:
+            node = self._node(FlowNode(
+                key=f"account:{account_id}", kind="account",
+                label=account_name or account_number or str(account_id), account_id=account_id
+            ))
+            self.account_nodes[account_id] = node
+            number = normalize_account_number(account_number)
+            if number:
+                self.accounts_by_number.setdefault(number, node)
+
+        self.src: List[int] = []
+        self.dst: List[int] = []
+        self.amounts: List[float] = []
+        self.times: List[int] = []
+        self.transaction_ids: List[UUID] = []
+        # (src, dst, cents) -> times of sender-recorded transfers between case accounts
+        self._sent_internal: Dict[Tuple[int, int, int], List[int]] = defaultdict(list)
+        self._received_internal: List[Tuple[Tuple[int, int, int], int, UUID, float]] = []
+
+    def _node(self, node: FlowNode) -> int:
+        index = self.node_index.get(node.key)
+        if index is None:
+            index = self.node_index[node.key] = len(self.nodes)
+            self.nodes.append(node)
+        return index
+
+    def _counterparty(self, name: Optional[str], account_number: Optional[str]) -> Optional[int]:
+        number = normalize_account_number(account_number)
+        if number:
+            if number in self.accounts_by_number:
+                return self.accounts_by_number[number]
+            return self._node(FlowNode(key=f"external:{number}", kind="external", label=name or account_number))
+        normalized = normalize_name(name)
+        if normalized:
+            return self._node(FlowNode(key=f"name:{normalized}", kind="name", label=name.strip()))
+        return None
+
+    def add(
+        self,
+        transaction_id: UUID,
+        account_id: UUID,
+        transaction_date: datetime,
+        amount: float,
+        transaction_type: Optional[TransactionType],
+        counterparty_name: Optional[str],
+        counterparty_account: Optional[str],
+        signed_amount: Optional[str] = None
+    ):
+        account = self.account_nodes.get(account_id)
+        counterparty = self._counterparty(counterparty_name, counterparty_account)
+        if account is None or counterparty is None or counterparty == account or not amount:
+            return
+
+        outflow = _is_outflow(transaction_type, signed_amount)
+        src, dst = (account, counterparty) if outflow else (counterparty, account)
+        moment = epoch_seconds(transaction_date)
+        amount = abs(float(amount))
+        if self.nodes[counterparty].kind == "account":
+            key = (src, dst, round(amount * 100))
+            if not outflow:
+                self._received_internal.append((key, moment, transaction_id, amount))
+                return
+            self._sent_internal[key].append(moment)
+        self._edge(src, dst, amount, moment, transaction_id)
+
+    def _edge(self, src: int, dst: int, amount: float, moment: int, transaction_id: UUID):
+        self.src.append(src)
+        self.dst.append(dst)
+        self.amounts.append(amount)
+        self.times.append(moment)
+        self.transaction_ids.append(transaction_id)
+
+    def build(self) -> MoneyFlowGraph:
+        # Receiver-side records of internal transfers, unless they mirror a sender-side record
+        for key, moment, transaction_id, amount in self._received_internal:
+            sent = self._sent_internal.get(key)
+            match = next((i for i, sent_at in enumerate(sent or ()) if abs(sent_at - moment) <= MIRROR_TOLERANCE_SECONDS), None)
+            if match is None:
+                self._edge(key[0], key[1], amount, moment, transaction_id)
+            else:
+                sent.pop(match)
+
+        return MoneyFlowGraph(
+            self.nodes,
+            np.asarray(self.src, dtype=np.int32),
+            np.asarray(self.dst, dtype=np.int32),
+            np.asarray(self.amounts, dtype=np.float64),
+            np.asarray(self.times, dtype=np.int64),
+            self.transaction_ids
+        )
@@ -0,0 +1,264 @@
+"""
+Money-flow analysis service - builds, caches and queries case flow graphs and raises flow alerts
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+import structlog
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.exceptions import NotFoundError, ValidationError
+from models.financial_analysis import AlertSeverity, FinancialAccount, FinancialTransaction
+from services.financial_alert_writer import FinancialAlertBatch
+from services.financial_summary_cache import financial_summary_cache
+from services.money_flow_graph import MoneyFlowGraph, MoneyFlowGraphBuilder, epoch_seconds
+
+logger = structlog.get_logger()
+
+GRAPH_LOAD_BATCH_SIZE = 5000
+
+class MoneyFlowGraphCache:
+    """
+    In-process LRU of case graphs, keyed by the case's data generation
+
+    The generation is the one the financial summary cache bumps on every committed change to a
+    case's transactions or accounts, so a cached graph is reused exactly until the data changes.
+    Without Redis there is no generation to compare against and graphs are rebuilt per request.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[int] = None):
+        self.max_entries = max_entries or settings.FINANCIAL_FLOW_CACHE_SIZE
+        self.ttl_seconds = ttl_seconds or settings.FINANCIAL_SUMMARY_CACHE_SECONDS
+        self._entries: "OrderedDict[UUID, Tuple[str, float, MoneyFlowGraph]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, case_id: UUID, generation: str) -> Optional[MoneyFlowGraph]:
+        entry = self._entries.get(case_id)
+        if entry is None or entry[0] != generation or time.monotonic() - entry[1] > self.ttl_seconds:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(case_id)
+        self.hits += 1
+        return entry[2]
+
+    def put(self, case_id: UUID, generation: str, graph: MoneyFlowGraph):
+        self._entries[case_id] = (generation, time.monotonic(), graph)
+        self._entries.move_to_end(case_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+# Global money-flow graph cache instance
+money_flow_graph_cache = MoneyFlowGraphCache()
+
+class MoneyFlowService:
+    """Cross-account tracing, round-trip and fan-in/fan-out detection over a case's money-flow graph"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_graph(self, case_id: UUID) -> MoneyFlowGraph:
+        """The case's flow graph, from the cache while the case's data is unchanged"""
+        generation = await financial_summary_cache.generation(case_id)
+        if generation is not None:
+            graph = money_flow_graph_cache.get(case_id, generation)
+            if graph is not None:
+                return graph
+
+        graph = await self._build_graph(case_id)
+        if generation is not None:
+            money_flow_graph_cache.put(case_id, generation, graph)
+        return graph
+
+    async def _build_graph(self, case_id: UUID) -> MoneyFlowGraph:
+        started = time.monotonic()
+        accounts = await self.db.execute(
+            select(FinancialAccount.id, FinancialAccount.account_number, FinancialAccount.account_name)
+            .where(FinancialAccount.case_id == case_id)
+        )
+        builder = MoneyFlowGraphBuilder(accounts.all())
+
+        result = await self.db.stream(
+            select(
+                FinancialTransaction.id,
+                FinancialTransaction.account_id,
+                FinancialTransaction.transaction_date,
+                FinancialTransaction.amount,
+                FinancialTransaction.transaction_type,
+                FinancialTransaction.counterparty_name,
+                FinancialTransaction.counterparty_account,
+                # Imported transfers keep their direction only in the statement's signed amount
+                FinancialTransaction.metadata_json["signed_amount"].as_string()
+            )
+            .where(FinancialTransaction.case_id == case_id)
+            .execution_options(yield_per=GRAPH_LOAD_BATCH_SIZE)
+        )
+        async for partition in result.partitions():
+            for row in partition:
+                builder.add(*row)
+
+        graph = await asyncio.to_thread(builder.build)
+        logger.info(
+            "Money-flow graph built",
+            case_id=str(case_id),
+            nodes=graph.node_count,
+            edges=graph.edge_count,
+            seconds=round(time.monotonic() - started, 3)
+        )
+        return graph
+
+    @staticmethod
+    def resolve_node(graph: MoneyFlowGraph, node_key: Optional[str] = None, account_id: Optional[UUID] = None) -> int:
+        """Node index for a node key or a case account"""
+        if node_key is None and account_id is None:
+            raise ValidationError("Either node or account_id is required")
+        key = node_key or f"account:{account_id}"
+        node = graph.node_index.get(key)
+        if node is None:
+            raise NotFoundError(f"No money flows recorded for {key}")
+        return node
+
+    async def trace(
+        self,
+        case_id: UUID,
+        node_key: Optional[str] = None,
+        account_id: Optional[UUID] = None,
+        max_hops: Optional[int] = None,
+        window_hours: Optional[int] = None,
+        since: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Follow funds out of an account or counterparty along time-respecting paths"""
+        graph = await self.get_graph(case_id)
+        source = self.resolve_node(graph, node_key, account_id)
+        return graph.trace(
+            source,
+            max_hops=max_hops or settings.FINANCIAL_FLOW_MAX_HOPS,
+            window_seconds=(window_hours or settings.FINANCIAL_FLOW_WINDOW_HOURS) * 3600,
+            since=epoch_seconds(since) if since else None,
+            max_paths=settings.FINANCIAL_FLOW_MAX_PATHS
+        )
+
+    async def find_cycles(self, case_id: UUID, max_hops: Optional[int] = None, window_hours: Optional[int] = None) -> Dict[str, Any]:
+        graph = await self.get_graph(case_id)
+        return graph.find_cycles(
+            max_hops=max_hops or settings.FINANCIAL_FLOW_MAX_HOPS,
+            window_seconds=(window_hours or settings.FINANCIAL_FLOW_WINDOW_HOURS) * 3600,
+            max_paths=settings.FINANCIAL_FLOW_MAX_PATHS
+        )
+
+    async def find_fan_patterns(
+        self,
+        case_id: UUID,
+        min_counterparties: Optional[int] = None,
+        window_hours: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        graph = await self.get_graph(case_id)
+        return graph.find_fan_patterns(
+            min_counterparties=min_counterparties or settings.FINANCIAL_FLOW_FAN_COUNTERPARTIES,
+            window_seconds=(window_hours or settings.FINANCIAL_FLOW_WINDOW_HOURS) * 3600
+        )
+
+    async def detect_patterns(self, case_id: UUID, flags: Dict[UUID, float]) -> int:
+        """
+        Raise round_tripping, fan_in and fan_out alerts, one bulk upsert for all of them
+
+        Args:
+            case_id: Case ID
+            flags: Transaction id -> risk score; transactions in a pattern are added or raised
+
+        Returns:
+            Number of alerts created
+        """
+        cycles = await self.find_cycles(case_id)
+        if cycles["truncated"]:
+            logger.warning("Round-trip search stopped at its path budget", case_id=str(case_id))
+        fans = await self.find_fan_patterns(case_id)
+
+        alerts = FinancialAlertBatch(case_id)
+        window_hours = settings.FINANCIAL_FLOW_WINDOW_HOURS
+
+        for cycle in cycles["cycles"]:
+            transaction_ids = [edge["transaction_id"] for edge in cycle["edges"]]
+            origin = cycle["nodes"][0]["label"]
+            self._raise(
+                alerts, flags, transaction_ids,
+                alert_type="round_tripping",
+                severity=AlertSeverity.HIGH,
+                title="Potential Round-Tripping Detected",
+                description=(
+                    f"{cycle['amount_out']:,.2f} left {origin} and {cycle['amount_returned']:,.2f} returned "
+                    f"through {len(cycle['nodes']) - 1} intermediaries within {window_hours}h."
+                ),
+                criteria={"amount_out": cycle["amount_out"], "amount_returned": cycle["amount_returned"]},
+                patterns={"nodes": [node["key"] for node in cycle["nodes"]]},
+                risk_score=0.8
+            )
+
+        for fan in fans:
+            direction = "from" if fan["kind"] == "fan_in" else "to"
+            description = (
+                f"{fan['node']['label']} moved {fan['amount']:,.2f} {direction} {fan['counterparties']} "
+                f"counterparties within {window_hours}h."
+            )
+            if fan["pass_through"]:
+                description += f" {fan['related_amount']:,.2f} passed straight through."
+            self._raise(
+                alerts, flags, fan["transaction_ids"],
+                alert_type=fan["kind"],
+                severity=AlertSeverity.HIGH if fan["pass_through"] else AlertSeverity.MEDIUM,
+                title="Fan-In of Funds" if fan["kind"] == "fan_in" else "Fan-Out of Funds",
+                description=description,
+                criteria={
+                    "counterparties": fan["counterparties"],
+                    "amount": fan["amount"],
+                    "related_amount": fan["related_amount"],
+                    "pass_through": fan["pass_through"]
+                },
+                patterns={"node": fan["node"]["key"]},
+                risk_score=0.8 if fan["pass_through"] else 0.7
+            )
+        # Patterns alerted before conflict on their fingerprint and are skipped
+        return await alerts.write(self.db)
+
+    @staticmethod
+    def _raise(
+        alerts: FinancialAlertBatch,
+        flags: Dict[UUID, float],
+        transaction_ids: List[UUID],
+        alert_type: str,
+        severity: AlertSeverity,
+        title: str,
+        description: str,
+        criteria: Dict[str, Any],
+        patterns: Dict[str, Any],
+        risk_score: float
+    ):
+        """Queue an alert for a pattern, identified by its set of transactions, and flag them"""
+        for tx_id in transaction_ids:
+            flags[tx_id] = max(flags.get(tx_id, 0.0), risk_score)
+
+        alerts.add(
+            alert_type=alert_type,
+            severity=severity,
+            title=title,
+            description=description,
+            transaction_ids=transaction_ids,
+            trigger_criteria={
+                "max_hops": settings.FINANCIAL_FLOW_MAX_HOPS,
+                "window_hours": settings.FINANCIAL_FLOW_WINDOW_HOURS,
+                **criteria
+            },
+            detected_patterns={**patterns, "transaction_ids": [str(tx_id) for tx_id in transaction_ids]}
+        )
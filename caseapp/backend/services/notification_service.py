@@ -3,9 +3,6 @@ Notification service for collaboration events and external integrations
 """
 
 import asyncio
-import json
-import hmac
-import hashlib
 from datetime import datetime, timedelta, UTC
 from typing import Optional, Dict, Any, List
 import structlog
@@ -16,6 +13,8 @@ import aiohttp
 import uuid
 
 from core.database import AsyncSessionLocal
+from core.http_client import http_client_registry
+from core.webhook_signing import encode_payload, sign_payload
 from models.external_sharing import (
     CollaborationNotification, NotificationType, NotificationChannel,
     WebhookEndpoint, WebhookDelivery
@@ -28,14 +27,10 @@ logger = structlog.get_logger()
 class NotificationService:
     """Service for managing collaboration notifications and webhooks"""
     
-    def __init__(self):
-        self.webhook_session = None
-        self._initialize_webhook_client()
-    
-    def _initialize_webhook_client(self):
-        """Initialize HTTP client for webhook deliveries"""
-        timeout = aiohttp.ClientTimeout(total=30)
-        self.webhook_session = aiohttp.ClientSession(timeout=timeout)
+    @property
+    def webhook_session(self) -> aiohttp.ClientSession:
+        """Shared, pooled HTTP session for webhook deliveries"""
+        return http_client_registry.get_session("webhooks")
     
     async def create_notification(
         self,
@@ -153,10 +148,14 @@ class NotificationService:
             )
             endpoints = result.scalars().all()
             
+            # The payload is endpoint-independent: encode it once for every endpoint
+            payload = self._webhook_payload(notification)
+            body = encode_payload(payload)
+            
             success = True
             for endpoint in endpoints:
                 try:
-                    await self._send_webhook(endpoint, notification)
+                    await self._send_webhook(endpoint, payload, body)
                 except Exception as e:
                     logger.error("Webhook delivery failed", 
                                endpoint_id=str(endpoint.id), error=str(e))
@@ -164,11 +163,9 @@ class NotificationService:
             
             return success
     
-    async def _send_webhook(self, endpoint: WebhookEndpoint, notification: CollaborationNotification):
-        """Send webhook to a specific endpoint"""
-        
-        # Prepare webhook payload
-        payload = {
+    def _webhook_payload(self, notification: CollaborationNotification) -> Dict[str, Any]:
+        """Webhook payload for a notification"""
+        return {
             'event_type': notification.notification_type,
             'notification_id': str(notification.id),
             'timestamp': notification.created_at.isoformat(),
@@ -184,12 +181,20 @@ class NotificationService:
                 **notification.data
             }
         }
+    
+    async def _send_webhook(
+        self,
+        endpoint: WebhookEndpoint,
+        payload: Dict[str, Any],
+        body: bytes
+    ):
+        """Send the pre-encoded webhook body to a specific endpoint"""
         
         # Create delivery record
         async with AsyncSessionLocal() as db:
             delivery = WebhookDelivery(
                 endpoint_id=endpoint.id,
-                event_type=notification.notification_type,
+                event_type=payload['event_type'],
                 payload=payload,
                 status='pending'
             )
@@ -204,20 +209,14 @@ class NotificationService:
                 'User-Agent': 'CaseApp-Webhook/1.0'
             }
             
-            # Add signature if secret key is configured
+            # Signature covers exactly the bytes sent
             if endpoint.secret_key:
-                payload_str = json.dumps(payload, sort_keys=True)
-                signature = hmac.new(
-                    endpoint.secret_key.encode(),
-                    payload_str.encode(),
-                    hashlib.sha256
-                ).hexdigest()
-                headers['X-CaseApp-Signature'] = f'sha256={signature}'
+                headers['X-CaseApp-Signature'] = sign_payload(endpoint.secret_key, body)
             
             # Send webhook
             async with self.webhook_session.post(
                 endpoint.url,
-                json=payload,
+                data=body,
                 headers=headers,
                 timeout=aiohttp.ClientTimeout(total=endpoint.timeout_seconds)
             ) as response:
@@ -534,6 +533,5 @@ class NotificationService:
             return endpoint
     
     async def cleanup(self):
-        """Cleanup resources"""
-        if self.webhook_session:
-            await self.webhook_session.close()
\ No newline at end of file
+        """Cleanup resources (the shared webhook session is closed by the HTTP client registry)"""
+        return None
\ No newline at end of file
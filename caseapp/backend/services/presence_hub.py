@@ -0,0 +1,177 @@
+"""
+Real-time presence hub - fans collaboration updates out to WebSocket and SSE subscribers
+"""
+
+import asyncio
+from typing import Optional, Dict, Any, List, Union
+import orjson
+import structlog
+
+from core.config import settings
+from core.redis import redis_service
+
+logger = structlog.get_logger()
+
+class PresenceSubscription:
+    """Bounded message queue for one collaboration session"""
+
+    def __init__(self, timeline_id: str, session_id: str, max_queued: int):
+        self.timeline_id = timeline_id
+        self.session_id = session_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self.dropped = 0
+
+    def put(self, message: str) -> None:
+        """Queue an encoded message, dropping the oldest one if the consumer is behind"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Next encoded message, or None if nothing arrives within the timeout"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def drain(self) -> List[str]:
+        """All queued messages, oldest first (for polling clients)"""
+        messages = []
+        while not self.queue.empty():
+            messages.append(self.queue.get_nowait())
+        return messages
+
+class PresenceHub:
+    """
+    Delivers presence updates to local session subscriptions.
+
+    With Redis available every update is a single PUBLISH on the timeline channel and each
+    replica fans it out to its own subscribers; without Redis updates are delivered in-process.
+    """
+
+    CHANNEL_PREFIX = "presence:"
+
+    def __init__(self):
+        self.timelines: Dict[str, Dict[str, PresenceSubscription]] = {}  # timeline_id -> session_id -> subscription
+        self.sessions: Dict[str, PresenceSubscription] = {}
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        self.messages_published = 0
+        self.messages_delivered = 0
+
+    @property
+    def listening(self) -> bool:
+        return self._listener is not None and not self._listener.done()
+
+    async def start(self) -> bool:
+        """Subscribe to presence channels if Redis is available"""
+        if self.listening:
+            return True
+        if not redis_service._initialized:
+            logger.info("Redis unavailable, presence updates delivered in-process only")
+            return False
+
+        self._pubsub = redis_service.redis_client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.psubscribe(f"{self.CHANNEL_PREFIX}*")
+        self._listener = asyncio.create_task(self._listen())
+        logger.info("Presence hub listening for cross-replica updates")
+        return True
+
+    async def stop(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.punsubscribe()
+                await self._pubsub.aclose()
+            except Exception as e:
+                logger.warning("Failed to close presence pub/sub", error=str(e))
+            self._pubsub = None
+
+    def subscribe(self, timeline_id: str, session_id: str) -> PresenceSubscription:
+        """Register (or return) the subscription for a session"""
+        subscription = self.sessions.get(session_id)
+        if subscription is None:
+            subscription = PresenceSubscription(timeline_id, session_id, settings.PRESENCE_SUBSCRIBER_QUEUE_SIZE)
+            self.sessions[session_id] = subscription
+            self.timelines.setdefault(timeline_id, {})[session_id] = subscription
+        return subscription
+
+    def unsubscribe(self, session_id: str) -> None:
+        subscription = self.sessions.pop(session_id, None)
+        if subscription is None:
+            return
+        timeline_subscribers = self.timelines.get(subscription.timeline_id)
+        if timeline_subscribers is not None:
+            timeline_subscribers.pop(session_id, None)
+            if not timeline_subscribers:
+                del self.timelines[subscription.timeline_id]
+
+    def get_subscription(self, session_id: str) -> Optional[PresenceSubscription]:
+        return self.sessions.get(session_id)
+
+    async def publish(
+        self,
+        timeline_id: str,
+        message: Dict[str, Any],
+        exclude_session_id: Optional[str] = None
+    ) -> None:
+        """Publish an update to every session on a timeline, across replicas"""
+        # Wire format: excluded session id, newline, message JSON (encoded once for all subscribers)
+        data = (exclude_session_id or "").encode() + b"\n" + orjson.dumps(message)
+        self.messages_published += 1
+
+        if self.listening:
+            try:
+                await redis_service.redis_client.publish(f"{self.CHANNEL_PREFIX}{timeline_id}", data)
+                return
+            except Exception as e:
+                logger.warning("Presence publish failed, delivering locally", error=str(e))
+
+        self._deliver_local(timeline_id, data)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "listening": self.listening,
+            "timelines": len(self.timelines),
+            "subscriptions": len(self.sessions),
+            "messages_published": self.messages_published,
+            "messages_delivered": self.messages_delivered,
+            "messages_dropped": sum(subscription.dropped for subscription in self.sessions.values())
+        }
+
+    def _deliver_local(self, timeline_id: str, data: Union[bytes, str]) -> None:
+        subscribers = self.timelines.get(timeline_id)
+        if not subscribers:
+            return
+
+        if isinstance(data, bytes):
+            data = data.decode()
+        exclude_session_id, _, message = data.partition("\n")
+
+        for session_id, subscription in list(subscribers.items()):
+            if session_id != exclude_session_id:
+                subscription.put(message)
+                self.messages_delivered += 1
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    channel = message["channel"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    self._deliver_local(channel[len(self.CHANNEL_PREFIX):], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Presence pub/sub listener error, reconnecting", error=str(e))
+                await asyncio.sleep(1)
+
+# Global presence hub instance
+presence_hub = PresenceHub()
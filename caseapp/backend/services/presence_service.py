@@ -3,47 +3,66 @@ Real-time presence service for collaboration sessions
 """
 
 import asyncio
-import json
 from datetime import datetime, timedelta, UTC
 from typing import Optional, Dict, Any, List, Set
+import orjson
 import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, desc, delete
+from sqlalchemy import select, update, and_, or_, func, desc, delete
 from sqlalchemy.orm import selectinload
-import redis.asyncio as redis
 import uuid
 
+from core.config import settings
 from core.database import AsyncSessionLocal
+from core.redis import redis_service
 from models.timeline import CollaborationSession, CaseTimeline
 from models.user import User
+from services.presence_hub import PresenceHub, PresenceSubscription, presence_hub
 
 logger = structlog.get_logger()
 
 class PresenceService:
     """Service for managing real-time user presence in collaboration sessions"""
     
-    def __init__(self):
-        # Redis connection for real-time data
-        self.redis_client = None
-        self._initialize_redis()
+    # Session fields persisted to CollaborationSession by the coalescing flush
+    PERSISTED_FIELDS = ('current_view', 'cursor_position', 'selected_events', 'editing_event_id')
+    
+    def __init__(self, hub: Optional[PresenceHub] = None):
+        # Fan-out of real-time updates to WebSocket/SSE subscribers
+        self.hub = hub or presence_hub
         
         # In-memory tracking for active sessions
         self.active_sessions: Dict[str, Dict[str, Any]] = {}  # session_id -> session_data
         self.timeline_sessions: Dict[str, Set[str]] = {}  # timeline_id -> set of session_ids
         
-    def _initialize_redis(self):
-        """Initialize Redis connection for real-time features"""
-        try:
-            # Use Redis for real-time presence if available
-            self.redis_client = redis.Redis(
-                host='localhost',
-                port=6379,
-                decode_responses=True,
-                socket_connect_timeout=5
-            )
-        except Exception as e:
-            logger.warning("Redis not available, using in-memory presence tracking", error=str(e))
-            self.redis_client = None
+        # Activity not yet written to the database: session_id -> changed columns
+        self.pending_activity: Dict[str, Dict[str, Any]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+    
+    @property
+    def redis_client(self):
+        """Shared Redis connection, or None when Redis is unavailable"""
+        return redis_service.redis_client if redis_service._initialized else None
+    
+    async def start(self) -> Dict[str, Any]:
+        """Start cross-replica fan-out and the periodic activity flush"""
+        listening = await self.hub.start()
+        self._ensure_flush_loop()
+        return {"pubsub_enabled": listening, "flush_interval_seconds": settings.PRESENCE_FLUSH_INTERVAL_SECONDS}
+    
+    async def stop(self) -> None:
+        """Persist outstanding activity and stop background work"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await self.flush_pending_activity()
+        await self.hub.stop()
+    
+    def subscribe(self, session_id: str) -> Optional[PresenceSubscription]:
+        """Subscription feeding a session's WebSocket or SSE stream"""
+        return self.hub.get_subscription(session_id)
     
     async def start_collaboration_session(
         self,
@@ -93,20 +112,21 @@ class PresenceService:
             }
             
             self.active_sessions[session_id] = session_data
+            self.active_sessions[session_id]['_row_id'] = session.id
             
             if timeline_id not in self.timeline_sessions:
                 self.timeline_sessions[timeline_id] = set()
             self.timeline_sessions[timeline_id].add(session_id)
+            self.hub.subscribe(timeline_id, session_id)
             
-            # Store in Redis if available
+            # Store in Redis if available (one pipelined round trip)
             if self.redis_client:
                 try:
-                    await self.redis_client.hset(
-                        f"session:{session_id}",
-                        mapping=session_data
-                    )
-                    await self.redis_client.sadd(f"timeline:{timeline_id}:sessions", session_id)
-                    await self.redis_client.expire(f"session:{session_id}", 3600)  # 1 hour TTL
+                    async with self.redis_client.pipeline(transaction=False) as pipe:
+                        pipe.hset(f"session:{session_id}", mapping=self._redis_mapping(session_data))
+                        pipe.sadd(f"timeline:{timeline_id}:sessions", session_id)
+                        pipe.expire(f"session:{session_id}", settings.PRESENCE_SESSION_TTL_SECONDS)
+                        await pipe.execute()
                 except Exception as e:
                     logger.warning("Failed to store session in Redis", error=str(e))
             
@@ -134,38 +154,26 @@ class PresenceService:
         if activity_data:
             session_data.update(activity_data)
         
-        # Update database
-        async with AsyncSessionLocal() as db:
-            result = await db.execute(
-                select(CollaborationSession).where(CollaborationSession.session_id == session_id)
-            )
-            session = result.scalar_one_or_none()
-            
-            if session:
-                session.last_activity = current_time
-                if activity_data:
-                    if 'current_view' in activity_data:
-                        session.current_view = activity_data['current_view']
-                    if 'cursor_position' in activity_data:
-                        session.cursor_position = activity_data['cursor_position']
-                    if 'selected_events' in activity_data:
-                        session.selected_events = activity_data['selected_events']
-                    if 'editing_event_id' in activity_data:
-                        session.editing_event_id = activity_data['editing_event_id']
-                
-                await db.commit()
+        # Coalesce database writes; the flush loop persists the latest state periodically
+        pending = self.pending_activity.setdefault(session_id, {})
+        pending['last_activity'] = current_time
+        if activity_data:
+            for field in self.PERSISTED_FIELDS:
+                if field in activity_data:
+                    pending[field] = activity_data[field]
+        self._ensure_flush_loop()
         
-        # Update Redis if available
+        # Update Redis if available (one pipelined round trip)
         if self.redis_client:
             try:
                 mapping_data = {'last_activity': current_time.isoformat()}
                 if activity_data:
                     mapping_data.update(activity_data)
                 
-                await self.redis_client.hset(
-                    f"session:{session_id}",
-                    mapping=mapping_data
-                )
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.hset(f"session:{session_id}", mapping=self._redis_mapping(mapping_data))
+                    pipe.expire(f"session:{session_id}", settings.PRESENCE_SESSION_TTL_SECONDS)
+                    await pipe.execute()
             except Exception as e:
                 logger.warning("Failed to update session in Redis", error=str(e))
         
@@ -182,29 +190,31 @@ class PresenceService:
         
         # Remove from in-memory tracking
         del self.active_sessions[session_id]
+        self.hub.unsubscribe(session_id)
         
         if timeline_id in self.timeline_sessions:
             self.timeline_sessions[timeline_id].discard(session_id)
             if not self.timeline_sessions[timeline_id]:
                 del self.timeline_sessions[timeline_id]
         
-        # Update database
+        # Persist the final state together with any coalesced activity
+        final_state = self.pending_activity.pop(session_id, {})
+        final_state.update(is_active=False, last_activity=datetime.now(UTC))
         async with AsyncSessionLocal() as db:
-            result = await db.execute(
-                select(CollaborationSession).where(CollaborationSession.session_id == session_id)
+            await db.execute(
+                update(CollaborationSession)
+                .where(CollaborationSession.session_id == session_id)
+                .values(**self._column_values(final_state))
             )
-            session = result.scalar_one_or_none()
-            
-            if session:
-                session.is_active = False
-                session.last_activity = datetime.now(UTC)
-                await db.commit()
+            await db.commit()
         
         # Remove from Redis if available
         if self.redis_client:
             try:
-                await self.redis_client.delete(f"session:{session_id}")
-                await self.redis_client.srem(f"timeline:{timeline_id}:sessions", session_id)
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.delete(f"session:{session_id}")
+                    pipe.srem(f"timeline:{timeline_id}:sessions", session_id)
+                    await pipe.execute()
             except Exception as e:
                 logger.warning("Failed to remove session from Redis", error=str(e))
         
@@ -238,16 +248,20 @@ class PresenceService:
             )
             
             for session, user in result:
+                # Local sessions may have activity newer than the last flush
+                local = self.active_sessions.get(session.session_id, {})
+                pending = self.pending_activity.get(session.session_id, {})
+                last_activity = pending.get('last_activity', session.last_activity)
                 presence_info = {
                     'session_id': session.session_id,
                     'user_id': str(user.id),
                     'user_name': user.full_name,
                     'user_email': user.email,
-                    'last_activity': session.last_activity.isoformat(),
-                    'current_view': session.current_view,
-                    'cursor_position': session.cursor_position,
-                    'selected_events': session.selected_events,
-                    'editing_event_id': str(session.editing_event_id) if session.editing_event_id else None,
+                    'last_activity': last_activity.isoformat(),
+                    'current_view': local.get('current_view', session.current_view),
+                    'cursor_position': local.get('cursor_position', session.cursor_position),
+                    'selected_events': local.get('selected_events', session.selected_events),
+                    'editing_event_id': self._editing_event_id(local, session),
                     'is_active': session.is_active
                 }
                 presence_data.append(presence_info)
@@ -319,57 +333,92 @@ class PresenceService:
     ):
         """Broadcast presence update to all active sessions on a timeline"""
         
-        # Get all active sessions for this timeline
-        session_ids = self.timeline_sessions.get(timeline_id, set())
-        
-        if exclude_session_id:
-            session_ids = session_ids - {exclude_session_id}
+        update_message = {
+            'type': 'presence_update',
+            'timeline_id': timeline_id,
+            'timestamp': datetime.now(UTC).isoformat(),
+            'data': update_data
+        }
         
-        # In a real implementation, this would use WebSocket connections
-        # For now, we'll store the update in Redis for polling clients
-        if self.redis_client and session_ids:
-            try:
-                update_message = {
-                    'type': 'presence_update',
-                    'timeline_id': timeline_id,
-                    'timestamp': datetime.now(UTC).isoformat(),
-                    'data': update_data
-                }
-                
-                # Store update for each active session
-                for session_id in session_ids:
-                    await self.redis_client.lpush(
-                        f"session:{session_id}:updates",
-                        json.dumps(update_message)
-                    )
-                    # Keep only last 50 updates
-                    await self.redis_client.ltrim(f"session:{session_id}:updates", 0, 49)
-                    await self.redis_client.expire(f"session:{session_id}:updates", 3600)
-                
-            except Exception as e:
-                logger.warning("Failed to broadcast presence update", error=str(e))
+        # A single publish; each replica's hub fans it out to its own subscribers
+        try:
+            await self.hub.publish(timeline_id, update_message, exclude_session_id=exclude_session_id)
+        except Exception as e:
+            logger.warning("Failed to broadcast presence update", error=str(e))
     
     async def get_session_updates(self, session_id: str) -> List[Dict[str, Any]]:
-        """Get pending updates for a collaboration session"""
+        """Get pending updates for a collaboration session (polling fallback for WebSocket/SSE)"""
         
-        updates = []
+        subscription = self.hub.get_subscription(session_id)
+        if subscription is None:
+            return []
         
-        if self.redis_client:
+        return [orjson.loads(message) for message in subscription.drain()]
+    
+    async def flush_pending_activity(self) -> int:
+        """Write coalesced session activity to the database in one batch"""
+        
+        async with self._flush_lock:
+            pending, self.pending_activity = self.pending_activity, {}
+            rows = []
+            for session_id, changes in pending.items():
+                session_data = self.active_sessions.get(session_id)
+                if session_data and session_data.get('_row_id') is not None:
+                    rows.append({'id': session_data['_row_id'], **self._column_values(changes)})
+            
+            if not rows:
+                return 0
+            
             try:
-                # Get all pending updates
-                raw_updates = await self.redis_client.lrange(f"session:{session_id}:updates", 0, -1)
-                
-                for raw_update in raw_updates:
-                    try:
-                        update = json.loads(raw_update)
-                        updates.append(update)
-                    except json.JSONDecodeError:
-                        continue
-                
-                # Clear the updates after retrieving
-                await self.redis_client.delete(f"session:{session_id}:updates")
-                
+                async with AsyncSessionLocal() as db:
+                    # ORM bulk UPDATE by primary key: one executemany per distinct column set
+                    await db.execute(update(CollaborationSession), rows)
+                    await db.commit()
             except Exception as e:
-                logger.warning("Failed to get session updates", error=str(e))
-        
-        return updates
\ No newline at end of file
+                # Keep the newest state for the next attempt
+                for session_id, changes in pending.items():
+                    self.pending_activity[session_id] = {**changes, **self.pending_activity.get(session_id, {})}
+                logger.warning("Failed to persist session activity", sessions=len(rows), error=str(e))
+                return 0
+            
+            logger.debug("Persisted coalesced session activity", sessions=len(rows))
+            return len(rows)
+    
+    def _ensure_flush_loop(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+    
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.PRESENCE_FLUSH_INTERVAL_SECONDS)
+            try:
+                await self.flush_pending_activity()
+            except Exception as e:
+                logger.warning("Session activity flush failed", error=str(e))
+    
+    @staticmethod
+    def _column_values(changes: Dict[str, Any]) -> Dict[str, Any]:
+        values = dict(changes)
+        if values.get('editing_event_id'):
+            values['editing_event_id'] = uuid.UUID(str(values['editing_event_id']))
+        return values
+    
+    @staticmethod
+    def _editing_event_id(local: Dict[str, Any], session: CollaborationSession) -> Optional[str]:
+        editing_event_id = local.get('editing_event_id', session.editing_event_id)
+        return str(editing_event_id) if editing_event_id else None
+    
+    @staticmethod
+    def _redis_mapping(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Redis hashes only hold scalars; JSON-encode structured values"""
+        mapping = {}
+        for key, value in data.items():
+            if key.startswith('_'):
+                continue
+            if value is None or isinstance(value, (dict, list, bool)):
+                value = orjson.dumps(value).decode()
+            mapping[key] = value
+        return mapping
+
+# Global presence service instance
+presence_service = PresenceService()
@@ -0,0 +1,282 @@
+"""
+Bulk bank statement import - streaming parse, COPY into a staging table, deduplicating merge
+"""
+
+import asyncio
+import io
+import json
+import uuid
+from datetime import datetime, UTC
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+import structlog
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.exceptions import NotFoundError, ProcessingError, ValidationError
+from core.money import quantize_amount
+from models.financial_analysis import FinancialAccount, FinancialStatementImport, StatementImportStatus
+from services.financial_summary_cache import financial_summary_cache
+from services.statement_parsers import (
+    STATEMENT_FORMATS, STATEMENT_PROFILES, NaturalKeyer, ParsedTransaction, RejectedRow,
+    StatementParseError, StatementProfile, StatementRecord, detect_format, iter_statement
+)
+
+logger = structlog.get_logger()
+
+STAGING_TABLE = "financial_transactions_staging"
+
+# Columns written by COPY; the rest take their table defaults
+COPY_COLUMNS = (
+    "id", "account_id", "case_id", "import_id", "natural_key_hash", "transaction_date", "amount",
+    "currency", "transaction_type", "description", "counterparty_name", "counterparty_account",
+    "is_suspicious", "risk_score", "metadata_json"
+)
+
+class StatementImportService:
+    """
+    Loads CSV, OFX and QIF bank statements into FinancialTransaction
+
+    Records are parsed off the event loop in batches, copied into a temporary staging table with
+    asyncpg's binary COPY and merged with ``ON CONFLICT DO NOTHING`` on the account's natural-key
+    hash, so overlapping or repeated productions never duplicate rows. Detectors run once, after
+    the whole statement has been loaded.
+    """
+
+    def __init__(self, db: AsyncSession, batch_size: Optional[int] = None):
+        self.db = db
+        self.batch_size = batch_size or settings.FINANCIAL_IMPORT_BATCH_SIZE
+
+    @staticmethod
+    def resolve_profile(profile: Optional[str] = None, column_mapping: Optional[Dict[str, Any]] = None) -> StatementProfile:
+        """Built-in profile by name, optionally overridden by a user-supplied column mapping"""
+        if profile is not None and profile not in STATEMENT_PROFILES:
+            raise ValidationError(
+                f"Unknown statement profile '{profile}'",
+                details={"available_profiles": sorted(STATEMENT_PROFILES)}
+            )
+        base = STATEMENT_PROFILES[profile or "generic"]
+        if not column_mapping:
+            return base
+        try:
+            return StatementProfile.from_mapping(column_mapping, base)
+        except (StatementParseError, TypeError) as e:
+            raise ValidationError(f"Invalid column mapping: {e}")
+
+    async def import_statement(
+        self,
+        account_id: UUID,
+        source: BinaryIO,
+        filename: Optional[str] = None,
+        file_format: Optional[str] = None,
+        profile: Optional[str] = None,
+        column_mapping: Optional[Dict[str, Any]] = None,
+        created_by: Optional[UUID] = None,
+        run_detectors: bool = True
+    ) -> FinancialStatementImport:
+        """
+        Import a statement file into an account
+
+        Args:
+            account_id: Account the statement belongs to
+            source: Binary file object positioned at the start of the statement
+            filename: Original file name (used to detect the format)
+            file_format: csv, ofx or qif; detected from the name or content when omitted
+            profile: Built-in CSV column-mapping profile
+            column_mapping: Overrides for the profile (column names, date formats, separators)
+            created_by: Importing user
+            run_detectors: Run the case's suspicious-activity detectors after loading
+
+        Returns:
+            The completed FinancialStatementImport with row counts
+        """
+        account = (await self.db.execute(
+            select(FinancialAccount).where(FinancialAccount.id == account_id)
+        )).scalar_one_or_none()
+        if account is None:
+            raise NotFoundError(f"Financial account {account_id} not found")
+
+        resolved_profile = self.resolve_profile(profile, column_mapping)
+        head = source.read(1024)
+        source.seek(0)
+        file_format = (file_format or detect_format(filename, head.decode("utf-8", errors="replace"))).lower()
+        if file_format not in STATEMENT_FORMATS:
+            raise ValidationError(f"Unsupported statement format '{file_format}'")
+
+        statement_import = FinancialStatementImport(
+            case_id=account.case_id,
+            account_id=account.id,
+            filename=filename,
+            file_format=file_format,
+            profile=resolved_profile.name if file_format == "csv" else None,
+            status=StatementImportStatus.PROCESSING.value,
+            rows_parsed=0,
+            rows_inserted=0,
+            rows_duplicate=0,
+            rows_rejected=0,
+            errors=[],
+            created_by=created_by
+        )
+        self.db.add(statement_import)
+        # Committed up front so a failed load is still recorded
+        await self.db.commit()
+
+        started = datetime.now(UTC)
+        stream = io.TextIOWrapper(source, encoding=resolved_profile.encoding, errors="replace", newline="")
+        try:
+            counts = await self._load(statement_import, account, iter_statement(stream, file_format, resolved_profile))
+        except StatementParseError as e:
+            await self._fail(statement_import, str(e))
+            raise ValidationError(f"Statement could not be parsed: {e}")
+        except Exception as e:
+            logger.error("Statement import failed", import_id=str(statement_import.id), error=str(e))
+            await self._fail(statement_import, str(e))
+            raise ProcessingError(f"Statement import failed: {e}")
+        finally:
+            # Leave the caller's file object open
+            stream.detach()
+
+        statement_import.rows_parsed = counts["parsed"]
+        statement_import.rows_inserted = counts["inserted"]
+        statement_import.rows_duplicate = counts["duplicate"]
+        statement_import.rows_rejected = counts["rejected"]
+        statement_import.errors = counts["errors"]
+        statement_import.status = StatementImportStatus.COMPLETED.value
+        statement_import.completed_at = datetime.now(UTC)
+        await self.db.commit()
+        if counts["inserted"]:
+            # COPY bypasses the ORM flush hooks that normally invalidate the summary
+            await financial_summary_cache.invalidate([account.case_id])
+
+        logger.info(
+            "Statement imported",
+            import_id=str(statement_import.id),
+            account_id=str(account.id),
+            file_format=file_format,
+            parsed=counts["parsed"],
+            inserted=counts["inserted"],
+            duplicate=counts["duplicate"],
+            rejected=counts["rejected"],
+            seconds=round((datetime.now(UTC) - started).total_seconds(), 2)
+        )
+
+        if run_detectors and counts["inserted"]:
+            await self._run_detectors(account.case_id)
+        return statement_import
+
+    async def get_import(self, import_id: UUID) -> Optional[FinancialStatementImport]:
+        result = await self.db.execute(
+            select(FinancialStatementImport).where(FinancialStatementImport.id == import_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def _load(
+        self,
+        statement_import: FinancialStatementImport,
+        account: FinancialAccount,
+        records: Iterator[StatementRecord]
+    ) -> Dict[str, Any]:
+        """Parse and load every batch in one transaction; returns row counts"""
+        counts = {"parsed": 0, "inserted": 0, "duplicate": 0, "rejected": 0, "errors": []}
+        keyer = NaturalKeyer()
+        context = (account.id, account.case_id, statement_import.id, account.currency or "USD")
+
+        await self._prepare_staging()
+        while True:
+            rows, rejected, exhausted = await asyncio.to_thread(self._read_batch, records, keyer, context)
+            if rows:
+                inserted = await self._load_batch(rows)
+                counts["parsed"] += len(rows)
+                counts["inserted"] += inserted
+                counts["duplicate"] += len(rows) - inserted
+            counts["rejected"] += len(rejected)
+            room = settings.FINANCIAL_IMPORT_MAX_ERRORS - len(counts["errors"])
+            counts["errors"].extend({"line": row.line, "reason": row.reason} for row in rejected[:max(room, 0)])
+            if exhausted:
+                break
+
+        await self.db.commit()
+        return counts
+
+    def _read_batch(
+        self,
+        records: Iterator[StatementRecord],
+        keyer: NaturalKeyer,
+        context: Tuple[UUID, UUID, UUID, str]
+    ) -> Tuple[List[tuple], List[RejectedRow], bool]:
+        """Next batch of COPY rows (runs in a worker thread, parsing as it goes)"""
+        rows: List[tuple] = []
+        rejected: List[RejectedRow] = []
+        for record in records:
+            if isinstance(record, RejectedRow):
+                rejected.append(record)
+            else:
+                rows.append(self._copy_row(record, keyer.key(record), context))
+                if len(rows) >= self.batch_size:
+                    return rows, rejected, False
+        return rows, rejected, True
+
+    @staticmethod
+    def _copy_row(record: ParsedTransaction, natural_key: str, context: Tuple[UUID, UUID, UUID, str]) -> tuple:
+        account_id, case_id, import_id, default_currency = context
+        metadata = {
+            "source_line": record.line,
+            "signed_amount": str(record.amount),
+            **({"reference": record.reference} if record.reference else {}),
+            **({"external_id": record.external_id} if record.external_id else {}),
+            **record.extra
+        }
+        currency = (record.currency or default_currency)[:10]
+        return (
+            uuid.uuid4(), account_id, case_id, import_id, natural_key, record.transaction_date,
+            # Stored unsigned with the direction in transaction_type, like manually entered rows
+            quantize_amount(abs(record.amount), currency),
+            currency,
+            record.resolved_type.name,
+            record.description,
+            record.counterparty_name[:200] if record.counterparty_name else None,
+            record.counterparty_account[:100] if record.counterparty_account else None,
+            False, 0.0,
+            json.dumps(metadata)
+        )
+
+    async def _prepare_staging(self):
+        """Session-local staging table, dropped when the import transaction commits"""
+        await self.db.execute(text(
+            f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} "
+            "(LIKE financial_transactions INCLUDING DEFAULTS) ON COMMIT DROP"
+        ))
+
+    async def _load_batch(self, rows: List[tuple]) -> int:
+        """COPY a batch into staging and merge it; returns the number of new transactions"""
+        connection = await self.db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            STAGING_TABLE, records=rows, columns=list(COPY_COLUMNS)
+        )
+
+        columns = ", ".join(COPY_COLUMNS + ("created_at",))
+        result = await self.db.execute(text(
+            f"INSERT INTO financial_transactions ({columns}) "
+            f"SELECT {columns} FROM {STAGING_TABLE} "
+            "ON CONFLICT (account_id, natural_key_hash) DO NOTHING"
+        ))
+        await self.db.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+        return result.rowcount
+
+    async def _fail(self, statement_import: FinancialStatementImport, error: str):
+        await self.db.rollback()
+        statement_import.status = StatementImportStatus.FAILED.value
+        statement_import.error_message = error[:1000]
+        statement_import.completed_at = datetime.now(UTC)
+        await self.db.commit()
+
+    async def _run_detectors(self, case_id: UUID):
+        from services.financial_analysis_service import FinancialAnalysisService
+
+        try:
+            await FinancialAnalysisService(self.db).run_analysis(case_id)
+        except Exception as e:
+            # The statement is loaded; analysis can be re-triggered from the analyze endpoint
+            logger.error("Post-import financial analysis failed", case_id=str(case_id), error=str(e))
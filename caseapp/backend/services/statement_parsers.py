@@ -0,0 +1,434 @@
+"""
+Streaming bank statement parsers (CSV with column-mapping profiles, OFX/QFX and QIF)
+
+Parsers are generators over a text stream and hold at most one record (plus a small read buffer)
+in memory, so a production of several hundred thousand rows parses in constant memory. Each yields
+``ParsedTransaction`` for good records and ``RejectedRow`` for records that cannot be read;
+only a structurally unusable file (e.g. a CSV without the mapped columns) raises.
+"""
+
+import csv
+import hashlib
+import html
+import re
+from dataclasses import dataclass, field, fields, replace
+from datetime import datetime, timedelta, timezone, UTC
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Any, Dict, Iterator, Optional, TextIO, Tuple, Union
+
+from models.financial_analysis import TransactionType
+
+CENT = Decimal("0.01")
+DEFAULT_DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y", "%Y/%m/%d", "%d-%b-%Y", "%d %b %Y", "%b %d, %Y")
+QIF_DATE_FORMATS = ("%m/%d/%Y", "%m/%d/%y", "%Y-%m-%d", "%d.%m.%Y")
+OFX_READ_SIZE = 64 * 1024
+
+STATEMENT_FORMATS = ("csv", "ofx", "qif")
+
+class StatementParseError(Exception):
+    """Statement file that cannot be parsed at all"""
+
+@dataclass
+class StatementProfile:
+    """
+    How to read a CSV statement: which header holds each field and how values are written
+
+    Column names are matched case-insensitively. A statement has either one signed ``amount``
+    column or separate ``debit``/``credit`` columns (both written as positive numbers).
+    """
+    name: str
+    date_column: str = "date"
+    amount_column: Optional[str] = "amount"
+    debit_column: Optional[str] = None
+    credit_column: Optional[str] = None
+    description_column: Optional[str] = "description"
+    counterparty_column: Optional[str] = None
+    counterparty_account_column: Optional[str] = None
+    reference_column: Optional[str] = None
+    type_column: Optional[str] = None
+    currency_column: Optional[str] = None
+    date_formats: Tuple[str, ...] = DEFAULT_DATE_FORMATS
+    delimiter: str = ","
+    decimal_separator: str = "."
+    negative_is_debit: bool = True  # False for card statements that list charges as positive
+    skip_rows: int = 0  # Preamble lines before the header row
+    encoding: str = "utf-8-sig"
+    currency: str = "USD"
+
+    @classmethod
+    def from_mapping(cls, mapping: Dict[str, Any], base: Optional["StatementProfile"] = None) -> "StatementProfile":
+        """Profile from a user-supplied mapping, optionally layered over a built-in profile"""
+        known = {f.name for f in fields(cls)}
+        unknown = set(mapping) - known
+        if unknown:
+            raise StatementParseError(f"Unknown profile settings: {', '.join(sorted(unknown))}")
+        values = dict(mapping)
+        if "date_formats" in values:
+            values["date_formats"] = tuple(values["date_formats"])
+        if base is None:
+            return cls(**{"name": "custom", **values})
+        return replace(base, **{"name": f"{base.name}+custom", **values})
+
+STATEMENT_PROFILES: Dict[str, StatementProfile] = {
+    "generic": StatementProfile("generic"),
+    "debit_credit": StatementProfile("debit_credit", amount_column=None, debit_column="debit", credit_column="credit"),
+    "european": StatementProfile(
+        "european", date_formats=("%d.%m.%Y", "%d/%m/%Y", "%Y-%m-%d"), delimiter=";", decimal_separator=","
+    ),
+    "credit_card": StatementProfile("credit_card", negative_is_debit=False),
+}
+
+TYPE_ALIASES: Dict[str, TransactionType] = {
+    "credit": TransactionType.CREDIT, "cr": TransactionType.CREDIT, "deposit": TransactionType.CREDIT,
+    "dep": TransactionType.CREDIT, "int": TransactionType.CREDIT, "div": TransactionType.CREDIT,
+    "directdep": TransactionType.CREDIT,
+    "debit": TransactionType.DEBIT, "dr": TransactionType.DEBIT, "withdrawal": TransactionType.DEBIT,
+    "payment": TransactionType.DEBIT, "pos": TransactionType.DEBIT, "check": TransactionType.DEBIT,
+    "fee": TransactionType.DEBIT, "srvchg": TransactionType.DEBIT, "directdebit": TransactionType.DEBIT,
+    "repeatpmt": TransactionType.DEBIT,
+    "transfer": TransactionType.TRANSFER, "xfer": TransactionType.TRANSFER,
+    "wire": TransactionType.WIRE_TRANSFER, "wire_transfer": TransactionType.WIRE_TRANSFER,
+    "atm": TransactionType.CASH_WITHDRAWAL, "cash": TransactionType.CASH_WITHDRAWAL,
+    "cash_withdrawal": TransactionType.CASH_WITHDRAWAL, "cash_deposit": TransactionType.CASH_DEPOSIT,
+    "crypto": TransactionType.CRYPTO_TRANSFER, "crypto_transfer": TransactionType.CRYPTO_TRANSFER,
+}
+
+@dataclass
+class ParsedTransaction:
+    """One statement record; ``amount`` is signed (negative = money out of the account)"""
+    line: int  # CSV line or OFX/QIF record number, for error reports
+    transaction_date: datetime
+    amount: Decimal
+    description: Optional[str] = None
+    counterparty_name: Optional[str] = None
+    counterparty_account: Optional[str] = None
+    reference: Optional[str] = None
+    currency: Optional[str] = None
+    transaction_type: Optional[TransactionType] = None
+    external_id: Optional[str] = None  # Institution's own transaction id (OFX FITID)
+    extra: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def resolved_type(self) -> TransactionType:
+        if self.transaction_type is not None:
+            return self.transaction_type
+        return TransactionType.DEBIT if self.amount < 0 else TransactionType.CREDIT
+
+    def base_key(self) -> bytes:
+        """
+        Identity of the record independent of where it appears in the file
+
+        Institutions' transaction ids are authoritative; otherwise the posting date, signed amount,
+        normalised description and reference identify the record.
+        """
+        if self.external_id:
+            material = f"id|{self.external_id}"
+        else:
+            description = " ".join((self.description or "").upper().split())
+            material = f"{self.transaction_date.date().isoformat()}|{self.amount}|{description}|{self.reference or ''}"
+        return hashlib.blake2b(material.encode(), digest_size=16).digest()
+
+@dataclass
+class RejectedRow:
+    line: int
+    reason: str
+
+StatementRecord = Union[ParsedTransaction, RejectedRow]
+
+class NaturalKeyer:
+    """
+    Natural-key hashes for a statement's records
+
+    Identical records within one file (two same-day purchases of the same amount) are told apart
+    by their occurrence number, so re-importing a file dedupes every row while still keeping
+    legitimate repeats.
+    """
+
+    def __init__(self):
+        self._seen: Dict[bytes, int] = {}
+
+    def key(self, record: ParsedTransaction) -> str:
+        base = record.base_key()
+        occurrence = self._seen.get(base, 0)
+        self._seen[base] = occurrence + 1
+        return hashlib.sha256(base + occurrence.to_bytes(4, "big")).hexdigest()
+
+def parse_amount(value: str, decimal_separator: str = ".") -> Decimal:
+    """
+    Signed Decimal amount from statement notation, rounded to cents
+
+    Handles currency symbols, thousands separators, ``(1,234.56)`` and trailing-minus negatives,
+    and ``CR``/``DR`` suffixes.
+    """
+    text = value.strip().upper()
+    if not text:
+        raise ValueError("empty amount")
+
+    negative = False
+    if "(" in text and text.endswith(")"):
+        negative, text = True, text.replace("(", "")[:-1]
+    if text.endswith("DR"):
+        negative, text = True, text[:-2]
+    elif text.endswith("CR"):
+        text = text[:-2]
+    text = re.sub(r"[^\d,.\-+]", "", text)
+    if text.endswith("-"):
+        negative, text = not negative, text[:-1]
+    if text.startswith("-"):
+        negative, text = not negative, text[1:]
+    text = text.lstrip("+")
+
+    if decimal_separator == ",":
+        text = text.replace(".", "").replace(",", ".")
+    else:
+        text = text.replace(",", "")
+
+    try:
+        amount = Decimal(text).quantize(CENT, rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        raise ValueError(f"invalid amount {value!r}")
+    return -amount if negative else amount
+
+def parse_date(value: str, formats: Tuple[str, ...] = DEFAULT_DATE_FORMATS) -> datetime:
+    text = value.strip()
+    for date_format in formats:
+        try:
+            return datetime.strptime(text, date_format).replace(tzinfo=UTC)
+        except ValueError:
+            continue
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"unrecognised date {value!r}")
+    return parsed.replace(tzinfo=UTC) if parsed.tzinfo is None else parsed.astimezone(UTC)
+
+def parse_type(value: Optional[str]) -> Optional[TransactionType]:
+    if not value:
+        return None
+    return TYPE_ALIASES.get(value.strip().lower().replace(" ", "_"))
+
+def detect_format(filename: Optional[str], head: str) -> str:
+    """Statement format from the file extension, falling back to the first bytes of the file"""
+    extension = (filename or "").rsplit(".", 1)[-1].lower() if filename and "." in filename else ""
+    if extension in ("ofx", "qfx"):
+        return "ofx"
+    if extension == "qif":
+        return "qif"
+    if extension in ("csv", "txt", "tsv"):
+        return "csv"
+
+    stripped = head.lstrip("\ufeff \r\n\t")
+    if stripped.startswith("OFXHEADER") or "<OFX>" in head.upper():
+        return "ofx"
+    if stripped.startswith("!Type") or stripped.startswith("!Account"):
+        return "qif"
+    return "csv"
+
+def iter_statement(stream: TextIO, file_format: str, profile: StatementProfile) -> Iterator[StatementRecord]:
+    if file_format == "csv":
+        return parse_csv(stream, profile)
+    if file_format == "ofx":
+        return parse_ofx(stream, profile)
+    if file_format == "qif":
+        return parse_qif(stream, profile)
+    raise StatementParseError(f"Unsupported statement format: {file_format}")
+
+def parse_csv(stream: TextIO, profile: StatementProfile) -> Iterator[StatementRecord]:
+    for _ in range(profile.skip_rows):
+        stream.readline()
+
+    reader = csv.reader(stream, delimiter=profile.delimiter)
+    header = next(reader, None)
+    if header is None:
+        raise StatementParseError("Statement is empty")
+    columns = {name.strip().lower(): index for index, name in enumerate(header)}
+
+    def index_of(column: Optional[str], required: bool = False) -> Optional[int]:
+        if column is None:
+            return None
+        index = columns.get(column.strip().lower())
+        if index is None and required:
+            raise StatementParseError(
+                f"Column '{column}' not found for profile '{profile.name}' (header: {', '.join(header)})"
+            )
+        return index
+
+    date_index = index_of(profile.date_column, required=True)
+    amount_index = index_of(profile.amount_column, required=profile.debit_column is None)
+    debit_index = index_of(profile.debit_column, required=amount_index is None)
+    credit_index = index_of(profile.credit_column, required=amount_index is None)
+    optional = {
+        "description": index_of(profile.description_column),
+        "counterparty_name": index_of(profile.counterparty_column),
+        "counterparty_account": index_of(profile.counterparty_account_column),
+        "reference": index_of(profile.reference_column),
+        "type": index_of(profile.type_column),
+        "currency": index_of(profile.currency_column),
+    }
+
+    def cell(row, index) -> Optional[str]:
+        if index is None or index >= len(row):
+            return None
+        return row[index].strip() or None
+
+    for row in reader:
+        line = profile.skip_rows + reader.line_num
+        if not any(value.strip() for value in row):
+            continue
+        try:
+            transaction_date = parse_date(cell(row, date_index) or "", profile.date_formats)
+            if amount_index is not None:
+                amount = parse_amount(cell(row, amount_index) or "", profile.decimal_separator)
+            else:
+                debit, credit = cell(row, debit_index), cell(row, credit_index)
+                if debit is None and credit is None:
+                    raise ValueError("no debit or credit amount")
+                amount = (
+                    (parse_amount(credit, profile.decimal_separator) if credit else Decimal(0))
+                    - (abs(parse_amount(debit, profile.decimal_separator)) if debit else Decimal(0))
+                )
+            if not profile.negative_is_debit:
+                amount = -amount
+        except ValueError as e:
+            yield RejectedRow(line, str(e))
+            continue
+
+        yield ParsedTransaction(
+            line=line,
+            transaction_date=transaction_date,
+            amount=amount,
+            description=cell(row, optional["description"]),
+            counterparty_name=cell(row, optional["counterparty_name"]),
+            counterparty_account=cell(row, optional["counterparty_account"]),
+            reference=cell(row, optional["reference"]),
+            currency=cell(row, optional["currency"]) or profile.currency,
+            transaction_type=parse_type(cell(row, optional["type"]))
+        )
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+_OFX_DATE = re.compile(r"^(\d{8})(\d{6})?(?:\.\d+)?(?:\[([+-]?\d+(?:\.\d+)?)(?::[^\]]*)?\])?")
+
+def parse_ofx_date(value: str) -> datetime:
+    match = _OFX_DATE.match(value.strip())
+    if not match:
+        raise ValueError(f"unrecognised OFX date {value!r}")
+    date_part, time_part, offset = match.groups()
+    parsed = datetime.strptime(date_part + (time_part or "000000"), "%Y%m%d%H%M%S")
+    tz = timezone(timedelta(hours=float(offset))) if offset else UTC
+    return parsed.replace(tzinfo=tz).astimezone(UTC)
+
+def _ofx_elements(stream: TextIO) -> Iterator[Tuple[bool, str, str]]:
+    """(closing, tag, value) for each tag, reading the stream in fixed-size chunks"""
+    buffer = ""
+    while True:
+        chunk = stream.read(OFX_READ_SIZE)
+        buffer += chunk
+        # Only tokenise up to the last '<' so a tag or value split across chunks is kept whole
+        cut = len(buffer) if not chunk else buffer.rfind("<")
+        if cut > 0:
+            for match in _OFX_TAG.finditer(buffer, 0, cut):
+                yield match.group(1) == "/", match.group(2).upper(), html.unescape(match.group(3).strip())
+            buffer = buffer[cut:]
+        if not chunk:
+            return
+
+def parse_ofx(stream: TextIO, profile: StatementProfile) -> Iterator[StatementRecord]:
+    """OFX 1.x (SGML, unclosed leaf tags) and 2.x (XML) bank and card statements"""
+    currency = profile.currency
+    current: Optional[Dict[str, str]] = None
+    in_counterparty = False
+    record = 0
+
+    for closing, tag, value in _ofx_elements(stream):
+        if tag == "STMTTRN":
+            if not closing:
+                current, in_counterparty = {}, False
+                record += 1
+                continue
+            if current is None:
+                continue
+            try:
+                yield _ofx_transaction(record, current, currency)
+            except ValueError as e:
+                yield RejectedRow(record, str(e))
+            current = None
+        elif current is None:
+            if tag == "CURDEF" and value:
+                currency = value
+        elif tag in ("BANKACCTTO", "CCACCTTO"):
+            in_counterparty = not closing
+        elif not closing and value:
+            key = f"TO_{tag}" if in_counterparty else tag
+            current.setdefault(key, value)
+
+def _ofx_transaction(record: int, values: Dict[str, str], currency: str) -> ParsedTransaction:
+    if "DTPOSTED" not in values or "TRNAMT" not in values:
+        raise ValueError("transaction without DTPOSTED or TRNAMT")
+    name, memo = values.get("NAME"), values.get("MEMO")
+    return ParsedTransaction(
+        line=record,
+        transaction_date=parse_ofx_date(values["DTPOSTED"]),
+        amount=parse_amount(values["TRNAMT"]),
+        description=" - ".join(part for part in (name, memo) if part) or None,
+        counterparty_name=name,
+        counterparty_account=values.get("TO_ACCTID"),
+        reference=values.get("CHECKNUM") or values.get("REFNUM"),
+        currency=values.get("CURSYM") or currency,
+        transaction_type=parse_type(values.get("TRNTYPE")),
+        external_id=values.get("FITID")
+    )
+
+def parse_qif(stream: TextIO, profile: StatementProfile) -> Iterator[StatementRecord]:
+    """Quicken Interchange Format bank, cash and card registers"""
+    date_formats = profile.date_formats if profile.date_formats != DEFAULT_DATE_FORMATS else QIF_DATE_FORMATS
+    current: Dict[str, str] = {}
+    record = 0
+
+    for raw_line in stream:
+        line = raw_line.rstrip("\r\n")
+        if not line or line.startswith("!"):
+            continue
+        code, value = line[0], line[1:].strip()
+        if code != "^":
+            # Split lines (S/E/$) repeat per split; the transaction-level value comes first
+            current.setdefault(code, value)
+            continue
+
+        record += 1
+        if current:
+            try:
+                yield _qif_transaction(record, current, date_formats, profile)
+            except ValueError as e:
+                yield RejectedRow(record, str(e))
+        current = {}
+
+    if current:
+        record += 1
+        try:
+            yield _qif_transaction(record, current, date_formats, profile)
+        except ValueError as e:
+            yield RejectedRow(record, str(e))
+
+def _qif_transaction(
+    record: int,
+    values: Dict[str, str],
+    date_formats: Tuple[str, ...],
+    profile: StatementProfile
+) -> ParsedTransaction:
+    amount_text = values.get("T") or values.get("U")
+    if "D" not in values or not amount_text:
+        raise ValueError("record without date or amount")
+    # Quicken writes two-digit years after an apostrophe (1/15'24) and pads with spaces
+    date_text = values["D"].replace("'", "/").replace(" ", "")
+    payee, memo = values.get("P"), values.get("M")
+    extra = {"category": values["L"]} if values.get("L") else {}
+    return ParsedTransaction(
+        line=record,
+        transaction_date=parse_date(date_text, date_formats),
+        amount=parse_amount(amount_text, profile.decimal_separator),
+        description=" - ".join(part for part in (payee, memo) if part) or None,
+        counterparty_name=payee,
+        reference=values.get("N"),
+        currency=profile.currency,
+        extra=extra
+    )
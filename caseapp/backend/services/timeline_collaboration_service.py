@@ -6,14 +6,15 @@ import structlog
 from datetime import datetime, timedelta, UTC
 from typing import Optional, Dict, Any, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, desc, delete
+from sqlalchemy import select, and_, or_, func, desc, delete, update, case
 from sqlalchemy.orm import selectinload
 import uuid
 import secrets
 
 from core.database import AsyncSessionLocal
+from models.case import Case
 from models.timeline import (
-    CaseTimeline, TimelineCollaboration, TimelineComment, 
+    CaseTimeline, TimelineCollaboration, TimelineComment, TimelineEvent,
     CollaborationSession
 )
 from models.user import User
@@ -221,6 +222,26 @@ class TimelineCollaborationService:
                 
                 thread_depth = parent_comment.thread_depth + 1
             
+            # Maintain the event's counters in the comment's transaction; the UPDATE's row lock
+            # orders concurrent comments on the same event
+            prior_comment = select(TimelineComment.id).where(
+                and_(
+                    TimelineComment.timeline_event_id == event_id,
+                    TimelineComment.created_by == user_id
+                )
+            ).exists()
+            counters = await db.execute(
+                update(TimelineEvent)
+                .where(TimelineEvent.id == event_id)
+                .values(
+                    comment_count=TimelineEvent.comment_count + 1,
+                    comment_participant_count=TimelineEvent.comment_participant_count + case((prior_comment, 0), else_=1)
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if counters.rowcount == 0:
+                raise ValueError("Timeline event not found")
+            
             # Create comment
             comment = TimelineComment(
                 timeline_event_id=event_id,
@@ -248,55 +269,145 @@ class TimelineCollaborationService:
         """Get comments for a timeline event"""
         
         async with AsyncSessionLocal() as db:
-            query = select(TimelineComment, User).join(
-                User, TimelineComment.created_by == User.id
-            ).where(TimelineComment.timeline_event_id == event_id)
-            
-            if not include_internal:
-                query = query.where(TimelineComment.is_internal == False)
-            
-            query = query.order_by(TimelineComment.created_at)
-            
-            result = await db.execute(query)
-            
-            comments = []
-            for comment, user in result:
-                comment_data = {
-                    'id': str(comment.id),
-                    'timeline_event_id': str(comment.timeline_event_id),
-                    'comment_text': comment.comment_text,
-                    'is_internal': comment.is_internal,
-                    'parent_comment_id': str(comment.parent_comment_id) if comment.parent_comment_id else None,
-                    'thread_depth': comment.thread_depth,
-                    'created_at': comment.created_at,
-                    'updated_at': comment.updated_at,
-                    'created_by_id': str(comment.created_by),
-                    'user_name': user.full_name,
-                    'is_resolved': comment.is_resolved
+            return await self._fetch_comments(db, [event_id], include_internal)
+    
+    async def get_comment_threads(
+        self,
+        timeline_id: str,
+        event_ids: List[str],
+        include_internal: bool = True
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get comment threads and discussion counts for many timeline events at once
+        
+        Two queries regardless of the number of events: one for the counters, one for every
+        comment. Threads are rebuilt from the flat rows by grouping on parent_comment_id; a reply
+        whose parent is filtered out (an internal comment) is promoted to a root. Without internal
+        comments the counts are taken from the visible comments rather than the stored counters.
+        
+        Returns:
+            Event ID -> {comment_count, participant_count, comments} for the requested events that
+            belong to the timeline, each comment carrying its replies, oldest first
+        """
+        
+        event_ids = [uuid.UUID(str(event_id)) for event_id in event_ids]
+        
+        async with AsyncSessionLocal() as db:
+            counts = await db.execute(
+                select(
+                    TimelineEvent.id,
+                    TimelineEvent.comment_count,
+                    TimelineEvent.comment_participant_count
+                ).where(
+                    and_(
+                        TimelineEvent.timeline_id == uuid.UUID(str(timeline_id)),
+                        TimelineEvent.id.in_(event_ids)
+                    )
+                )
+            )
+            threads = {
+                str(event_id): {
+                    'comment_count': comment_count,
+                    'participant_count': participant_count,
+                    'comments': []
                 }
-                comments.append(comment_data)
+                for event_id, comment_count, participant_count in counts
+            }
             
-            return comments
+            comments = await self._fetch_comments(
+                db, [uuid.UUID(event_id) for event_id in threads], include_internal
+            )
+        
+        if not include_internal:
+            # The stored counters include internal comments, so count the visible ones instead
+            participants: Dict[str, set] = {event_id: set() for event_id in threads}
+            for thread in threads.values():
+                thread['comment_count'] = 0
+            for comment in comments:
+                threads[comment['timeline_event_id']]['comment_count'] += 1
+                participants[comment['timeline_event_id']].add(comment['created_by_id'])
+            for event_id, users in participants.items():
+                threads[event_id]['participant_count'] = len(users)
+        
+        by_id = {comment['id']: comment for comment in comments}
+        for comment in comments:
+            comment['replies'] = []
+        for comment in comments:
+            parent = by_id.get(comment['parent_comment_id'])
+            if parent is not None:
+                parent['replies'].append(comment)
+            else:
+                threads[comment['timeline_event_id']]['comments'].append(comment)
+        
+        return threads
+    
+    async def _fetch_comments(
+        self,
+        db: AsyncSession,
+        event_ids: List[Any],
+        include_internal: bool
+    ) -> List[Dict[str, Any]]:
+        """Flat comments for the given events with their authors, oldest first"""
+        
+        if not event_ids:
+            return []
+        
+        query = select(TimelineComment, User.first_name, User.last_name).join(
+            User, TimelineComment.created_by == User.id
+        ).where(TimelineComment.timeline_event_id.in_(event_ids))
+        
+        if not include_internal:
+            query = query.where(TimelineComment.is_internal == False)
+        
+        query = query.order_by(TimelineComment.created_at, TimelineComment.id)
+        
+        result = await db.execute(query)
+        
+        comments = []
+        for comment, first_name, last_name in result:
+            comment_data = {
+                'id': str(comment.id),
+                'timeline_event_id': str(comment.timeline_event_id),
+                'comment_text': comment.comment_text,
+                'is_internal': comment.is_internal,
+                'parent_comment_id': str(comment.parent_comment_id) if comment.parent_comment_id else None,
+                'thread_depth': comment.thread_depth,
+                'created_at': comment.created_at,
+                'updated_at': comment.updated_at,
+                'created_by_id': str(comment.created_by),
+                'user_name': f"{first_name} {last_name}",
+                'is_resolved': comment.is_resolved
+            }
+            comments.append(comment_data)
+        
+        return comments
     
     async def get_user_collaborations(self, user_id: str) -> List[Dict[str, Any]]:
         """Get all timeline collaborations for a user"""
         
         async with AsyncSessionLocal() as db:
+            # Only the case title is needed, so join for it instead of loading each Case
             result = await db.execute(
-                select(TimelineCollaboration, CaseTimeline)
+                select(
+                    TimelineCollaboration,
+                    CaseTimeline.id,
+                    CaseTimeline.title,
+                    CaseTimeline.case_id,
+                    Case.title
+                )
                 .join(CaseTimeline, TimelineCollaboration.timeline_id == CaseTimeline.id)
+                .outerjoin(Case, CaseTimeline.case_id == Case.id)
                 .where(TimelineCollaboration.user_id == user_id)
-                .options(selectinload(CaseTimeline.case))
             )
             
             collaborations = []
-            for collaboration, timeline in result:
+            for collaboration, timeline_id, timeline_title, case_id, case_title in result:
                 collaboration_data = {
                     'collaboration_id': str(collaboration.id),
-                    'timeline_id': str(timeline.id),
-                    'timeline_title': timeline.title,
-                    'case_id': str(timeline.case_id),
-                    'case_title': timeline.case.title if timeline.case else None,
+                    'timeline_id': str(timeline_id),
+                    'timeline_title': timeline_title,
+                    'case_id': str(case_id),
+                    'case_title': case_title,
                     'permissions': {
                         'can_view': collaboration.can_view,
                         'can_edit': collaboration.can_edit,
@@ -9,17 +9,6 @@ from datetime import datetime, UTC
 from typing import Optional, Dict, Any, List, Tuple
 from uuid import UUID
 import structlog
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib.colors import HexColor, black, white, grey
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib.patches import Rectangle
-import seaborn as sns
-from PIL import Image, ImageDraw, ImageFont
 import io
 import base64
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -29,6 +18,17 @@ from services.timeline_service import TimelineService
 from services.audit_service import AuditService
 from models.timeline import TimelineEvent
 from schemas.timeline import TimelineExportRequest
+from core.lazy_imports import lazy_import
+
+# PDF and chart libraries are imported on first export
+pagesizes = lazy_import("reportlab.lib.pagesizes")
+reportlab_styles = lazy_import("reportlab.lib.styles")
+units = lazy_import("reportlab.lib.units")
+reportlab_colors = lazy_import("reportlab.lib.colors")
+platypus = lazy_import("reportlab.platypus")
+enums = lazy_import("reportlab.lib.enums")
+plt = lazy_import("matplotlib.pyplot")
+mdates = lazy_import("matplotlib.dates")
 
 logger = structlog.get_logger()
 
@@ -213,9 +213,9 @@ class TimelineExportService:
         filename = f"timeline_{export_data['case_id']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         filepath = f"/tmp/{filename}"
         
-        doc = SimpleDocTemplate(
+        doc = platypus.SimpleDocTemplate(
             filepath,
-            pagesize=letter,
+            pagesize=pagesizes.letter,
             rightMargin=72,
             leftMargin=72,
             topMargin=72,
@@ -224,29 +224,29 @@ class TimelineExportService:
         
         # Build PDF content
         story = []
-        styles = getSampleStyleSheet()
+        styles = reportlab_styles.getSampleStyleSheet()
         
         # Custom styles
-        title_style = ParagraphStyle(
+        title_style = reportlab_styles.ParagraphStyle(
             'CustomTitle',
             parent=styles['Heading1'],
             fontSize=24,
             spaceAfter=30,
-            alignment=TA_CENTER,
-            textColor=HexColor('#1976D2')
+            alignment=enums.TA_CENTER,
+            textColor=reportlab_colors.HexColor('#1976D2')
         )
         
-        event_title_style = ParagraphStyle(
+        event_title_style = reportlab_styles.ParagraphStyle(
             'EventTitle',
             parent=styles['Heading2'],
             fontSize=14,
             spaceAfter=12,
-            textColor=HexColor('#333333')
+            textColor=reportlab_colors.HexColor('#333333')
         )
         
         # Title page
-        story.append(Paragraph(export_data['title'], title_style))
-        story.append(Spacer(1, 12))
+        story.append(platypus.Paragraph(export_data['title'], title_style))
+        story.append(platypus.Spacer(1, 12))
         
         # Timeline metadata
         stats = export_data['statistics']
@@ -263,8 +263,8 @@ class TimelineExportService:
             end_date = datetime.fromisoformat(stats['date_range']['end']).strftime('%B %d, %Y')
             metadata_data.append(['Date Range:', f"{start_date} - {end_date}"])
         
-        metadata_table = Table(metadata_data, colWidths=[2*inch, 3*inch])
-        metadata_table.setStyle(TableStyle([
+        metadata_table = platypus.Table(metadata_data, colWidths=[2*units.inch, 3*units.inch])
+        metadata_table.setStyle(platypus.TableStyle([
             ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
             ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
             ('FONTSIZE', (0, 0), (-1, -1), 10),
@@ -272,12 +272,12 @@ class TimelineExportService:
         ]))
         
         story.append(metadata_table)
-        story.append(Spacer(1, 24))
-        story.append(PageBreak())
+        story.append(platypus.Spacer(1, 24))
+        story.append(platypus.PageBreak())
         
         # Timeline events
-        story.append(Paragraph("Timeline Events", styles['Heading1']))
-        story.append(Spacer(1, 12))
+        story.append(platypus.Paragraph("Timeline Events", styles['Heading1']))
+        story.append(platypus.Spacer(1, 12))
         
         for event in export_data['events']:
             # Event header
@@ -288,7 +288,7 @@ class TimelineExportService:
             if event['is_milestone']:
                 title_text = f"🏆 {title_text} (Milestone)"
             
-            story.append(Paragraph(title_text, event_title_style))
+            story.append(platypus.Paragraph(title_text, event_title_style))
             
             # Event details table
             event_details = [
@@ -303,26 +303,26 @@ class TimelineExportService:
             if event.get('participants'):
                 event_details.append(['Participants:', ', '.join(event['participants'])])
             
-            details_table = Table(event_details, colWidths=[1.5*inch, 4*inch])
-            details_table.setStyle(TableStyle([
+            details_table = platypus.Table(event_details, colWidths=[1.5*units.inch, 4*units.inch])
+            details_table.setStyle(platypus.TableStyle([
                 ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
                 ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
                 ('FONTSIZE', (0, 0), (-1, -1), 9),
                 ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-                ('GRID', (0, 0), (-1, -1), 0.5, grey),
+                ('GRID', (0, 0), (-1, -1), 0.5, reportlab_colors.grey),
             ]))
             
             story.append(details_table)
-            story.append(Spacer(1, 6))
+            story.append(platypus.Spacer(1, 6))
             
             # Event description
             if event.get('description'):
-                story.append(Paragraph(f"<b>Description:</b> {event['description']}", styles['Normal']))
-                story.append(Spacer(1, 6))
+                story.append(platypus.Paragraph(f"<b>Description:</b> {event['description']}", styles['Normal']))
+                story.append(platypus.Spacer(1, 6))
             
             # Evidence section
             if event.get('evidence_pins'):
-                story.append(Paragraph("<b>Evidence:</b>", styles['Normal']))
+                story.append(platypus.Paragraph("<b>Evidence:</b>", styles['Normal']))
                 
                 evidence_data = []
                 for pin in event['evidence_pins']:
@@ -340,23 +340,23 @@ class TimelineExportService:
                     ])
                 
                 if evidence_data:
-                    evidence_table = Table(
+                    evidence_table = platypus.Table(
                         [['Type', 'Evidence ID', 'Relevance', 'Primary', 'Description']] + evidence_data,
-                        colWidths=[0.8*inch, 1.2*inch, 0.8*inch, 0.6*inch, 2.2*inch]
+                        colWidths=[0.8*units.inch, 1.2*units.inch, 0.8*units.inch, 0.6*units.inch, 2.2*units.inch]
                     )
-                    evidence_table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (-1, 0), HexColor('#E3F2FD')),
-                        ('TEXTCOLOR', (0, 0), (-1, 0), black),
+                    evidence_table.setStyle(platypus.TableStyle([
+                        ('BACKGROUND', (0, 0), (-1, 0), reportlab_colors.HexColor('#E3F2FD')),
+                        ('TEXTCOLOR', (0, 0), (-1, 0), reportlab_colors.black),
                         ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
                         ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
                         ('FONTSIZE', (0, 0), (-1, -1), 8),
                         ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-                        ('GRID', (0, 0), (-1, -1), 0.5, grey),
+                        ('GRID', (0, 0), (-1, -1), 0.5, reportlab_colors.grey),
                     ]))
                     
                     story.append(evidence_table)
             
-            story.append(Spacer(1, 18))
+            story.append(platypus.Spacer(1, 18))
         
         # Build PDF
         doc.build(story)
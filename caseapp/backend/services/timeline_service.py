@@ -3,27 +3,36 @@ Timeline management service with event creation, evidence pinning, and chronolog
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc, asc
+from sqlalchemy import select, func, and_, or_, desc, asc, update, values, column, String, DateTime
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import selectinload
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Set, Tuple
 from uuid import UUID
 from datetime import datetime, timedelta, UTC
+from itertools import groupby
+import asyncio
 import structlog
 
 from models.timeline import TimelineEvent, EvidencePin, TimelineComment, EventType
 from models.case import Case
-from models.document import Document
 from schemas.timeline import (
     TimelineEventCreateRequest, TimelineEventUpdateRequest,
     EvidencePinCreateRequest, EvidencePinUpdateRequest,
     TimelineCommentCreateRequest, TimelineCommentUpdateRequest,
-    TimelineEventResponse, EvidencePinResponse, TimelineCommentResponse
+    TimelineEventResponse, EvidencePinResponse, TimelineCommentResponse, EvidenceSummary
 )
+from core.config import settings
+from core.database import AsyncSessionLocal
 from core.exceptions import CaseManagementException
+from core.lexorank import rank_between, spread_ranks
 from services.audit_service import AuditService
+from services.evidence_resolver import EvidenceResolver, evidence_key
 
 logger = structlog.get_logger()
 
+# Rows per UPDATE ... FROM (VALUES ...), three bind parameters each
+RANK_UPDATE_CHUNK = 5000
+
 class TimelineService:
     """Service for timeline and event management"""
     
@@ -65,8 +74,8 @@ class TimelineService:
                     error_code="INVALID_DATE_RANGE"
                 )
             
-            # Get display order for events on the same date
-            display_order = await self._get_next_display_order(
+            # Rank after the events already at the same timestamp
+            sort_rank = await self._get_next_sort_rank(
                 event_request.case_id, 
                 event_request.event_date
             )
@@ -84,7 +93,7 @@ class TimelineService:
                 participants=event_request.participants or [],
                 importance_level=event_request.importance_level,
                 is_milestone=event_request.is_milestone,
-                display_order=display_order,
+                sort_rank=sort_rank,
                 color=event_request.color,
                 event_metadata=event_request.event_metadata or {},
                 created_by=created_by
@@ -322,7 +331,7 @@ class TimelineService:
             # Apply ordering and pagination
             query = query.order_by(
                 TimelineEvent.event_date.asc(),
-                TimelineEvent.display_order.asc()
+                TimelineEvent.sort_rank.asc()
             ).offset(offset).limit(limit)
             
             # Execute query
@@ -335,6 +344,27 @@ class TimelineService:
             logger.error("Failed to get case timeline", case_id=str(case_id), error=str(e))
             raise CaseManagementException(f"Failed to get case timeline: {str(e)}")
     
+    async def resolve_pin_evidence(
+        self,
+        case_id: UUID,
+        pins: List[EvidencePinResponse]
+    ) -> List[EvidencePinResponse]:
+        """
+        Attach the pinned document, media or forensic item to each pin response
+        
+        Args:
+            case_id: Case the pins belong to
+            pins: Evidence pin responses, typically every pin of a page of events
+            
+        Returns:
+            The same responses with evidence set (None where the evidence no longer exists)
+        """
+        resolved = await EvidenceResolver(self.db).resolve_case_pins(case_id, pins)
+        for pin in pins:
+            summary = resolved.get(evidence_key(pin.evidence_type, pin.evidence_id))
+            pin.evidence = EvidenceSummary.model_validate(summary) if summary else None
+        return pins
+    
     async def pin_evidence_to_event(
         self, 
         pin_request: EvidencePinCreateRequest, 
@@ -359,8 +389,10 @@ class TimelineService:
                     error_code="EVENT_NOT_FOUND"
                 )
             
-            # Validate evidence exists based on type
-            await self._validate_evidence_exists(pin_request.evidence_type, pin_request.evidence_id)
+            # Validate the evidence exists and belongs to the event's case
+            await self._validate_evidence_exists(
+                pin_request.evidence_type, pin_request.evidence_id, event.case_id
+            )
             
             # Get display order for evidence pins
             display_order = await self._get_next_pin_display_order(pin_request.timeline_event_id)
@@ -512,6 +544,104 @@ class TimelineService:
             logger.error("Failed to remove evidence pin", pin_id=str(pin_id), error=str(e))
             raise CaseManagementException(f"Failed to remove evidence pin: {str(e)}")
     
+    async def move_timeline_event(
+        self,
+        case_id: UUID,
+        event_id: UUID,
+        moved_by: UUID,
+        previous_event_id: Optional[UUID] = None,
+        next_event_id: Optional[UUID] = None,
+        new_date: Optional[datetime] = None
+    ) -> TimelineEvent:
+        """
+        Move one event between two neighbours, optionally to a new date
+        
+        Only the moved event is written: it takes a rank between its neighbours' ranks. Ranks
+        order events that share a timestamp, so a neighbour at a different timestamp leaves that
+        side open, and an open side is bounded by the nearest other event at the timestamp.
+        Without a neighbour at the timestamp the event goes after the events already there.
+        
+        Args:
+            case_id: Case UUID
+            event_id: Event being moved
+            moved_by: UUID of the user moving the event
+            previous_event_id: Event that should come immediately before it
+            next_event_id: Event that should come immediately after it
+            new_date: New event date, if the move changes it
+            
+        Returns:
+            The moved timeline event
+        """
+        try:
+            ids = {event_id, previous_event_id, next_event_id} - {None}
+            if len(ids) != len([i for i in (event_id, previous_event_id, next_event_id) if i]):
+                raise CaseManagementException(
+                    "An event cannot be its own neighbour",
+                    error_code="INVALID_REORDER"
+                )
+            
+            result = await self.db.execute(
+                select(TimelineEvent.id, TimelineEvent.event_date, TimelineEvent.sort_rank)
+                .where(and_(TimelineEvent.case_id == case_id, TimelineEvent.id.in_(ids)))
+            )
+            positions = {row.id: row for row in result}
+            if len(positions) != len(ids):
+                raise CaseManagementException(
+                    "Timeline event not found in this case",
+                    error_code="EVENT_NOT_FOUND"
+                )
+            
+            event_date = new_date or positions[event_id].event_date
+            before, after = [
+                positions[neighbour_id].sort_rank
+                if neighbour_id and positions[neighbour_id].event_date == event_date else None
+                for neighbour_id in (previous_event_id, next_event_id)
+            ]
+            if before is not None and after is not None and not before < after:
+                raise CaseManagementException(
+                    "Previous event does not come before next event",
+                    error_code="INVALID_REORDER"
+                )
+            if before is None or after is None:
+                before, after = await self._open_rank_bounds(case_id, event_id, event_date, before, after)
+            sort_rank = rank_between(before, after)
+            
+            await self.db.execute(
+                update(TimelineEvent)
+                .where(TimelineEvent.id == event_id)
+                .values(
+                    event_date=event_date,
+                    sort_rank=sort_rank,
+                    updated_by=moved_by,
+                    updated_at=datetime.now(UTC)
+                )
+                .execution_options(synchronize_session=False)
+            )
+            
+            await self.audit_service.log_action(
+                entity_type="timeline_event",
+                entity_id=event_id,
+                action="move",
+                user_id=moved_by,
+                case_id=case_id,
+                new_value=f"Moved event to {event_date} at rank {sort_rank}"
+            )
+            
+            await self.db.commit()
+            
+            if len(sort_rank) > settings.TIMELINE_RANK_MAX_LENGTH:
+                schedule_rank_rebalance(case_id)
+            
+            [event] = await self._get_ordered_events([event_id])
+            return event
+            
+        except Exception as e:
+            await self.db.rollback()
+            if isinstance(e, CaseManagementException):
+                raise
+            logger.error("Failed to move timeline event", event_id=str(event_id), error=str(e))
+            raise CaseManagementException(f"Failed to move timeline event: {str(e)}")
+    
     async def reorder_timeline_events(
         self, 
         case_id: UUID, 
@@ -521,6 +651,9 @@ class TimelineService:
         """
         Reorder timeline events with date validation
         
+        The batch is written in one statement. Within each timestamp the listed events are
+        re-ranked in display_order order after the events not listed, which keep their ranks.
+        
         Args:
             case_id: Case UUID
             event_orders: List of {event_id, new_date, display_order}
@@ -530,36 +663,44 @@ class TimelineService:
             List of updated timeline events
         """
         try:
-            updated_events = []
-            
-            for order_data in event_orders:
+            orders = []
+            for position, order_data in enumerate(event_orders):
                 event_id = order_data.get('event_id')
-                new_date = order_data.get('new_date')
-                display_order = order_data.get('display_order', 0)
-                
                 if not event_id:
                     continue
                 
-                event = await self.get_timeline_event(UUID(event_id))
-                if not event or event.case_id != case_id:
-                    continue
-                
-                # Update event date and order if provided
-                if new_date:
-                    # Validate chronological constraints
-                    if isinstance(new_date, str):
-                        new_date = datetime.fromisoformat(new_date.replace('Z', '+00:00'))
-                    
-                    # Check if this violates any chronological constraints
-                    # (This is where you'd implement business rules for date validation)
-                    
-                    event.event_date = new_date
-                
-                event.display_order = display_order
-                event.updated_by = reordered_by
-                event.updated_at = datetime.now(UTC)
+                new_date = order_data.get('new_date')
+                if isinstance(new_date, str):
+                    new_date = datetime.fromisoformat(new_date.replace('Z', '+00:00'))
                 
-                updated_events.append(event)
+                orders.append((UUID(str(event_id)), new_date, order_data.get('display_order') or 0, position))
+            
+            result = await self.db.execute(
+                select(TimelineEvent.id, TimelineEvent.event_date)
+                .where(and_(
+                    TimelineEvent.case_id == case_id,
+                    TimelineEvent.id.in_([event_id for event_id, *_ in orders])
+                ))
+            )
+            current_dates = dict(result.all())
+            
+            # Events outside the case are skipped
+            moves = sorted(
+                (new_date or current_dates[event_id], display_order, position, event_id)
+                for event_id, new_date, display_order, position in orders
+                if event_id in current_dates
+            )
+            last_ranks = await self._last_unlisted_ranks(
+                case_id, {move[0] for move in moves}, [move[3] for move in moves]
+            )
+            rows = []
+            for event_date, group in groupby(moves, key=lambda move: move[0]):
+                group = list(group)
+                ranks = spread_ranks(len(group), last_ranks.get(event_date))
+                for (_, _, _, event_id), sort_rank in zip(group, ranks):
+                    rows.append({'id': event_id, 'event_date': event_date, 'sort_rank': sort_rank})
+            
+            await self._write_ranks(case_id, rows, reordered_by)
             
             # Create audit log for reordering
             await self.audit_service.log_action(
@@ -568,7 +709,7 @@ class TimelineService:
                 action="reorder",
                 user_id=reordered_by,
                 case_id=case_id,
-                new_value=f"Reordered {len(updated_events)} timeline events"
+                new_value=f"Reordered {len(rows)} timeline events"
             )
             
             await self.db.commit()
@@ -576,16 +717,52 @@ class TimelineService:
             logger.info(
                 "Timeline events reordered",
                 case_id=str(case_id),
-                event_count=len(updated_events)
+                event_count=len(rows)
             )
             
-            return updated_events
+            return await self._get_ordered_events([row['id'] for row in rows])
             
         except Exception as e:
             await self.db.rollback()
             logger.error("Failed to reorder timeline events", case_id=str(case_id), error=str(e))
             raise CaseManagementException(f"Failed to reorder timeline events: {str(e)}")
     
+    async def rebalance_event_ranks(self, case_id: UUID) -> int:
+        """
+        Re-spread the ranks of every timestamp in a case that has an overlong or missing rank
+        
+        Repeated moves between the same neighbours lengthen ranks by a digit every few moves;
+        this rewrites just the affected timestamps with short, evenly spaced keys.
+        
+        Returns:
+            Number of events re-ranked
+        """
+        result = await self.db.execute(
+            select(TimelineEvent.id, TimelineEvent.event_date, TimelineEvent.sort_rank)
+            .where(TimelineEvent.case_id == case_id)
+            .order_by(
+                TimelineEvent.event_date,
+                TimelineEvent.sort_rank,
+                TimelineEvent.created_at,
+                TimelineEvent.id
+            )
+        )
+        
+        rows = []
+        for event_date, group in groupby(result.all(), key=lambda row: row.event_date):
+            group = list(group)
+            if all(row.sort_rank and len(row.sort_rank) <= settings.TIMELINE_RANK_MAX_LENGTH for row in group):
+                continue
+            for row, sort_rank in zip(group, spread_ranks(len(group))):
+                rows.append({'id': row.id, 'event_date': event_date, 'sort_rank': sort_rank})
+        
+        if rows:
+            await self._write_ranks(case_id, rows)
+            await self.db.commit()
+        
+        logger.info("Timeline ranks rebalanced", case_id=str(case_id), event_count=len(rows))
+        return len(rows)
+    
     # Helper methods
     async def _get_case(self, case_id: UUID) -> Optional[Case]:
         """Get case by ID for validation"""
@@ -601,15 +778,102 @@ class TimelineService:
         )
         return result.scalar_one_or_none()
     
-    async def _get_next_display_order(self, case_id: UUID, event_date: datetime) -> int:
-        """Get the next display order for events on the same date"""
+    async def _get_next_sort_rank(self, case_id: UUID, event_date: datetime) -> str:
+        """Get a rank after the events already at this timestamp"""
         result = await self.db.execute(
-            select(func.coalesce(func.max(TimelineEvent.display_order), 0))
+            select(func.max(TimelineEvent.sort_rank))
             .where(TimelineEvent.case_id == case_id)
-            .where(func.date(TimelineEvent.event_date) == event_date.date())
+            .where(TimelineEvent.event_date == event_date)
         )
-        max_order = result.scalar() or 0
-        return max_order + 1
+        return rank_between(result.scalar(), None)
+    
+    async def _open_rank_bounds(
+        self,
+        case_id: UUID,
+        event_id: UUID,
+        event_date: datetime,
+        before: Optional[str],
+        after: Optional[str]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Close an open side with the nearest rank of the other events at this timestamp"""
+        others = and_(
+            TimelineEvent.case_id == case_id,
+            TimelineEvent.event_date == event_date,
+            TimelineEvent.id != event_id
+        )
+        if after is not None:
+            query = select(func.max(TimelineEvent.sort_rank)).where(others, TimelineEvent.sort_rank < after)
+            return (await self.db.execute(query)).scalar(), after
+        if before is not None:
+            query = select(func.min(TimelineEvent.sort_rank)).where(others, TimelineEvent.sort_rank > before)
+            return before, (await self.db.execute(query)).scalar()
+        query = select(func.max(TimelineEvent.sort_rank)).where(others)
+        return (await self.db.execute(query)).scalar(), None
+    
+    async def _last_unlisted_ranks(
+        self,
+        case_id: UUID,
+        event_dates: Set[datetime],
+        listed_ids: List[UUID]
+    ) -> Dict[datetime, str]:
+        """Highest rank at each timestamp among the events a reorder leaves in place"""
+        if not event_dates:
+            return {}
+        result = await self.db.execute(
+            select(TimelineEvent.event_date, func.max(TimelineEvent.sort_rank))
+            .where(and_(
+                TimelineEvent.case_id == case_id,
+                TimelineEvent.event_date.in_(event_dates),
+                TimelineEvent.id.not_in(listed_ids)
+            ))
+            .group_by(TimelineEvent.event_date)
+        )
+        return {event_date: sort_rank for event_date, sort_rank in result if sort_rank is not None}
+    
+    async def _write_ranks(
+        self,
+        case_id: UUID,
+        rows: List[Dict[str, Any]],
+        updated_by: Optional[UUID] = None
+    ):
+        """Apply {id, event_date, sort_rank} rows, one UPDATE ... FROM (VALUES ...) per chunk"""
+        if not rows:
+            return
+        audit_values = {'updated_at': datetime.now(UTC)}
+        if updated_by:
+            audit_values['updated_by'] = updated_by
+        
+        for start in range(0, len(rows), RANK_UPDATE_CHUNK):
+            ranks = values(
+                column('id', PG_UUID(as_uuid=True)),
+                column('event_date', DateTime(timezone=True)),
+                column('sort_rank', String),
+                name='ranks'
+            ).data([
+                (row['id'], row['event_date'], row['sort_rank'])
+                for row in rows[start:start + RANK_UPDATE_CHUNK]
+            ])
+            await self.db.execute(
+                update(TimelineEvent)
+                .where(and_(TimelineEvent.id == ranks.c.id, TimelineEvent.case_id == case_id))
+                .values(event_date=ranks.c.event_date, sort_rank=ranks.c.sort_rank, **audit_values)
+                .execution_options(synchronize_session=False)
+            )
+    
+    async def _get_ordered_events(self, event_ids: List[UUID]) -> List[TimelineEvent]:
+        """Events with their related data, in timeline order"""
+        result = await self.db.execute(
+            select(TimelineEvent)
+            .options(
+                selectinload(TimelineEvent.creator),
+                selectinload(TimelineEvent.evidence_pins),
+                selectinload(TimelineEvent.comments)
+            )
+            .where(TimelineEvent.id.in_(event_ids))
+            .order_by(TimelineEvent.event_date, TimelineEvent.sort_rank)
+            .execution_options(populate_existing=True)
+        )
+        return list(result.scalars().all())
     
     async def _get_next_pin_display_order(self, event_id: UUID) -> int:
         """Get the next display order for evidence pins on an event"""
@@ -620,16 +884,33 @@ class TimelineService:
         max_order = result.scalar() or 0
         return max_order + 1
     
-    async def _validate_evidence_exists(self, evidence_type: str, evidence_id: UUID) -> bool:
-        """Validate that evidence exists based on type"""
-        if evidence_type == "document":
-            result = await self.db.execute(
-                select(Document).where(Document.id == evidence_id)
-            )
-            if not result.scalar_one_or_none():
-                raise CaseManagementException(
-                    f"Document with ID {evidence_id} not found",
-                    error_code="EVIDENCE_NOT_FOUND"
-                )
-        # TODO: Add validation for media and forensic evidence when those models are implemented
-        return True
\ No newline at end of file
+    async def _validate_evidence_exists(
+        self,
+        evidence_type: str,
+        evidence_id: UUID,
+        case_id: Optional[UUID] = None
+    ) -> bool:
+        """Validate that evidence of any pinnable type exists (in the case, when given)"""
+        await EvidenceResolver(self.db).validate([(evidence_type, evidence_id)], case_id)
+        return True
+
+# Cases with a rank rebalance in flight; holds the tasks until they finish
+_rebalance_tasks: Dict[UUID, asyncio.Task] = {}
+
+def schedule_rank_rebalance(case_id: UUID):
+    """Rebalance a case's timeline ranks in the background, once at a time per case"""
+    if case_id in _rebalance_tasks:
+        return
+    task = asyncio.create_task(rebalance_timeline_ranks(case_id))
+    _rebalance_tasks[case_id] = task
+    task.add_done_callback(lambda _: _rebalance_tasks.pop(case_id, None))
+
+async def rebalance_timeline_ranks(case_id: UUID) -> int:
+    """Rebalance a case's timeline ranks in a session of its own"""
+    async with AsyncSessionLocal() as db:
+        try:
+            return await TimelineService(db, AuditService(db)).rebalance_event_ranks(case_id)
+        except Exception as e:
+            await db.rollback()
+            logger.error("Timeline rank rebalance failed", case_id=str(case_id), error=str(e))
+            return 0
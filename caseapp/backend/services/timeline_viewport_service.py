@@ -0,0 +1,245 @@
+"""
+Timeline viewport service - date-window queries that return raw events or server-side buckets
+"""
+
+import base64
+import json
+from datetime import UTC, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+import structlog
+from sqlalchemy import DateTime, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.exceptions import CaseManagementException
+from models.timeline import EvidencePin, TimelineEvent
+
+logger = structlog.get_logger()
+
+# Bucket widths, finest first, with their approximate length for choosing an automatic zoom
+ZOOM_SECONDS = {
+    "hour": 3600,
+    "day": 86400,
+    "week": 7 * 86400,
+    "month": 2629746,
+    "quarter": 7889238,
+    "year": 31556952,
+}
+ZOOM_LEVELS = ("auto", "events", *ZOOM_SECONDS)
+
+# The summary projection a viewport plots; pins and comments are fetched per event on demand
+VIEWPORT_EVENT_COLUMNS = (
+    TimelineEvent.id,
+    TimelineEvent.case_id,
+    TimelineEvent.title,
+    TimelineEvent.event_type,
+    TimelineEvent.event_date,
+    TimelineEvent.end_date,
+    TimelineEvent.all_day,
+    TimelineEvent.location,
+    TimelineEvent.importance_level,
+    TimelineEvent.is_milestone,
+    TimelineEvent.sort_rank,
+    TimelineEvent.comment_count,
+)
+
+def encode_viewport_cursor(event_date: datetime, sort_rank: str, event_id: UUID) -> str:
+    """Opaque keyset cursor for the position after an event"""
+    payload = json.dumps([event_date.isoformat(), sort_rank, str(event_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_viewport_cursor(cursor: str) -> Tuple[datetime, str, UUID]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        event_date, sort_rank, event_id = json.loads(payload)
+        return datetime.fromisoformat(event_date), str(sort_rank), UUID(event_id)
+    except (ValueError, TypeError):
+        raise CaseManagementException("Invalid pagination cursor", error_code="INVALID_CURSOR")
+
+def choose_zoom(start_date: datetime, end_date: datetime, max_buckets: int) -> str:
+    """The finest bucket width that splits the window into at most max_buckets buckets"""
+    span = (end_date - start_date).total_seconds()
+    for zoom, seconds in ZOOM_SECONDS.items():
+        if span / seconds <= max_buckets:
+            return zoom
+    return "year"
+
+class TimelineViewportService:
+    """
+    Zoomable reads of one timeline over a date window
+
+    Every query is a range scan of ix_timeline_events_timeline_date: raw events are keyset
+    paginated on (event_date, sort_rank, id), and buckets come back from a single grouped,
+    windowed query with their counts and most important events.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_viewport(
+        self,
+        timeline_id: UUID,
+        start_date: datetime,
+        end_date: datetime,
+        zoom: str = "auto",
+        event_types: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        top_events: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Events or buckets of a timeline within [start_date, end_date)
+
+        Args:
+            timeline_id: Timeline ID
+            start_date: Window start (inclusive)
+            end_date: Window end (exclusive)
+            zoom: "events", a bucket width (hour ... year), or "auto" to return raw events when
+                the window holds at most limit of them and the finest fitting buckets otherwise
+            event_types: Optional event type filter
+            limit: Page size for raw events
+            cursor: next_cursor from the previous page of raw events
+            top_events: Events listed per bucket
+
+        Returns:
+            Dictionary with mode ("events" or "buckets"), zoom, total_count, and either events
+            and next_cursor or buckets
+        """
+        if zoom not in ZOOM_LEVELS:
+            raise CaseManagementException(f"Unknown zoom level: {zoom}", error_code="INVALID_ZOOM")
+        if end_date <= start_date:
+            raise CaseManagementException("End date must be after start date", error_code="INVALID_DATE_RANGE")
+
+        limit = limit or settings.TIMELINE_VIEWPORT_PAGE_SIZE
+        filters = self._filters(timeline_id, start_date, end_date, event_types)
+        total = await self.db.scalar(select(func.count()).select_from(TimelineEvent).where(*filters))
+
+        if zoom == "auto":
+            zoom = "events" if cursor or total <= limit else choose_zoom(
+                start_date, end_date, settings.TIMELINE_VIEWPORT_MAX_BUCKETS
+            )
+
+        viewport = {
+            "timeline_id": timeline_id,
+            "start_date": start_date,
+            "end_date": end_date,
+            "zoom": zoom,
+            "total_count": total,
+            "events": [],
+            "next_cursor": None,
+            "buckets": [],
+        }
+        if zoom == "events":
+            viewport["mode"] = "events"
+            viewport["events"], viewport["next_cursor"] = await self._list_events(filters, limit, cursor)
+        else:
+            viewport["mode"] = "buckets"
+            viewport["buckets"] = await self._bucket_events(
+                filters, zoom, top_events or settings.TIMELINE_VIEWPORT_TOP_EVENTS
+            )
+        return viewport
+
+    @staticmethod
+    def _filters(
+        timeline_id: UUID,
+        start_date: datetime,
+        end_date: datetime,
+        event_types: Optional[Sequence[str]]
+    ) -> List[Any]:
+        filters = [
+            TimelineEvent.timeline_id == timeline_id,
+            TimelineEvent.event_date >= start_date,
+            TimelineEvent.event_date < end_date,
+        ]
+        if event_types:
+            filters.append(TimelineEvent.event_type.in_(event_types))
+        return filters
+
+    async def _list_events(
+        self,
+        filters: List[Any],
+        limit: int,
+        cursor: Optional[str]
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        query = select(*VIEWPORT_EVENT_COLUMNS).where(*filters)
+        if cursor:
+            query = query.where(
+                tuple_(TimelineEvent.event_date, TimelineEvent.sort_rank, TimelineEvent.id)
+                > tuple_(*decode_viewport_cursor(cursor))
+            )
+        query = query.order_by(TimelineEvent.event_date, TimelineEvent.sort_rank, TimelineEvent.id)
+
+        # One extra row tells whether another page exists
+        result = await self.db.execute(query.limit(limit + 1))
+        events = [dict(row) for row in result.mappings().all()]
+        next_cursor = None
+        if len(events) > limit:
+            events = events[:limit]
+            last = events[-1]
+            next_cursor = encode_viewport_cursor(last["event_date"], last["sort_rank"], last["id"])
+
+        await self._attach_evidence_counts(events)
+        return events, next_cursor
+
+    async def _bucket_events(self, filters: List[Any], zoom: str, top_events: int) -> List[Dict[str, Any]]:
+        bucket = self._bucket_expression(zoom)
+        ranked = (
+            select(
+                *VIEWPORT_EVENT_COLUMNS,
+                bucket.label("bucket"),
+                func.count().over(partition_by=bucket).label("bucket_count"),
+                func.row_number().over(
+                    partition_by=bucket,
+                    order_by=(
+                        func.coalesce(TimelineEvent.is_milestone, False).desc(),
+                        func.coalesce(TimelineEvent.importance_level, 0).desc(),
+                        TimelineEvent.event_date,
+                        TimelineEvent.sort_rank,
+                        TimelineEvent.id
+                    )
+                ).label("position")
+            )
+            .where(*filters)
+            .subquery()
+        )
+        result = await self.db.execute(
+            select(ranked)
+            .where(ranked.c.position <= top_events)
+            .order_by(ranked.c.bucket, ranked.c.position)
+        )
+
+        buckets: List[Dict[str, Any]] = []
+        events: List[Dict[str, Any]] = []
+        for row in result.mappings():
+            event = dict(row)
+            start = _as_datetime(event.pop("bucket"))
+            count = event.pop("bucket_count")
+            event.pop("position")
+            if not buckets or buckets[-1]["start"] != start:
+                buckets.append({"start": start, "count": count, "top_events": []})
+            buckets[-1]["top_events"].append(event)
+            events.append(event)
+
+        await self._attach_evidence_counts(events)
+        return buckets
+
+    def _bucket_expression(self, zoom: str):
+        """date_trunc of the event date in UTC"""
+        return func.date_trunc(zoom, func.timezone("UTC", TimelineEvent.event_date), type_=DateTime)
+
+    async def _attach_evidence_counts(self, events: List[Dict[str, Any]]):
+        """Evidence pin counts for a page of events, in one grouped query"""
+        if not events:
+            return
+        result = await self.db.execute(
+            select(EvidencePin.timeline_event_id, func.count())
+            .where(EvidencePin.timeline_event_id.in_([event["id"] for event in events]))
+            .group_by(EvidencePin.timeline_event_id)
+        )
+        counts = dict(result.all())
+        for event in events:
+            event["evidence_count"] = counts.get(event["id"], 0)
+
+def _as_datetime(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=UTC)
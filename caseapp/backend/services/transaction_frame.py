@@ -0,0 +1,106 @@
+"""
+Columnar view of a case's transactions for vectorised detectors
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import BigInteger, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.lazy_imports import lazy_import
+from core.money import AMOUNT_FACTOR
+from models.financial_analysis import FinancialTransaction, TransactionType
+from services.money_flow_graph import epoch_seconds
+
+np = lazy_import("numpy")
+
+TYPE_CODES = {transaction_type: code for code, transaction_type in enumerate(TransactionType)}
+LOAD_BATCH_SIZE = 5000
+
+@dataclass
+class TransactionFrame:
+    """
+    A case's transactions as parallel NumPy arrays, in time order
+
+    Amounts are exact int64 counts of thousandths (scaled in the database from NUMERIC), times are
+    UTC epoch seconds, and transaction types, counterparty accounts and currencies are integer codes
+    into small label lists (-1 when missing).
+    """
+    ids: List[UUID]
+    times: np.ndarray
+    amounts: np.ndarray
+    types: np.ndarray
+    counterparties: np.ndarray
+    counterparty_labels: List[str]
+    currencies: np.ndarray
+    currency_labels: List[str]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    async def load(cls, db: AsyncSession, case_id: UUID) -> "TransactionFrame":
+        result = await db.stream(
+            select(
+                FinancialTransaction.id,
+                FinancialTransaction.transaction_date,
+                cast(func.round(FinancialTransaction.amount * AMOUNT_FACTOR), BigInteger),
+                FinancialTransaction.transaction_type,
+                FinancialTransaction.counterparty_account,
+                FinancialTransaction.currency
+            )
+            .where(FinancialTransaction.case_id == case_id)
+            .order_by(FinancialTransaction.transaction_date, FinancialTransaction.id)
+            .execution_options(yield_per=LOAD_BATCH_SIZE)
+        )
+
+        ids: List[UUID] = []
+        times: List[int] = []
+        amounts: List[int] = []
+        types: List[int] = []
+        counterparties: List[int] = []
+        currencies: List[int] = []
+        counterparty_codes: Dict[str, int] = {}
+        currency_codes: Dict[str, int] = {}
+        async for partition in result.partitions():
+            for tx_id, transaction_date, amount, transaction_type, counterparty, currency in partition:
+                ids.append(tx_id)
+                times.append(epoch_seconds(transaction_date))
+                amounts.append(amount)
+                types.append(TYPE_CODES.get(transaction_type, -1))
+                counterparties.append(_code(counterparty_codes, counterparty))
+                currencies.append(_code(currency_codes, currency))
+
+        return cls(
+            ids=ids,
+            times=np.asarray(times, dtype=np.int64),
+            amounts=np.asarray(amounts, dtype=np.int64),
+            types=np.asarray(types, dtype=np.int8),
+            counterparties=np.asarray(counterparties, dtype=np.int32),
+            counterparty_labels=list(counterparty_codes),
+            currencies=np.asarray(currencies, dtype=np.int32),
+            currency_labels=list(currency_codes)
+        )
+
+    def type_mask(self, *transaction_types: TransactionType) -> np.ndarray:
+        return np.isin(self.types, [TYPE_CODES[transaction_type] for transaction_type in transaction_types])
+
+    def counterparty(self, index: int) -> Optional[str]:
+        code = self.counterparties[index]
+        return self.counterparty_labels[code] if code >= 0 else None
+
+    def currency(self, index: int) -> Optional[str]:
+        code = self.currencies[index]
+        return self.currency_labels[code] if code >= 0 else None
+
+def _code(codes: Dict[str, int], value: Optional[str]) -> int:
+    if value is None:
+        return -1
+    code = codes.get(value)
+    if code is None:
+        code = codes[value] = len(codes)
+    return code
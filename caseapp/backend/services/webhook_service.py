@@ -5,16 +5,28 @@ Validates Requirements 10.6
 """
 
 import asyncio
-import json
+import heapq
+import itertools
+import os
+import random
+import socket
 import uuid
 import aiohttp
+from collections import deque
 from datetime import datetime, timedelta, UTC
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Deque, Set
 from enum import Enum
 import logging
-from dataclasses import dataclass, asdict
-import hashlib
-import hmac
+from dataclasses import dataclass, field, asdict
+
+from sqlalchemy import select, delete, update, or_
+from sqlalchemy.dialects.postgresql import insert
+
+from core.config import settings
+from core.database import AsyncSessionLocal
+from core.http_client import http_client_registry
+from core.webhook_signing import encode_payload, encode_batch, sign_payload
+from models.external_sharing import WebhookSubscription, WebhookQueuedDelivery
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +53,18 @@ class WebhookStatus(str, Enum):
     RETRYING = "retrying"
     CANCELLED = "cancelled"
 
+class CircuitState(str, Enum):
+    """Per-endpoint circuit breaker state"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+# Deliveries still owned by the delivery engine
+OUTSTANDING_STATUSES = (WebhookStatus.PENDING, WebhookStatus.RETRYING)
+
+# 4xx responses worth retrying; any other 4xx is treated as a permanent rejection
+RETRYABLE_STATUS_CODES = (408, 425, 429)
+
 @dataclass
 class WebhookEndpoint:
     """Webhook endpoint configuration"""
@@ -54,6 +78,8 @@ class WebhookEndpoint:
     retry_delay_seconds: int = 60
     timeout_seconds: int = 30
     headers: Optional[Dict[str, str]] = None
+    batch_size: int = 1  # Events combined into one POST (1 = no batching)
+    max_concurrency: int = 1  # Requests in flight at once for this endpoint
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -73,25 +99,663 @@ class WebhookDelivery:
     error_message: Optional[str] = None
     retry_count: int = 0
     next_retry_at: Optional[datetime] = None
+    batch_id: Optional[str] = None
+    # Encoded once and shared by every endpoint receiving the same event; reused across retries
+    body: Optional[bytes] = field(default=None, repr=False)
+    signature: Optional[str] = field(default=None, repr=False)
+    signed_with: Optional[str] = field(default=None, repr=False)
+
+def compute_retry_delay(retry_count: int, base_delay_seconds: float, max_delay_seconds: float) -> float:
+    """Exponential backoff with equal jitter for a 1-based retry attempt"""
+    exponent = min(max(retry_count - 1, 0), 32)
+    delay = min(base_delay_seconds * (2 ** exponent), max_delay_seconds)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+class EndpointCircuitBreaker:
+    """Stops dispatching to an endpoint after repeated failures and probes it again after a cool-down"""
+    
+    def __init__(self, failure_threshold: int, reset_timeout_seconds: int):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[datetime] = None
+    
+    @property
+    def reopens_at(self) -> Optional[datetime]:
+        """When an open circuit will let a probe request through"""
+        if self.opened_at is None:
+            return None
+        return self.opened_at + timedelta(seconds=self.reset_timeout_seconds)
+    
+    def allows_request(self, now: datetime) -> bool:
+        """Whether a request may be sent, moving an expired open circuit to half-open"""
+        if self.state == CircuitState.OPEN:
+            if now < self.reopens_at:
+                return False
+            self.state = CircuitState.HALF_OPEN
+        return True
+    
+    def record_success(self) -> None:
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+    
+    def record_failure(self, now: datetime) -> None:
+        self.consecutive_failures += 1
+        if self.state == CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = CircuitState.OPEN
+            self.opened_at = now
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "reopens_at": self.reopens_at.isoformat() if self.state == CircuitState.OPEN else None
+        }
+
+class WebhookDeliveryStore:
+    """In-process delivery store; queued deliveries live only as long as the service"""
+    
+    durable = False
+    
+    async def save_endpoint(self, endpoint: WebhookEndpoint) -> None:
+        return None
+    
+    async def delete_endpoint(self, endpoint_id: str) -> None:
+        return None
+    
+    async def save_deliveries(self, deliveries: List[WebhookDelivery]) -> None:
+        return None
+    
+    async def load(self) -> Tuple[List[WebhookEndpoint], List[WebhookDelivery]]:
+        """Endpoints, and the outstanding deliveries this replica has claimed, to resume on startup"""
+        return [], []
+    
+    async def load_endpoints(self) -> List[WebhookEndpoint]:
+        """Every persisted endpoint, including those other replicas created"""
+        return []
+    
+    async def load_endpoint(self, endpoint_id: str) -> Optional[WebhookEndpoint]:
+        return None
+    
+    async def claim_deliveries(self) -> List[WebhookDelivery]:
+        """Claim outstanding deliveries that no live replica holds"""
+        return []
+    
+    async def renew_leases(self, delivery_ids: List[str]) -> Set[str]:
+        """Extend this replica's leases; returns the given deliveries now held by another replica"""
+        return set()
+    
+    async def release_leases(self, delivery_ids: Optional[List[str]] = None) -> None:
+        """Give up this replica's leases (all, or just delivery_ids) so another replica can resume them"""
+        return None
+
+class DatabaseWebhookDeliveryStore(WebhookDeliveryStore):
+    """
+    Persists endpoints and deliveries so queued and retrying work survives restarts
+    
+    Every API replica runs a delivery engine, so outstanding deliveries are leased: a replica
+    only dispatches rows it has claimed with FOR UPDATE SKIP LOCKED, renews those leases while it
+    holds them, and claims rows whose lease lapsed (a crashed or killed replica).
+    """
+    
+    durable = True
+    RESPONSE_BODY_LIMIT = 2000
+    LEASE_CHECK_CHUNK_SIZE = 5000
+    
+    def __init__(self, owner_id: Optional[str] = None, lease_seconds: Optional[int] = None):
+        self.owner_id = owner_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = lease_seconds or settings.WEBHOOK_DELIVERY_LEASE_SECONDS
+    
+    def _lease_expiry(self) -> datetime:
+        return datetime.now(UTC) + timedelta(seconds=self.lease_seconds)
+    
+    async def save_endpoint(self, endpoint: WebhookEndpoint) -> None:
+        async with AsyncSessionLocal() as session:
+            await session.merge(WebhookSubscription(
+                id=endpoint.id,
+                name=endpoint.name,
+                url=endpoint.url,
+                events=[event.value for event in endpoint.events],
+                secret=endpoint.secret,
+                headers=endpoint.headers or {},
+                active=endpoint.active,
+                max_retries=endpoint.max_retries,
+                retry_delay_seconds=endpoint.retry_delay_seconds,
+                timeout_seconds=endpoint.timeout_seconds,
+                batch_size=endpoint.batch_size,
+                max_concurrency=endpoint.max_concurrency,
+                created_at=endpoint.created_at,
+                updated_at=endpoint.updated_at
+            ))
+            await session.commit()
+    
+    async def delete_endpoint(self, endpoint_id: str) -> None:
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(WebhookSubscription).where(WebhookSubscription.id == endpoint_id))
+            await session.commit()
+    
+    async def save_deliveries(self, deliveries: List[WebhookDelivery]) -> None:
+        """Upsert delivery state in a single statement; the rows stay leased to this replica"""
+        if not deliveries:
+            return
+        
+        lease_expires_at = self._lease_expiry()
+        rows = [
+            {
+                "id": delivery.id,
+                "endpoint_id": delivery.endpoint_id,
+                "event_type": delivery.event_type.value,
+                "payload": delivery.payload,
+                "batch_id": delivery.batch_id,
+                "status": delivery.status.value,
+                "response_code": delivery.response_code,
+                "response_body": (delivery.response_body or "")[:self.RESPONSE_BODY_LIMIT] or None,
+                "error_message": delivery.error_message,
+                "created_at": delivery.created_at,
+                "delivered_at": delivery.delivered_at,
+                "retry_count": delivery.retry_count,
+                "next_retry_at": delivery.next_retry_at,
+                "owner_id": self.owner_id,
+                "lease_expires_at": lease_expires_at
+            }
+            for delivery in deliveries
+        ]
+        statement = insert(WebhookQueuedDelivery).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[WebhookQueuedDelivery.id],
+            set_={
+                column: statement.excluded[column]
+                for column in ("batch_id", "status", "response_code", "response_body", "error_message",
+                               "delivered_at", "retry_count", "next_retry_at", "owner_id", "lease_expires_at")
+            }
+        )
+        async with AsyncSessionLocal() as session:
+            await session.execute(statement)
+            await session.commit()
+    
+    async def load(self) -> Tuple[List[WebhookEndpoint], List[WebhookDelivery]]:
+        return await self.load_endpoints(), await self.claim_deliveries()
+    
+    async def load_endpoints(self) -> List[WebhookEndpoint]:
+        async with AsyncSessionLocal() as session:
+            subscriptions = (await session.execute(select(WebhookSubscription))).scalars().all()
+        return [self._endpoint(row) for row in subscriptions]
+    
+    async def load_endpoint(self, endpoint_id: str) -> Optional[WebhookEndpoint]:
+        async with AsyncSessionLocal() as session:
+            row = await session.get(WebhookSubscription, endpoint_id)
+        return self._endpoint(row) if row is not None else None
+    
+    @staticmethod
+    def _endpoint(row: WebhookSubscription) -> WebhookEndpoint:
+        return WebhookEndpoint(
+            id=row.id,
+            name=row.name,
+            url=row.url,
+            events=[WebhookEvent(event) for event in row.events or []],
+            secret=row.secret,
+            active=row.active,
+            max_retries=row.max_retries,
+            retry_delay_seconds=row.retry_delay_seconds,
+            timeout_seconds=row.timeout_seconds,
+            headers=row.headers or {},
+            batch_size=row.batch_size,
+            max_concurrency=row.max_concurrency,
+            created_at=row.created_at,
+            updated_at=row.updated_at or row.created_at
+        )
+    
+    @staticmethod
+    def claim_query(now: datetime, limit: int):
+        """Outstanding deliveries that are unowned or whose lease lapsed, skipping rows being claimed"""
+        return (
+            select(WebhookQueuedDelivery)
+            .where(
+                WebhookQueuedDelivery.status.in_([status.value for status in OUTSTANDING_STATUSES]),
+                or_(
+                    WebhookQueuedDelivery.owner_id.is_(None),
+                    WebhookQueuedDelivery.lease_expires_at.is_(None),
+                    WebhookQueuedDelivery.lease_expires_at < now
+                )
+            )
+            .order_by(WebhookQueuedDelivery.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+    
+    async def claim_deliveries(self) -> List[WebhookDelivery]:
+        """
+        Lease up to WEBHOOK_DELIVERY_CLAIM_BATCH unclaimed deliveries to this replica
+        
+        The rows are locked with FOR UPDATE SKIP LOCKED and leased in the same transaction, so
+        concurrent replicas always claim disjoint deliveries.
+        """
+        now = datetime.now(UTC)
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(
+                self.claim_query(now, settings.WEBHOOK_DELIVERY_CLAIM_BATCH)
+            )).scalars().all()
+            
+            deliveries = []
+            for row in rows:
+                row.owner_id = self.owner_id
+                row.lease_expires_at = now + timedelta(seconds=self.lease_seconds)
+                deliveries.append(WebhookDelivery(
+                    id=row.id,
+                    endpoint_id=row.endpoint_id,
+                    event_type=WebhookEvent(row.event_type),
+                    payload=row.payload,
+                    status=WebhookStatus(row.status),
+                    created_at=row.created_at,
+                    scheduled_at=row.next_retry_at or row.created_at,
+                    response_code=row.response_code,
+                    response_body=row.response_body,
+                    error_message=row.error_message,
+                    retry_count=row.retry_count,
+                    next_retry_at=row.next_retry_at,
+                    batch_id=row.batch_id
+                ))
+            await session.commit()
+        return deliveries
+    
+    async def renew_leases(self, delivery_ids: List[str]) -> Set[str]:
+        """Extend the leases of just the given deliveries, so rows this replica stopped tracking lapse"""
+        outstanding = [status.value for status in OUTSTANDING_STATUSES]
+        lost: Set[str] = set()
+        async with AsyncSessionLocal() as session:
+            for start in range(0, len(delivery_ids), self.LEASE_CHECK_CHUNK_SIZE):
+                chunk = delivery_ids[start:start + self.LEASE_CHECK_CHUNK_SIZE]
+                await session.execute(
+                    update(WebhookQueuedDelivery)
+                    .where(
+                        WebhookQueuedDelivery.id.in_(chunk),
+                        WebhookQueuedDelivery.owner_id == self.owner_id,
+                        WebhookQueuedDelivery.status.in_(outstanding)
+                    )
+                    .values(lease_expires_at=self._lease_expiry())
+                )
+                
+                # Rows another replica claimed after this replica's lease lapsed
+                result = await session.execute(
+                    select(WebhookQueuedDelivery.id).where(
+                        WebhookQueuedDelivery.id.in_(chunk),
+                        WebhookQueuedDelivery.owner_id != self.owner_id
+                    )
+                )
+                lost.update(result.scalars().all())
+            await session.commit()
+        return lost
+    
+    async def release_leases(self, delivery_ids: Optional[List[str]] = None) -> None:
+        conditions = [
+            WebhookQueuedDelivery.owner_id == self.owner_id,
+            WebhookQueuedDelivery.status.in_([status.value for status in OUTSTANDING_STATUSES])
+        ]
+        if delivery_ids is not None:
+            conditions.append(WebhookQueuedDelivery.id.in_(delivery_ids))
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(WebhookQueuedDelivery)
+                .where(*conditions)
+                .values(owner_id=None, lease_expires_at=None)
+            )
+            await session.commit()
+
+class WebhookDeliveryEngine:
+    """
+    Dispatches queued deliveries from per-endpoint FIFO queues.
+    
+    Each endpoint has bounded in-flight requests and its own circuit breaker, so a slow
+    or dead endpoint only holds its own slots. Failed attempts are rescheduled by timestamp
+    (exponential backoff with jitter) instead of sleeping inside a worker.
+    """
+    
+    def __init__(self, service: "WebhookService"):
+        self.service = service
+        self.ready: Dict[str, Deque[str]] = {}
+        self.scheduled: List[Tuple[datetime, int, str]] = []  # Heap of (due_at, sequence, delivery_id)
+        self.in_flight: Dict[str, int] = {}
+        self.breakers: Dict[str, EndpointCircuitBreaker] = {}
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._attempts: Set[asyncio.Task] = set()
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self) -> None:
+        """Start the dispatch loop (must run inside the event loop)"""
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(settings.WEBHOOK_MAX_CONCURRENT_DELIVERIES)
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop dispatching; interrupted attempts stay outstanding and resume on the next start"""
+        tasks = [task for task in [self._task, *self._attempts] if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._attempts.clear()
+        self.in_flight.clear()
+    
+    def enqueue(self, delivery: WebhookDelivery) -> None:
+        """Queue a delivery, or schedule it if it has a retry time in the future"""
+        if delivery.next_retry_at and delivery.next_retry_at > datetime.now(UTC):
+            heapq.heappush(self.scheduled, (delivery.next_retry_at, next(self._sequence), delivery.id))
+        else:
+            self.ready.setdefault(delivery.endpoint_id, deque()).append(delivery.id)
+        self.notify()
+    
+    def notify(self) -> None:
+        """Wake the dispatch loop"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+    
+    def drop_endpoint(self, endpoint_id: str) -> List[str]:
+        """Forget an endpoint's queue; scheduled retries are discarded when they fall due"""
+        self.breakers.pop(endpoint_id, None)
+        return list(self.ready.pop(endpoint_id, ()))
+    
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queued": sum(len(queue) for queue in self.ready.values()),
+            "scheduled_retries": len(self.scheduled),
+            "in_flight": sum(self.in_flight.values()),
+            "circuit_breakers": {
+                endpoint_id: breaker.to_dict()
+                for endpoint_id, breaker in self.breakers.items()
+                if breaker.state != CircuitState.CLOSED
+            }
+        }
+    
+    def breaker(self, endpoint_id: str) -> EndpointCircuitBreaker:
+        breaker = self.breakers.get(endpoint_id)
+        if breaker is None:
+            breaker = self.breakers[endpoint_id] = EndpointCircuitBreaker(
+                failure_threshold=settings.WEBHOOK_CIRCUIT_FAILURE_THRESHOLD,
+                reset_timeout_seconds=settings.WEBHOOK_CIRCUIT_RESET_SECONDS
+            )
+        return breaker
+    
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                next_wake = self._dispatch(datetime.now(UTC))
+            except Exception as e:
+                logger.error(f"Webhook dispatch error: {str(e)}")
+                next_wake = datetime.now(UTC) + timedelta(seconds=1)
+            
+            timeout = None
+            if next_wake is not None:
+                timeout = max((next_wake - datetime.now(UTC)).total_seconds(), 0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+    
+    def _dispatch(self, now: datetime) -> Optional[datetime]:
+        """Start every attempt that is due and return when the loop should next wake"""
+        # Retries that have fallen due go back to the front of their endpoint queue
+        due_retries = []
+        while self.scheduled and self.scheduled[0][0] <= now:
+            due_retries.append(heapq.heappop(self.scheduled)[2])
+        for delivery_id in reversed(due_retries):
+            delivery = self.service.deliveries.get(delivery_id)
+            if delivery is not None and delivery.status in OUTSTANDING_STATUSES:
+                self.ready.setdefault(delivery.endpoint_id, deque()).appendleft(delivery_id)
+        
+        next_wake = self.scheduled[0][0] if self.scheduled else None
+        
+        for endpoint_id in list(self.ready):
+            queue = self.ready[endpoint_id]
+            if not queue:
+                del self.ready[endpoint_id]
+                continue
+            
+            endpoint = self.service.endpoints.get(endpoint_id)
+            if endpoint is None:
+                self.service._resolve_endpoint(endpoint_id, self.ready.pop(endpoint_id))
+                continue
+            if not endpoint.active:
+                self.service._cancel_queued(endpoint_id, self.ready.pop(endpoint_id))
+                continue
+            
+            breaker = self.breaker(endpoint_id)
+            if not breaker.allows_request(now):
+                if next_wake is None or breaker.reopens_at < next_wake:
+                    next_wake = breaker.reopens_at
+                continue
+            
+            # A half-open circuit lets a single probe request through
+            half_open = breaker.state == CircuitState.HALF_OPEN
+            limit = 1 if half_open else max(endpoint.max_concurrency, 1)
+            batch_size = 1 if half_open else max(endpoint.batch_size, 1)
+            
+            while queue and self.in_flight.get(endpoint_id, 0) < limit:
+                batch = self._take_batch(queue, batch_size)
+                if batch:
+                    self._launch(endpoint, batch)
+        
+        return next_wake
+    
+    def _take_batch(self, queue: Deque[str], batch_size: int) -> List[WebhookDelivery]:
+        batch = []
+        while queue and len(batch) < batch_size:
+            delivery = self.service.deliveries.get(queue.popleft())
+            if delivery is not None and delivery.status in OUTSTANDING_STATUSES:
+                batch.append(delivery)
+        return batch
+    
+    def _launch(self, endpoint: WebhookEndpoint, batch: List[WebhookDelivery]) -> None:
+        self.in_flight[endpoint.id] = self.in_flight.get(endpoint.id, 0) + 1
+        task = asyncio.create_task(self._attempt(endpoint, batch))
+        self._attempts.add(task)
+        task.add_done_callback(self._attempts.discard)
+    
+    async def _attempt(self, endpoint: WebhookEndpoint, batch: List[WebhookDelivery]) -> None:
+        try:
+            async with self._semaphore:
+                success, retryable = await self.service._post_deliveries(endpoint, batch)
+        finally:
+            remaining = self.in_flight.get(endpoint.id, 1) - 1
+            if remaining > 0:
+                self.in_flight[endpoint.id] = remaining
+            else:
+                self.in_flight.pop(endpoint.id, None)
+            self.notify()
+        
+        self._settle(endpoint, batch, success, retryable)
+        await self.service._store_deliveries(batch)
+    
+    def _settle(self, endpoint: WebhookEndpoint, batch: List[WebhookDelivery], success: bool, retryable: bool) -> None:
+        now = datetime.now(UTC)
+        breaker = self.breaker(endpoint.id)
+        
+        if success:
+            breaker.record_success()
+            for delivery in batch:
+                delivery.status = WebhookStatus.DELIVERED
+                delivery.next_retry_at = None
+                self.service._retire(delivery)
+            return
+        
+        breaker.record_failure(now)
+        if breaker.state == CircuitState.OPEN:
+            logger.warning(
+                f"Circuit opened for webhook endpoint {endpoint.id} after "
+                f"{breaker.consecutive_failures} consecutive failures"
+            )
+        
+        for delivery in batch:
+            if retryable and delivery.retry_count < endpoint.max_retries:
+                delivery.retry_count += 1
+                delivery.status = WebhookStatus.RETRYING
+                delivery.next_retry_at = now + timedelta(seconds=compute_retry_delay(
+                    delivery.retry_count,
+                    endpoint.retry_delay_seconds,
+                    settings.WEBHOOK_RETRY_MAX_DELAY_SECONDS
+                ))
+                self.enqueue(delivery)
+            else:
+                delivery.status = WebhookStatus.FAILED
+                delivery.next_retry_at = None
+                self.service._retire(delivery)
 
 class WebhookService:
     """Service for webhook management and delivery"""
     
-    def __init__(self, background_job_service=None):
+    def __init__(self, background_job_service=None, store: Optional[WebhookDeliveryStore] = None):
         self.endpoints: Dict[str, WebhookEndpoint] = {}
         self.deliveries: Dict[str, WebhookDelivery] = {}
         self.background_job_service = background_job_service
-        self.session: Optional[aiohttp.ClientSession] = None
+        self.store = store or WebhookDeliveryStore()
+        self.engine = WebhookDeliveryEngine(self)
+        self._settled: Deque[str] = deque()  # Settled delivery IDs, oldest first
+        self._lease_task: Optional[asyncio.Task] = None
+        self._pending_writes: Set[asyncio.Task] = set()  # Holds fire-and-forget writes and lookups until they finish
+        self._endpoint_lookups: Dict[str, List[str]] = {}  # Unknown endpoint -> deliveries waiting on its lookup
+    
+    async def start(self, store: Optional[WebhookDeliveryStore] = None) -> Dict[str, Any]:
+        """
+        Resume persisted endpoints and claimed outstanding deliveries, then start the delivery engine
+        
+        Args:
+            store: Delivery store to use from now on (keeps the current store if None)
+        
+        Returns:
+            Startup summary
+        """
+        if store is not None:
+            self.store = store
+        
+        endpoints, deliveries = await self.store.load()
+        for endpoint in endpoints:
+            self.endpoints[endpoint.id] = endpoint
+        self._resume(deliveries)
+        
+        self.engine.start()
+        if self.store.durable and (self._lease_task is None or self._lease_task.done()):
+            self._lease_task = asyncio.create_task(self._maintain_leases())
+        
+        logger.info(f"Webhook delivery engine started with {len(deliveries)} outstanding deliveries")
+        return {
+            "durable": self.store.durable,
+            "endpoints_loaded": len(endpoints),
+            "deliveries_resumed": len(deliveries)
+        }
+    
+    async def stop(self) -> None:
+        """Stop the delivery engine and hand this replica's outstanding deliveries back"""
+        if self._lease_task is not None:
+            self._lease_task.cancel()
+            await asyncio.gather(self._lease_task, return_exceptions=True)
+            self._lease_task = None
+        await self.engine.stop()
+        await asyncio.gather(*self._pending_writes, return_exceptions=True)
+        try:
+            await self.store.release_leases()
+        except Exception as e:
+            # Unreleased leases still expire after WEBHOOK_DELIVERY_LEASE_SECONDS
+            logger.error(f"Failed to release webhook delivery leases: {str(e)}")
+        logger.info("Webhook delivery engine stopped")
+    
+    def _resume(self, deliveries: List[WebhookDelivery]) -> None:
+        """Queue claimed deliveries this replica is not already tracking"""
+        for delivery in deliveries:
+            if delivery.id not in self.deliveries:
+                self.deliveries[delivery.id] = delivery
+                self.engine.enqueue(delivery)
+    
+    async def _maintain_leases(self) -> None:
+        """Renew held leases, pick up endpoint changes from other replicas and claim lapsed deliveries"""
+        interval = getattr(self.store, "lease_seconds", settings.WEBHOOK_DELIVERY_LEASE_SECONDS) / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                outstanding = [
+                    delivery.id for delivery in self.deliveries.values()
+                    if delivery.status in OUTSTANDING_STATUSES
+                ]
+                for delivery_id in await self.store.renew_leases(outstanding):
+                    # Another replica took it over; the engine skips deliveries it no longer tracks
+                    logger.warning(f"Webhook delivery {delivery_id} lease lost to another replica")
+                    self.deliveries.pop(delivery_id, None)
+                await self._refresh_endpoints()
+                self._resume(await self.store.claim_deliveries())
+            except Exception as e:
+                logger.error(f"Webhook delivery lease maintenance failed: {str(e)}")
+    
+    async def _refresh_endpoints(self) -> None:
+        """Replace the endpoint cache with the persisted endpoints, which any replica may have changed"""
+        endpoints = {endpoint.id: endpoint for endpoint in await self.store.load_endpoints()}
+        for endpoint_id in set(self.endpoints) - set(endpoints):
+            # Deleted elsewhere; its queued rows went with the subscription
+            self._cancel_queued(endpoint_id, self.engine.drop_endpoint(endpoint_id), persist=False)
+        self.endpoints = endpoints
+        self.engine.notify()
+    
+    def _resolve_endpoint(self, endpoint_id: str, delivery_ids) -> None:
+        """Deal with queued deliveries for an endpoint this replica does not know"""
+        if not self.store.durable:
+            self._cancel_queued(endpoint_id, delivery_ids, persist=False)
+            return
+        waiting = self._endpoint_lookups.get(endpoint_id)
+        if waiting is not None:
+            waiting.extend(delivery_ids)
+            return
+        self._endpoint_lookups[endpoint_id] = list(delivery_ids)
+        self._spawn(self._load_endpoint(endpoint_id))
+    
+    async def _load_endpoint(self, endpoint_id: str) -> None:
+        """Load an endpoint another replica created and queue its deliveries, or hand them back"""
+        try:
+            endpoint = await self.store.load_endpoint(endpoint_id)
+        except Exception as e:
+            delivery_ids = self._endpoint_lookups.pop(endpoint_id, [])
+            logger.error(f"Failed to load webhook endpoint {endpoint_id}: {str(e)}")
+            for delivery_id in delivery_ids:
+                self.deliveries.pop(delivery_id, None)
+            try:
+                # Another replica, or this one on its next claim, picks the deliveries up again
+                await self.store.release_leases(delivery_ids)
+            except Exception as e:
+                # The leases still lapse, since this replica no longer renews them
+                logger.error(f"Failed to release webhook delivery leases: {str(e)}")
+            return
+        
+        delivery_ids = self._endpoint_lookups.pop(endpoint_id, [])
+        if endpoint is None:
+            # Deleted: its queued rows went with the subscription
+            self._cancel_queued(endpoint_id, delivery_ids, persist=False)
+            return
+        self.endpoints.setdefault(endpoint_id, endpoint)
+        for delivery_id in delivery_ids:
+            delivery = self.deliveries.get(delivery_id)
+            if delivery is not None and delivery.status in OUTSTANDING_STATUSES:
+                self.engine.enqueue(delivery)
     
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit"""
-        if self.session:
-            await self.session.close()
+        """Async context manager exit (the shared HTTP session is owned by the registry)"""
+        return None
+    
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Shared, pooled HTTP session for webhook delivery"""
+        return http_client_registry.get_session("webhooks")
     
     async def create_endpoint(
         self,
@@ -102,7 +766,9 @@ class WebhookService:
         max_retries: int = 3,
         retry_delay_seconds: int = 60,
         timeout_seconds: int = 30,
-        headers: Optional[Dict[str, str]] = None
+        headers: Optional[Dict[str, str]] = None,
+        batch_size: int = 1,
+        max_concurrency: int = 1
     ) -> WebhookEndpoint:
         """
         Create a new webhook endpoint
@@ -113,9 +779,11 @@ class WebhookService:
             events: List of events to subscribe to
             secret: Optional secret for signature verification
             max_retries: Maximum retry attempts
-            retry_delay_seconds: Delay between retries
+            retry_delay_seconds: Base delay for exponential retry backoff
             timeout_seconds: Request timeout
             headers: Additional headers to send
+            batch_size: Maximum events combined into one POST (1 disables batching)
+            max_concurrency: Maximum requests in flight to this endpoint
         
         Returns:
             Created webhook endpoint
@@ -132,11 +800,14 @@ class WebhookService:
             retry_delay_seconds=retry_delay_seconds,
             timeout_seconds=timeout_seconds,
             headers=headers or {},
+            batch_size=batch_size,
+            max_concurrency=max_concurrency,
             created_at=datetime.now(UTC),
             updated_at=datetime.now(UTC)
         )
         
         self.endpoints[endpoint_id] = endpoint
+        await self._store_endpoint(endpoint)
         
         logger.info(f"Created webhook endpoint {endpoint_id}: {name} -> {url}")
         return endpoint
@@ -152,7 +823,9 @@ class WebhookService:
         max_retries: Optional[int] = None,
         retry_delay_seconds: Optional[int] = None,
         timeout_seconds: Optional[int] = None,
-        headers: Optional[Dict[str, str]] = None
+        headers: Optional[Dict[str, str]] = None,
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None
     ) -> Optional[WebhookEndpoint]:
         """
         Update an existing webhook endpoint
@@ -168,6 +841,8 @@ class WebhookService:
             retry_delay_seconds: New retry delay
             timeout_seconds: New timeout
             headers: New headers
+            batch_size: New batch size
+            max_concurrency: New per-endpoint concurrency
         
         Returns:
             Updated endpoint or None if not found
@@ -195,8 +870,14 @@ class WebhookService:
             endpoint.timeout_seconds = timeout_seconds
         if headers is not None:
             endpoint.headers = headers
+        if batch_size is not None:
+            endpoint.batch_size = batch_size
+        if max_concurrency is not None:
+            endpoint.max_concurrency = max_concurrency
         
         endpoint.updated_at = datetime.now(UTC)
+        await self._store_endpoint(endpoint)
+        self.engine.notify()
         
         logger.info(f"Updated webhook endpoint {endpoint_id}")
         return endpoint
@@ -213,6 +894,11 @@ class WebhookService:
         """
         if endpoint_id in self.endpoints:
             del self.endpoints[endpoint_id]
+            self._cancel_queued(endpoint_id, self.engine.drop_endpoint(endpoint_id), persist=False)
+            try:
+                await self.store.delete_endpoint(endpoint_id)
+            except Exception as e:
+                logger.error(f"Failed to remove persisted webhook endpoint {endpoint_id}: {str(e)}")
             logger.info(f"Deleted webhook endpoint {endpoint_id}")
             return True
         return False
@@ -280,73 +966,70 @@ class WebhookService:
             
             target_endpoints.append(endpoint)
         
-        # Create deliveries for each target endpoint
-        delivery_ids = []
+        # Encode the event once; every endpoint receives (and signs) the same bytes
+        event_payload = {
+            "id": str(uuid.uuid4()),
+            "event": event_type.value,
+            "timestamp": datetime.now(UTC).isoformat(),
+            "data": payload
+        }
+        body = encode_payload(event_payload)
+        
+        # Create deliveries for each target endpoint, persisted together before they are queued
+        deliveries = [
+            self._create_delivery(endpoint, event_type, event_payload, body)
+            for endpoint in target_endpoints
+        ]
+        await self._store_deliveries(deliveries)
         
-        for endpoint in target_endpoints:
-            delivery_id = await self._create_delivery(endpoint, event_type, payload)
-            delivery_ids.append(delivery_id)
+        for delivery in deliveries:
+            self.engine.enqueue(delivery)
+        if deliveries:
+            self.engine.start()
         
+        delivery_ids = [delivery.id for delivery in deliveries]
         logger.info(f"Created {len(delivery_ids)} webhook deliveries for event {event_type}")
         return delivery_ids
     
-    async def _create_delivery(
+    def _create_delivery(
         self,
         endpoint: WebhookEndpoint,
         event_type: WebhookEvent,
-        payload: Dict[str, Any]
-    ) -> str:
+        payload: Dict[str, Any],
+        body: bytes
+    ) -> WebhookDelivery:
         """
         Create a webhook delivery record
         
         Args:
             endpoint: Target endpoint
             event_type: Event type
-            payload: Event payload
+            payload: Event envelope (id, event, timestamp, data)
+            body: Encoded envelope shared across endpoints
         
         Returns:
-            Delivery ID
+            Pending webhook delivery
         """
         delivery_id = str(uuid.uuid4())
         
-        # Add metadata to payload
-        enhanced_payload = {
-            "id": delivery_id,
-            "event": event_type.value,
-            "timestamp": datetime.now(UTC).isoformat(),
-            "data": payload
-        }
-        
         delivery = WebhookDelivery(
             id=delivery_id,
             endpoint_id=endpoint.id,
             event_type=event_type,
-            payload=enhanced_payload,
+            payload=payload,
             status=WebhookStatus.PENDING,
             created_at=datetime.now(UTC),
-            scheduled_at=datetime.now(UTC)
+            scheduled_at=datetime.now(UTC),
+            body=body
         )
+        self._signature(endpoint, delivery)
         
         self.deliveries[delivery_id] = delivery
-        
-        # Schedule delivery using background job service
-        if self.background_job_service:
-            await self.background_job_service.submit_job(
-                task_name="webhook_delivery",
-                args=[delivery_id],
-                priority="normal",
-                max_retries=endpoint.max_retries,
-                retry_delay_seconds=endpoint.retry_delay_seconds
-            )
-        else:
-            # Deliver immediately if no background service
-            asyncio.create_task(self._deliver_webhook(delivery_id))
-        
-        return delivery_id
+        return delivery
     
     async def _deliver_webhook(self, delivery_id: str) -> bool:
         """
-        Deliver a webhook
+        Attempt a single delivery immediately, outside the delivery queue
         
         Args:
             delivery_id: Delivery identifier
@@ -371,7 +1054,41 @@ class WebhookService:
             delivery.status = WebhookStatus.CANCELLED
             return False
         
-        delivery.status = WebhookStatus.PENDING
+        success, _ = await self._post_deliveries(endpoint, [delivery])
+        delivery.status = WebhookStatus.DELIVERED if success else WebhookStatus.FAILED
+        self._retire(delivery)
+        return success
+    
+    async def _post_deliveries(
+        self,
+        endpoint: WebhookEndpoint,
+        deliveries: List[WebhookDelivery]
+    ) -> Tuple[bool, bool]:
+        """
+        POST one delivery, or several combined into a batch, and record the response
+        
+        Args:
+            endpoint: Target endpoint
+            deliveries: Deliveries sent in this request
+        
+        Returns:
+            Tuple of (delivered, worth retrying)
+        """
+        batch_id = None
+        if len(deliveries) == 1:
+            body = self._encoded(deliveries[0])
+            signature = self._signature(endpoint, deliveries[0])
+        else:
+            # Splice the already-encoded event bodies into the batch envelope
+            batch_id = str(uuid.uuid4())
+            body = encode_batch(
+                {"id": batch_id, "event": "batch", "timestamp": datetime.now(UTC).isoformat()},
+                [self._encoded(delivery) for delivery in deliveries]
+            )
+            signature = sign_payload(endpoint.secret, body) if endpoint.secret else None
+        
+        response_code = None
+        response_body = None
         
         try:
             # Prepare request
@@ -380,53 +1097,50 @@ class WebhookService:
                 "User-Agent": "CourtCaseManagement-Webhook/1.0",
                 **endpoint.headers
             }
+            if batch_id:
+                headers["X-Webhook-Batch-Size"] = str(len(deliveries))
+            else:
+                headers["X-Webhook-Delivery"] = deliveries[0].id
             
-            # Add signature if secret is configured
-            if endpoint.secret:
-                payload_str = json.dumps(delivery.payload, sort_keys=True)
-                signature = hmac.new(
-                    endpoint.secret.encode(),
-                    payload_str.encode(),
-                    hashlib.sha256
-                ).hexdigest()
-                headers["X-Webhook-Signature"] = f"sha256={signature}"
-            
-            # Create session if not exists
-            if not self.session:
-                self.session = aiohttp.ClientSession()
+            # Signature covers exactly the bytes sent
+            if signature:
+                headers["X-Webhook-Signature"] = signature
             
             # Send webhook
             async with self.session.post(
                 endpoint.url,
-                json=delivery.payload,
+                data=body,
                 headers=headers,
                 timeout=aiohttp.ClientTimeout(total=endpoint.timeout_seconds)
             ) as response:
-                delivery.response_code = response.status
-                delivery.response_body = await response.text()
-                delivery.delivered_at = datetime.now(UTC)
-                
-                if 200 <= response.status < 300:
-                    delivery.status = WebhookStatus.DELIVERED
-                    logger.info(f"Webhook delivered successfully: {delivery_id} -> {endpoint.url}")
-                    return True
-                else:
-                    delivery.status = WebhookStatus.FAILED
-                    delivery.error_message = f"HTTP {response.status}: {delivery.response_body}"
-                    logger.error(f"Webhook delivery failed: {delivery_id} -> {endpoint.url} (HTTP {response.status})")
-                    return False
+                response_code = response.status
+                response_body = await response.text()
+            
+            success = 200 <= response_code < 300
+            retryable = response_code >= 500 or response_code in RETRYABLE_STATUS_CODES
+            error_message = None if success else f"HTTP {response_code}: {response_body}"
         
         except asyncio.TimeoutError:
-            delivery.status = WebhookStatus.FAILED
-            delivery.error_message = f"Request timeout after {endpoint.timeout_seconds} seconds"
-            logger.error(f"Webhook delivery timeout: {delivery_id} -> {endpoint.url}")
-            return False
+            success, retryable = False, True
+            error_message = f"Request timeout after {endpoint.timeout_seconds} seconds"
         
         except Exception as e:
-            delivery.status = WebhookStatus.FAILED
-            delivery.error_message = str(e)
-            logger.error(f"Webhook delivery error: {delivery_id} -> {endpoint.url}: {str(e)}")
-            return False
+            success, retryable = False, True
+            error_message = str(e)
+        
+        delivered_at = datetime.now(UTC) if success else None
+        for delivery in deliveries:
+            delivery.batch_id = batch_id
+            delivery.response_code = response_code
+            delivery.response_body = response_body
+            delivery.error_message = error_message
+            delivery.delivered_at = delivered_at
+        
+        if success:
+            logger.info(f"Webhook delivered successfully: {len(deliveries)} event(s) -> {endpoint.url}")
+        else:
+            logger.error(f"Webhook delivery failed: {len(deliveries)} event(s) -> {endpoint.url}: {error_message}")
+        return success, retryable
     
     async def retry_delivery(self, delivery_id: str) -> bool:
         """
@@ -436,7 +1150,7 @@ class WebhookService:
             delivery_id: Delivery identifier
         
         Returns:
-            True if retry initiated
+            True if retry scheduled
         """
         delivery = self.deliveries.get(delivery_id)
         if not delivery or delivery.status != WebhookStatus.FAILED:
@@ -452,19 +1166,16 @@ class WebhookService:
         
         delivery.retry_count += 1
         delivery.status = WebhookStatus.RETRYING
-        delivery.next_retry_at = datetime.now(UTC) + timedelta(seconds=endpoint.retry_delay_seconds)
-        
-        # Schedule retry
-        if self.background_job_service:
-            await self.background_job_service.submit_job(
-                task_name="webhook_delivery",
-                args=[delivery_id],
-                priority="normal"
-            )
-        else:
-            # Wait and retry
-            await asyncio.sleep(endpoint.retry_delay_seconds)
-            asyncio.create_task(self._deliver_webhook(delivery_id))
+        delivery.next_retry_at = datetime.now(UTC) + timedelta(seconds=compute_retry_delay(
+            delivery.retry_count,
+            endpoint.retry_delay_seconds,
+            settings.WEBHOOK_RETRY_MAX_DELAY_SECONDS
+        ))
+        
+        # Schedule by timestamp; the engine picks it up when it falls due
+        await self._store_deliveries([delivery])
+        self.engine.enqueue(delivery)
+        self.engine.start()
         
         logger.info(f"Scheduled retry {delivery.retry_count} for delivery {delivery_id}")
         return True
@@ -586,7 +1297,8 @@ class WebhookService:
             "endpoint_breakdown": endpoint_counts,
             "average_retries": round(average_retries, 2),
             "total_endpoints": len(self.endpoints),
-            "active_endpoints": len([ep for ep in self.endpoints.values() if ep.active])
+            "active_endpoints": len([ep for ep in self.endpoints.values() if ep.active]),
+            "delivery_queue": self.engine.get_status()
         }
     
     async def test_endpoint(self, endpoint_id: str) -> Dict[str, Any]:
@@ -620,7 +1332,8 @@ class WebhookService:
             payload=test_payload,
             status=WebhookStatus.PENDING,
             created_at=datetime.now(UTC),
-            scheduled_at=datetime.now(UTC)
+            scheduled_at=datetime.now(UTC),
+            body=encode_payload(test_payload)
         )
         
         self.deliveries[delivery_id] = delivery
@@ -638,4 +1351,67 @@ class WebhookService:
             "delivered_at": delivery.delivered_at.isoformat() if delivery.delivered_at else None
         }
         
-        return result
\ No newline at end of file
+        return result
+    
+    def _encoded(self, delivery: WebhookDelivery) -> bytes:
+        """Encoded request body, produced once per delivery"""
+        if delivery.body is None:
+            delivery.body = encode_payload(delivery.payload)
+        return delivery.body
+    
+    def _signature(self, endpoint: WebhookEndpoint, delivery: WebhookDelivery) -> Optional[str]:
+        """Signature for the delivery body, recomputed only if the endpoint secret changes"""
+        if not endpoint.secret:
+            return None
+        if delivery.signature is None or delivery.signed_with != endpoint.secret:
+            delivery.signature = sign_payload(endpoint.secret, self._encoded(delivery))
+            delivery.signed_with = endpoint.secret
+        return delivery.signature
+    
+    def _retire(self, delivery: WebhookDelivery) -> None:
+        """Track a settled delivery, evicting the oldest settled ones beyond the retention limit"""
+        # Encoded bodies are only needed while the delivery is outstanding
+        delivery.body = None
+        delivery.signature = None
+        self._settled.append(delivery.id)
+        while len(self.deliveries) > settings.WEBHOOK_DELIVERY_RETENTION and self._settled:
+            oldest = self.deliveries.get(self._settled.popleft())
+            if oldest is not None and oldest.status not in OUTSTANDING_STATUSES:
+                del self.deliveries[oldest.id]
+    
+    def _cancel_queued(self, endpoint_id: str, delivery_ids, persist: bool = True) -> None:
+        """Cancel queued deliveries for an endpoint that was removed or deactivated"""
+        cancelled = []
+        for delivery_id in delivery_ids:
+            delivery = self.deliveries.get(delivery_id)
+            if delivery is not None and delivery.status in OUTSTANDING_STATUSES:
+                delivery.status = WebhookStatus.CANCELLED
+                delivery.next_retry_at = None
+                self._retire(delivery)
+                cancelled.append(delivery)
+        
+        if cancelled:
+            logger.info(f"Cancelled {len(cancelled)} queued deliveries for endpoint {endpoint_id}")
+            if persist:
+                self._spawn(self._store_deliveries(cancelled))
+    
+    def _spawn(self, coroutine) -> None:
+        """Run a coroutine in the background, holding its task until it finishes"""
+        task = asyncio.create_task(coroutine)
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+    
+    async def _store_endpoint(self, endpoint: WebhookEndpoint) -> None:
+        try:
+            await self.store.save_endpoint(endpoint)
+        except Exception as e:
+            logger.error(f"Failed to persist webhook endpoint {endpoint.id}: {str(e)}")
+    
+    async def _store_deliveries(self, deliveries: List[WebhookDelivery]) -> None:
+        try:
+            await self.store.save_deliveries(deliveries)
+        except Exception as e:
+            logger.error(f"Failed to persist {len(deliveries)} webhook deliveries: {str(e)}")
+
+# Global webhook service instance
+webhook_service = WebhookService()
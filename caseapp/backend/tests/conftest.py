@@ -0,0 +1,39 @@
+"""
+Shared fixtures - in-memory SQLite databases holding the PostgreSQL models a test needs
+"""
+
+import pytest_asyncio
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_for_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+@compiles(ARRAY, "sqlite")
+def _compile_array_for_sqlite(type_, compiler, **kw):
+    return "TEXT"
+
+@pytest_asyncio.fixture
+async def engine(request):
+    """
+    In-memory SQLite engine with the test's tables created
+
+    The tables come from parametrising the fixture indirectly, or else from the test module's TABLES.
+    """
+    tables = getattr(request, "param", None) or request.module.TABLES
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: tables[0].metadata.create_all(sync_conn, tables=tables))
+    yield engine
+    await engine.dispose()
+
+@pytest_asyncio.fixture
+async def session_factory(engine):
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+@pytest_asyncio.fixture
+async def db(session_factory):
+    async with session_factory() as session:
+        yield session
@@ -0,0 +1,79 @@
+"""
+Basic tests for the lean session dependency and pool metrics
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import core.database as database
+from core.database import (
+    DatabaseConnectionManager, InstrumentedQueuePool, PoolMetrics, get_db, get_db_for
+)
+
+@pytest.mark.asyncio
+async def test_get_db_does_not_ping_or_check_out_a_connection_per_session():
+    """An endpoint that never queries costs no round trip at all"""
+    checkouts = database.db_manager.metrics.checkouts
+    with patch.object(database.db_manager, "session_mode", "pre_ping"), \
+         patch.object(database.db_manager, "get_session_with_retry", AsyncMock(side_effect=AssertionError)):
+        async for session in get_db():
+            assert not session.in_transaction()
+
+    assert database.db_manager.metrics.checkouts == checkouts
+
+@pytest.mark.asyncio
+async def test_validate_mode_keeps_select_one_per_session():
+    session = database.AsyncSessionLocal()
+    retry = AsyncMock(return_value=session)
+    with patch.object(database.db_manager, "session_mode", "validate"), \
+         patch.object(database.db_manager, "get_session_with_retry", retry):
+        async for yielded in get_db():
+            assert yielded is session
+    retry.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_route_class_sets_statement_timeout_only_when_it_differs_from_default():
+    get_interactive_db = get_db_for("interactive")
+    async for session in get_interactive_db():
+        assert session.sync_session.info["statement_timeout_ms"] == 5000
+
+    async for session in get_db_for("default")():
+        assert "statement_timeout_ms" not in session.sync_session.info
+
+    with pytest.raises(ValueError):
+        get_db_for("unknown")
+
+@pytest.mark.asyncio
+async def test_pool_metrics_count_checkouts_and_wait_timeouts():
+    manager = DatabaseConnectionManager()
+    manager.metrics = PoolMetrics()
+    engine = create_async_engine(
+        "sqlite+aiosqlite://", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    engine.pool.metrics = manager.metrics
+    manager._register_pool_listeners(engine)
+
+    try:
+        for _ in range(3):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        async with engine.connect():
+            with pytest.raises(PoolTimeoutError):
+                async with engine.connect():
+                    pass
+
+        metrics = manager.metrics.snapshot(engine.pool)
+    finally:
+        await engine.dispose()
+
+    assert metrics["connections_created"] == 1
+    assert metrics["checkouts"] == 4
+    assert metrics["checkins"] == 4
+    assert metrics["checkout_timeouts"] == 1
+    assert metrics["checkout_wait_max_ms"] >= 40
+    assert metrics["size"] == 1
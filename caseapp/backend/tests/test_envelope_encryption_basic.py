@@ -0,0 +1,171 @@
+"""
+Basic tests for streaming envelope encryption and the data key cache
+"""
+
+import base64
+import hashlib
+import io
+import json
+import os
+from unittest.mock import MagicMock
+
+import pytest
+from cryptography.fernet import Fernet
+
+from core.envelope_encryption import (
+    build_header, read_header, encrypt_bytes, decrypt_bytes, decrypt_range, plaintext_size, EnvelopeError
+)
+from services.encryption_service import EncryptionService, DataKeyCache, ENVELOPE_FORMAT
+
+KEY = os.urandom(32)
+
+def _envelope(content: bytes, chunk_size: int = 16) -> bytes:
+    return encrypt_bytes(content, KEY, build_header(b"wrapped", "key-1", {"document_id": "doc-1"}, chunk_size))
+
+@pytest.mark.parametrize("length", [0, 1, 15, 16, 32, 100])
+def test_round_trip_across_chunk_boundaries(length):
+    """Empty input, partial chunks and exact chunk multiples all round-trip"""
+    content = os.urandom(length)
+    envelope = _envelope(content)
+
+    header = read_header(io.BytesIO(envelope))
+    assert header.context == {"document_id": "doc-1"}
+    assert plaintext_size(header, len(envelope)) == length
+    assert decrypt_bytes(envelope, KEY) == content
+
+def test_tampering_truncation_and_reordering_are_rejected():
+    """Every chunk is bound to the header, its index and whether it is the last"""
+    envelope = _envelope(os.urandom(64))
+    header = read_header(io.BytesIO(envelope))
+    body = envelope[header.length:]
+    size = header.encrypted_chunk_size
+    chunks = [body[i:i + size] for i in range(0, len(body), size)]
+
+    flipped = bytearray(envelope)
+    flipped[-1] ^= 1
+    tampered_header = envelope.replace(b'"doc-1"', b'"doc-2"')
+    truncated = header.raw + b"".join(chunks[:-1])
+    reordered = header.raw + b"".join([chunks[1], chunks[0], *chunks[2:]])
+
+    for broken in (bytes(flipped), tampered_header, truncated, reordered):
+        with pytest.raises(EnvelopeError):
+            decrypt_bytes(broken, KEY)
+
+def test_range_decrypt_reads_only_covering_chunks():
+    """Byte ranges decrypt without the rest of the envelope"""
+    content = os.urandom(100)
+    envelope = _envelope(content)
+    header = read_header(io.BytesIO(envelope))
+
+    for start, end in [(0, 0), (10, 40), (95, 200), (99, 99)]:
+        assert decrypt_range(io.BytesIO(envelope), KEY, header, len(envelope), start, end) == content[start:end + 1]
+    assert decrypt_range(io.BytesIO(envelope), KEY, header, len(envelope), 150, 160) == b""
+
+def test_data_key_cache_limits_reuse():
+    """Encryption keys expire by message count and age; unwrapped keys are bounded"""
+    cache = DataKeyCache(max_messages=2, max_age_seconds=10, max_entries=2)
+    data_key = {"plaintext_key": b"k1", "encrypted_key": b"w1", "key_id": "key-1"}
+
+    assert cache.take_encryption_key(now=0) is None
+    cache.store_encryption_key(data_key, {"purpose": "p"}, now=0)
+    assert cache.take_encryption_key(now=1)["plaintext_key"] == b"k1"
+    assert cache.take_encryption_key(now=2) is None
+
+    cache.store_encryption_key(data_key, {"purpose": "p"}, now=0)
+    assert cache.take_encryption_key(now=11) is None
+
+    assert cache.get_unwrapped(b"w1", {"purpose": "p"}, now=1) == b"k1"
+    assert cache.get_unwrapped(b"w1", {"purpose": "other"}, now=1) is None
+    cache.put_unwrapped(b"w2", {}, b"k2", now=1)
+    cache.put_unwrapped(b"w3", {}, b"k3", now=1)
+    assert cache.get_unwrapped(b"w1", {"purpose": "p"}, now=1) is None
+
+def _kms_service() -> EncryptionService:
+    service = EncryptionService()
+    service.kms_key_id = "key-123"
+    service.kms_client = MagicMock()
+    service.kms_client.generate_data_key.return_value = {
+        "Plaintext": KEY, "CiphertextBlob": b"wrapped-key", "KeyId": "key-123"
+    }
+    service.kms_client.decrypt.return_value = {"Plaintext": KEY}
+    return service
+
+@pytest.mark.asyncio
+async def test_documents_share_cached_data_key():
+    """Many documents cost one KMS call to encrypt and none to decrypt"""
+    service = _kms_service()
+
+    encrypted = [await service.encrypt_document(f"content {i}".encode(), f"doc-{i}") for i in range(10)]
+    for i, item in enumerate(encrypted):
+        assert item["format"] == ENVELOPE_FORMAT
+        content, metadata = await service.decrypt_document(item)
+        assert content == f"content {i}".encode()
+        assert metadata["document_id"] == f"doc-{i}"
+
+    assert service.kms_client.generate_data_key.call_count == 1
+    assert service.kms_client.decrypt.call_count == 0
+
+    service.key_cache.clear()
+    await service.decrypt_document(encrypted[0])
+    await service.decrypt_document(encrypted[1])
+    assert service.kms_client.decrypt.call_count == 1
+
+@pytest.mark.asyncio
+async def test_swapped_document_envelope_is_rejected():
+    """Content from one document cannot be passed off as another's"""
+    service = _kms_service()
+    first = await service.encrypt_document(b"first", "doc-1")
+    second = await service.encrypt_document(b"second", "doc-2")
+
+    with pytest.raises(Exception):
+        await service.decrypt_document({**second, "encrypted_content": first["encrypted_content"]})
+
+@pytest.mark.asyncio
+async def test_legacy_fernet_documents_still_decrypt():
+    """Documents written before envelopes decrypt through the Fernet path"""
+    service = _kms_service()
+    fernet = Fernet(base64.urlsafe_b64encode(KEY))
+    metadata = {"document_id": "doc-1", "content_hash": hashlib.sha256(b"old").hexdigest()}
+    legacy = {
+        "encrypted_content": base64.b64encode(fernet.encrypt(b"old")).decode(),
+        "encrypted_metadata": base64.b64encode(fernet.encrypt(json.dumps(metadata).encode())).decode(),
+        "encrypted_data_key": base64.b64encode(b"wrapped-key").decode(),
+        "key_id": "key-123",
+        "encryption_context": {"document_id": "doc-1", "purpose": "document_encryption"}
+    }
+
+    content, decrypted_metadata = await service.decrypt_document(legacy)
+    assert content == b"old"
+    assert decrypted_metadata["document_id"] == "doc-1"
+
+@pytest.mark.asyncio
+async def test_file_encryption_streams_and_seeks(tmp_path):
+    """Files encrypt and decrypt in chunks, and ranges decrypt for media seeking"""
+    service = EncryptionService()
+    service.kms_key_id = None
+    source, envelope, restored = tmp_path / "in.bin", tmp_path / "in.enc", tmp_path / "out.bin"
+    content = os.urandom(200 * 1024 + 7)
+    source.write_bytes(content)
+
+    info = await service.encrypt_file(str(source), str(envelope), {"media_id": "m-1"})
+    assert info["plaintext_size"] == len(content)
+
+    assert await service.decrypt_file(str(envelope), str(restored)) == len(content)
+    assert restored.read_bytes() == content
+    assert await service.decrypt_file_range(str(envelope), 65530, 131080) == content[65530:131081]
+
+@pytest.mark.asyncio
+async def test_local_key_headers_are_rejected_when_kms_is_configured():
+    """A forged header naming a development key cannot bypass KMS"""
+    local = EncryptionService()
+    local.kms_key_id = None
+    encrypted = await local.encrypt_document(b"secret", "doc-1")
+    assert encrypted["key_id"] == "local-dev-key"
+    assert (await local.decrypt_document(encrypted))[0] == b"secret"
+
+    service = _kms_service()
+    with pytest.raises(Exception, match="not accepted"):
+        await service.decrypt_document(encrypted)
+    with pytest.raises(Exception, match="not accepted"):
+        await service.decrypt_document({**encrypted, "format": None})
+    assert service.kms_client.decrypt.call_count == 0
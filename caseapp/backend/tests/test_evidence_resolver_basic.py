@@ -0,0 +1,198 @@
+"""
+Basic tests for batched evidence pin resolution and the per-case evidence cache
+"""
+
+import uuid
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+
+from core.exceptions import CaseManagementException
+from core.redis import redis_service
+from models.case import AuditLog, Case
+from models.document import Document
+from models.forensic_analysis import ForensicDataType, ForensicItem, ForensicSource
+from models.media import MediaEvidence, MediaFormat, MediaType
+from models.timeline import EvidencePin, TimelineComment, TimelineEvent
+from models.user import User
+from schemas.timeline import EvidencePinCreateRequest, EvidencePinResponse, EvidenceTypeEnum
+from services.audit_service import AuditService
+from services.evidence_resolver import EvidenceResolver, evidence_key, forensic_evidence_id
+from services.timeline_service import TimelineService
+
+TABLES = [
+    User.__table__, Case.__table__, Document.__table__, MediaEvidence.__table__, ForensicSource.__table__,
+    ForensicItem.__table__, TimelineEvent.__table__, EvidencePin.__table__, TimelineComment.__table__,
+    AuditLog.__table__
+]
+
+class MemoryRedis:
+    """The handful of Redis commands the evidence cache uses"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def mget(self, *keys):
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def pipeline(self, transaction=True):
+        redis = self
+
+        class Pipeline:
+            def __init__(self):
+                self.commands = []
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            def incr(self, key):
+                self.commands.append(lambda: redis.data.__setitem__(key, str(int(redis.data.get(key, "0")) + 1)))
+
+            def delete(self, key):
+                self.commands.append(lambda: redis.data.pop(key, None))
+
+            async def execute(self):
+                for command in self.commands:
+                    command()
+
+        return Pipeline()
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = MemoryRedis()
+    monkeypatch.setattr(redis_service, "redis_client", client)
+    monkeypatch.setattr(redis_service, "_initialized", True)
+    return client
+
+@pytest_asyncio.fixture
+async def db(engine, db):
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    db.info["statements"] = statements
+    return db
+
+@pytest_asyncio.fixture
+async def evidence(db):
+    case_id, user_id = uuid.uuid4(), uuid.uuid4()
+    documents = [
+        Document(
+            id=uuid.uuid4(), filename=f"d{index}.pdf", original_filename=f"Contract {index}.pdf",
+            file_path=f"/d{index}.pdf", file_size=10, mime_type="application/pdf", file_hash=f"hash{index}",
+            document_type="contract", case_id=case_id, uploaded_by=user_id
+        )
+        for index in range(2)
+    ]
+    # Inserted through Core so the ARRAY columns stay NULL instead of defaulting to []
+    media_id = uuid.uuid4()
+    await db.execute(MediaEvidence.__table__.insert().values(
+        id=media_id, case_id=case_id, filename="cctv.mp4", original_filename="CCTV lobby.mp4",
+        file_path="/cctv.mp4", file_size=10, file_hash="mediahash", mime_type="video/mp4",
+        media_type=MediaType.VIDEO, media_format=MediaFormat.MP4, thumbnail_path="/thumbs/cctv.jpg",
+        tags=None, categories=None, created_by=user_id
+    ))
+    source = ForensicSource(case_id=case_id, source_name="Phone", file_path="/phone.tar", file_hash="sourcehash")
+    db.add_all([*documents, source])
+    await db.flush()
+    item = ForensicItem(
+        source_id=source.id, item_type=ForensicDataType.EMAIL, sender="a@example.com",
+        subject="Wire instructions", timestamp=datetime(2024, 1, 1)
+    )
+    event_ = TimelineEvent(
+        id=uuid.uuid4(), timeline_id=uuid.uuid4(), case_id=case_id, title="Signing",
+        event_date=datetime(2024, 1, 2), created_by=user_id
+    )
+    db.add_all([item, event_])
+    await db.commit()
+    media = await db.get(MediaEvidence, media_id)
+    return {"case_id": case_id, "documents": documents, "media": media, "item": item, "event": event_}
+
+@pytest.mark.asyncio
+async def test_resolve_loads_each_type_in_one_query(db, evidence):
+    documents, media, item = evidence["documents"], evidence["media"], evidence["item"]
+    refs = [
+        *(("document", document.id) for document in documents),
+        ("media", media.id),
+        ("forensic", forensic_evidence_id(item.id)),
+        ("document", uuid.uuid4()),
+        ("forensic", uuid.uuid4()),
+    ]
+
+    db.info["statements"].clear()
+    resolved = await EvidenceResolver(db).resolve(refs)
+    assert len(db.info["statements"]) == 3
+    assert len(resolved) == 4
+
+    assert resolved[evidence_key("document", documents[1].id)]["title"] == "Contract 1.pdf"
+    video = resolved[evidence_key("media", media.id)]
+    assert (video["kind"], video["thumbnail_path"], video["file_hash"]) == ("video", "/thumbs/cctv.jpg", "mediahash")
+    email = resolved[evidence_key("forensic", forensic_evidence_id(item.id))]
+    assert (email["title"], email["kind"], email["file_hash"]) == ("Wire instructions", "email", "sourcehash")
+
+@pytest.mark.asyncio
+async def test_pinning_validates_every_evidence_type(db, evidence):
+    service = TimelineService(db, AuditService(db))
+    event_id, document_id = evidence["event"].id, evidence["documents"][0].id
+
+    for evidence_type, evidence_id in (
+        (EvidenceTypeEnum.MEDIA, evidence["media"].id),
+        (EvidenceTypeEnum.FORENSIC, forensic_evidence_id(evidence["item"].id)),
+    ):
+        pin = await service.pin_evidence_to_event(
+            EvidencePinCreateRequest(timeline_event_id=event_id, evidence_type=evidence_type, evidence_id=evidence_id),
+            evidence["event"].created_by
+        )
+        assert pin.evidence_type == evidence_type.value
+
+    with pytest.raises(CaseManagementException) as missing:
+        await service.pin_evidence_to_event(
+            EvidencePinCreateRequest(timeline_event_id=event_id, evidence_type="media", evidence_id=uuid.uuid4()),
+            evidence["event"].created_by
+        )
+    assert missing.value.error_code == "EVIDENCE_NOT_FOUND"
+
+    # Evidence of another case cannot be pinned
+    with pytest.raises(CaseManagementException):
+        await EvidenceResolver(db).validate([("document", document_id)], uuid.uuid4())
+    with pytest.raises(CaseManagementException) as unknown:
+        await EvidenceResolver(db).validate([("audio", uuid.uuid4())])
+    assert unknown.value.error_code == "INVALID_EVIDENCE_TYPE"
+
+@pytest.mark.asyncio
+async def test_pin_metadata_is_cached_until_the_evidence_changes(db, evidence, redis):
+    service = TimelineService(db, AuditService(db))
+    case_id, document = evidence["case_id"], evidence["documents"][0]
+
+    def pins(*refs):
+        return [
+            EvidencePinResponse(
+                id=uuid.uuid4(), timeline_event_id=evidence["event"].id, evidence_type=evidence_type,
+                evidence_id=evidence_id, relevance_score=1.0, pin_description=None, pin_notes=None,
+                display_order=index, is_primary=False, created_at=datetime(2024, 1, 1), created_by=uuid.uuid4()
+            )
+            for index, (evidence_type, evidence_id) in enumerate(refs)
+        ]
+
+    missing_id = uuid.uuid4()
+    first = await service.resolve_pin_evidence(case_id, pins(("document", document.id), ("document", missing_id)))
+    assert first[0].evidence.title == "Contract 0.pdf" and first[1].evidence is None
+
+    # Cached entries, including the missing one, are served without queries; new evidence is loaded alone
+    db.info["statements"].clear()
+    second = await service.resolve_pin_evidence(
+        case_id, pins(("document", document.id), ("document", missing_id), ("media", evidence["media"].id))
+    )
+    assert len(db.info["statements"]) == 1
+    assert second[0].evidence.file_hash == "hash0" and second[2].evidence.kind == "video"
+
+    document.original_filename = "Signed contract.pdf"
+    await db.commit()
+    third = await service.resolve_pin_evidence(case_id, pins(("document", document.id)))
+    assert third[0].evidence.title == "Signed contract.pdf"
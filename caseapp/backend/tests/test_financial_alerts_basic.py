@@ -0,0 +1,99 @@
+"""
+Basic tests for fingerprinted, bulk-upserted financial alerts
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event, func, select, update
+from sqlalchemy.dialects import postgresql
+
+from models.financial_analysis import (
+    AlertSeverity, FinancialAccount, FinancialAlert, FinancialTransaction, TransactionType
+)
+from services.financial_alert_writer import FinancialAlertBatch, alert_fingerprint
+from services.financial_analysis_service import FinancialAnalysisService
+
+TABLES = [FinancialAccount.__table__, FinancialTransaction.__table__, FinancialAlert.__table__]
+
+def test_fingerprint_depends_on_type_case_and_transaction_set_only():
+    case_id, a, b = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    assert alert_fingerprint("round_tripping", case_id, [a, b]) == alert_fingerprint("round_tripping", case_id, [b, a])
+    assert alert_fingerprint("round_tripping", case_id, [a, b]) != alert_fingerprint("fan_in", case_id, [a, b])
+    assert alert_fingerprint("fan_in", case_id, [a]) != alert_fingerprint("fan_in", uuid.uuid4(), [a])
+    assert alert_fingerprint("concentration", case_id, [a], key="ACME") == alert_fingerprint("concentration", case_id, key="ACME")
+
+async def _alerts(db):
+    return (await db.scalars(select(FinancialAlert).order_by(FinancialAlert.alert_type))).all()
+
+@pytest.mark.asyncio
+async def test_batches_insert_once_and_refresh_in_place(db):
+    case_id, tx_id = uuid.uuid4(), uuid.uuid4()
+
+    for _ in range(2):
+        batch = FinancialAlertBatch(case_id)
+        batch.add("high_value", AlertSeverity.MEDIUM, "High-Value Transaction", "first", transaction_ids=[tx_id])
+        batch.add("high_value", AlertSeverity.MEDIUM, "High-Value Transaction", "first", transaction_ids=[tx_id])
+        assert len(batch) == 1
+        await batch.write(db)
+    await db.commit()
+    assert [alert.description for alert in await _alerts(db)] == ["first"]
+
+    refreshed = FinancialAlertBatch(case_id, refresh=True)
+    refreshed.add("concentration", AlertSeverity.MEDIUM, "Concentration", "60%", key="ACME")
+    assert await refreshed.write(db) == 1
+    await db.execute(update(FinancialAlert).where(FinancialAlert.alert_type == "concentration").values(is_acknowledged=True))
+    refreshed.add("concentration", AlertSeverity.HIGH, "Concentration", "75%", key="ACME")
+    await refreshed.write(db)
+    await db.commit()
+
+    db.expunge_all()
+    concentration = (await _alerts(db))[0]
+    assert concentration.description == "75%" and concentration.severity == AlertSeverity.HIGH
+    assert concentration.is_acknowledged
+
+@pytest.mark.asyncio
+async def test_batches_upsert_on_the_case_fingerprint_in_postgresql(db):
+    statements = []
+    event.listen(db.sync_session, "do_orm_execute", lambda state: statements.append(state.statement))
+    case_id = uuid.uuid4()
+    for refresh in (False, True):
+        batch = FinancialAlertBatch(case_id, refresh=refresh)
+        batch.add("concentration", AlertSeverity.MEDIUM, "Concentration", "60%", key="ACME")
+        await batch.write(db)
+
+    inserted, refreshed = (
+        " ".join(str(statement.compile(dialect=postgresql.dialect())).split()) for statement in statements
+    )
+    assert inserted.startswith("INSERT INTO financial_alerts ")
+    assert inserted.endswith(" ON CONFLICT (case_id, fingerprint) DO NOTHING")
+    assert refreshed.endswith(
+        " ON CONFLICT (case_id, fingerprint) DO UPDATE SET transaction_id = excluded.transaction_id, "
+        "severity = excluded.severity, title = excluded.title, description = excluded.description, "
+        "trigger_criteria = excluded.trigger_criteria, detected_patterns = excluded.detected_patterns"
+    )
+
+@pytest.mark.asyncio
+async def test_rerunning_analysis_is_idempotent(db):
+    account = FinancialAccount(id=uuid.uuid4(), case_id=uuid.uuid4(), created_by=uuid.uuid4())
+    start = datetime(2024, 6, 1)
+    db.add(account)
+    db.add_all([
+        FinancialTransaction(
+            account_id=account.id, case_id=account.case_id, transaction_date=start + timedelta(hours=hours),
+            amount=Decimal(amount), transaction_type=TransactionType.DEBIT, counterparty_account="MULE",
+            currency="USD", risk_score=0.0
+        )
+        for hours, amount in ((0, "4000"), (5, "4000"), (10, "12000"))
+    ])
+    await db.commit()
+
+    service = FinancialAnalysisService(db)
+    await service.run_analysis(account.case_id)
+    first_run = sorted(alert.alert_type for alert in await _alerts(db))
+    assert first_run == ["concentration", "high_value", "structuring"]
+
+    await service.run_analysis(account.case_id)
+    assert await db.scalar(select(func.count()).select_from(FinancialAlert)) == 3
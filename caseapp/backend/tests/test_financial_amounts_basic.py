@@ -0,0 +1,79 @@
+"""
+Basic tests for exact amounts and the vectorised financial detectors
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from core.money import from_scaled, minor_units, quantize_amount, to_scaled
+from models.financial_analysis import FinancialAccount, FinancialAlert, FinancialTransaction, TransactionType
+from services.financial_analysis_service import FinancialAnalysisService
+from services.transaction_frame import TransactionFrame
+
+START = datetime(2024, 5, 1, 9, 0)
+
+def test_amounts_round_to_the_currency_minor_unit_and_scale_exactly():
+    assert minor_units("usd") == 2 and minor_units("JPY") == 0 and minor_units("KWD") == 3
+    assert quantize_amount(0.125, "USD") == Decimal("0.13")
+    assert quantize_amount("1234.5", "JPY") == Decimal("1235")
+    assert quantize_amount(1.0005, "BHD") == Decimal("1.001")
+    assert to_scaled(0.1) + to_scaled(0.2) == to_scaled("0.3") == 300
+    assert from_scaled(to_scaled("9999.999")) == Decimal("9999.999")
+
+TABLES = [FinancialAccount.__table__, FinancialTransaction.__table__, FinancialAlert.__table__]
+
+def _tx(account, hours, amount, transaction_type=TransactionType.DEBIT, counterparty=None, risk_score=0.0):
+    return FinancialTransaction(
+        id=uuid.uuid4(), account_id=account.id, case_id=account.case_id,
+        transaction_date=START + timedelta(hours=hours), amount=Decimal(amount),
+        transaction_type=transaction_type, counterparty_account=counterparty,
+        currency="USD", is_suspicious=False, risk_score=risk_score
+    )
+
+@pytest.mark.asyncio
+async def test_frame_loads_exact_scaled_amounts_in_time_order(db):
+    account = FinancialAccount(id=uuid.uuid4(), case_id=uuid.uuid4(), created_by=uuid.uuid4())
+    db.add_all([account, _tx(account, 2, "0.29", counterparty="X"), _tx(account, 1, "1.005"), _tx(account, 3, "0.10")])
+    await db.commit()
+
+    frame = await TransactionFrame.load(db, account.case_id)
+    assert frame.amounts.tolist() == [1005, 290, 100]
+    assert frame.counterparty(1) == "X" and frame.counterparty(0) is None
+    assert frame.type_mask(TransactionType.DEBIT).all()
+
+@pytest.mark.asyncio
+async def test_analysis_detects_structuring_concentration_and_high_value(db):
+    account = FinancialAccount(id=uuid.uuid4(), case_id=uuid.uuid4(), created_by=uuid.uuid4())
+    structured = [_tx(account, hours, "3400.00", counterparty="MULE") for hours in (0, 10, 20, 30)]
+    big = _tx(account, 200, "12000.00", TransactionType.CREDIT, counterparty="PAYER", risk_score=0.9)
+    other = _tx(account, 300, "500.00", counterparty="SHOP")
+    db.add_all([account, *structured, big, other])
+    await db.commit()
+
+    service = FinancialAnalysisService(db)
+    await service.run_analysis(account.case_id)
+    alerts = (await db.scalars(select(FinancialAlert))).all()
+    by_type = {}
+    for alert in alerts:
+        by_type.setdefault(alert.alert_type, []).append(alert)
+
+    # Overlapping 48h windows to MULE are one sequence
+    assert len(by_type["structuring"]) == 1
+    assert by_type["structuring"][0].trigger_criteria == {"item_count": 4, "total_amount": 13600.0}
+    assert by_type["concentration"][0].trigger_criteria["counterparty"] == "MULE"
+    assert [alert.transaction_id for alert in by_type["high_value"]] == [big.id]
+
+    rows = {tx_id: (suspicious, risk) for tx_id, suspicious, risk in (await db.execute(
+        select(FinancialTransaction.id, FinancialTransaction.is_suspicious, FinancialTransaction.risk_score)
+    )).all()}
+    assert all(rows[tx.id] == (True, 0.8) for tx in structured)
+    assert rows[big.id] == (True, 0.9)  # Scores are only ever raised
+    assert rows[other.id] == (False, 0.0)
+
+    # High-value alerts are not repeated
+    await service.run_analysis(account.case_id)
+    assert len((await db.scalars(select(FinancialAlert).where(FinancialAlert.alert_type == "high_value"))).all()) == 1
@@ -0,0 +1,156 @@
+"""
+Basic tests for the single-query financial summary and its per-case cache
+"""
+
+import asyncio
+import uuid
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.util import greenlet_spawn
+
+from core import generation_cache
+from core.redis import redis_service
+from models.financial_analysis import FinancialAlert, FinancialStatementImport, FinancialTransaction
+from services.financial_analysis_service import summary_from_rows
+from services.financial_summary_cache import FinancialSummaryCache, financial_summary_cache
+
+class MemoryRedis:
+    """The handful of Redis commands the summary cache uses"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def mget(self, *keys):
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def pipeline(self, transaction=True):
+        redis = self
+
+        class Pipeline:
+            def __init__(self):
+                self.commands = []
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            def incr(self, key):
+                self.commands.append(lambda: redis.data.__setitem__(key, str(int(redis.data.get(key, "0")) + 1)))
+
+            def delete(self, key):
+                self.commands.append(lambda: redis.data.pop(key, None))
+
+            async def execute(self):
+                for command in self.commands:
+                    command()
+
+        return Pipeline()
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = MemoryRedis()
+    monkeypatch.setattr(redis_service, "redis_client", client)
+    monkeypatch.setattr(redis_service, "_initialized", True)
+    return client
+
+def _row(grouping_set, **values):
+    row = {
+        "total_accounts": 2, "total_alerts": 1, "grouping_set": grouping_set, "counterparty_name": None,
+        "recent_day": None, "transaction_count": 0, "total_credit": 0, "total_debit": 0,
+        "high_risk_count": 0, "total_amount": 0, "amount_rank": 1
+    }
+    row.update(values)
+    return row
+
+def test_summary_from_grouping_set_rows():
+    rows = [
+        _row(1, counterparty_name="Shell LLC", total_amount=900.0, amount_rank=1),
+        _row(1, counterparty_name=None, total_amount=100.0, amount_rank=2),
+        _row(2, recent_day=date(2024, 1, 2), total_amount=40.0),
+        _row(2, recent_day=date(2024, 1, 1), total_amount=60.0),
+        _row(3, transaction_count=7, total_credit=700.0, total_debit=300.0, high_risk_count=2),
+    ]
+    summary = summary_from_rows(rows)
+
+    assert summary["total_accounts"] == 2 and summary["total_alerts"] == 1
+    assert summary["total_transactions"] == 7 and summary["high_risk_transactions"] == 2
+    assert summary["net_flow"] == 400.0
+    assert summary["top_counterparties"] == [{"name": "Shell LLC", "amount": 900.0}, {"name": "Unknown", "amount": 100.0}]
+    assert [point["date"] for point in summary["timeline_data"]] == ["2024-01-01", "2024-01-02"]
+
+    # A case without transactions still reports its accounts and alerts (LEFT JOIN row)
+    empty = summary_from_rows([{"total_accounts": 1, "total_alerts": 0, "grouping_set": None}])
+    assert empty["total_accounts"] == 1 and empty["total_transactions"] == 0
+    assert empty["top_counterparties"] == [] and empty["timeline_data"] == []
+
+@pytest.mark.asyncio
+async def test_cache_serves_hits_until_the_case_changes(redis):
+    cache = FinancialSummaryCache(ttl_seconds=60)
+    case_id, other_case = uuid.uuid4(), uuid.uuid4()
+    computed = []
+
+    async def compute():
+        computed.append(1)
+        return {"total_transactions": len(computed)}
+
+    assert await cache.get_or_compute(case_id, compute) == {"total_transactions": 1}
+    assert await cache.get_or_compute(case_id, compute) == {"total_transactions": 1}
+    assert cache.get_stats()["hits"] == 1
+
+    await cache.invalidate([other_case])
+    assert await cache.get_or_compute(case_id, compute) == {"total_transactions": 1}
+
+    await cache.invalidate([case_id])
+    assert await cache.get_or_compute(case_id, compute) == {"total_transactions": 2}
+    assert len(computed) == 2
+
+@pytest.mark.asyncio
+async def test_summary_computed_across_an_invalidation_is_not_served(redis):
+    cache = FinancialSummaryCache(ttl_seconds=60)
+    case_id = uuid.uuid4()
+
+    async def compute_while_data_changes():
+        await cache.invalidate([case_id])  # A commit lands mid-computation
+        return {"total_transactions": 1}
+
+    await cache.get_or_compute(case_id, compute_while_data_changes)
+
+    async def fresh():
+        return {"total_transactions": 2}
+
+    assert await cache.get_or_compute(case_id, fresh) == {"total_transactions": 2}
+
+@pytest.mark.asyncio
+async def test_orm_commits_invalidate_touched_cases(monkeypatch):
+    invalidated = []
+
+    async def invalidate(case_ids):
+        await asyncio.sleep(0)
+        invalidated.append(set(case_ids))
+
+    monkeypatch.setattr(financial_summary_cache, "invalidate", invalidate)
+    case_id = uuid.uuid4()
+    session = SimpleNamespace(
+        info={},
+        new=[FinancialTransaction(case_id=case_id), FinancialStatementImport(case_id=uuid.uuid4())],
+        dirty=[FinancialAlert(case_id=case_id)],
+        deleted=[]
+    )
+
+    generation_cache._collect_stale_cases(session, None)
+    # AsyncSession runs commit hooks inside a greenlet, where the invalidation is awaited
+    await greenlet_spawn(generation_cache._invalidate_committed_cases, session)
+    assert invalidated == [{case_id}]
+
+    session.new, session.dirty = [FinancialTransaction(case_id=case_id)], []
+    generation_cache._collect_stale_cases(session, None)
+    generation_cache._discard_stale_cases(session)
+    await greenlet_spawn(generation_cache._invalidate_committed_cases, session)
+    assert len(invalidated) == 1
@@ -0,0 +1,108 @@
+"""
+Basic tests for background health checks and snapshot-based readiness
+"""
+
+import asyncio
+
+import pytest
+
+from services.health_monitor import HealthMonitor
+from services.health_service import HealthCheckResult, HealthStatus
+
+def _check(name, calls, status=HealthStatus.HEALTHY, delay=0.0):
+    async def check():
+        calls.append(name)
+        await asyncio.sleep(delay)
+        return HealthCheckResult(name=name, status=status, message=f"{name} {status}")
+    return check
+
+@pytest.mark.asyncio
+async def test_snapshot_serves_cached_results_without_rerunning_checks():
+    calls = []
+    monitor = HealthMonitor(jitter=0)
+    monitor.register("database", _check("database", calls), interval=60, critical=True)
+    monitor.register("redis", _check("redis", calls), interval=60, critical=True)
+    await monitor.refresh()
+
+    for _ in range(100):
+        snapshot = monitor.snapshot()
+        ready, _ = monitor.readiness()
+
+    assert sorted(calls) == ["database", "redis"]
+    assert ready
+    assert snapshot["overall_status"] == HealthStatus.HEALTHY
+    assert snapshot["checks"]["database"]["runs"] == 1
+    assert set(snapshot["services"]) == {"database", "redis"}
+
+@pytest.mark.asyncio
+async def test_readiness_fails_on_unhealthy_or_stale_critical_check():
+    calls = []
+    monitor = HealthMonitor(jitter=0)
+    monitor.register("database", _check("database", calls), interval=10, critical=True)
+    monitor.register("redis", _check("redis", calls, HealthStatus.UNHEALTHY), interval=10, critical=True)
+    monitor.register("aws_services", _check("aws_services", calls, HealthStatus.UNHEALTHY), interval=10)
+
+    ready, reasons = monitor.readiness()
+    assert not ready and reasons["database"] == "not checked yet"
+
+    await monitor.refresh()
+    ready, reasons = monitor.readiness()
+    assert not ready
+    assert set(reasons) == {"redis"}  # Non-critical failures do not gate readiness
+    assert monitor.readiness(required=("database",)) == (True, {})
+
+    monitor.checks["database"].checked_at -= 1000
+    ready, reasons = monitor.readiness(required=("database",))
+    assert not ready and reasons["database"].startswith("stale")
+    assert monitor.snapshot()["checks"]["database"]["status"] == "stale"
+
+@pytest.mark.asyncio
+async def test_slow_or_failing_check_is_recorded_as_unhealthy():
+    calls = []
+
+    async def broken():
+        raise ConnectionError("connection refused")
+
+    monitor = HealthMonitor(jitter=0)
+    monitor.register("database", _check("database", calls, delay=1), interval=10, critical=True, timeout=0.05)
+    monitor.register("redis", broken, interval=10, critical=True)
+    await monitor.refresh()
+
+    assert monitor.get_result("database").status == HealthStatus.UNHEALTHY
+    assert "timed out" in monitor.get_result("database").message
+    assert "connection refused" in monitor.get_result("redis").message
+    assert monitor.checks["redis"].consecutive_failures == 1
+
+@pytest.mark.asyncio
+async def test_ensure_fresh_only_probes_when_monitor_is_not_running():
+    calls = []
+    monitor = HealthMonitor(jitter=0)
+    monitor.register("database", _check("database", calls), interval=60, critical=True)
+
+    await monitor.ensure_fresh()
+    await monitor.ensure_fresh()  # Result is still fresh
+    assert calls == ["database"]
+
+    await monitor.start()
+    try:
+        await asyncio.sleep(0.01)
+        assert monitor.running
+        runs = len(calls)
+        await monitor.ensure_fresh()
+        assert len(calls) == runs
+    finally:
+        await monitor.stop()
+    assert not monitor.running
+
+@pytest.mark.asyncio
+async def test_refresh_loop_repeats_on_jittered_interval():
+    calls = []
+    monitor = HealthMonitor(jitter=0.5)
+    monitor.register("redis", _check("redis", calls), interval=0.02)
+
+    await monitor.start()
+    await asyncio.sleep(0.2)
+    await monitor.stop()
+
+    # Sleeps fall within [0.01, 0.03], so 0.2s allows between ~7 and ~21 runs
+    assert 5 <= len(calls) <= 25
@@ -0,0 +1,51 @@
+"""
+Basic tests for the shared HTTP client registry
+"""
+
+import pytest
+
+from core.http_client import HTTPClientRegistry
+
+@pytest.mark.asyncio
+async def test_sessions_are_shared_per_pool():
+    """Repeated lookups reuse one pooled session per named pool"""
+    registry = HTTPClientRegistry()
+    await registry.initialize()
+    try:
+        webhooks = registry.get_session("webhooks")
+        assert registry.get_session("webhooks") is webhooks
+        assert registry.get_session("integrations") is not webhooks
+        assert webhooks.connector.limit_per_host > 0
+    finally:
+        await registry.close()
+
+    assert webhooks.closed
+
+    # Late callers during shutdown must not open a pool nobody will close
+    with pytest.raises(RuntimeError):
+        registry.get_session("webhooks")
+
+@pytest.mark.asyncio
+async def test_metrics_report_every_pool():
+    """Pool metrics are exposed for each registered pool"""
+    registry = HTTPClientRegistry()
+    await registry.initialize()
+    try:
+        metrics = registry.get_metrics()
+        assert metrics["initialized"] is True
+        assert set(metrics["pools"]) == set(HTTPClientRegistry.POOL_NAMES)
+        for pool in metrics["pools"].values():
+            assert pool["open"] is True
+            assert pool["connections_in_use"] == 0
+            assert pool["utilisation_percent"] == 0.0
+    finally:
+        await registry.close()
+
+    assert registry.get_metrics() == {"initialized": False, "pools": {}}
+
+@pytest.mark.asyncio
+async def test_unknown_pool_rejected():
+    """Only registered pool names can be requested"""
+    registry = HTTPClientRegistry()
+    with pytest.raises(ValueError):
+        registry.get_session("unknown")
@@ -275,7 +275,7 @@ class TestCompleteWorkflows:
         mock_cm.__aenter__.return_value = mock_db_session
         
         with patch('services.export_service.AsyncSessionLocal', return_value=mock_cm):
-            with patch('services.export_service.SimpleDocTemplate') as mock_doc:
+            with patch('services.export_service.platypus.SimpleDocTemplate') as mock_doc:
                 mock_doc.return_value = MagicMock()
                 
                 # Mock the internal data fetching to avoid more DB issues
@@ -0,0 +1,151 @@
+"""
+Basic tests for parallel, resumable key rotation
+"""
+
+import os
+from typing import Dict, Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from models.encryption import KeyRotationMode
+from services.encryption_service import EncryptionService
+from services.key_rotation_service import KeyRotationService, EncryptedDocumentStore
+
+KEY = os.urandom(32)
+
+class MemoryDocumentStore(EncryptedDocumentStore):
+    def __init__(self):
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.saves = 0
+
+    async def load(self, document_id):
+        return self.documents[document_id]
+
+    async def save(self, document_id, encrypted_data):
+        self.saves += 1
+        self.documents[document_id] = encrypted_data
+
+class MemoryRotationService(KeyRotationService):
+    """Keeps rotation runs in memory instead of the database"""
+
+    def __init__(self, *args, fail_on_checkpoint=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.runs: Dict[str, Dict[str, Any]] = {}
+        self.checkpoints = 0
+        self.fail_on_checkpoint = fail_on_checkpoint
+
+    async def _create_run(self, run):
+        run_id = f"run-{len(self.runs) + 1}"
+        self.runs[run_id] = {**run, 'failed_documents': list(run['failed_documents'])}
+        return run_id
+
+    async def _load_run(self, run_id):
+        run = self.runs.get(run_id)
+        return {**run, 'failed_documents': list(run['failed_documents'])} if run else None
+
+    async def _update_run(self, run_id, values):
+        if 'next_index' in values:
+            self.checkpoints += 1
+            if self.checkpoints == self.fail_on_checkpoint:
+                raise ConnectionError("database went away")
+        self.runs[run_id].update(values)
+
+def _kms_service() -> EncryptionService:
+    service = EncryptionService()
+    service.kms_key_id = "old-key"
+    service.kms_client = MagicMock()
+    service.kms_client.generate_data_key.return_value = {
+        "Plaintext": KEY, "CiphertextBlob": b"wrapped-by-old", "KeyId": "old-key"
+    }
+    service.kms_client.re_encrypt.return_value = {"CiphertextBlob": b"wrapped-by-new", "KeyId": "new-key"}
+    service.kms_client.decrypt.return_value = {"Plaintext": KEY}
+    return service
+
+async def _populate(service: EncryptionService, count: int) -> MemoryDocumentStore:
+    store = MemoryDocumentStore()
+    for i in range(count):
+        store.documents[f"doc-{i}"] = await service.encrypt_document(f"content {i}".encode(), f"doc-{i}")
+    return store
+
+@pytest.mark.asyncio
+async def test_rewrap_changes_keys_not_ciphertext_chunks():
+    """Re-wrapping shares one ReEncrypt per data key and documents still decrypt"""
+    service = _kms_service()
+    store = await _populate(service, 25)
+    before = dict(store.documents)
+
+    rotation = MemoryRotationService(service, concurrency=4, batch_size=10)
+    result = await rotation.rotate(list(store.documents), store, target_key_id="new-key")
+
+    assert result['rotated_count'] == 25 and result['failed_count'] == 0
+    assert service.kms_client.re_encrypt.call_count == 1
+    assert rotation.runs[result['run_id']]['status'] == "completed"
+    assert rotation.checkpoints == 3
+
+    service.key_cache.clear()
+    for i in range(25):
+        rotated = store.documents[f"doc-{i}"]
+        assert rotated['key_id'] == "new-key"
+        assert rotated['encrypted_content'] != before[f"doc-{i}"]['encrypted_content']
+        content, _ = await service.decrypt_document(rotated)
+        assert content == f"content {i}".encode()
+    assert service.kms_client.decrypt.call_args.kwargs['CiphertextBlob'] == b"wrapped-by-new"
+
+@pytest.mark.asyncio
+async def test_failed_documents_are_recorded_without_stopping_the_run():
+    """Per-document errors are collected while the rest of the run proceeds"""
+    service = _kms_service()
+    store = await _populate(service, 5)
+    store.documents["doc-2"] = {"key_id": "old-key"}
+
+    result = await MemoryRotationService(service).rotate(list(store.documents), store)
+
+    assert result['rotated_count'] == 4
+    assert [failure['document_id'] for failure in result['failed_documents']] == ["doc-2"]
+
+@pytest.mark.asyncio
+async def test_interrupted_run_resumes_from_last_checkpoint():
+    """A crash after the first batch resumes without redoing completed batches"""
+    service = _kms_service()
+    store = await _populate(service, 30)
+
+    rotation = MemoryRotationService(service, batch_size=10, fail_on_checkpoint=2)
+    with pytest.raises(Exception):
+        await rotation.rotate(list(store.documents), store, target_key_id="new-key")
+    [run_id] = rotation.runs
+    assert rotation.runs[run_id]['status'] == "failed"
+    assert rotation.runs[run_id]['next_index'] == 10
+
+    store.saves = 0
+    result = await rotation.rotate([], store, run_id=run_id)
+
+    assert store.saves == 20
+    assert result['rotated_count'] == 30
+    assert rotation.runs[run_id]['status'] == "completed"
+
+@pytest.mark.asyncio
+async def test_reencrypt_mode_uses_fresh_data_key():
+    """Full re-encryption produces new ciphertext under a newly generated data key"""
+    service = EncryptionService()
+    service.kms_key_id = None
+    store = await _populate(service, 3)
+    old_keys = {item['encrypted_data_key'] for item in store.documents.values()}
+
+    result = await MemoryRotationService(service).rotate(list(store.documents), store, mode=KeyRotationMode.REENCRYPT)
+
+    assert result['rotated_count'] == 3
+    assert {item['encrypted_data_key'] for item in store.documents.values()}.isdisjoint(old_keys)
+    content, _ = await service.decrypt_document(store.documents["doc-1"])
+    assert content == b"content 1"
+
+def test_document_store_must_implement_load_and_save():
+    with pytest.raises(TypeError):
+        EncryptedDocumentStore()
+
+    class LoadOnlyStore(EncryptedDocumentStore):
+        async def load(self, document_id):
+            return {}
+
+    with pytest.raises(TypeError):
+        LoadOnlyStore()
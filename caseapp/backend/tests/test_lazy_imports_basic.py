@@ -0,0 +1,71 @@
+"""
+Basic tests for deferred imports, the shared model registry and import-time budget
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from core.lazy_imports import LazyImportRegistry
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ["reportlab.platypus", "matplotlib.pyplot", "numpy", "pandas", "spacy", "textblob", "networkx", "sklearn"]
+
+def test_proxy_imports_on_first_attribute_access():
+    """The real module is imported once, when an attribute is first used"""
+    registry = LazyImportRegistry()
+    proxy = registry.lazy_import("colorsys")
+
+    assert "deferred" in repr(proxy)
+    assert proxy.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert "loaded" in repr(proxy)
+    assert "colorsys" in registry.get_report()["loaded_modules"]
+
+def test_models_load_once_and_missing_models_are_cached():
+    """Every caller shares one model instance; a None result is not retried"""
+    registry = LazyImportRegistry()
+    calls = []
+
+    def load():
+        calls.append(1)
+        return object()
+
+    first = registry.get_model("model", load)
+    assert registry.get_model("model", load) is first
+    assert registry.get_model("missing", lambda: calls.append(1)) is None
+    assert registry.get_model("missing", lambda: calls.append(1)) is None
+    assert len(calls) == 2
+    assert registry.get_report()["models"]["missing"]["available"] is False
+
+def test_milestones_keep_first_mark():
+    registry = LazyImportRegistry()
+    registry.mark("app_imported")
+    first = registry.milestones["app_imported"]
+    registry.mark("app_imported")
+    assert registry.milestones["app_imported"] == first
+
+def test_service_imports_defer_heavy_libraries():
+    """Importing export and forensic services loads none of their heavy dependencies"""
+    script = (
+        "import json, sys\n"
+        "import services.export_service, services.timeline_export_service, services.forensic_analysis_service\n"
+        f"print(json.dumps({{'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert report["loaded"] == []
+
+def test_app_import_does_not_load_numpy():
+    """Importing the application leaves numpy for the first analysis that needs it"""
+    script = "import sys\nimport main\nprint('numpy' in sys.modules)\n"
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "False"
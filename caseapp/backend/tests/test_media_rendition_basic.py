@@ -0,0 +1,78 @@
+"""
+Basic tests for media rendition generation
+"""
+
+import shutil
+import subprocess
+import pytest
+from pathlib import Path
+from PIL import Image
+
+from services.media_rendition_service import (
+    MediaRenditionService, render_image, render_video, select_rendition, RENDITION_DIR
+)
+
+SIZES = {"small": 50, "large": 200}
+
+def _write_jpeg(path: Path, size=(640, 480)) -> str:
+    Image.new("RGB", size, (120, 30, 200)).save(path, "JPEG", quality=90)
+    return str(path)
+
+def test_image_renditions_from_single_decode(tmp_path):
+    """Every size and format is produced and stored next to the original"""
+    manifest = render_image(_write_jpeg(tmp_path / "photo.jpg"), SIZES, ["jpeg", "webp"])
+
+    assert (manifest["original_width"], manifest["original_height"]) == (640, 480)
+    assert len(manifest["renditions"]) == 4
+
+    small = select_rendition(manifest, "small", "webp")
+    assert max(small["width"], small["height"]) == 50
+    assert Path(small["path"]).parent == tmp_path / RENDITION_DIR
+    with Image.open(small["path"]) as image:
+        assert image.format == "WEBP"
+
+    large = select_rendition(manifest, "large")
+    assert (large["width"], large["height"]) == (200, 150)
+    assert select_rendition(manifest, "huge") is None
+
+def test_renditions_are_content_addressed(tmp_path):
+    """Identical sources produce the same rendition files"""
+    first = render_image(_write_jpeg(tmp_path / "a.jpg"), SIZES, ["jpeg"])
+    second = render_image(_write_jpeg(tmp_path / "b.jpg"), SIZES, ["jpeg"])
+
+    assert [r["path"] for r in first["renditions"]] == [r["path"] for r in second["renditions"]]
+    assert len(list((tmp_path / RENDITION_DIR).iterdir())) == 2
+
+def test_small_images_are_not_upscaled(tmp_path):
+    """Sizes larger than the source keep the original dimensions"""
+    manifest = render_image(_write_jpeg(tmp_path / "tiny.jpg", size=(40, 30)), SIZES, ["jpeg"])
+
+    assert {(r["width"], r["height"]) for r in manifest["renditions"]} == {(40, 30)}
+
+@pytest.mark.asyncio
+async def test_service_renders_in_process_pool(tmp_path):
+    """Rendering runs in a worker process and returns the manifest"""
+    service = MediaRenditionService(max_workers=1)
+    try:
+        manifest = await service.render_image(_write_jpeg(tmp_path / "pooled.jpg"))
+        assert manifest["source"] == "image"
+        assert all(Path(r["path"]).exists() for r in manifest["renditions"])
+    finally:
+        service.shutdown()
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_video_poster_and_sprite_sheet(tmp_path):
+    """Videos get a poster in every size plus a keyframe sprite sheet"""
+    source = tmp_path / "clip.mp4"
+    subprocess.run(
+        ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", "testsrc=duration=4:size=320x240:rate=10",
+         "-g", "10", str(source)],
+        check=True
+    )
+
+    manifest = render_video(str(source), SIZES, ["jpeg"], sprite_frames=4, sprite_tile_width=80)
+
+    assert manifest["source"] == "video"
+    assert (manifest["original_width"], manifest["original_height"]) == (320, 240)
+    assert Path(manifest["sprite"]["path"]).exists()
+    assert select_rendition(manifest, "small")["width"] == 50
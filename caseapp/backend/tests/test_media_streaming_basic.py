@@ -0,0 +1,153 @@
+"""
+Basic tests for the media range streaming engine
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+from starlette.datastructures import Headers
+
+from models.media import MediaShareLink
+from services.media_service import MediaService
+from services.media_streaming_service import MediaStreamingService, parse_range_header
+
+CONTENT = bytes(range(256)) * 40  # 10240 bytes
+
+TABLES = [MediaShareLink.__table__]
+
+async def _collect(response, extensions=None):
+    """Run an ASGI response, returning (status, headers, body, zero-copy sends)"""
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await response({"type": "http", "extensions": extensions or {}}, None, send)
+    start = messages[0]
+    headers = {key.decode(): value.decode() for key, value in start["headers"]}
+    body = b"".join(m.get("body", b"") for m in messages if m["type"] == "http.response.body")
+    zero_copy = [m for m in messages if m["type"] == "http.response.zerocopysend"]
+    return start["status"], headers, body, zero_copy
+
+@pytest.fixture
+def session(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(CONTENT)
+    media = SimpleNamespace(
+        id=uuid4(), file_path=str(path), file_size=len(CONTENT),
+        mime_type="video/mp4", file_hash="abc123", original_filename="clip.mp4"
+    )
+    service = MediaStreamingService(idle_seconds=60)
+    key = service.session_key(media.id, "user-1", "127.0.0.1", "stream")
+    return service, service.open_session(key, media)
+
+def test_parse_range_header_variants():
+    """Open-ended, suffix and overlapping ranges are normalised"""
+    assert parse_range_header("bytes=0-99", 1000) == [(0, 99)]
+    assert parse_range_header("bytes=900-", 1000) == [(900, 999)]
+    assert parse_range_header("bytes=-100", 1000) == [(900, 999)]
+    assert parse_range_header("bytes=0-5000", 1000) == [(0, 999)]
+    assert parse_range_header("bytes=50-99, 0-49, 200-299", 1000) == [(0, 99), (200, 299)]
+    assert parse_range_header("bytes=2000-3000", 1000) == []
+    with pytest.raises(ValueError):
+        parse_range_header("items=0-1", 1000)
+
+@pytest.mark.asyncio
+async def test_single_range_served_from_mapped_file(session):
+    service, playback = session
+    response = service.build_response(playback, Headers({"range": "bytes=100-199"}))
+
+    status, headers, body, _ = await _collect(response)
+    assert status == 206
+    assert headers["content-range"] == f"bytes 100-199/{len(CONTENT)}"
+    assert headers["content-length"] == "100"
+    assert headers["etag"] == '"abc123"'
+    assert body == CONTENT[100:200]
+
+@pytest.mark.asyncio
+async def test_multi_range_uses_multipart_byteranges(session):
+    service, playback = session
+    response = service.build_response(playback, Headers({"range": "bytes=0-9,5000-5009"}))
+
+    status, headers, body, _ = await _collect(response)
+    assert status == 206
+    assert headers["content-type"].startswith("multipart/byteranges; boundary=")
+    assert int(headers["content-length"]) == len(body)
+    assert CONTENT[0:10] in body and CONTENT[5000:5010] in body
+    assert body.count(b"Content-Range: bytes") == 2
+
+@pytest.mark.asyncio
+async def test_zero_copy_extension_is_used_when_offered(session):
+    service, playback = session
+    response = service.build_response(playback, Headers({"range": "bytes=10-19"}))
+
+    _, _, body, zero_copy = await _collect(response, {"http.response.zerocopysend": {}})
+    assert body == b""
+    assert [(m["offset"], m["count"]) for m in zero_copy] == [(10, 10)]
+
+def test_conditional_requests(session):
+    service, playback = session
+
+    assert service.build_response(playback, Headers({"if-none-match": '"abc123"'})).status_code == 304
+    assert service.build_response(playback, Headers({"range": "bytes=0-1", "if-range": '"stale"'})).status_code == 200
+    assert service.build_response(playback, Headers({"range": "bytes=0-1", "if-range": '"abc123"'})).status_code == 206
+    assert service.build_response(playback, Headers({"range": "bytes=99999-"})).status_code == 416
+    assert service.build_response(playback, Headers({"range": "nonsense"})).status_code == 200
+
+def test_playback_session_coalesces_requests(session):
+    """Seeks reuse one session and accumulate bytes served"""
+    service, playback = session
+    for start in (0, 1000, 2000):
+        service.build_response(playback, Headers({"range": f"bytes={start}-{start + 99}"}))
+
+    assert service.get_session(playback.key) is playback
+    assert playback.requests == 3
+    assert playback.bytes_served == 300
+    assert service.get_session(("other",)) is None
+
+@pytest.mark.asyncio
+async def test_idle_sessions_are_flushed(session):
+    service, playback = session
+    assert await service.flush_expired() == 0
+    assert await service.flush_expired(force=True) == 1
+    assert service.sessions == {}
+
+@pytest.mark.asyncio
+async def test_sessions_expire_after_max_lifetime_despite_activity(session):
+    service, playback = session
+    service.max_seconds = 120
+    playback.started_at -= 121
+    service.build_response(playback, Headers({"range": "bytes=0-9"}))
+
+    assert service.get_session(playback.key) is None
+    assert await service.flush_expired() == 1
+
+@pytest.mark.asyncio
+async def test_closed_sessions_are_written_and_awaited_on_stop(session):
+    service, playback = session
+    service.close_session(playback.key)
+    assert service.get_session(playback.key) is None
+    assert len(service._pending_writes) == 1
+
+    await service.stop()
+    assert service._pending_writes == set()
+
+@pytest.mark.asyncio
+async def test_share_link_is_rechecked_without_counting_a_view(db):
+    link = MediaShareLink(
+        media_id=uuid4(), share_token="t" * 64, expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+        view_limit=1, view_count=1, is_active=True, created_by=uuid4()
+    )
+    db.add(link)
+    await db.commit()
+    service = MediaService(db, audit_service=None)
+
+    # The session's own view used up the limit, which does not end it
+    assert await service.is_share_link_active(link.share_token)
+    assert link.view_count == 1
+    assert not await service.is_share_link_active("missing")
+
+    link.is_active = False
+    await db.commit()
+    assert not await service.is_share_link_active(link.share_token)
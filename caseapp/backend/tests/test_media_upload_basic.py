@@ -0,0 +1,151 @@
+"""
+Basic tests for streamed, deduplicated media uploads
+"""
+
+import hashlib
+import pytest
+from io import BytesIO
+from uuid import uuid4
+from fastapi import UploadFile
+from sqlalchemy import select, update
+
+from core.exceptions import CaseManagementException
+from models.media import MediaBlob
+from schemas.media import MediaUploadRequest, MediaTypeEnum
+from services.media_service import MediaService, _stream_to_temp_file
+
+CONTENT = b"evidence-bytes" * 100000
+
+TABLES = [MediaBlob.__table__]
+
+class ScriptedResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+class ScriptedDB:
+    """Returns queued scalar results in order"""
+
+    def __init__(self, *values):
+        self.values = list(values)
+
+    async def execute(self, statement):
+        return ScriptedResult(self.values.pop(0))
+
+    async def rollback(self):
+        pass
+
+class UnreadableFile(BytesIO):
+    def read(self, *args):
+        raise AssertionError("upload body should not be read")
+
+@pytest.fixture
+def media_service(tmp_path):
+    def build(db):
+        service = MediaService(db, audit_service=None)
+        service.upload_path = tmp_path
+        service.blob_path = tmp_path / "blobs"
+        service.staging_path = tmp_path / "staging"
+        service.staging_path.mkdir(exist_ok=True)
+        return service
+    return build
+
+def test_stream_to_temp_file_hashes_while_copying(tmp_path):
+    temp_path, file_hash, size = _stream_to_temp_file(BytesIO(CONTENT), tmp_path)
+
+    assert file_hash == hashlib.sha256(CONTENT).hexdigest()
+    assert size == len(CONTENT)
+    assert temp_path.read_bytes() == CONTENT
+
+def test_identical_uploads_share_one_blob(media_service, tmp_path):
+    service = media_service(None)
+    file_hash = hashlib.sha256(CONTENT).hexdigest()
+
+    paths = []
+    for _ in range(2):
+        temp_path, _, _ = _stream_to_temp_file(BytesIO(CONTENT), service.staging_path)
+        paths.append(service._commit_blob(temp_path, file_hash))
+        temp_path.unlink(missing_ok=True)
+
+    assert paths[0] == paths[1]
+    assert paths[0].name == file_hash
+    assert paths[0].read_bytes() == CONTENT
+    assert list(service.staging_path.iterdir()) == []
+
+@pytest.mark.asyncio
+async def test_client_hash_rejects_known_duplicate_before_reading(media_service):
+    """A supplied hash matching media already in the case fails without touching the body"""
+    existing_id = uuid4()
+    service = media_service(ScriptedDB(object(), existing_id))
+    request = MediaUploadRequest(
+        case_id=uuid4(),
+        media_type=MediaTypeEnum.VIDEO,
+        sha256=hashlib.sha256(CONTENT).hexdigest().upper()
+    )
+    upload = UploadFile(file=UnreadableFile(), filename="clip.mp4")
+
+    with pytest.raises(CaseManagementException, match=str(existing_id)):
+        await service.upload_media(upload, request, uuid4())
+
+@pytest.mark.asyncio
+async def test_mismatched_client_hash_is_rejected(media_service):
+    service = media_service(ScriptedDB(object(), None))
+    request = MediaUploadRequest(case_id=uuid4(), media_type=MediaTypeEnum.IMAGE, sha256="0" * 64)
+    upload = UploadFile(file=BytesIO(CONTENT), filename="photo.jpg")
+
+    with pytest.raises(CaseManagementException, match="does not match"):
+        await service.upload_media(upload, request, uuid4())
+    assert list(service.staging_path.iterdir()) == []
+    assert not service.blob_path.exists()
+
+@pytest.mark.asyncio
+async def test_released_blob_file_outlives_the_transaction_until_swept(db, media_service):
+    service = media_service(db)
+    file_hash = hashlib.sha256(CONTENT).hexdigest()
+    temp_path, _, _ = _stream_to_temp_file(BytesIO(CONTENT), service.staging_path)
+    blob_file = service._commit_blob(temp_path, file_hash)
+    db.add(MediaBlob(sha256=file_hash, file_path=str(blob_file), file_size=len(CONTENT), ref_count=2))
+    await db.commit()
+
+    assert not await service.release_blob(file_hash)
+    assert await service.release_blob(file_hash)
+    # Rolled back: the file and its references are untouched
+    await db.rollback()
+    assert await service.sweep_released_blobs() == 0
+    assert blob_file.exists()
+
+    await service.release_blob(file_hash)
+    await service.release_blob(file_hash)
+    await db.commit()
+    assert blob_file.exists()
+
+    assert await service.sweep_released_blobs() == 1
+    assert not blob_file.exists()
+    assert (await db.execute(select(MediaBlob))).first() is None
+
+@pytest.mark.asyncio
+async def test_sweep_removes_legacy_file_and_blob_store_copy(db, media_service, tmp_path):
+    """A blob registered at its pre-blob path and uploaded again leaves no file behind"""
+    service = media_service(db)
+    file_hash = hashlib.sha256(CONTENT).hexdigest()
+    legacy_file = tmp_path / "case-1" / f"{file_hash}.mp4"
+    legacy_file.parent.mkdir()
+    legacy_file.write_bytes(CONTENT)
+    # As registered by the blob migration
+    db.add(MediaBlob(sha256=file_hash, file_path=str(legacy_file), file_size=len(CONTENT), ref_count=1))
+    await db.commit()
+
+    # Re-uploading the content places a second copy in the blob store
+    temp_path, _, _ = _stream_to_temp_file(BytesIO(CONTENT), service.staging_path)
+    blob_file = service._commit_blob(temp_path, file_hash)
+    await db.execute(update(MediaBlob).values(ref_count=MediaBlob.ref_count + 1))
+    await db.commit()
+    assert blob_file != legacy_file and blob_file.exists()
+
+    await service.release_blob(file_hash)
+    await service.release_blob(file_hash)
+    await db.commit()
+    assert await service.sweep_released_blobs() == 1
+    assert not legacy_file.exists() and not blob_file.exists()
@@ -0,0 +1,168 @@
+"""
+Basic tests for the media worker pool and job claiming
+"""
+
+import asyncio
+import pytest
+from uuid import uuid4
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql
+
+from models.media import MediaEvidence, MediaFormat, MediaProcessingJob, MediaType, ProcessingStatus
+from services.media_processing_service import MediaProcessingService, MediaWorkerPool
+
+TABLES = [MediaEvidence.__table__, MediaProcessingJob.__table__]
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+class FakeSession:
+    """Returns canned rows for the claim query and records commits"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.rows)
+
+    async def commit(self):
+        self.commits += 1
+
+class ScriptedPool(MediaWorkerPool):
+    """Worker pool whose claims come from in-memory queues and whose jobs just sleep"""
+
+    def __init__(self, queues, pools):
+        super().__init__(pools=pools, worker_id="test-worker", poll_interval_seconds=0.01)
+        self.queues = queues
+        self.running_now = {name: 0 for name in pools}
+        self.peak = {name: 0 for name in pools}
+        self.durations = {"transcription": 0.2}
+
+    def _pool_for(self, job_type):
+        return next(name for name, (job_types, _) in self.pools.items() if job_type in job_types)
+
+    async def _claim(self, job_types, limit):
+        claimed = []
+        for job_type in job_types:
+            queue = self.queues.get(job_type, [])
+            while queue and len(claimed) < limit:
+                claimed.append((job_type, queue.pop(0)))
+        return claimed
+
+    async def _maintain(self):
+        return
+
+    async def _execute(self, job):
+        job_type, _ = job
+        name = self._pool_for(job_type)
+        self.running_now[name] += 1
+        self.peak[name] = max(self.peak[name], self.running_now[name])
+        try:
+            await asyncio.sleep(self.durations.get(job_type, 0.01))
+        finally:
+            self.running_now[name] -= 1
+
+def test_claim_query_skips_locked_rows():
+    """Claims lock rows with SKIP LOCKED in priority order"""
+    sql = str(
+        MediaProcessingService.claim_query(["thumbnail"], 5).compile(dialect=postgresql.dialect())
+    )
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "ORDER BY media_processing_jobs.priority DESC, media_processing_jobs.created_at ASC" in sql
+
+def test_claim_index_matches_claim_order():
+    """The composite claim index covers status, priority and age"""
+    [index] = [i for i in MediaProcessingJob.__table__.indexes if i.name == "ix_media_processing_jobs_claim"]
+    assert [str(expr) for expr in index.expressions] == [
+        "media_processing_jobs.status",
+        "media_processing_jobs.priority DESC",
+        "media_processing_jobs.created_at"
+    ]
+
+@pytest.mark.asyncio
+async def test_claim_leases_jobs_with_wall_clock_times():
+    """Claimed jobs are leased to the worker with timezone-aware timestamps"""
+    job = MediaProcessingJob(id=uuid4(), job_type="thumbnail", status=ProcessingStatus.PENDING)
+    db = FakeSession([job])
+
+    [claimed] = await MediaProcessingService(db).claim_jobs("worker-1", ["thumbnail"], limit=3)
+
+    assert claimed.status == ProcessingStatus.PROCESSING
+    assert claimed.worker_id == "worker-1"
+    assert claimed.started_at.tzinfo is not None
+    assert claimed.lease_expires_at > claimed.started_at
+    assert db.commits == 1
+    assert await MediaProcessingService(db).claim_jobs("worker-1", limit=0) == []
+
+@pytest.mark.asyncio
+async def test_pools_drain_in_parallel_within_limits():
+    """Each pool respects its own limit and slow transcriptions don't block thumbnails"""
+    queues = {
+        "thumbnail": [f"t{i}" for i in range(12)],
+        "transcription": [f"a{i}" for i in range(4)]
+    }
+    workers = ScriptedPool(queues, {
+        "thumbnail": (("thumbnail",), 3),
+        "transcription": (("transcription",), 1)
+    })
+
+    await workers.start()
+    try:
+        deadline = asyncio.get_running_loop().time() + 2
+        while workers.processed["thumbnail"] < 12:
+            assert asyncio.get_running_loop().time() < deadline
+            await asyncio.sleep(0.01)
+
+        assert workers.processed["transcription"] < 4
+        assert workers.peak == {"thumbnail": 3, "transcription": 1}
+    finally:
+        await workers.stop()
+
+    assert workers.get_status()["pools"]["thumbnail"]["in_flight"] == 0
+
+@pytest.mark.asyncio
+async def test_job_is_completed_only_while_the_worker_holds_it(db, session_factory):
+    """A job requeued after its lease lapsed is left for the worker that picks it up next"""
+    # Inserted through Core so the ARRAY columns stay NULL instead of defaulting to []
+    media_id = uuid4()
+    await db.execute(MediaEvidence.__table__.insert().values(
+        id=media_id, case_id=uuid4(), filename="call.mp3", original_filename="call.mp3", file_path="/call.mp3",
+        file_size=10, file_hash="callhash", mime_type="audio/mpeg", media_type=MediaType.AUDIO,
+        media_format=MediaFormat.MP3, tags=None, categories=None, created_by=uuid4()
+    ))
+    await db.execute(MediaProcessingJob.__table__.insert(), [
+        dict(id=job_id, media_id=media_id, job_type="thumbnail", status=ProcessingStatus.PENDING, priority=5,
+             retry_count=0, max_retries=3, output_files=None, created_by=uuid4())
+        for job_id in (uuid4(), uuid4())
+    ])
+    await db.commit()
+    service = MediaProcessingService(db)
+    held, requeued = await service.claim_jobs("worker-1", ["thumbnail"], limit=2)
+    held_id, requeued_id = held.id, requeued.id
+
+    # Stale-job recovery releases one of them while the worker is still busy with it
+    async with session_factory() as other:
+        await other.execute(
+            update(MediaProcessingJob)
+            .where(MediaProcessingJob.id == requeued_id)
+            .values(status=ProcessingStatus.PENDING, worker_id=None)
+        )
+        await other.commit()
+
+    await service._process_job(held)
+    await service._process_job(requeued)
+
+    async with session_factory() as other:
+        assert (await other.get(MediaProcessingJob, held_id)).status == ProcessingStatus.SKIPPED
+        job = await other.get(MediaProcessingJob, requeued_id)
+        assert (job.status, job.result_data) == (ProcessingStatus.PENDING, None)
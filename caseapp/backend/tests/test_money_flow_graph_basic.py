@@ -0,0 +1,139 @@
+"""
+Basic tests for the money-flow graph engine and flow alerts
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+from models.financial_analysis import FinancialAccount, FinancialAlert, FinancialTransaction, TransactionType
+from services import money_flow_service
+from services.financial_summary_cache import financial_summary_cache
+from services.money_flow_graph import MoneyFlowGraphBuilder, epoch_seconds
+from services.money_flow_service import MoneyFlowService, money_flow_graph_cache
+
+TABLES = [FinancialAccount.__table__, FinancialTransaction.__table__, FinancialAlert.__table__]
+
+START = datetime(2024, 3, 1, 9, 0)
+HOUR = 3600
+
+def _at(hours):
+    return START + timedelta(hours=hours)
+
+def _builder(*accounts):
+    return MoneyFlowGraphBuilder([(account_id, number, name) for account_id, number, name in accounts])
+
+def test_builder_links_case_accounts_and_keeps_mirrored_transfers_once():
+    a, b = uuid.uuid4(), uuid.uuid4()
+    builder = _builder((a, "111-222", "Operating"), (b, "333 444", "Reserve"))
+    builder.add(uuid.uuid4(), a, _at(0), 500.0, TransactionType.DEBIT, "Reserve", "333-444")
+    # The same transfer as recorded on the receiving account's statement
+    builder.add(uuid.uuid4(), b, _at(20), 500.0, TransactionType.CREDIT, "Operating", "111222")
+    # An imported transfer whose direction is in the signed amount
+    builder.add(uuid.uuid4(), b, _at(30), 75.0, TransactionType.TRANSFER, "Shell LLC", None, "75.00")
+    builder.add(uuid.uuid4(), b, _at(31), 10.0, TransactionType.DEBIT, None, None)
+    graph = builder.build()
+
+    assert graph.edge_count == 2
+    edges = {(graph.nodes[s].key, graph.nodes[d].key) for s, d in zip(graph.src, graph.dst)}
+    assert edges == {(f"account:{a}", f"account:{b}"), ("name:shell llc", f"account:{b}")}
+
+def test_trace_follows_hops_in_time_order_within_the_window():
+    a = uuid.uuid4()
+    builder = _builder((a, "1", "Source"))
+    builder.add(uuid.uuid4(), a, _at(0), 1000.0, TransactionType.DEBIT, "Mule", "M1")
+    # Onward hops between external parties, as traced on statements outside the case
+    for src_number, dst_number, hours, amount in [
+        ("M1", "L1", 2, 900.0),
+        ("M1", "E1", -1, 5000.0),  # Before the funds arrived
+        ("L1", "X1", 100, 800.0),  # Outside the window
+    ]:
+        src, dst = builder._counterparty(None, src_number), builder._counterparty(None, dst_number)
+        builder._edge(src, dst, amount, epoch_seconds(_at(hours)), uuid.uuid4())
+    graph = builder.build()
+
+    trace = graph.trace(graph.node_index[f"account:{a}"], max_hops=4, window_seconds=48 * HOUR)
+    reached = {entry["node"]["key"]: entry for entry in trace["reached"]}
+    assert set(reached) == {"external:M1", "external:L1"}
+    assert reached["external:L1"]["hops"] == 2 and reached["external:L1"]["traced_amount"] == 900.0
+    assert trace["paths"][0]["amount"] == 1000.0 and not trace["truncated"]
+
+def test_cycles_and_fan_patterns():
+    a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    builder = _builder((a, "A", "Alpha"), (b, "B", "Bravo"), (c, "C", "Charlie"))
+    builder.add(uuid.uuid4(), a, _at(0), 10000.0, TransactionType.DEBIT, None, "B")
+    builder.add(uuid.uuid4(), b, _at(5), 9800.0, TransactionType.DEBIT, None, "C")
+    builder.add(uuid.uuid4(), c, _at(10), 9500.0, TransactionType.DEBIT, None, "A")
+    # Returns too little to count as a round trip (and C's 9,500 to A went out before this arrived)
+    builder.add(uuid.uuid4(), a, _at(11), 4000.0, TransactionType.DEBIT, None, "C")
+    builder.add(uuid.uuid4(), c, _at(12), 100.0, TransactionType.DEBIT, None, "A")
+    for i in range(6):
+        builder.add(uuid.uuid4(), b, _at(20 + i), 900.0, TransactionType.CREDIT, f"Payer {i}", f"P{i}")
+    builder.add(uuid.uuid4(), b, _at(30), 5000.0, TransactionType.WIRE_TRANSFER, "Offshore", "OFF1")
+    graph = builder.build()
+
+    result = graph.find_cycles(max_hops=4, window_seconds=24 * HOUR)
+    assert len(result["cycles"]) == 1
+    cycle = result["cycles"][0]
+    assert [node["label"] for node in cycle["nodes"]] == ["Alpha", "Bravo", "Charlie"]
+    assert (cycle["amount_out"], cycle["amount_returned"]) == (10000.0, 9500.0)
+
+    patterns = graph.find_fan_patterns(min_counterparties=5, window_seconds=12 * HOUR)
+    assert len(patterns) == 1
+    fan = patterns[0]
+    assert fan["kind"] == "fan_in" and fan["node"]["label"] == "Bravo"
+    assert (fan["counterparties"], fan["amount"], fan["related_amount"]) == (6, 5400.0, 5000.0)
+    assert fan["pass_through"]
+
+@pytest_asyncio.fixture
+async def db(db):
+    yield db
+    money_flow_graph_cache.clear()
+
+@pytest.mark.asyncio
+async def test_service_caches_graphs_per_generation_and_alerts_once(db, monkeypatch):
+    case_id = uuid.uuid4()
+    accounts = [FinancialAccount(id=uuid.uuid4(), case_id=case_id, created_by=uuid.uuid4(), account_number=number)
+                for number in ("A", "B")]
+    db.add_all(accounts)
+    db.add_all([
+        FinancialTransaction(account_id=accounts[0].id, case_id=case_id, transaction_date=_at(0), amount=7000.0,
+                             transaction_type=TransactionType.DEBIT, counterparty_account="B", risk_score=0.0),
+        FinancialTransaction(account_id=accounts[1].id, case_id=case_id, transaction_date=_at(3), amount=6900.0,
+                             transaction_type=TransactionType.TRANSFER, counterparty_account="A", risk_score=0.0,
+                             metadata_json={"signed_amount": "-6900.00"}),
+    ])
+    await db.commit()
+
+    generation = {"value": "1"}
+
+    async def current_generation(case):
+        return generation["value"]
+    monkeypatch.setattr(financial_summary_cache, "generation", current_generation)
+    builds = []
+    build_graph = MoneyFlowService._build_graph
+
+    async def counting_build(self, case):
+        builds.append(case)
+        return await build_graph(self, case)
+    monkeypatch.setattr(money_flow_service.MoneyFlowService, "_build_graph", counting_build)
+
+    service = MoneyFlowService(db)
+    first = await service.get_graph(case_id)
+    assert await service.get_graph(case_id) is first
+    generation["value"] = "2"
+    assert await service.get_graph(case_id) is not first
+    assert len(builds) == 2
+
+    flags = {}
+    assert await service.detect_patterns(case_id, flags) == 1
+    await db.commit()
+    assert await service.detect_patterns(case_id, flags) == 0
+
+    alert = (await db.scalars(select(FinancialAlert))).one()
+    assert alert.alert_type == "round_tripping"
+    assert len(alert.detected_patterns["transaction_ids"]) == 2
+    assert set(flags.values()) == {0.8} and len(flags) == 2
@@ -0,0 +1,106 @@
+"""
+Basic tests for the real-time presence hub and coalesced session activity
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
+from api.v1.endpoints import collaboration
+from core.auth import authenticate_token
+from core.config import settings
+from services.presence_hub import PresenceHub, PresenceSubscription
+from services.presence_service import PresenceService
+
+@pytest.mark.asyncio
+async def test_publish_fans_out_to_timeline_except_sender():
+    """Updates reach every session on the timeline except the excluded one"""
+    hub = PresenceHub()
+    sender = hub.subscribe("timeline-1", "session-a")
+    peer = hub.subscribe("timeline-1", "session-b")
+    other_timeline = hub.subscribe("timeline-2", "session-c")
+
+    await hub.publish("timeline-1", {"type": "presence_update", "n": 1}, exclude_session_id="session-a")
+
+    assert sender.drain() == []
+    assert [json.loads(message) for message in peer.drain()] == [{"type": "presence_update", "n": 1}]
+    assert other_timeline.drain() == []
+
+    hub.unsubscribe("session-b")
+    assert hub.get_subscription("session-b") is None
+    assert set(hub.timelines["timeline-1"]) == {"session-a"}
+
+def test_slow_subscriber_drops_oldest_messages():
+    """A full queue keeps the newest updates"""
+    subscription = PresenceSubscription("timeline-1", "session-a", max_queued=2)
+    for index in range(4):
+        subscription.put(str(index))
+
+    assert subscription.drain() == ["2", "3"]
+    assert subscription.dropped == 2
+
+@pytest.mark.asyncio
+async def test_activity_updates_are_coalesced_until_flush():
+    """Repeated cursor moves collapse into one pending database write"""
+    service = PresenceService(hub=PresenceHub())
+    service.active_sessions["session-a"] = {"session_id": "session-a", "timeline_id": "timeline-1", "user_id": "user-1"}
+
+    try:
+        for x in range(100):
+            assert await service.update_session_activity("session-a", {"cursor_position": {"x": x}})
+
+        assert list(service.pending_activity) == ["session-a"]
+        assert service.pending_activity["session-a"]["cursor_position"] == {"x": 99}
+        assert await service.update_session_activity("missing", {"cursor_position": {"x": 1}}) is False
+    finally:
+        service._flush_task.cancel()
+
+@pytest.mark.asyncio
+async def test_polling_fallback_reads_hub_subscription():
+    """Polling clients drain the same subscription that WebSocket/SSE streams read"""
+    hub = PresenceHub()
+    service = PresenceService(hub=hub)
+    hub.subscribe("timeline-1", "session-a")
+
+    await service.broadcast_presence_update("timeline-1", {"type": "user_joined", "user_id": "user-2"})
+
+    [update] = await service.get_session_updates("session-a")
+    assert update["type"] == "presence_update"
+    assert update["data"] == {"type": "user_joined", "user_id": "user-2"}
+    assert await service.get_session_updates("session-a") == []
+
+def test_redis_mapping_encodes_structured_values():
+    """Redis hash fields hold JSON for structured values and skip private keys"""
+    mapping = PresenceService._redis_mapping({
+        "session_id": "session-a",
+        "current_view": {"zoom": 2},
+        "is_active": True,
+        "_row_id": 7
+    })
+
+    assert mapping == {"session_id": "session-a", "current_view": '{"zoom":2}', "is_active": "true"}
+
+@pytest.mark.asyncio
+async def test_session_streams_are_limited_to_their_owner(monkeypatch):
+    """Another user's session is reported as missing, and MFA-pending tokens are refused"""
+    service = PresenceService(hub=PresenceHub())
+    service.active_sessions["session-a"] = {"session_id": "session-a", "timeline_id": "timeline-1", "user_id": "user-1"}
+    service.hub.subscribe("timeline-1", "session-a")
+    monkeypatch.setattr(collaboration, "presence_service", service)
+
+    with pytest.raises(HTTPException) as denied:
+        await collaboration.stream_session_events("session-a", request=None, current_user=SimpleNamespace(id="user-2"))
+    assert denied.value.status_code == 404
+    with pytest.raises(HTTPException):
+        await collaboration.get_session_updates("session-a", db=None, current_user=SimpleNamespace(id="user-2"))
+    assert await collaboration.get_session_updates("session-a", db=None, current_user=SimpleNamespace(id="user-1")) == {"updates": []}
+
+    pending = jwt.encode({"sub": "user-1", "mfa_required": True}, settings.SECRET_KEY, algorithm="HS256")
+    with pytest.raises(HTTPException) as refused:
+        await authenticate_token(pending)
+    assert refused.value.detail == "MFA verification required"
+    verified = jwt.encode({"sub": "user-1", "mfa_required": True, "mfa_verified": True}, settings.SECRET_KEY, algorithm="HS256")
+    assert (await authenticate_token(verified))["id"] == "user-1"
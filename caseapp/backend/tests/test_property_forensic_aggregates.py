@@ -0,0 +1,95 @@
+"""
+Property-based tests for precomputed forensic source aggregates
+"""
+
+import pytest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from hypothesis import given, strategies as st, settings
+
+from models.forensic_analysis import ForensicDataType, ForensicSourceAggregate
+from services.forensic_aggregate_service import ForensicAggregateAccumulator
+
+participants = st.sampled_from(['self', 'alice@example.com', 'bob@example.com', '+15551234567', 'carol@test.org'])
+
+@st.composite
+def forensic_item_strategy(draw):
+    """Generate a lightweight forensic item"""
+    return SimpleNamespace(
+        item_type=draw(st.sampled_from(list(ForensicDataType))),
+        timestamp=draw(st.datetimes(
+            min_value=datetime(2019, 1, 1),
+            max_value=datetime(2024, 12, 31),
+            timezones=st.just(timezone.utc)
+        )),
+        sender=draw(st.one_of(st.none(), participants)),
+        recipients=draw(st.lists(participants, max_size=3)),
+        sentiment_score=draw(st.one_of(st.none(), st.floats(min_value=-1, max_value=1))),
+        is_deleted=draw(st.booleans())
+    )
+
+def _snapshot(accumulator: ForensicAggregateAccumulator):
+    row = ForensicSourceAggregate()
+    accumulator.write_to(row)
+    return {column.name: getattr(row, column.name) for column in ForensicSourceAggregate.__table__.columns
+            if column.name not in ('id', 'source_id', 'updated_at')}
+
+class TestForensicAggregateProperties:
+    """Aggregates maintained incrementally must match a full recomputation"""
+
+    @given(items=st.lists(forensic_item_strategy(), max_size=40), split=st.integers(min_value=0, max_value=40))
+    @settings(max_examples=50, deadline=None)
+    def test_batched_ingestion_matches_single_pass(self, items, split):
+        """Flushing in batches and merging yields the same aggregate as one pass"""
+        single_pass = ForensicAggregateAccumulator()
+        single_pass.add_items(items)
+
+        first_batch = ForensicAggregateAccumulator()
+        first_batch.add_items(items[:split])
+        stored = ForensicSourceAggregate()
+        first_batch.write_to(stored)
+
+        combined = ForensicAggregateAccumulator.from_aggregate(stored)
+        second_batch = ForensicAggregateAccumulator()
+        second_batch.add_items(items[split:])
+        combined.merge(second_batch)
+
+        assert _snapshot(combined) == _snapshot(single_pass)
+
+    @given(items=st.lists(forensic_item_strategy(), min_size=1, max_size=40))
+    @settings(max_examples=50, deadline=None)
+    def test_statistics_are_consistent(self, items):
+        """Breakdowns add up to the total and edges reflect real exchanges"""
+        accumulator = ForensicAggregateAccumulator()
+        accumulator.add_items(items)
+        stats = accumulator.statistics()
+
+        assert stats['total_messages'] == len(items)
+        assert sum(stats['messages_by_hour']) == len(items)
+        assert sum(stats['messages_by_weekday']) == len(items)
+        assert sum(stats['messages_by_day'].values()) == len(items)
+        assert stats['email_count'] + stats['sms_count'] + stats['whatsapp_count'] + stats['other_count'] == len(items)
+        assert stats['deleted_messages'] == sum(1 for item in items if item.is_deleted)
+        assert stats['positive_sentiment'] + stats['neutral_sentiment'] + stats['negative_sentiment'] == \
+            sum(1 for item in items if item.sentiment_score is not None)
+
+        exchanged = sum(
+            1 for item in items if item.sender
+            for recipient in item.recipients if recipient != item.sender
+        )
+        assert sum(edge['weight'] for edge in accumulator.edge_list()) == exchanged
+
+        for participant in accumulator.participant_summaries():
+            assert 0 <= participant['centrality_score'] <= 1
+            assert participant['message_count'] == participant['sent_count'] + participant['received_count']
+
+    def test_empty_accumulator_statistics(self):
+        """An empty source reports zeros and no peak hour"""
+        stats = ForensicAggregateAccumulator().statistics()
+
+        assert stats['total_messages'] == 0
+        assert stats['peak_hour'] is None
+        assert stats['date_range'] == {'start': None, 'end': None}
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,106 @@
+"""
+Basic tests for the concurrent, dependency-aware service initialization graph
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from core.service_manager import ServiceManager, ServiceInitStep
+
+def _manager(steps_factory):
+    manager = ServiceManager()
+    manager.init_steps = steps_factory(manager)
+    return manager
+
+def _step(name, log, delay=0.0, fail=False, **kwargs):
+    async def initialize():
+        log.append(f"start:{name}")
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError(f"{name} down")
+        log.append(f"end:{name}")
+        return {"ok": True}
+    return ServiceInitStep(name, initialize, **kwargs)
+
+@pytest.mark.asyncio
+async def test_independent_steps_run_concurrently_after_dependencies():
+    """Startup time is the critical path, not the sum of every step"""
+    log = []
+    manager = _manager(lambda m: [
+        _step("migrations", log, 0.1),
+        _step("database", log, 0.1, depends_on=("migrations",), critical=True),
+        _step("redis", log, 0.15, critical=True),
+        _step("aws_services", log, 0.15),
+        _step("integration_services", log, 0.0, depends_on=("database", "redis")),
+    ])
+
+    started = time.perf_counter()
+    result = await manager.initialize_all_services()
+    elapsed = time.perf_counter() - started
+
+    assert result["status"] == "success"
+    assert elapsed < 0.4
+    assert log.index("end:migrations") < log.index("start:database")
+    assert log.index("end:database") < log.index("start:integration_services")
+    assert log.index("end:redis") < log.index("start:integration_services")
+    assert set(manager.initialization_times) == {"migrations", "database", "redis", "aws_services", "integration_services"}
+
+@pytest.mark.asyncio
+async def test_critical_failure_skips_dependents_and_noncritical_failure_does_not():
+    log = []
+    manager = _manager(lambda m: [
+        _step("migrations", log, fail=True),
+        _step("database", log, depends_on=("migrations",), critical=True),
+        _step("redis", log, fail=True, critical=True),
+        _step("integration_services", log, depends_on=("database", "redis")),
+    ])
+
+    result = await manager.initialize_all_services()
+
+    assert result["services"]["migrations"]["status"] == "error"
+    assert result["services"]["database"]["status"] == "success"
+    assert result["services"]["integration_services"]["status"] == "skipped"
+    assert "start:integration_services" not in log
+    assert "redis" in manager.service_errors["integration_services"]
+
+@pytest.mark.asyncio
+async def test_slow_step_times_out():
+    log = []
+    manager = _manager(lambda m: [_step("aws_services", log, 1.0, timeout=0.05)])
+
+    result = await manager.initialize_all_services()
+
+    assert result["services"]["aws_services"]["status"] == "error"
+    assert "timed out" in manager.service_errors["aws_services"]
+
+@pytest.mark.asyncio
+async def test_deferred_steps_run_in_background_warmup():
+    """Startup returns before deferred probes finish; they are reported once warm-up completes"""
+    log = []
+    manager = _manager(lambda m: [
+        _step("database", log, critical=True),
+        _step("aws_connectivity", log, 0.1, deferred=True),
+    ])
+
+    result = await manager.initialize_all_services()
+    assert result["deferred_services"] == ["aws_connectivity"]
+    assert result["total_services"] == 1
+    assert manager.get_service_status()["warmup_complete"] is False
+
+    await manager.warmup_task
+    status = manager.get_service_status()
+    assert status["warmup_complete"] is True
+    assert status["initialized_services"]["aws_connectivity"] is True
+    assert "aws_connectivity" in status["initialization_times_ms"]
+
+def test_default_graph_is_acyclic_and_references_known_steps():
+    steps = ServiceManager().init_steps
+    names = [step.name for step in steps]
+    assert len(names) == len(set(names))
+
+    order = {}
+    for step in steps:
+        assert all(dependency in order for dependency in step.depends_on), step.name
+        order[step.name] = len(order)
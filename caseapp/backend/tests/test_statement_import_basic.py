@@ -0,0 +1,198 @@
+"""
+Basic tests for streaming statement parsing and deduplicating bulk import
+"""
+
+import io
+import json
+import uuid
+from datetime import datetime, UTC
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from core.exceptions import ValidationError
+from models.financial_analysis import (
+    FinancialAccount, FinancialStatementImport, FinancialTransaction, TransactionType
+)
+from services.statement_import_service import COPY_COLUMNS, StatementImportService
+from services.statement_parsers import (
+    STATEMENT_PROFILES, NaturalKeyer, ParsedTransaction, RejectedRow, StatementParseError,
+    StatementProfile, detect_format, parse_amount, parse_csv, parse_ofx, parse_qif
+)
+
+OFX_SGML = """OFXHEADER:100
+DATA:OFXSGML
+VERSION:102
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><CURDEF>EUR
+<BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240115120000.000[-5:EST]<TRNAMT>-125.50<FITID>A1<NAME>AMAZON &amp; CO<MEMO>Order 1
+</STMTTRN>
+<STMTTRN><TRNTYPE>XFER<DTPOSTED>20240116<TRNAMT>9500.00<FITID>A2<NAME>Shell LLC
+<BANKACCTTO><BANKID>021000021<ACCTID>99887766<ACCTTYPE>CHECKING</BANKACCTTO>
+</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<TRNAMT>-1.00<FITID>A3</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+QIF = """!Type:Bank
+D1/15'24
+T-1,250.00
+PLandlord
+MRent
+NChk 101
+LHousing
+^
+D 1/16'24
+T300.00
+PPayroll
+^
+Dnot a date
+T1.00
+^
+"""
+
+def _records(parser, text, profile=STATEMENT_PROFILES["generic"]):
+    return list(parser(io.StringIO(text), profile))
+
+def test_parse_amount_handles_statement_notations():
+    assert parse_amount("$1,234.56") == Decimal("1234.56")
+    assert parse_amount("(1,234.56)") == Decimal("-1234.56")
+    assert parse_amount("$(20.00)") == Decimal("-20.00")
+    assert parse_amount("45.10-") == Decimal("-45.10")
+    assert parse_amount("99.99 DR") == Decimal("-99.99")
+    assert parse_amount("1.234,5", decimal_separator=",") == Decimal("1234.50")
+    assert parse_amount("0.105") == Decimal("0.11")
+    with pytest.raises(ValueError):
+        parse_amount("n/a")
+
+def test_csv_profiles_map_columns_and_reject_bad_rows():
+    text = "Date,Description,Amount,Ref\n2024-01-15,Coffee,-4.50,R1\n01/16/2024,Salary,\"2,000.00\",\n2024-13-40,Bad,1.00,\n\n"
+    profile = StatementProfile.from_mapping({"reference_column": "Ref"}, STATEMENT_PROFILES["generic"])
+    records = _records(parse_csv, text, profile)
+
+    assert [type(record) for record in records] == [ParsedTransaction, ParsedTransaction, RejectedRow]
+    coffee, salary, bad = records
+    assert coffee.amount == Decimal("-4.50") and coffee.resolved_type == TransactionType.DEBIT
+    assert coffee.reference == "R1"
+    assert salary.amount == Decimal("2000.00") and salary.resolved_type == TransactionType.CREDIT
+    assert bad.line == 4 and "date" in bad.reason
+
+    debit_credit = "date;text;debit;credit\n15.01.2024;Rent;1.200,00;\n16.01.2024;Refund;;10,5\n"
+    profile = StatementProfile.from_mapping(
+        {"description_column": "text", "amount_column": None, "debit_column": "debit", "credit_column": "credit"},
+        STATEMENT_PROFILES["european"]
+    )
+    rent, refund = _records(parse_csv, debit_credit, profile)
+    assert rent.amount == Decimal("-1200.00") and rent.transaction_date == datetime(2024, 1, 15, tzinfo=UTC)
+    assert refund.amount == Decimal("10.50")
+
+    with pytest.raises(StatementParseError):
+        _records(parse_csv, "Posted,Memo,Value\n2024-01-01,x,1\n")
+
+def test_ofx_sgml_and_qif_parsing():
+    amazon, transfer, missing = _records(parse_ofx, OFX_SGML)
+    assert amazon.transaction_date == datetime(2024, 1, 15, 17, 0, tzinfo=UTC)
+    assert amazon.amount == Decimal("-125.50") and amazon.currency == "EUR"
+    assert amazon.description == "AMAZON & CO - Order 1" and amazon.external_id == "A1"
+    assert transfer.transaction_type == TransactionType.TRANSFER
+    assert transfer.counterparty_account == "99887766"
+    assert isinstance(missing, RejectedRow)
+
+    rent, payroll, bad = _records(parse_qif, QIF)
+    assert rent.transaction_date == datetime(2024, 1, 15, tzinfo=UTC)
+    assert rent.amount == Decimal("-1250.00") and rent.reference == "Chk 101"
+    assert rent.extra == {"category": "Housing"}
+    assert payroll.amount == Decimal("300.00")
+    assert isinstance(bad, RejectedRow)
+
+def test_ofx_reader_handles_tags_split_across_chunks(monkeypatch):
+    import services.statement_parsers as parsers
+    monkeypatch.setattr(parsers, "OFX_READ_SIZE", 7)
+    assert [record.external_id for record in _records(parse_ofx, OFX_SGML)[:2]] == ["A1", "A2"]
+
+def test_detect_format_and_natural_keys():
+    assert detect_format("statement.QFX", "") == "ofx"
+    assert detect_format(None, "!Type:Bank\n") == "qif"
+    assert detect_format("export", "OFXHEADER:100") == "ofx"
+    assert detect_format("export", "Date,Amount") == "csv"
+
+    record = ParsedTransaction(line=1, transaction_date=datetime(2024, 1, 1, tzinfo=UTC), amount=Decimal("-5.00"),
+                               description="Coffee  shop")
+    same = ParsedTransaction(line=9, transaction_date=datetime(2024, 1, 1, 8, tzinfo=UTC), amount=Decimal("-5.00"),
+                             description="COFFEE SHOP")
+    first, second = NaturalKeyer(), NaturalKeyer()
+    key = first.key(record)
+    assert second.key(same) == key  # Same record in another file
+    assert first.key(record) != key  # Repeat within one file is kept
+
+class SQLiteStatementImportService(StatementImportService):
+    """Loads batches with INSERT .. ON CONFLICT DO NOTHING instead of asyncpg COPY"""
+
+    async def _prepare_staging(self):
+        self.batches = []
+
+    async def _load_batch(self, rows):
+        self.batches.append(len(rows))
+        values = []
+        for row in rows:
+            value = dict(zip(COPY_COLUMNS, row))
+            value["transaction_type"] = TransactionType[value["transaction_type"]]
+            value["metadata_json"] = json.loads(value["metadata_json"])
+            values.append(value)
+        result = await self.db.execute(
+            sqlite_insert(FinancialTransaction).values(values).on_conflict_do_nothing()
+        )
+        return result.rowcount
+
+TABLES = [FinancialAccount.__table__, FinancialStatementImport.__table__, FinancialTransaction.__table__]
+
+@pytest.mark.asyncio
+async def test_import_batches_dedupes_and_runs_detectors_once(db):
+    account = FinancialAccount(id=uuid.uuid4(), case_id=uuid.uuid4(), created_by=uuid.uuid4(), currency="USD")
+    db.add(account)
+    await db.commit()
+
+    rows = "".join(f"2024-01-{day:02d},Deposit,100.00\n" for day in range(1, 11))
+    statement = ("Date,Description,Amount\n" + rows + "2024-01-05,Deposit,100.00\nbad,row,1\n").encode()
+
+    service = SQLiteStatementImportService(db, batch_size=4)
+    detector_runs = []
+
+    async def run_detectors(case_id):
+        detector_runs.append(case_id)
+    service._run_detectors = run_detectors
+
+    result = await service.import_statement(account.id, io.BytesIO(statement), filename="jan.csv")
+    assert result.status == "completed"
+    assert (result.rows_parsed, result.rows_inserted, result.rows_duplicate, result.rows_rejected) == (11, 11, 0, 1)
+    assert result.errors == [{"line": 13, "reason": "unrecognised date 'bad'"}]
+    assert service.batches == [4, 4, 3]
+    assert detector_runs == [account.case_id]
+
+    # Re-importing the same production (or an overlapping one) adds nothing
+    again = await service.import_statement(account.id, io.BytesIO(statement), filename="jan.csv")
+    assert (again.rows_inserted, again.rows_duplicate) == (0, 11)
+    assert detector_runs == [account.case_id]
+
+    count = await db.scalar(select(func.count()).select_from(FinancialTransaction))
+    assert count == 11
+    stored = (await db.execute(select(FinancialTransaction).limit(1))).scalar_one()
+    assert stored.import_id == result.id and stored.transaction_type == TransactionType.CREDIT
+
+@pytest.mark.asyncio
+async def test_import_rejects_unknown_profile_and_records_parse_failures(db):
+    account = FinancialAccount(id=uuid.uuid4(), case_id=uuid.uuid4(), created_by=uuid.uuid4())
+    db.add(account)
+    await db.commit()
+    service = SQLiteStatementImportService(db)
+
+    with pytest.raises(ValidationError):
+        await service.import_statement(account.id, io.BytesIO(b"Date,Amount\n"), profile="nope")
+
+    with pytest.raises(ValidationError):
+        await service.import_statement(account.id, io.BytesIO(b"Posted,Value\n2024-01-01,1\n"), filename="x.csv")
+    failed = (await db.execute(select(FinancialStatementImport))).scalar_one()
+    assert failed.status == "failed" and "Column 'date' not found" in failed.error_message
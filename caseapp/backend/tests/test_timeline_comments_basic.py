@@ -0,0 +1,95 @@
+"""
+Basic tests for batched timeline comment threads and discussion counters
+"""
+
+import uuid
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+
+from models.case import Case, CaseType
+from models.timeline import CaseTimeline, TimelineCollaboration, TimelineComment, TimelineEvent
+from models.user import User, UserRole
+from services.timeline_collaboration_service import TimelineCollaborationService
+
+TABLES = [
+    User.__table__, Case.__table__, CaseTimeline.__table__, TimelineEvent.__table__,
+    TimelineComment.__table__, TimelineCollaboration.__table__
+]
+
+@pytest_asyncio.fixture
+async def sessions(session_factory, monkeypatch):
+    monkeypatch.setattr("services.timeline_collaboration_service.AsyncSessionLocal", session_factory)
+    return session_factory
+
+def _user(name):
+    return User(
+        id=uuid.uuid4(), username=name, email=f"{name}@example.com", hashed_password="x",
+        first_name=name.title(), last_name="Tester", role=UserRole.ATTORNEY
+    )
+
+@pytest_asyncio.fixture
+async def timeline(sessions):
+    alice, bob = _user("alice"), _user("bob")
+    case = Case(id=uuid.uuid4(), case_number="C-1", title="Doe v. Roe", case_type=CaseType.CIVIL, created_by=alice.id)
+    timeline = CaseTimeline(id=uuid.uuid4(), case_id=case.id, title="Main", created_by=alice.id)
+    events = [
+        TimelineEvent(
+            id=uuid.uuid4(), timeline_id=timeline.id, case_id=case.id, title=f"Event {index}",
+            event_date=datetime(2024, 1, index + 1), created_by=alice.id
+        )
+        for index in range(3)
+    ]
+    async with sessions() as db:
+        db.add_all([alice, bob, case, timeline, *events])
+        db.add(TimelineCollaboration(timeline_id=timeline.id, user_id=bob.id, created_by_id=alice.id))
+        await db.commit()
+    return {"alice": alice.id, "bob": bob.id, "timeline": timeline.id, "events": [event.id for event in events]}
+
+@pytest.mark.asyncio
+async def test_counters_and_threads_for_many_events(timeline):
+    service = TimelineCollaborationService()
+    first, second, empty = timeline["events"]
+    alice, bob = timeline["alice"], timeline["bob"]
+
+    root = await service.add_timeline_comment(timeline["timeline"], first, alice, "Root")
+    reply = await service.add_timeline_comment(timeline["timeline"], first, bob, "Reply", parent_comment_id=root.id)
+    await service.add_timeline_comment(timeline["timeline"], first, alice, "Nested", parent_comment_id=reply.id)
+    hidden = await service.add_timeline_comment(timeline["timeline"], second, alice, "Internal")
+    await service.add_timeline_comment(
+        timeline["timeline"], second, bob, "Public reply", parent_comment_id=hidden.id, is_internal=False
+    )
+
+    threads = await service.get_comment_threads(timeline["timeline"], [first, second, empty, uuid.uuid4()])
+    first, second, empty = str(first), str(second), str(empty)
+    assert set(threads) == {first, second, empty}
+    assert (threads[first]["comment_count"], threads[first]["participant_count"]) == (3, 2)
+    assert (threads[second]["comment_count"], threads[second]["participant_count"]) == (2, 2)
+    assert threads[empty] == {"comment_count": 0, "participant_count": 0, "comments": []}
+
+    [thread] = threads[first]["comments"]
+    assert thread["comment_text"] == "Root" and thread["user_name"] == "Alice Tester"
+    assert thread["replies"][0]["comment_text"] == "Reply"
+    assert thread["replies"][0]["replies"][0]["comment_text"] == "Nested"
+
+    # A reply whose parent is hidden becomes a root, and hidden comments are not counted
+    public = await service.get_comment_threads(timeline["timeline"], [second, empty], include_internal=False)
+    assert [comment["comment_text"] for comment in public[second]["comments"]] == ["Public reply"]
+    assert (public[second]["comment_count"], public[second]["participant_count"]) == (1, 1)
+    assert public[empty] == {"comment_count": 0, "participant_count": 0, "comments": []}
+
+    assert len(await service.get_timeline_comments(timeline["events"][0])) == 3
+
+@pytest.mark.asyncio
+async def test_commenting_on_a_missing_event_is_rejected(timeline):
+    with pytest.raises(ValueError):
+        await TimelineCollaborationService().add_timeline_comment(
+            timeline["timeline"], uuid.uuid4(), timeline["alice"], "Lost"
+        )
+
+@pytest.mark.asyncio
+async def test_user_collaborations_include_the_case_title(timeline):
+    [collaboration] = await TimelineCollaborationService().get_user_collaborations(timeline["bob"])
+    assert collaboration["case_title"] == "Doe v. Roe"
+    assert collaboration["timeline_title"] == "Main"
@@ -0,0 +1,184 @@
+"""
+Basic tests for lexicographic timeline ranks, single-row moves and bulk reorders
+"""
+
+import random
+import uuid
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import Values
+
+from core.config import settings
+from core.exceptions import CaseManagementException
+from core.lexorank import rank_between, spread_ranks
+from models.case import AuditLog
+from models.timeline import EvidencePin, TimelineComment, TimelineEvent
+from models.user import User
+from services.audit_service import AuditService
+from services.timeline_service import TimelineService
+
+MORNING = datetime(2024, 3, 1, 9, 0)
+NOON = datetime(2024, 3, 1, 12, 0)
+
+TABLES = [User.__table__, TimelineEvent.__table__, EvidencePin.__table__, TimelineComment.__table__, AuditLog.__table__]
+
+def test_rank_between_always_finds_room():
+    keys = []
+    generator = random.Random(7)
+    for _ in range(2000):
+        index = generator.randint(0, len(keys))
+        before = keys[index - 1] if index else None
+        after = keys[index] if index < len(keys) else None
+        key = rank_between(before, after)
+        assert (before is None or before < key) and (after is None or key < after)
+        keys.insert(index, key)
+    assert keys == sorted(keys) and max(map(len, keys)) < 10
+
+    with pytest.raises(ValueError):
+        rank_between("m", "c")
+
+    spread = spread_ranks(5000)
+    assert spread == sorted(spread) and len(set(spread)) == 5000 and max(map(len, spread)) <= 4
+    bounded = spread_ranks(100, "i", "ij")
+    assert bounded == sorted(set(bounded)) and "i" < bounded[0] and bounded[-1] < "ij"
+
+@compiles(Values, "sqlite")
+def _compile_named_values_for_sqlite(element, compiler, asfrom=False, **kw):
+    # SQLite cannot name the columns of a VALUES list, so select them under their names
+    if not asfrom or element._unnamed:
+        return compiler.visit_values(element, asfrom=asfrom, **kw)
+    kw.pop("from_linter", None)
+    columns = ", ".join(
+        f"column{position} AS {compiler.preparer.quote(c.name)}"
+        for position, c in enumerate(element.columns, 1)
+    )
+    rows = compiler._render_values(element, **kw)
+    return f"(SELECT {columns} FROM ({rows})) AS {compiler.preparer.quote(element.name)}"
+
+@pytest_asyncio.fixture
+async def events(db):
+    case_id, user_id = uuid.uuid4(), uuid.uuid4()
+    created = [
+        TimelineEvent(
+            id=uuid.uuid4(), timeline_id=uuid.uuid4(), case_id=case_id, title=title,
+            event_date=MORNING, sort_rank=sort_rank, created_by=user_id
+        )
+        for title, sort_rank in (("a", "4"), ("b", "8"), ("c", "c"))
+    ]
+    db.add_all(created)
+    await db.commit()
+    return created
+
+async def _titles(db, case_id):
+    result = await db.execute(
+        select(TimelineEvent.title)
+        .where(TimelineEvent.case_id == case_id)
+        .order_by(TimelineEvent.event_date, TimelineEvent.sort_rank)
+    )
+    return result.scalars().all()
+
+@pytest.mark.asyncio
+async def test_move_writes_only_the_moved_event(db, events):
+    a, b, c = events
+    service = TimelineService(db, AuditService(db))
+
+    moved = await service.move_timeline_event(a.case_id, c.id, a.created_by, previous_event_id=a.id, next_event_id=b.id)
+    assert "4" < moved.sort_rank < "8"
+    assert await _titles(db, a.case_id) == ["a", "c", "b"]
+    assert {event.id: event.sort_rank for event in await service._get_ordered_events([a.id, b.id])} == {a.id: "4", b.id: "8"}
+
+    # A neighbour at another timestamp leaves that side open
+    moved = await service.move_timeline_event(a.case_id, a.id, a.created_by, previous_event_id=b.id, new_date=NOON)
+    assert moved.event_date == NOON and moved.sort_rank == rank_between()
+    assert await _titles(db, a.case_id) == ["c", "b", "a"]
+
+    with pytest.raises(CaseManagementException):
+        await service.move_timeline_event(a.case_id, c.id, a.created_by, previous_event_id=b.id, next_event_id=c.id)
+
+@pytest.mark.asyncio
+async def test_bulk_reorder_and_rebalance(db, events, monkeypatch):
+    a, b, c = events
+    service = TimelineService(db, AuditService(db))
+
+    updated = await service.reorder_timeline_events(a.case_id, [
+        {"event_id": str(a.id), "display_order": 3},
+        {"event_id": str(b.id), "display_order": 1},
+        {"event_id": str(c.id), "display_order": 2},
+        {"event_id": str(uuid.uuid4()), "display_order": 0}
+    ], a.created_by)
+    assert [event.title for event in updated] == ["b", "c", "a"]
+    assert await _titles(db, a.case_id) == ["b", "c", "a"]
+
+    # Keys lengthen as moves squeeze into the same gap until a rebalance shortens them
+    monkeypatch.setattr("services.timeline_service.schedule_rank_rebalance", lambda case_id: None)
+    for _ in range(60):
+        await service.move_timeline_event(a.case_id, a.id, a.created_by, previous_event_id=b.id, next_event_id=c.id)
+        await service.move_timeline_event(a.case_id, c.id, a.created_by, previous_event_id=b.id, next_event_id=a.id)
+    [squeezed] = await service._get_ordered_events([c.id])
+    assert len(squeezed.sort_rank) > settings.TIMELINE_RANK_MAX_LENGTH
+
+    assert await service.rebalance_event_ranks(a.case_id) == 3
+    assert await _titles(db, a.case_id) == ["b", "c", "a"]
+    assert all(len(event.sort_rank) <= 2 for event in await service._get_ordered_events([a.id, b.id, c.id]))
+    assert await service.rebalance_event_ranks(a.case_id) == 0
+
+@pytest.mark.asyncio
+async def test_bulk_rank_writes_update_from_one_values_list_per_chunk(db, events, monkeypatch):
+    a, b, c = events
+    service = TimelineService(db, AuditService(db))
+    statements = []
+    event.listen(db.sync_session, "do_orm_execute", lambda state: statements.append(state.statement))
+    monkeypatch.setattr("services.timeline_service.RANK_UPDATE_CHUNK", 2)
+
+    await service._write_ranks(a.case_id, [
+        {"id": moved.id, "event_date": NOON, "sort_rank": sort_rank}
+        for moved, sort_rank in ((a, "2"), (b, "4"), (c, "6"))
+    ], a.created_by)
+    await db.commit()
+    assert len(statements) == 2
+    assert await _titles(db, a.case_id) == ["a", "b", "c"]
+
+    sql = " ".join(str(statements[0].compile(dialect=postgresql.dialect())).split())
+    assert sql.startswith("UPDATE timeline_events SET event_date=ranks.event_date, sort_rank=ranks.sort_rank")
+    assert "FROM (VALUES (%(param_1)s::UUID, %(param_2)s, %(param_3)s), " in sql
+    assert ") AS ranks (id, event_date, sort_rank) WHERE timeline_events.id = ranks.id AND timeline_events.case_id = " in sql
+
+@pytest.mark.asyncio
+async def test_open_sides_are_bounded_by_events_at_the_timestamp(db, events):
+    a, b, c = events
+    service = TimelineService(db, AuditService(db))
+    at_noon = TimelineEvent(
+        id=uuid.uuid4(), timeline_id=a.timeline_id, case_id=a.case_id, title="noon",
+        event_date=NOON, sort_rank=rank_between(), created_by=a.created_by
+    )
+    db.add(at_noon)
+    await db.commit()
+
+    # Only the previous neighbour: lands right after it, not past the events that follow it
+    await service.move_timeline_event(a.case_id, c.id, a.created_by, previous_event_id=a.id)
+    assert await _titles(db, a.case_id) == ["a", "c", "b", "noon"]
+    await service.move_timeline_event(a.case_id, a.id, a.created_by, next_event_id=b.id)
+    assert await _titles(db, a.case_id) == ["c", "a", "b", "noon"]
+
+    # No neighbour at the new timestamp: appended after the events already there
+    moved = await service.move_timeline_event(a.case_id, b.id, a.created_by, new_date=NOON)
+    assert moved.sort_rank > at_noon.sort_rank
+    assert await _titles(db, a.case_id) == ["c", "a", "noon", "b"]
+
+@pytest.mark.asyncio
+async def test_reorder_places_listed_events_after_unlisted_ones(db, events):
+    a, b, c = events
+    service = TimelineService(db, AuditService(db))
+
+    await service.reorder_timeline_events(a.case_id, [
+        {"event_id": str(b.id), "display_order": 2},
+        {"event_id": str(a.id), "display_order": 1}
+    ], a.created_by)
+    ranks = {event.title: event.sort_rank for event in await service._get_ordered_events([a.id, b.id, c.id])}
+    assert ranks["c"] == "c" and len(set(ranks.values())) == 3
+    assert await _titles(db, a.case_id) == ["c", "a", "b"]
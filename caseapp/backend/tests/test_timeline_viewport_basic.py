@@ -0,0 +1,116 @@
+"""
+Basic tests for zoomable timeline viewports
+"""
+
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.dialects import postgresql
+
+from core.exceptions import CaseManagementException
+from models.timeline import EvidencePin, TimelineEvent
+from services.timeline_viewport_service import TimelineViewportService, choose_zoom
+
+START = datetime(2024, 1, 1)
+
+TABLES = [TimelineEvent.__table__, EvidencePin.__table__]
+
+def _date_trunc(field, value):
+    """PostgreSQL's date_trunc for the fields viewports bucket by, over SQLite datetime strings"""
+    moment = datetime.fromisoformat(value)
+    if field == "week":
+        moment = moment - timedelta(days=moment.weekday())
+    elif field == "quarter":
+        moment = moment.replace(month=(moment.month - 1) // 3 * 3 + 1)
+    units = ("year", "month", "day", "hour", "minute", "second", "microsecond")
+    kept = units.index({"week": "day", "quarter": "month"}.get(field, field)) + 1
+    moment = moment.replace(**{unit: 1 if unit in ("month", "day") else 0 for unit in units[kept:]})
+    return moment.isoformat(" ")
+
+def _register_postgresql_functions(sync_conn):
+    # Event dates are stored as naive UTC, so converting them to UTC is a no-op
+    dbapi_connection = sync_conn.connection.dbapi_connection
+    dbapi_connection.create_function("timezone", 2, lambda zone, value: value)
+    dbapi_connection.create_function("date_trunc", 2, _date_trunc)
+
+@pytest_asyncio.fixture
+async def engine(engine):
+    async with engine.connect() as conn:
+        await conn.run_sync(_register_postgresql_functions)
+    return engine
+
+@pytest_asyncio.fixture
+async def timeline_id(db):
+    timeline_id, case_id, user_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    # One event every 12 hours through January and February, a milestone on each 10th
+    events = [
+        TimelineEvent(
+            id=uuid.uuid4(), timeline_id=timeline_id, case_id=case_id, title=f"Event {index}",
+            event_date=START + timedelta(hours=12 * index), importance_level=3,
+            is_milestone=(START + timedelta(hours=12 * index)).day == 10, created_by=user_id
+        )
+        for index in range(120)
+    ]
+    db.add_all(events)
+    db.add(EvidencePin(
+        timeline_event_id=events[0].id, evidence_type="document", evidence_id=uuid.uuid4(), created_by=user_id
+    ))
+    await db.commit()
+    return timeline_id
+
+def test_auto_zoom_picks_the_finest_fitting_bucket():
+    assert choose_zoom(START, START + timedelta(days=3), 120) == "hour"
+    assert choose_zoom(START, START + timedelta(days=365), 120) == "week"
+    assert choose_zoom(START, START + timedelta(days=365 * 50), 120) == "year"
+
+def test_buckets_truncate_the_utc_event_date_in_postgresql(db):
+    bucket = TimelineViewportService(db)._bucket_expression("week")
+    assert str(bucket.compile(dialect=postgresql.dialect())) == (
+        "date_trunc(%(date_trunc_1)s, timezone(%(timezone_1)s, timeline_events.event_date))"
+    )
+
+@pytest.mark.asyncio
+async def test_events_are_keyset_paginated(db, timeline_id):
+    service = TimelineViewportService(db)
+    end = START + timedelta(days=10)
+
+    seen, cursor = [], None
+    while True:
+        page = await service.get_viewport(timeline_id, START, end, zoom="events", limit=7, cursor=cursor)
+        seen.extend(event["title"] for event in page["events"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert page["total_count"] == 20
+    assert seen == [f"Event {index}" for index in range(20)]
+
+    first = await service.get_viewport(timeline_id, START, end, zoom="events", limit=1)
+    assert first["events"][0]["evidence_count"] == 1 and "comments" not in first["events"][0]
+
+    with pytest.raises(CaseManagementException):
+        await service.get_viewport(timeline_id, START, end, zoom="events", cursor="not-a-cursor")
+
+@pytest.mark.asyncio
+async def test_zoomed_out_views_return_buckets(db, timeline_id):
+    service = TimelineViewportService(db)
+    end = START + timedelta(days=60)
+
+    viewport = await service.get_viewport(timeline_id, START, end, limit=50)
+    assert viewport["mode"] == "buckets" and viewport["zoom"] == "day"
+
+    months = await service.get_viewport(timeline_id, START, end, zoom="month", top_events=2)
+    assert [(bucket["start"], bucket["count"]) for bucket in months["buckets"]] == [
+        (datetime(2024, 1, 1, tzinfo=UTC), 62),
+        (datetime(2024, 2, 1, tzinfo=UTC), 58),
+    ]
+    # Milestones rank first within a bucket
+    assert [event["event_date"].day for event in months["buckets"][0]["top_events"]] == [10, 10]
+
+    weeks = await service.get_viewport(timeline_id, START, end, zoom="week")
+    assert weeks["buckets"][0]["start"] == datetime(2024, 1, 1, tzinfo=UTC)  # A Monday
+    assert sum(bucket["count"] for bucket in weeks["buckets"]) == 120
+
+    quarters = await service.get_viewport(timeline_id, START, end, zoom="quarter")
+    assert [(bucket["start"].month, bucket["count"]) for bucket in quarters["buckets"]] == [(1, 120)]
@@ -0,0 +1,259 @@
+"""
+Basic tests for the webhook delivery engine
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import pytest
+from datetime import datetime, timedelta, UTC
+
+from core.webhook_signing import encode_payload, encode_batch, sign_payload
+
+from sqlalchemy import select, update
+
+from models.external_sharing import WebhookQueuedDelivery, WebhookSubscription
+from services.webhook_service import (
+    WebhookService, WebhookEvent, WebhookStatus, CircuitState,
+    EndpointCircuitBreaker, DatabaseWebhookDeliveryStore, compute_retry_delay
+)
+
+TABLES = [WebhookSubscription.__table__, WebhookQueuedDelivery.__table__]
+
+class RecordingTransport:
+    """Stands in for the HTTP POST, recording each request's deliveries"""
+
+    def __init__(self, succeed: bool = True, retryable: bool = True):
+        self.succeed = succeed
+        self.retryable = retryable
+        self.requests = []
+
+    async def __call__(self, endpoint, deliveries):
+        self.requests.append([delivery.id for delivery in deliveries])
+        return self.succeed, self.retryable
+
+async def _wait_until(condition, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+def test_retry_delay_grows_with_jitter():
+    """Backoff doubles per attempt, stays within the jitter band and is capped"""
+    for attempt in range(1, 8):
+        delay = compute_retry_delay(attempt, 10, 3600)
+        ceiling = min(10 * 2 ** (attempt - 1), 3600)
+        assert ceiling / 2 <= delay <= ceiling
+
+    assert compute_retry_delay(100, 10, 300) <= 300
+
+def test_circuit_breaker_opens_and_probes():
+    """Consecutive failures open the circuit; one probe is allowed after the cool-down"""
+    breaker = EndpointCircuitBreaker(failure_threshold=2, reset_timeout_seconds=30)
+    now = datetime.now(UTC)
+
+    breaker.record_failure(now)
+    assert breaker.allows_request(now)
+    breaker.record_failure(now)
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allows_request(now + timedelta(seconds=10))
+
+    assert breaker.allows_request(now + timedelta(seconds=31))
+    assert breaker.state == CircuitState.HALF_OPEN
+    breaker.record_failure(now + timedelta(seconds=31))
+    assert breaker.state == CircuitState.OPEN
+
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.consecutive_failures == 0
+
+@pytest.mark.asyncio
+async def test_batching_combines_events_for_opted_in_endpoint():
+    """Queued events for a batching endpoint are sent in one request"""
+    service = WebhookService()
+    transport = RecordingTransport()
+    service._post_deliveries = transport
+    await service.create_endpoint(
+        name="batched",
+        url="https://example.com/batched",
+        events=[WebhookEvent.CASE_CREATED],
+        batch_size=10
+    )
+
+    try:
+        delivery_ids = []
+        for index in range(3):
+            delivery_ids += await service.send_webhook(WebhookEvent.CASE_CREATED, {"index": index})
+
+        await _wait_until(lambda: all(
+            service.deliveries[d].status == WebhookStatus.DELIVERED for d in delivery_ids
+        ))
+        assert sum(len(request) for request in transport.requests) == 3
+        assert len(transport.requests) < 3
+    finally:
+        await service.stop()
+
+@pytest.mark.asyncio
+async def test_failures_are_rescheduled_not_slept():
+    """A failing endpoint gets a timestamped retry and does not hold the caller"""
+    service = WebhookService()
+    service._post_deliveries = RecordingTransport(succeed=False)
+    await service.create_endpoint(
+        name="down",
+        url="https://example.com/down",
+        events=[WebhookEvent.CASE_CREATED],
+        retry_delay_seconds=60
+    )
+
+    try:
+        [delivery_id] = await service.send_webhook(WebhookEvent.CASE_CREATED, {"case": 1})
+        delivery = service.deliveries[delivery_id]
+        await _wait_until(lambda: delivery.status == WebhookStatus.RETRYING)
+
+        assert delivery.retry_count == 1
+        assert delivery.next_retry_at > datetime.now(UTC) + timedelta(seconds=25)
+        assert service.engine.get_status()["scheduled_retries"] == 1
+    finally:
+        await service.stop()
+
+@pytest.mark.asyncio
+async def test_permanent_rejection_fails_without_retry():
+    """Non-retryable responses fail the delivery immediately"""
+    service = WebhookService()
+    service._post_deliveries = RecordingTransport(succeed=False, retryable=False)
+    await service.create_endpoint(
+        name="rejecting",
+        url="https://example.com/rejecting",
+        events=[WebhookEvent.CASE_CREATED]
+    )
+
+    try:
+        [delivery_id] = await service.send_webhook(WebhookEvent.CASE_CREATED, {"case": 1})
+        delivery = service.deliveries[delivery_id]
+        await _wait_until(lambda: delivery.status == WebhookStatus.FAILED)
+
+        assert delivery.retry_count == 0
+        assert await service.retry_delivery(delivery_id) is True
+        assert delivery.status == WebhookStatus.RETRYING
+        assert delivery.next_retry_at > datetime.now(UTC)
+    finally:
+        await service.stop()
+
+def test_batch_envelope_splices_encoded_bodies():
+    """Batch bodies embed the per-event bytes unchanged"""
+    bodies = [encode_payload({"id": str(index), "data": {"n": index}}) for index in range(3)]
+    batch = encode_batch({"id": "batch-1", "event": "batch"}, bodies)
+
+    decoded = json.loads(batch)
+    assert decoded["id"] == "batch-1"
+    assert decoded["events"] == [json.loads(body) for body in bodies]
+
+@pytest.mark.asyncio
+async def test_fan_out_shares_encoded_body_and_signs_sent_bytes():
+    """One encoding per event; each endpoint's signature covers those exact bytes"""
+    service = WebhookService()
+    service._post_deliveries = RecordingTransport()
+    for name, secret in (("first", "secret-one"), ("second", "secret-two")):
+        await service.create_endpoint(
+            name=name,
+            url=f"https://example.com/{name}",
+            events=[WebhookEvent.CASE_CREATED],
+            secret=secret
+        )
+
+    try:
+        delivery_ids = await service.send_webhook(WebhookEvent.CASE_CREATED, {"case": 1})
+        first, second = (service.deliveries[d] for d in delivery_ids)
+
+        assert first.body is second.body
+        for delivery in (first, second):
+            secret = service.endpoints[delivery.endpoint_id].secret
+            expected = hmac.new(secret.encode(), delivery.body, hashlib.sha256).hexdigest()
+            assert delivery.signature == f"sha256={expected}"
+        assert first.signature != second.signature
+        assert sign_payload("secret-one", first.body) == first.signature
+    finally:
+        await service.stop()
+
+@pytest.mark.asyncio
+async def test_replicas_claim_disjoint_deliveries_and_take_over_lapsed_leases(session_factory, monkeypatch):
+    """Each outstanding delivery is leased to one replica until that replica stops renewing"""
+    monkeypatch.setattr("services.webhook_service.AsyncSessionLocal", session_factory)
+
+    now = datetime.now(UTC)
+    async with session_factory() as session:
+        session.add(WebhookSubscription(id="endpoint", name="Endpoint", url="https://example.com", events=[]))
+        session.add_all([
+            WebhookQueuedDelivery(
+                id=f"delivery-{index}", endpoint_id="endpoint", event_type=WebhookEvent.CASE_CREATED.value,
+                payload={}, status=status, created_at=now + timedelta(seconds=index), retry_count=0
+            )
+            for index, status in enumerate(("pending", "retrying", "delivered"))
+        ])
+        await session.commit()
+
+    first = DatabaseWebhookDeliveryStore(owner_id="replica-1")
+    second = DatabaseWebhookDeliveryStore(owner_id="replica-2")
+    _, resumed = await first.load()
+    assert [delivery.id for delivery in resumed] == ["delivery-0", "delivery-1"]
+    assert await second.claim_deliveries() == []
+    assert await first.renew_leases(["delivery-0", "delivery-1"]) == set()
+
+    # replica-1 stops renewing; once its lease lapses replica-2 takes the work over
+    async with session_factory() as session:
+        await session.execute(
+            update(WebhookQueuedDelivery).values(lease_expires_at=now - timedelta(seconds=1))
+        )
+        await session.commit()
+    assert [delivery.id for delivery in await second.claim_deliveries()] == ["delivery-0", "delivery-1"]
+    assert await first.renew_leases(["delivery-0", "delivery-1"]) == {"delivery-0", "delivery-1"}
+
+    await second.release_leases()
+    async with session_factory() as session:
+        owners = (await session.execute(select(WebhookQueuedDelivery.owner_id))).scalars().all()
+    assert owners == [None, None, None]
+
+@pytest.mark.asyncio
+async def test_replica_delivers_for_endpoints_created_elsewhere_and_lets_untracked_leases_lapse(session_factory, monkeypatch):
+    """A claimed delivery for an endpoint this replica has not seen is looked up, not dropped"""
+    monkeypatch.setattr("services.webhook_service.AsyncSessionLocal", session_factory)
+
+    service = WebhookService()
+    transport = RecordingTransport()
+    service._post_deliveries = transport
+    store = DatabaseWebhookDeliveryStore(owner_id="replica-1")
+    await service.start(store)
+    try:
+        # Another replica creates the endpoint and queues a delivery after this one started
+        now = datetime.now(UTC)
+        async with session_factory() as session:
+            session.add(WebhookSubscription(
+                id="late", name="Late", url="https://example.com", events=[WebhookEvent.CASE_CREATED.value],
+                active=True, max_retries=3, retry_delay_seconds=60, timeout_seconds=30,
+                batch_size=1, max_concurrency=1
+            ))
+            session.add(WebhookQueuedDelivery(
+                id="late-delivery", endpoint_id="late", event_type=WebhookEvent.CASE_CREATED.value,
+                payload={}, status="pending", created_at=now, retry_count=0
+            ))
+            await session.commit()
+
+        service._resume(await store.claim_deliveries())
+        await _wait_until(lambda: transport.requests == [["late-delivery"]])
+        assert "late" in service.endpoints
+
+        # Only the deliveries the replica still tracks are renewed
+        expired = now - timedelta(seconds=1)
+        async with session_factory() as session:
+            session.add(WebhookQueuedDelivery(
+                id="untracked", endpoint_id="late", event_type=WebhookEvent.CASE_CREATED.value, payload={},
+                status="pending", created_at=now, retry_count=0, owner_id="replica-1", lease_expires_at=expired
+            ))
+            await session.commit()
+        await store.renew_leases([])
+        async with session_factory() as session:
+            row = await session.get(WebhookQueuedDelivery, "untracked")
+        assert row.lease_expires_at.replace(tzinfo=UTC) == expired
+    finally:
+        await service.stop()
@@ -124,7 +124,7 @@ export const financialAnalysisService = {
     },
     getTransactions: async (caseId: string) => {
         const response = await apiClient.get(`/api/v1/financial/case/${caseId}/transactions`);
-        return response.data;
+        return response.data.items;
     },
     getAlerts: async (caseId: string) => {
         const response = await apiClient.get(`/api/v1/financial/case/${caseId}/alerts`);